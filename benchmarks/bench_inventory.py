@@ -0,0 +1,72 @@
+"""Time adding, looking up and removing items in an Inventory, against the list-backed inventory it replaced,
+for inventories holding growing numbers of item types.
+Run from the repository root with: python -m benchmarks.bench_inventory
+"""
+import timeit
+
+# tests imports bot.cfg, which must be imported before bot.lib
+from tests.listInventory import ListInventory
+from tests.test_inventory import Item
+from bot.gameObjects.inventories import inventory
+
+# The numbers of distinct item types to time inventories holding
+NUM_ITEMS = (100, 1000, 10000)
+# The number of listings per page when reading pages
+ITEMS_PER_PAGE = 10
+
+
+def addAll(inv, items):
+    for item in items:
+        inv.addItem(item)
+
+
+def lookUpAll(inv, items):
+    for item in items:
+        inv.stores(item)
+        item in inv
+        inv.numStored(item)
+
+
+def addAndRemoveAll(inv, items):
+    for item in items:
+        inv.addItem(item)
+    for item in items:
+        inv.removeItem(item)
+
+
+def readPages(inv, items):
+    for pageNum in range(1, inv.numPages(ITEMS_PER_PAGE) + 1):
+        inv.getPage(pageNum, ITEMS_PER_PAGE)
+
+
+def removeAll(inv, items):
+    for item in reversed(items):
+        inv.removeItem(item)
+
+
+# The stages of filling, reading and emptying an inventory to time, in order
+STAGES = (addAll, lookUpAll, addAndRemoveAll, readPages, removeAll)
+
+
+def timeInventory(inventoryType, items):
+    """Time each stage of filling, reading and emptying an inventory of the given type.
+
+    :return: The seconds taken to add every item, look every item up, add and remove one more of every item,
+                read every page, and remove every item, newest first
+    :rtype: Tuple[float]
+    """
+    inv = inventoryType()
+    return tuple(timeit.timeit(lambda: stage(inv, items), number=1) for stage in STAGES)
+
+
+def main():
+    print("items  inventory  add (s)  look up (s)  add+remove (s)  read pages (s)  remove all (s)")
+    for numItems in NUM_ITEMS:
+        items = [Item(itemNum) for itemNum in range(numItems)]
+        for name, inventoryType in (("list", ListInventory), ("dict", inventory.Inventory)):
+            print("{:>5}  {:>9}  {:>7.4f}  {:>11.4f}  {:>14.4f}  {:>14.4f}  {:>14.4f}".format(
+                numItems, name, *timeInventory(inventoryType, items)))
+
+
+if __name__ == "__main__":
+    main()
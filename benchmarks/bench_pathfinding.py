@@ -0,0 +1,44 @@
+"""Time route finding with bbAStar, breadth-first search and RouteTable lookups, on random galaxies of growing size.
+Run from the repository root with: python -m benchmarks.bench_pathfinding
+"""
+import random
+import timeit
+
+# tests imports bot.cfg, which must be imported before bot.lib
+from tests import galaxies
+from bot.lib import galaxyGraph, pathfinding
+
+# The number of systems in each galaxy to time, and the distance that a jump gate reaches in each
+GALAXY_SIZES = ((50, 0.2), (200, 0.1), (1000, 0.045), (5000, 0.02))
+# The number of routes to find in each galaxy
+NUM_ROUTES = 200
+
+
+def main():
+    rng = random.Random(2033)
+    print("systems  routes  bbAStar (ms/route)  BFS (ms/route)  RouteTable build (s)  RouteTable (ms/route)")
+    for numSystems, jumpRange in GALAXY_SIZES:
+        graph = galaxies.makeRandomGalaxy(numSystems, jumpRange, rng)
+        names = list(graph)
+        pairs = [tuple(rng.sample(names, 2)) for _ in range(NUM_ROUTES)]
+        maxJumpDistance = pathfinding.longestJump(graph)
+
+        aStarTime = timeit.timeit(lambda: [pathfinding.bbAStar(start, end, graph, maxJumpDistance)
+                                            for start, end in pairs], number=1)
+        bfsTime = timeit.timeit(lambda: [galaxies.bfsJumps(start, graph) for start, _ in pairs], number=1)
+        routeTable = None
+
+        def buildTable():
+            nonlocal routeTable
+            routeTable = pathfinding.RouteTable.fromGalaxyGraph(galaxyGraph.GalaxyGraph.fromSystems(graph))
+
+        buildTime = timeit.timeit(buildTable, number=1)
+        tableTime = timeit.timeit(lambda: [routeTable.makeRoute(start, end) for start, end in pairs], number=1)
+
+        print(str(numSystems).rjust(7) + str(NUM_ROUTES).rjust(8) + ("%.3f" % (aStarTime * 1000 / NUM_ROUTES)).rjust(20)
+                + ("%.3f" % (bfsTime * 1000 / NUM_ROUTES)).rjust(16) + ("%.3f" % buildTime).rjust(22)
+                + ("%.4f" % (tableTime * 1000 / NUM_ROUTES)).rjust(23))
+
+
+if __name__ == "__main__":
+    main()
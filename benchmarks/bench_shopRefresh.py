@@ -0,0 +1,66 @@
+"""Time refreshing the shops of many guilds one at a time with GuildShop.refreshStock, against refreshing them all in
+one batch with guildShop.refreshShopStocks, with and without per-guild random streams.
+The shops stock a synthetic catalogue of 10 items of each type per tech level.
+Run from the repository root with: python -m benchmarks.bench_shopRefresh
+"""
+import random
+import timeit
+
+from bot.cfg import bbData, cfg
+from bot.gameObjects import guildShop
+from bot.gameObjects.items import shipItem
+from bot.gameObjects.items.modules import moduleItem
+from bot.gameObjects.items.weapons import primaryWeapon, turretWeapon
+from bot.lib import gameMaths, randomStreams
+
+# The numbers of guilds to time refreshing the shops of
+NUM_GUILDS = (1000, 10000, 50000)
+# The number of items of each type to generate for every tech level
+ITEMS_PER_TL = 10
+
+
+def makeCatalogue():
+    """Populate bbData with synthetic ships, modules, weapons and turrets for every tech level.
+    """
+    techLevels = range(cfg.minTechLevel, cfg.maxTechLevel + 1)
+    bbData.builtInShipPrototypes = {}
+    bbData.shipKeysByTL = []
+    for techLevel in techLevels:
+        shipKeys = ["Ship " + str(techLevel) + "-" + str(itemNum) for itemNum in range(ITEMS_PER_TL)]
+        for shipKey in shipKeys:
+            bbData.builtInShipPrototypes[shipKey] = shipItem.Ship(shipKey, 2, 1, 3, value=techLevel * 10000,
+                                                                    techLevel=techLevel)
+        bbData.shipKeysByTL.append(shipKeys)
+    bbData.moduleObjsByTL = [[moduleItem.ModuleItem("Module " + str(techLevel) + "-" + str(itemNum), [],
+                                                    value=techLevel * 1000, techLevel=techLevel)
+                                for itemNum in range(ITEMS_PER_TL)] for techLevel in techLevels]
+    bbData.weaponObjsByTL = [[primaryWeapon.PrimaryWeapon("Weapon " + str(techLevel) + "-" + str(itemNum), [],
+                                                            value=techLevel * 1000, techLevel=techLevel)
+                                for itemNum in range(ITEMS_PER_TL)] for techLevel in techLevels]
+    bbData.turretObjsByTL = [[turretWeapon.TurretWeapon("Turret " + str(techLevel) + "-" + str(itemNum), [],
+                                                        value=techLevel * 1000, techLevel=techLevel)
+                                for itemNum in range(ITEMS_PER_TL)] for techLevel in techLevels]
+
+
+def main():
+    makeCatalogue()
+    print("NumPy " + ("installed" if gameMaths.np is not None else "not installed, using pure Python fallbacks"))
+    print(" guilds  refreshStock (s)  refreshStock + streams (s)  batch (s)  batch + streams (s)")
+    for numGuilds in NUM_GUILDS:
+        shops = [guildShop.GuildShop(noRefresh=True) for _ in range(numGuilds)]
+        guildIDs = random.sample(range(10 ** 17, 10 ** 18), numGuilds)
+
+        loopTime = timeit.timeit(lambda: [shop.refreshStock() for shop in shops], number=1)
+        loopStreamsTime = timeit.timeit(lambda: [shop.refreshStock(rng=randomStreams.makeStream(guildID, "shop", 0))
+                                                    for shop, guildID in zip(shops, guildIDs)], number=1)
+        batchTime = timeit.timeit(lambda: guildShop.refreshShopStocks(shops), number=1)
+        batchStreamsTime = timeit.timeit(lambda: guildShop.refreshShopStocks(shops,
+                                                    [randomStreams.streamSeed(guildID, "shop", 0) for guildID in guildIDs]),
+                                            number=1)
+
+        print(str(numGuilds).rjust(7) + ("%.3f" % loopTime).rjust(18) + ("%.3f" % loopStreamsTime).rjust(28)
+                + ("%.3f" % batchTime).rjust(11) + ("%.3f" % batchStreamsTime).rjust(21))
+
+
+if __name__ == "__main__":
+    main()
@@ -22,10 +22,11 @@ import aiohttp
 # BASED Imports
 
 from . import lib, botState, logging
-from .databases import guildDB, reactionMenuDB, userDB
+from .databases import guildDB, reactionMenuDB, userDB, creditsLedger
 from .scheduling.timedTask import TimedTask
 from .scheduling.timedTaskHeap import TimedTaskHeap
 from bot.scheduling import timedTaskHeap
+from .scheduling import commandExecutor
 
 
 async def checkForUpdates():
@@ -90,10 +91,7 @@ def setHelpEmbedThumbnails():
     """Loads the bot application's profile picture into all help menu embeds as the embed thumbnail.
     If no profile picture is set for the application, the default profile picture is used instead.
     """
-    for levelSection in botCommands.helpSectionEmbeds:
-        for helpSection in levelSection.values():
-            for embed in helpSection:
-                embed.set_thumbnail(url=botState.client.user.avatar_url_as(size=64))
+    botCommands.setHelpEmbedThumbnail(botState.client.user.avatar_url_as(size=64))
 
 
 async def initializeBountyBoardChannels():
@@ -190,10 +188,12 @@ class BasedClient(ClientBaseClass):
         - the users database
         - the guilds database
         - the reaction menus database
+        - the credits ledger
         - logs
         """
         if self.storeUsers:
             lib.jsonHandler.saveDB(cfg.paths.usersDB, botState.usersDB)
+            botState.creditsLedger.save(cfg.paths.creditsLedger)
         if self.storeGuilds:
             lib.jsonHandler.saveDB(cfg.paths.guildsDB, botState.guildsDB)
         if self.storeMenus:
@@ -211,6 +211,8 @@ class BasedClient(ClientBaseClass):
         - saves all savedata to file
         """
         botState.taskScheduler.stopTaskChecking()
+        if botState.commandExecutor is not None:
+            botState.commandExecutor.stop()
         if self.storeMenus:
             # expire non-saveable reaction menus
             menus = list(botState.reactionMenusDB.values())
@@ -402,6 +404,29 @@ async def on_guild_remove(guild: discord.Guild):
                                 "I left a guild! " + guild.name + "#" + str(guild.id) \
                                     + ("\n -- The guild was removed from botState.guildsDB" if guildExists else ""),
                                 category="guildsDB", eventType="LEAVE_GUILD")
+    # Guilds' leaderboards are only indexed after usersDB is loaded
+    if botState.usersDB is not None:
+        botState.usersDB.removeGuild(guild.id)
+
+
+@botState.client.event
+async def on_member_join(member: discord.Member):
+    """Add new guild members to the guild's leaderboards, if the guild's members are indexed.
+
+    :param discord.Member member: the member who joined the guild.
+    """
+    if botState.usersDB is not None:
+        botState.usersDB.addGuildMember(member.guild.id, member.id)
+
+
+@botState.client.event
+async def on_member_remove(member: discord.Member):
+    """Remove members who leave a guild from the guild's leaderboards.
+
+    :param discord.Member member: the member who left the guild.
+    """
+    if botState.usersDB is not None:
+        botState.usersDB.removeGuildMember(member.guild.id, member.id)
 
 
 @botState.client.event
@@ -424,6 +449,11 @@ async def on_ready():
     else:
         raise ValueError("Unsupported cfg.timedTaskCheckingType: " + str(cfg.timedTaskCheckingType))
 
+    if cfg.useCommandExecutor:
+        botState.commandExecutor = commandExecutor.CommandExecutor(cfg.commandExecutorWorkers, cfg.commandPriorityClasses,
+                                                                    cfg.defaultCommandPriorityClass)
+        botState.commandExecutor.start()
+
     # Set custom bot status
     await botState.client.change_presence(activity=discord.Game("BASED APP"))
     # bot is now logged in
@@ -477,6 +507,7 @@ async def on_ready():
 
     # Load save data. If the specified files do not exist, an empty database will be created instead.
     botState.usersDB = loadUsersDB(cfg.paths.usersDB)
+    botState.creditsLedger = creditsLedger.CreditsLedger.load(cfg.paths.creditsLedger, cfg.creditsLedgerRetentionDays)
     botState.guildsDB = loadGuildsDB(cfg.paths.guildsDB)
     botState.reactionMenusDB = await loadReactionMenusDB(cfg.paths.reactionMenusDB)
 
@@ -565,7 +596,15 @@ async def on_message(message: discord.Message):
         accessLevel = inferUserPermissions(message)
         try:
             # Call the requested command
-            commandFound = await botCommands.call(command, message, args, accessLevel, isDM=isDM)
+            if botState.commandExecutor is None:
+                commandFound = await botCommands.call(command, message, args, accessLevel, isDM=isDM)
+            # Queue the command in its priority class
+            else:
+                registry = botCommands.find(command, accessLevel)
+                commandFound = await botState.commandExecutor.submit("" if registry is None else registry.ident,
+                                                                        None if isDM else message.guild.id,
+                                                                        botCommands.call(command, message, args, accessLevel,
+                                                                                            isDM=isDM))
         # If a non-DMable command was called from DMs, send an error message
         except lib.exceptions.IncorrectCommandCallContext:
             await err_nodm(message, "", isDM)
@@ -12,12 +12,14 @@ shutdown = ShutDownState.restart
 usersDB = None
 guildsDB = None
 reactionMenusDB = None
+creditsLedger = None
 
 newBountiesTTDB = None
 duelRequestTTDB = None
 shopRefreshTT = None
 
 taskScheduler = None
+commandExecutor = None
 logger = None
 
 dbSaveTT = None
@@ -37,6 +37,9 @@ factionColours = {  "terran": Colour.gold(),
 # Ships to not have tech levels in GOF2, so tech levels will be automaticaly generated
 # for the sake of the bot during bot.on_ready.
 builtInShipData = {}
+# Shared, unmodifiable Ship objects for each builtIn ship, listed in shops until bought. Keys are builtInShipData keys.
+# To be populated during bot.on_ready
+builtInShipPrototypes = {}
 
 # Data representing all module items in the game. These are used to create bbModule objects,
 # which are stored in builtInModuleObjs in a similar dict format.
@@ -86,6 +89,44 @@ builtInWeaponObjs = {}
 builtInUpgradeObjs = {}
 builtInTurretObjs = {}
 
+# Indexes mapping the normalized name and every normalized alias of each builtIn object to that object,
+# for constant time lookup by name. See lib.stringTyping.normalizeName.
+# Ships are not instanced at load time, so shipNameIndex maps to keys of builtInShipData instead.
+# To be populated during bot.on_ready
+shipNameIndex = {}
+systemNameIndex = {}
+criminalNameIndex = {}
+moduleNameIndex = {}
+weaponNameIndex = {}
+turretNameIndex = {}
+toolNameIndex = {}
+
+# lib.fuzzySearch.TrigramIndexes over the names and aliases in the above indexes, for suggesting corrections to misspelled
+# names. Suggestions are given as object names. To be populated during bot.on_ready
+shipNameTrigrams = None
+systemNameTrigrams = None
+criminalNameTrigrams = None
+moduleNameTrigrams = None
+weaponNameTrigrams = None
+turretNameTrigrams = None
+toolNameTrigrams = None
+
+# lib.galaxyGraph.GalaxyGraph compiled from builtInSystemObjs. To be populated during bot.on_ready
+galaxyGraph = None
+# lib.pathfinding.RouteTable of the shortest routes between all builtIn systems. To be populated during bot.on_ready
+routeTable = None
+
+# lib.routeMap.RouteMapRenderer of galaxyGraph, if cfg.renderRouteMaps is enabled. To be populated during bot.on_ready
+routeMapRenderer = None
+
+# lib.statMatrix.StatMatrix of the stats of every builtIn ship, weapon, module and turret, keyed by item type,
+# for searching and comparing items. Ships are represented by their prototypes. To be populated during bot.on_ready
+statMatrices = {}
+
+# gameObjects.bounties.npcFleet.NPCFleet of pre-generated ships for NPC criminals to fly in bounties.
+# To be populated during bot.on_ready
+npcFleet = None
+
 # References to the above item objects, sorted by techLevel.
 shipKeysByTL = []
 moduleObjsByTL = []
@@ -67,10 +67,15 @@ paths = {
     "usersDB": "saveData" + "/" + "users.json",
     "guildsDB": "saveData" + "/" + "guilds.json",
     "reactionMenusDB": "saveData" + "/" + "reactionMenus.json",
+    # path to the binary file of recent credits balance changes
+    "creditsLedger": "saveData" + "/" + "creditsLedger.bin",
 
     # path to folder to save log txts to
     "logsFolder": "saveData" + "/" + "logs",
 
+    # path to JSON file caching the shortest routes between all systems
+    "routeTableCache": "saveData" + "/" + "routeTable.json",
+
     # folders containing game objects to load into the game
     "CriminalMETAFolder": "game objects" + "/" + "criminals",
     "shipSkinMETAFolder": "game objects" + "/" + "ship skins",
@@ -95,6 +100,12 @@ helpIntro = "Here are my commands!"
 # Maximum number of commands each cmd_help menu may contain
 maxCommandsPerHelpPage = 5
 
+# Maximum number of commands to list in the results of a help search
+maxHelpSearchResults = 10
+
+# Number of items to list on each page of the results of an item search
+itemSearchResultsPerPage = 8
+
 # List of module names from the commands package to import
 # includedCommandModules = ("usr_misc",
 #                           "admn_misc",
@@ -104,9 +115,38 @@ includedCommandModules = (  "usr_misc", "usr_homeguilds", "usr_gof2-info", "usr_
                             "admn_channels", "admn_misc",
                             "dev_misc", "dev_channels", "dev_bounties", "dev_items", "dev_skins")
 
+# Whether to defer importing command modules until one of their commands is first called.
+# Commands are registered up front from a manifest read from each module's source.
+lazyCommandModules = True
+
 # Default prefix for commands
 defaultCommandPrefix = "$"
 
+# The minimum trigram similarity (between 0 and 1) a name must have to a misspelled name, to be suggested as a correction
+fuzzySuggestionThreshold = 0.4
+
+# The maximum number of names to suggest as corrections to a misspelled name
+maxFuzzySuggestions = 3
+
+# Whether to run commands through a queue with separate priority classes, rather than as soon as they are received.
+# Within each priority class, guilds take turns to have a command started.
+useCommandExecutor = False
+
+# The maximum number of commands of each priority class that may run at once
+commandExecutorWorkers = {"read": 8, "economy": 4, "heavy": 2}
+
+# The priority class to run commands in, for commands not listed in commandPriorityClasses
+defaultCommandPriorityClass = "read"
+
+# Identifiers of the commands to run in each priority class
+commandPriorityClasses = {
+    "economy": ("buy", "sell", "pay", "equip", "unequip", "use", "duel", "check", "transfer", "nameship", "unnameship",
+                "give", "setbalance", "refreshshop"),
+    "heavy": ("showme", "showmehd", "map", "make-route", "route", "total-value", "leaderboard", "make-bounty",
+              "make-player-bounty", "add-skin-to-all-ships", "del-skin-from-all-ships",
+              "duel-odds", "optimise", "find")
+}
+
 
 
 ##### REACTION MENUS #####
@@ -167,6 +207,18 @@ userAlertsIDsDefaults = {   "bounties_new": False,
 
 homeGuildTransferCooldown = {"weeks": 1}
 
+# Users keep a running total of the value of their items, which is updated as their items change.
+# Give True to recalculate each user's total value from scratch whenever it is requested, and log any difference.
+# This is slow, and intended only for debugging.
+verifyUserValues = False
+
+# The number of days of credits balance changes to keep for time-windowed leaderboards, including the current day.
+# This must be at least the length of the longest window in leaderboardWindowDays.
+creditsLedgerRetentionDays = 31
+
+# The number of days covered by each time-windowed leaderboard, including the current day
+leaderboardWindowDays = {"daily": 1, "weekly": 7, "monthly": 30}
+
 
 
 ##### GAME MATHS #####
@@ -188,6 +240,13 @@ shipMaxPriceTechLevels = [50000, 100000, 200000, 500000, 1000000, 2000000, 50000
 # The amount to vary ship stats (+-) by before executing a duel
 duelVariancePercent = 0.05
 
+# The number of duels to simulate when predicting the outcome of a duel
+duelPredictionSimulations = 10000
+
+# The maximum number of partial loadouts to consider when optimising a ship's loadout.
+# If the limit is reached, the best loadout found so far is used.
+loadoutOptimiserMaxNodes = 10000
+
 # Max number of entries that can be printed for a duel log
 duelLogMaxLength = 10
 
@@ -210,6 +269,11 @@ shopRefreshWeapons = 5
 shopRefreshModules = 5
 shopRefreshTurrets = 2
 
+# Whether each guild's shop stock and bounties should be generated from that guild's own seeded random stream,
+# derived from the guild ID and the refresh time. This makes generation reproducible, and independent between guilds.
+# Shops are refreshed together in one batch either way. When False, the global random number generator is used.
+guildRandomStreams = True
+
 # bbTurret is the only item that has a probability not to be spawned.
 # This metric indicates the percentage chance of turrets being stocked on a given refresh
 turretSpawnProbability = 45
@@ -245,6 +309,10 @@ fallbackRouteScale = 5
 # The number of credits to award for each bPoint (each system in a criminal route)
 bPointsToCreditsRatio = 1000
 
+# The number of ships with random loadouts to generate at once for NPC criminals of each tech level.
+# Each tech level's pool is filled on startup, and regenerated whenever it runs out.
+npcFleetPoolSize = 50
+
 # number of bounties ahead of a checked system in a route to report a recent criminal spotting (+1)
 closeBountyThreshold = 4
 
@@ -252,6 +320,18 @@ closeBountyThreshold = 4
 bbcNoBountiesMsg = "```css\n[ NO ACTIVE BOUNTIES ]\n\nThere are currently no active bounty listings.\n" \
                     + "Please check back later, or use [ $notify bounties ] to be pinged when new ones become available!\n```"
 
+# Whether or not to attach a map image to route and make-route responses
+renderRouteMaps = True
+
+# The number of pixels per galaxy coordinate unit in route map images
+routeMapScale = 8
+
+# The number of pixels of empty space around the edges of the galaxy in route map images
+routeMapMargin = 40
+
+# The maximum number of rendered route maps to keep in memory
+routeMapCacheSize = 128
+
 
 
 ##### SKINS #####
@@ -5,8 +5,8 @@ from types import FunctionType
 
 from . import cfg, bbData
 from ..gameObjects import shipUpgrade, shipSkin
-from ..gameObjects.bounties import criminal, solarSystem
-from ..gameObjects.items import moduleItemFactory
+from ..gameObjects.bounties import criminal, solarSystem, npcFleet
+from ..gameObjects.items import moduleItemFactory, shipItem
 from ..gameObjects.items.weapons import primaryWeapon, turretWeapon
 from ..gameObjects.items.tools import shipSkinTool, toolItemFactory
 from .. import lib
@@ -155,6 +155,40 @@ def _loadGameObjects(dataDB : Dict[str, dict], objsDB : Dict[str, Any], deserial
         dataDB[objDict["name"]]["builtIn"] = True
 
 
+def _buildNameIndex(objsDB : Dict[str, Any]) -> Dict[str, Any]:
+    """Create a dictionary mapping the normalized name and all normalized aliases of each Aliasable in objsDB,
+    to that object.
+
+    :param Dict[str, Any] objsDB: Dictionary of object name to Aliasable object, to index
+    :return: A dictionary mapping normalized names and aliases to objects in objsDB
+    :rtype: Dict[str, Any]
+    """
+    nameIndex = {}
+    for obj in objsDB.values():
+        for alias in obj.aliases:
+            nameIndex[lib.stringTyping.normalizeName(alias)] = obj
+    # Main names take priority over aliases of other objects
+    for obj in objsDB.values():
+        nameIndex[lib.stringTyping.normalizeName(obj.name)] = obj
+    return nameIndex
+
+
+def _buildShipNameIndex() -> Dict[str, str]:
+    """Create a dictionary mapping the normalized name and all normalized aliases of each ship in bbData.builtInShipData,
+    to the ship's key in bbData.builtInShipData.
+
+    :return: A dictionary mapping normalized ship names and aliases to keys of bbData.builtInShipData
+    :rtype: Dict[str, str]
+    """
+    nameIndex = {}
+    for shipKey, shipData in bbData.builtInShipData.items():
+        for alias in shipData.get("aliases", []):
+            nameIndex[lib.stringTyping.normalizeName(alias)] = shipKey
+    for shipKey, shipData in bbData.builtInShipData.items():
+        nameIndex[lib.stringTyping.normalizeName(shipData["name"])] = shipKey
+    return nameIndex
+
+
 def _sortShipKeys():
     """Populate bbData.shipKeysByTL with the names of ships from bbData.builtInShipData, sorted by tech level.
     """
@@ -186,8 +220,9 @@ def _sortGameObjects(objsDB : Dict[str, Any]) -> List[List[Any]]:
 def _makeShipSpawnRates():
     """Calculate spawn rates for the ship metadatas found in bbData.builtInShipData, based on their techLevels.
     """
+    itemTLSpawnChanceForShopTL = gameMaths.getTechLevelTables().itemTLSpawnChanceForShopTL
     for ship in bbData.builtInShipData.values():
-        unnormalizedChance = gameMaths.itemTLSpawnChanceForShopTL[ship["techLevel"] - 1][ship["techLevel"] - 1]
+        unnormalizedChance = itemTLSpawnChanceForShopTL[ship["techLevel"] - 1][ship["techLevel"] - 1]
         normalizedChance = unnormalizedChance / len(bbData.shipKeysByTL[ship["techLevel"] - 1])
         ship["shopSpawnRate"] = gameMaths.truncItemSpawnResolution(normalizedChance * 100)
 
@@ -196,12 +231,46 @@ def _makeItemSpawnRates(objsDB : Dict[str, Any]):
     """Calculate spawn rates for the game object instances found in objsDB, based on their techLevels.
     Spawn rates are then stored in the items' shopSpawnRate attributes.
     """
+    itemTLSpawnChanceForShopTL = gameMaths.getTechLevelTables().itemTLSpawnChanceForShopTL
     for item in objsDB.values():
-        unnormalizedChance = gameMaths.itemTLSpawnChanceForShopTL[item.techLevel - 1][item.techLevel - 1]
+        unnormalizedChance = itemTLSpawnChanceForShopTL[item.techLevel - 1][item.techLevel - 1]
         normalizedChance = unnormalizedChance / len(bbData.shipKeysByTL[item.techLevel - 1])
         item.shopSpawnRate = gameMaths.truncItemSpawnResolution(normalizedChance * 100)
 
 
+def makeSpawnRates():
+    """Calculate shop spawn rates for all builtIn ships, modules, weapons and turrets, from the current
+    gameMaths tech level tables. Call this again after the tables are recalculated, to update the spawn rates.
+    bbData.shipKeysByTL must be populated first.
+    """
+    _makeShipSpawnRates()
+    for objsDB in (bbData.builtInModuleObjs, bbData.builtInWeaponObjs, bbData.builtInTurretObjs):
+        _makeItemSpawnRates(objsDB)
+
+
+def buildStatMatrices():
+    """Build the columnar tables of item stats used for searching and comparing items, into bbData.statMatrices.
+    Items are listed in name order. This must be called after ship prototypes are created.
+    """
+    commonStats = {"value": lambda item: item.getValue(), "tl": lambda item: item.techLevel}
+    weaponStats = {**commonStats, "dps": lambda weapon: weapon.dps}
+    moduleStats = {**commonStats}
+    for stat in ("armour", "shield", "dps", "cargo", "handling"):
+        moduleStats[stat] = lambda module, stat=stat: getattr(module, stat)
+        moduleStats[stat + "mult"] = lambda module, stat=stat: getattr(module, stat + "Multiplier")
+    shipStats = {**commonStats, "dps": lambda ship: ship.getDPS(), "shield": lambda ship: ship.getShield(),
+                    "armour": lambda ship: ship.getArmour(), "cargo": lambda ship: ship.getCargo(),
+                    "handling": lambda ship: ship.getHandling(), "primaries": lambda ship: ship.getMaxPrimaries(),
+                    "secondaries": lambda ship: ship.getMaxSecondaries(), "turrets": lambda ship: ship.getMaxTurrets(),
+                    "modules": lambda ship: ship.getMaxModules()}
+
+    for itemType, objsDB, stats in (("ship",    bbData.builtInShipPrototypes,   shipStats),
+                                    ("weapon",  bbData.builtInWeaponObjs,       weaponStats),
+                                    ("module",  bbData.builtInModuleObjs,       moduleStats),
+                                    ("turret",  bbData.builtInTurretObjs,       weaponStats)):
+        bbData.statMatrices[itemType] = lib.statMatrix.StatMatrix.fromItems([objsDB[name] for name in sorted(objsDB)], stats)
+
+
 def loadAllGameObjectData():
     """Load json descriptions of all configured game objects into bbData variables.
     This function populates:
@@ -249,12 +318,36 @@ def loadAllGameObjects():
     bbData.builtInTurretObjs
     bbData.builtInToolObjs
     bbData.builtInShipSkins
+    bbData.builtInShipPrototypes
 
     bbData.shipKeysByTL
     bbData.moduleObjsByTL
     bbData.weaponObjsByTL
     bbData.turretObjsByTL
 
+    bbData.shipNameIndex
+    bbData.systemNameIndex
+    bbData.criminalNameIndex
+    bbData.moduleNameIndex
+    bbData.weaponNameIndex
+    bbData.turretNameIndex
+    bbData.toolNameIndex
+
+    bbData.shipNameTrigrams
+    bbData.systemNameTrigrams
+    bbData.criminalNameTrigrams
+    bbData.moduleNameTrigrams
+    bbData.weaponNameTrigrams
+    bbData.turretNameTrigrams
+    bbData.toolNameTrigrams
+
+    bbData.statMatrices
+    bbData.npcFleet
+
+    bbData.galaxyGraph
+    bbData.routeTable
+    bbData.routeMapRenderer (if cfg.renderRouteMaps)
+
     This function currently does NOT populate:
     bbData.builtInCommodityObjs
     bbData.builtInSecondariesObjs
@@ -279,17 +372,27 @@ def loadAllGameObjects():
             bbData.builtInToolObjs[toolName] = newTool
 
     _sortShipKeys()
-    _makeShipSpawnRates()
-
     for db, objsDB in ( ("moduleObjsByTL", bbData.builtInModuleObjs),
                         ("weaponObjsByTL", bbData.builtInWeaponObjs),
                         ("turretObjsByTL", bbData.builtInTurretObjs)):
         setattr(bbData, db, _sortGameObjects(objsDB))
-        _makeItemSpawnRates(objsDB)
+    makeSpawnRates()
 
     # Crates can contain any other item, so need to be loaded after all other items
     _loadGameObjects(bbData.builtInToolData, bbData.builtInToolObjs, toolItemFactory.fromDict)
 
+    # Create a single shared ship object for each builtIn ship, to be listed in shops
+    for shipKey, shipData in bbData.builtInShipData.items():
+        prototype = shipItem.Ship.fromDict(shipData)
+        prototype.isPrototype = True
+        bbData.builtInShipPrototypes[shipKey] = prototype
+
+    buildStatMatrices()
+
+    # Pre-generate ships for NPC criminals, now that the prototypes and items sorted by tech level are ready
+    bbData.npcFleet = npcFleet.NPCFleet(cfg.npcFleetPoolSize)
+    bbData.npcFleet.refill()
+
     # Fetch bounty names and longest bounty name
     for criminalName in bbData.builtInCriminalData:
         if bbData.builtInCriminalData[criminalName]["faction"] not in bbData.bountyNames:
@@ -297,3 +400,34 @@ def loadAllGameObjects():
         bbData.bountyNames[bbData.builtInCriminalData[criminalName]["faction"]].append(criminalName)
         if len(criminalName) > bbData.longestBountyNameLength:
             bbData.longestBountyNameLength = len(criminalName)
+
+    # Index all objects by name and alias
+    bbData.shipNameIndex = _buildShipNameIndex()
+    for indexName, objsDB in (  ("systemNameIndex",     bbData.builtInSystemObjs),
+                                ("criminalNameIndex",   bbData.builtInCriminalObjs),
+                                ("moduleNameIndex",     bbData.builtInModuleObjs),
+                                ("weaponNameIndex",     bbData.builtInWeaponObjs),
+                                ("turretNameIndex",     bbData.builtInTurretObjs),
+                                ("toolNameIndex",       bbData.builtInToolObjs)):
+        setattr(bbData, indexName, _buildNameIndex(objsDB))
+
+    # Index all names and aliases by trigram, for spelling suggestions
+    bbData.shipNameTrigrams = lib.fuzzySearch.TrigramIndex.fromNames(bbData.shipNameIndex)
+    for trigramsName, indexName in (("systemNameTrigrams",      "systemNameIndex"),
+                                    ("criminalNameTrigrams",    "criminalNameIndex"),
+                                    ("moduleNameTrigrams",      "moduleNameIndex"),
+                                    ("weaponNameTrigrams",      "weaponNameIndex"),
+                                    ("turretNameTrigrams",      "turretNameIndex"),
+                                    ("toolNameTrigrams",        "toolNameIndex")):
+        setattr(bbData, trigramsName, lib.fuzzySearch.TrigramIndex.fromNames(
+            {name: obj.name for name, obj in getattr(bbData, indexName).items()}))
+
+    # Compile the galaxy into an integer-indexed graph, and precompute the shortest routes between all systems,
+    # or load them from the cache if the galaxy is unchanged
+    bbData.galaxyGraph = lib.galaxyGraph.GalaxyGraph.fromSystems(bbData.builtInSystemObjs)
+    bbData.routeTable = lib.pathfinding.loadRouteTable(bbData.galaxyGraph, cfg.paths.routeTableCache)
+
+    # Draw the galaxy base layer for route maps
+    if cfg.renderRouteMaps:
+        bbData.routeMapRenderer = lib.routeMap.RouteMapRenderer(bbData.galaxyGraph, cfg.routeMapScale, cfg.routeMapMargin,
+                                                                cfg.routeMapCacheSize)
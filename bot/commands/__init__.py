@@ -1,6 +1,9 @@
 from ..commandsManager import heirarchicalCommandsDB
+from ..commandsManager.commandsManifest import CommandsManifest
 from ..cfg import cfg
+from ..lib.exceptions import UnmanifestableCommandModule
 import importlib
+import importlib.util
 
 commandsDB = heirarchicalCommandsDB.HeirarchicalCommandsDB(len(cfg.userAccessLevels))
 
@@ -10,8 +13,23 @@ def loadCommands():
     commandsDB.clear()
 
     for modName in cfg.includedCommandModules:
+        modName = ("" if modName.startswith(".") else ".") + modName
+        if cfg.lazyCommandModules:
+            # Register stubs from the module's manifest, deferring the import until one of its commands is called
+            modSpec = importlib.util.find_spec(modName, "bot.commands")
+            if modSpec is None:
+                raise ImportError("Unrecognised commands module in cfg.includedCommandModules. " \
+                                    + "Please ensure the file exists, and spelling/capitalization are correct: '" \
+                                    + modName + "'")
+            try:
+                commandsDB.registerManifest(CommandsManifest.fromSource(modSpec.name, modSpec.origin))
+                continue
+            # Modules which register commands dynamically must be imported up front
+            except UnmanifestableCommandModule:
+                pass
+
         try:
-            importlib.import_module(("" if modName.startswith(".") else ".") + modName, "bot.commands")
+            importlib.import_module(modName, "bot.commands")
         except ImportError as e:
             if e == modName:
                 raise ImportError("Unrecognised commands module in cfg.includedCommandModules. " \
@@ -27,12 +27,14 @@ async def admin_cmd_admin_help(message: discord.Message, args: str, isDM: bool):
     """
     await util_help.util_autohelp(message, args, isDM, 2)
 
-botCommands.register("admin-help", admin_cmd_admin_help, 2, signatureStr="**admin-help** *[page number, section or command]*",
+botCommands.register("admin-help", admin_cmd_admin_help, 2,
+                     signatureStr="**admin-help** *[page number, section, command or search <words>]*",
                      shortHelp="Display information about admin-only commands.\nGive a specific command for detailed " \
                                 + "info about it, or give a page number or give a section name for brief info.",
                      longHelp="Display information about admin-only commands.\nGive a specific command for detailed " \
                                 + "info about it, or give a page number or give a section name for brief info about " \
-                                + "a set of commands. These are the currently valid section names:\n- Miscellaneous")
+                                + "a set of commands. These are the currently valid section names:\n- Miscellaneous" \
+                                + "\nGive `search` followed by some words to find commands about them.")
 
 
 async def admin_cmd_set_prefix(message: discord.Message, args: str, isDM: bool):
@@ -448,10 +450,9 @@ async def admin_cmd_showmeHD(message : discord.Message, args : str, isDM : bool)
     # look up the ship object
     itemName = args.rstrip(" ").title()
     itemObj = None
-    for ship in bbData.builtInShipData.values():
-        shipObj = shipItem.Ship.fromDict(ship)
-        if shipObj.isCalled(itemName):
-            itemObj = shipObj
+    shipKey = bbData.shipNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
+    if shipKey is not None:
+        itemObj = shipItem.Ship.fromDict(bbData.builtInShipData[shipKey])
 
     # report unrecognised ship names
     if itemObj is None:
@@ -334,12 +334,11 @@ async def dev_cmd_make_bounty(message : discord.Message, args : str, isDM : bool
             newName = ""
         else:
             # if a criminal name was given, see if it corresponds to a builtIn criminal
-            for crim in bbData.builtInCriminalObjs.values():
-                if crim.isCalled(newName):
-                    builtIn = True
-                    builtInCrimObj = crim
-                    newName = crim.name
-                    break
+            crim = bbData.criminalNameIndex.get(lib.stringTyping.normalizeName(newName), None)
+            if crim is not None:
+                builtIn = True
+                builtInCrimObj = crim
+                newName = crim.name
 
             # if a criminal name was given, ensure it does not already exist as a bounty
             if newName != "" and callingBBGuild.bountiesDB.bountyNameExists(newName):
@@ -3,8 +3,9 @@ import json
 
 from . import commandsDB as botCommands
 from .. import lib, botState
-from ..cfg import cfg, bbData
+from ..cfg import cfg, bbData, gameConfigurator
 from ..gameObjects.items import gameItem
+from ..lib import gameMaths
 
 
 botCommands.addHelpSection(2, "items")
@@ -226,7 +227,7 @@ async def dev_cmd_del_item_key(message : discord.Message, args : str, isDM : boo
         await message.reply(mention_author=False, content=":x: Invalid item number! Must be at least 1.")
         return
 
-    requestedItem = userItemInactives.keys[itemNum - 1]
+    requestedItem = userItemInactives.getKeys()[itemNum - 1]
     itemName = ""
     itemEmbed = None
 
@@ -275,16 +276,18 @@ async def dev_cmd_del_item_key(message : discord.Message, args : str, isDM : boo
         itemName = requestedItem.name + "\n" + requestedItem.statsStringShort()
 
     if requestedItem not in userItemInactives.items:
-        userItemInactives.keys.remove(requestedItem)
-        userItemInactives.numKeys -= 1
+        # Rebuild the keys list from the listings, dropping the erroneous key
+        userItemInactives.orderedKeys = None
         await message.reply(mention_author=False, content=":white_check_mark: **Erroneous key** deleted from " \
                                     + lib.discordUtil.userOrMemberName(requestedUser, message.guild) \
                                     + "'s inventory: " + itemName, embed=itemEmbed)
     else:
         itemCount = userItemInactives.items[requestedItem].count
         del userItemInactives.items[requestedItem]
-        userItemInactives.keys.remove(requestedItem)
+        userItemInactives.orderedKeys = None
         userItemInactives.numKeys -= 1
+        # The inventory was edited directly, so the user's running value must be recalculated
+        requestedBBUser.itemsValue = requestedBBUser.calculateItemsValue()
         await message.reply(mention_author=False, content=":white_check_mark: " + str(itemCount) + " item(s) deleted from " \
                                     + lib.discordUtil.userOrMemberName(requestedUser, message.guild) \
                                     + "'s inventory: " + itemName, embed=itemEmbed)
@@ -315,6 +318,25 @@ async def dev_cmd_refreshshop(message : discord.Message, args : str, isDM : bool
 botCommands.register("refreshshop", dev_cmd_refreshshop, 2, allowDM=False, helpSection="items", useDoc=True)
 
 
+async def dev_cmd_tl_tables(message : discord.Message, args : str, isDM : bool):
+    """Show the chances of each shop tech level, and of each item tech level within each shop tech level.
+    Give 'reset' to recalculate the tables and all items' shop spawn rates first, e.g after changing cfg values.
+
+    :param discord.Message message: the discord message calling the command
+    :param str args: either empty, or 'reset' to recalculate the tables before showing them
+    :param bool isDM: Whether or not the command is being called from a DM channel
+    """
+    if args == "reset":
+        gameMaths.resetTechLevelTables()
+        gameConfigurator.makeSpawnRates()
+    elif args != "":
+        await message.reply(mention_author=False, content=":x: Unknown argument! Give either nothing, or `reset`.")
+        return
+    await message.reply(mention_author=False, content="```\n" + gameMaths.getTechLevelTables().describe() + "\n```")
+
+botCommands.register("tl-tables", dev_cmd_tl_tables, 2, allowDM=True, helpSection="items", useDoc=True)
+
+
 async def dev_cmd_debug_hangar(message : discord.Message, args : str, isDM : bool):
     """developer command printing the requested user's hangar, including object memory addresses.
 
@@ -346,8 +368,8 @@ async def dev_cmd_debug_hangar(message : discord.Message, args : str, isDM : boo
     itemTypes = ("ship", "weapon", "module", "turret")
     for itemType in itemTypes:
         itemInv = requestedBBUser.getInactivesByName(itemType)
-        await message.reply(mention_author=False, content=itemType.upper() + " KEYS: " + str(itemInv.keys) + "\n" + itemType.upper() \
-                                    + " LISTINGS: " + str(list(itemInv.items.keys())))
+        await message.reply(mention_author=False, content=itemType.upper() + " KEYS: " + str(itemInv.getKeys()) + "\n" \
+                                    + itemType.upper() + " LISTINGS: " + str(list(itemInv.items.keys())))
 
     for page in range(1, maxPage + 1):
 
@@ -366,7 +388,7 @@ async def dev_cmd_debug_hangar(message : discord.Message, args : str, isDM : boo
                 if itemNum == firstPlace:
                     hangarEmbed.add_field(
                         name="‎", value="__**Stored " + itemType.title() + "s**__", inline=False)
-                currentItem = itemInv.keys[itemNum - 1]
+                currentItem = itemInv.getKeys()[itemNum - 1]
                 itemStored = currentItem in itemInv.items
                 currentItemCount = itemInv.numStored(
                     currentItem) if itemStored else 0
@@ -17,13 +17,15 @@ async def dev_cmd_dev_help(message: discord.Message, args: str, isDM: bool):
     """
     await util_help.util_autohelp(message, args, isDM, 3)
 
-botCommands.register("dev-help", dev_cmd_dev_help, 3, signatureStr="**dev-help** *[page number, section or command]*",
+botCommands.register("dev-help", dev_cmd_dev_help, 3,
+                        signatureStr="**dev-help** *[page number, section, command or search <words>]*",
                         shortHelp="Display information about developer-only commands.\nGive a specific command for " \
                                     + "detailed info about it, or give a page number or give a section name for brief info.",
                         longHelp="Display information about developer-only commands.\nGive a specific command for " \
                                     + "detailed info about it, or give a page number or give a section name for brief info " \
                                     + "about a set of commands. These are the currently valid section names:" \
-                                    + "\n- Miscellaneous")
+                                    + "\n- Miscellaneous" \
+                                    + "\nGive `search` followed by some words to find commands about them.")
 
 
 async def dev_cmd_sleep(message: discord.Message, args: str, isDM: bool):
@@ -182,3 +184,27 @@ async def dev_cmd_reset_transfer_cool(message : discord.Message, args : str, isD
 
 
 botCommands.register("reset-transfer-cool", dev_cmd_reset_transfer_cool, 2, allowDM=True, useDoc=True)
+
+
+async def dev_cmd_command_queues(message : discord.Message, args : str, isDM : bool):
+    """developer command printing the depth, running workers and wait times of each command priority class queue.
+
+    :param discord.Message message: the discord message calling the command
+    :param str args: ignored
+    :param bool isDM: Whether or not the command is being called from a DM channel
+    """
+    if botState.commandExecutor is None:
+        await message.reply(mention_author=False, content=":x: The command executor is disabled! See cfg.useCommandExecutor.")
+        return
+    statsEmbed = lib.discordUtil.makeEmbed(titleTxt="Command Queues")
+    for className, classStats in botState.commandExecutor.stats().items():
+        statsEmbed.add_field(name=className.title(),
+                                value="Queued: " + str(classStats["depth"]) + " from " + str(classStats["guilds"]) \
+                                        + " guilds" \
+                                        + "\nRunning: " + str(classStats["running"]) + "/" + str(classStats["maxWorkers"]) \
+                                        + "\nStarted: " + str(classStats["started"]) \
+                                        + "\nAverage wait: " + str(round(classStats["avgWait"], 3)) + "s" \
+                                        + "\nLongest wait: " + str(round(classStats["maxWait"], 3)) + "s")
+    await message.reply(mention_author=False, embed=statsEmbed)
+
+botCommands.register("command-queues", dev_cmd_command_queues, 2, allowDM=True, useDoc=True)
@@ -36,10 +36,9 @@ async def dev_cmd_addSkin(message : discord.Message, args : str, isDM : bool):
     # look up the ship object
     itemName = args.rstrip(" ").title()
     itemObj = None
-    for ship in bbData.builtInShipData.values():
-        shipObj = shipItem.Ship.fromDict(ship)
-        if shipObj.isCalled(itemName):
-            itemObj = shipObj
+    shipKey = bbData.shipNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
+    if shipKey is not None:
+        itemObj = shipItem.Ship.fromDict(bbData.builtInShipData[shipKey])
 
     # report unrecognised ship names
     if itemObj is None:
@@ -99,10 +98,9 @@ async def dev_cmd_delSkin(message : discord.Message, args : str, isDM : bool):
     # look up the ship object
     itemName = args.rstrip(" ").title()
     itemObj = None
-    for ship in bbData.builtInShipData.values():
-        shipObj = shipItem.Ship.fromDict(ship)
-        if shipObj.isCalled(itemName):
-            itemObj = shipObj
+    shipKey = bbData.shipNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
+    if shipKey is not None:
+        itemObj = shipItem.Ship.fromDict(bbData.builtInShipData[shipKey])
 
     # report unrecognised ship names
     if itemObj is None:
@@ -160,10 +158,9 @@ async def dev_cmd_makeSkin(message : discord.Message, args : str, isDM : bool):
     # look up the ship object
     itemName = args.rstrip(" ").title()
     itemObj = None
-    for ship in bbData.builtInShipData.values():
-        shipObj = shipItem.Ship.fromDict(ship)
-        if shipObj.isCalled(itemName):
-            itemObj = shipObj
+    shipKey = bbData.shipNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
+    if shipKey is not None:
+        itemObj = shipItem.Ship.fromDict(bbData.builtInShipData[shipKey])
 
     # report unrecognised ship names
     if itemObj is None:
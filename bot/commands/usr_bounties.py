@@ -1,10 +1,12 @@
 import discord
 from datetime import datetime, timedelta
+from io import BytesIO
 
 from . import commandsDB as botCommands
 from .. import botState, lib
 from ..cfg import cfg, bbData
-from ..gameObjects.battles import duelRequest
+from ..gameObjects.battles import duelRequest, duelPrediction
+from ..databases import creditsLedger
 from ..scheduling import timedTask
 from ..reactionMenus import reactionMenu, reactionDuelChallengeMenu, expiryFunctions
 
@@ -47,19 +49,20 @@ async def cmd_check(message : discord.Message, args : str, isDM : bool):
         return
 
     requestedSystem = args.title()
-    systObj = None
 
     # attempt to find the requested system in the database
-    for syst in bbData.builtInSystemObjs.keys():
-        if bbData.builtInSystemObjs[syst].isCalled(requestedSystem):
-            systObj = bbData.builtInSystemObjs[syst]
+    systObj = bbData.systemNameIndex.get(lib.stringTyping.normalizeName(requestedSystem), None)
 
     # reject if the requested system is not in the database
     if systObj is None:
+        suggestions = bbData.systemNameTrigrams.suggest(requestedSystem, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(requestedSystem) < 20:
-            await message.reply(mention_author=False, content=":x: The **" + requestedSystem + "** system is not on my star map! :map:")
+            await message.reply(mention_author=False, content=":x: The **" + requestedSystem \
+                                        + "** system is not on my star map! :map:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: The **" + requestedSystem[0:15] + "**... system is not on my star map! :map:")
+            await message.reply(mention_author=False, content=":x: The **" + requestedSystem[0:15] \
+                                        + "**... system is not on my star map! :map:" + suggestionsStr)
         return
 
     requestedSystem = systObj.name
@@ -84,52 +87,51 @@ async def cmd_check(message : discord.Message, args : str, isDM : bool):
         systemInBountyRoute = False
         dailyBountiesMaxReached = False
 
-        # Loop over all bounties in the database
-        for fac in callingGuild.bountiesDB.getFactions():
-            # list of completed bounties to remove from the bounties database
-            toPop = []
-            for bounty in callingGuild.bountiesDB.getFactionBounties(fac):
-
-                # Check the passed system in current bounty
-                # If current bounty resides in the requested system
-                checkResult = bounty.check(requestedSystem, message.author.id)
-                if checkResult == 3:
-                    requestedBBUser.bountyWinsToday += 1
-                    if not dailyBountiesMaxReached and requestedBBUser.bountyWinsToday >= cfg.maxDailyBountyWins:
-                        requestedBBUser.dailyBountyWinsReset = lib.timeUtil.tomorrow()
-                        dailyBountiesMaxReached = True
-
-                    bountyWon = True
-                    # reward all contributing users
-                    rewards = bounty.calcRewards()
-                    for userID in rewards:
-                        botState.usersDB.getUser(
-                            userID).credits += rewards[userID]["reward"]
-                        botState.usersDB.getUser(
-                            userID).lifetimeBountyCreditsWon += rewards[userID]["reward"]
-                    # add this bounty to the list of bounties to be removed
-                    toPop += [bounty]
-                    # Announce the bounty has ben completed
-                    await callingGuild.announceBountyWon(bounty, rewards, message.author)
-
-                if checkResult != 0:
-                    systemInBountyRoute = True
-                    await callingGuild.updateBountyBoardChannel(bounty, bountyComplete=checkResult == 3)
-
-            # remove all completed bounties
-            for bounty in toPop:
-                callingGuild.bountiesDB.removeBountyObj(bounty)
+        # list of completed bounties to remove from the bounties database
+        toPop = []
+        # Loop over only the bounties whose routes pass through the requested system.
+        # The index is copied, as it cannot be changed during iteration.
+        for bounty in list(callingGuild.bountiesDB.getSystemBounties(requestedSystem)):
+
+            # Check the passed system in current bounty
+            # If current bounty resides in the requested system
+            checkResult = bounty.check(requestedSystem, message.author.id)
+            if checkResult == 3:
+                requestedBBUser.bountyWinsToday += 1
+                if not dailyBountiesMaxReached and requestedBBUser.bountyWinsToday >= cfg.maxDailyBountyWins:
+                    requestedBBUser.dailyBountyWinsReset = lib.timeUtil.tomorrow()
+                    dailyBountiesMaxReached = True
+
+                bountyWon = True
+                # reward all contributing users
+                rewards = bounty.calcRewards()
+                for userID in rewards:
+                    botState.usersDB.getUser(
+                        userID).credits += rewards[userID]["reward"]
+                    botState.usersDB.getUser(
+                        userID).lifetimeBountyCreditsWon += rewards[userID]["reward"]
+                    botState.creditsLedger.record(userID, rewards[userID]["reward"], creditsLedger.LedgerEvent.bounty)
+                # add this bounty to the list of bounties to be removed
+                toPop += [bounty]
+                # Announce the bounty has ben completed
+                await callingGuild.announceBountyWon(bounty, rewards, message.author)
+
+            if checkResult != 0:
+                systemInBountyRoute = True
+                await callingGuild.updateBountyBoardChannel(bounty, bountyComplete=checkResult == 3)
+
+        # remove all completed bounties
+        for bounty in toPop:
+            callingGuild.bountiesDB.removeBountyObj(bounty)
 
         sightedCriminalsStr = ""
         # Check if any bounties are close to the requested system in their route, defined by cfg.closeBountyThreshold
-        for fac in callingGuild.bountiesDB.getFactions():
-            for bounty in callingGuild.bountiesDB.getFactionBounties(fac):
-                if requestedSystem in bounty.route:
-                    if 0 < bounty.route.index(bounty.answer) - bounty.route.index(requestedSystem) < cfg.closeBountyThreshold:
-                        # Print any close bounty names
-                        sightedCriminalsStr += "**       **• Local security forces spotted **" \
-                                                + lib.discordUtil.criminalNameOrDiscrim(bounty.criminal) \
-                                                + "** here recently.\n"
+        for bounty, systemPos in callingGuild.bountiesDB.getSystemBounties(requestedSystem).items():
+            if 0 < callingGuild.bountiesDB.getSystemBounties(bounty.answer)[bounty] - systemPos < cfg.closeBountyThreshold:
+                # Print any close bounty names
+                sightedCriminalsStr += "**       **• Local security forces spotted **" \
+                                        + lib.discordUtil.criminalNameOrDiscrim(bounty.criminal) \
+                                        + "** here recently.\n"
         sightedCriminalsStr = sightedCriminalsStr[:-1]
 
         # If a bounty was won, print a congratulatory message
@@ -252,6 +254,8 @@ async def cmd_bounties(message : discord.Message, args : str, isDM : bool):
                                 + str(len(bounty.route)) + " possible system"
                 if len(bounty.route) != 1:
                     outmessage += "s"
+                if bounty.ship is not None:
+                    outmessage += " - Flying a " + bounty.ship.name
             maxBountiesMsg = ""
             if botState.usersDB.idExists(message.author.id):
                 requestedBBUser = botState.usersDB.getUser(message.author.id)
@@ -305,11 +309,22 @@ async def cmd_route(message : discord.Message, args : str, isDM : bool):
             outmessage += " " + ("~~" if bounty.checked[system] != -1 else "") \
                             + system + ("~~" if bounty.checked[system] != -1 else "") + ","
         outmessage = outmessage[:-1] + ". :rocket:"
-        await message.reply(mention_author=False, content=outmessage)
+        if bounty.ship is not None:
+            outmessage += "\nThey are flying a **" + bounty.ship.name + "**."
+        routeMap = None
+        if bbData.routeMapRenderer is not None:
+            routeMap = discord.File(BytesIO(bbData.routeMapRenderer.renderRoute(bounty.route)), filename="route.png")
+        await message.reply(mention_author=False, content=outmessage, file=routeMap)
     # if the named criminal is not wanted
     else:
         # display an error
         outmsg = ":x: That pilot isn't on any bounty boards! :clipboard:"
+        # suggest similarly named active bounties
+        activeBountyNames = [bounty.criminal.name for factionBounties in callingGuild.bountiesDB.bounties.values()
+                                for bounty in factionBounties if not bounty.criminal.isPlayer]
+        outmsg += lib.fuzzySearch.didYouMean(lib.fuzzySearch.rankBySimilarity(requestedBountyName, activeBountyNames,
+                                                                                cfg.fuzzySuggestionThreshold,
+                                                                                cfg.maxFuzzySuggestions))
         # accept user name + discrim instead of tags to avoid mention spam
         if lib.stringTyping.isMention(requestedBountyName):
             outmsg += "\n:warning: **Don't tag users**, use their name and ID number like so: `" \
@@ -514,6 +529,67 @@ botCommands.register("duel", cmd_duel, 0, forceKeepArgsCasing=True, allowDM=Fals
                                     + "you will win - the 'stakes'.")
 
 
+async def cmd_duel_odds(message : discord.Message, args : str, isDM : bool):
+    """Predict the outcome of a duel between the calling user's active ship and another user's active ship,
+    by simulating many duels. No credits are staked, and the other user is not notified.
+
+    :param discord.Message message: the discord message calling the command
+    :param str args: string containing a target user (mention or ID)
+    :param bool isDM: Whether or not the command is being called from a DM channel
+    """
+    if args == "":
+        await message.reply(mention_author=False, content=":x: Please provide a user to compare ships with!")
+        return
+    requestedUser = lib.discordUtil.getMemberByRefOverDB(args, dcGuild=message.guild)
+    if requestedUser is None:
+        await message.reply(mention_author=False, content=":x: User not found!")
+        return
+    if requestedUser.id == message.author.id:
+        await message.reply(mention_author=False, content=":x: You can't duel yourself!")
+        return
+
+    sourceBBUser = botState.usersDB.getOrAddID(message.author.id)
+    targetBBUser = botState.usersDB.getOrAddID(requestedUser.id)
+
+    simulationStart = datetime.utcnow()
+    prediction = duelPrediction.predictDuel(sourceBBUser.activeShip, targetBBUser.activeShip, cfg.duelVariancePercent,
+                                            cfg.duelPredictionSimulations)
+    simulationTime = datetime.utcnow() - simulationStart
+
+    targetName = lib.discordUtil.userOrMemberName(requestedUser, message.guild)
+    predictionEmbed = lib.discordUtil.makeEmbed(titleTxt="Duel Prediction", col=bbData.factionColours["neutral"],
+                                                desc=sourceBBUser.activeShip.getNameAndNick() + " vs " \
+                                                        + targetBBUser.activeShip.getNameAndNick(),
+                                                footerTxt="Simulated " + str(prediction["numFights"]) + " duels in " \
+                                                        + str(round(simulationTime.total_seconds() * 1000)) + "ms. " \
+                                                        + "Ranges are 95% confidence intervals.")
+
+    # Show win chances and times to kill for each user, where ship1 belongs to the calling user
+    for shipKey, userName in (("ship1", message.author.name), ("ship2", targetName)):
+        shipPrediction = prediction[shipKey]
+        lowChance, highChance = shipPrediction["winChanceInterval"]
+        fieldValue = "Win chance: **" + str(round(shipPrediction["winChance"] * 100, 1)) + "%** (" \
+                        + str(round(lowChance * 100, 1)) + "-" + str(round(highChance * 100, 1)) + "%)"
+        if shipPrediction["TTK"]["mean"] is None:
+            fieldValue += "\nNever destroyed"
+        else:
+            lowTTK, highTTK = shipPrediction["TTK"]["interval"]
+            fieldValue += "\nDestroyed after: **" + str(round(shipPrediction["TTK"]["mean"], 2)) + "s** (" \
+                            + str(round(lowTTK, 2)) + "-" + str(round(highTTK, 2)) + "s)"
+        predictionEmbed.add_field(name=userName, value=fieldValue)
+    if prediction["drawChance"] > 0:
+        predictionEmbed.add_field(name="Draw", value="**" + str(round(prediction["drawChance"] * 100, 1)) + "%**")
+
+    await message.reply(mention_author=False, embed=predictionEmbed)
+
+botCommands.register("duel-odds", cmd_duel_odds, 0, forceKeepArgsCasing=True, allowDM=False, helpSection="bounties",
+                        signatureStr="**duel-odds [user]**",
+                        shortHelp="See your chances of winning a duel against another player, without fighting.",
+                        longHelp="See your chances of winning a duel against another player, without fighting. " \
+                                    + "Thousands of duels between your active ship and theirs are simulated, to estimate " \
+                                    + "who would win and how long each ship would last.")
+
+
 async def cmd_use(message : discord.Message, args : str, isDM : bool):
     """Use the specified tool from the user's inventory.
 
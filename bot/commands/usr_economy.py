@@ -3,6 +3,7 @@ import discord
 from . import commandsDB as botCommands
 from .. import botState, lib
 from ..cfg import cfg
+from ..databases import creditsLedger
 
 
 botCommands.addHelpSection(0, "economy")
@@ -86,172 +87,11 @@ async def cmd_shop(message : discord.Message, args : str, isDM : bool):
                                                     + message.guild.icon + ".png?size=64") \
                                                         if message.guild.icon is not None else "")
 
-    if item in ["all", "ship"]:
-        for shipNum in range(1, requestedShop.shipsStock.numKeys + 1):
-            if shipNum == 1:
-                shopEmbed.add_field(name="‎", value="__**Ships**__", inline=False)
-
-            try:
-                currentItem = requestedShop.shipsStock[shipNum - 1].item
-            except KeyError:
-                try:
-                    botState.logger.log("Main", "cmd_shop", "Requested ship '" \
-                                                            + requestedShop.shipsStock.keys[shipNum - 1].name \
-                                                            + "' (index " + str(shipNum - 1) \
-                                                            + "), which was not found in the shop stock",
-                                            category="shop", eventType="UNKWN_KEY")
-                except IndexError:
-                    break
-                except AttributeError:
-                    keysStr = ""
-                    for item in requestedShop.shipsStock.items:
-                        keysStr += str(item) + ", "
-                    botState.logger.log("Main", "cmd_shop", "Unexpected type in shipsstock KEYS, index " + str(shipNum - 1) \
-                                                            + ". Expected shipItem, got " \
-                                                            + type(requestedShop.shipsStock.keys[shipNum - 1]).__name__ \
-                                                            + ".\nInventory keys: " + keysStr[:-2],
-                                        category="shop", eventType="INVTY_KEY_TYPE")
-                    shopEmbed.add_field(name=str(shipNum) + ". **⚠ #INVALID-ITEM# '" \
-                                            + requestedShop.shipsStock.keys[shipNum - 1] + "'",
-                                        value="Do not attempt to buy. Could cause issues.", inline=True)
-                    continue
-                shopEmbed.add_field(name=str(shipNum) + ". **⚠ #INVALID-ITEM# '" \
-                                        + requestedShop.shipsStock.keys[shipNum - 1].name + "'",
-                                    value="Do not attempt to buy. Could cause issues.", inline=True)
-                continue
-
-            currentItemCount = requestedShop.shipsStock.items[currentItem].count
-            shopEmbed.add_field(name=str(shipNum) + ". " \
-                                    + (currentItem.emoji.sendable + " " if currentItem.hasEmoji else "") \
-                                    + ((" `(" + str(currentItemCount) + ")` ") if currentItemCount > 1 else "") + "**" \
-                                    + currentItem.getNameAndNick() + "**",
-                                value=lib.stringTyping.commaSplitNum(currentItem.getValue()) + " Credits\n" \
-                                    + currentItem.statsStringShort(), inline=True)
-
-    if item in ["all", "weapon"]:
-        for weaponNum in range(1, requestedShop.weaponsStock.numKeys + 1):
-            if weaponNum == 1:
-                shopEmbed.add_field(name="‎", value="__**Weapons**__", inline=False)
-
-            try:
-                currentItem = requestedShop.weaponsStock[weaponNum - 1].item
-            except KeyError:
-                try:
-                    botState.logger.log("Main", "cmd_shop",
-                                        "Requested weapon '" \
-                                            + requestedShop.weaponsStock.keys[weaponNum - 1].name + "' (index " \
-                                            + str(weaponNum - 1) + "), which was not found in " + "the shop stock",
-                                        category="shop", eventType="UNKWN_KEY")
-                except IndexError:
-                    break
-                except AttributeError:
-                    keysStr = ""
-                    for item in requestedShop.weaponsStock.items:
-                        keysStr += str(item) + ", "
-                    botState.logger.log("Main", "cmd_shop",
-                                        "Unexpected type in weaponsstock KEYS, index " \
-                                            + str(weaponNum - 1) + ". Expected primaryWeapon, got " \
-                                            + type(requestedShop.weaponsStock.keys[weaponNum - 1]).__name__ \
-                                            + ".\nInventory keys: " + keysStr[:-2], category="shop",
-                                        eventType="INVTY_KEY_TYPE")
-                    shopEmbed.add_field(name=str(weaponNum) + ". **⚠ #INVALID-ITEM# '" \
-                                            + requestedShop.weaponsStock.keys[weaponNum - 1] + "'",
-                                        value="Do not attempt to buy. Could cause issues.", inline=True)
-                    continue
-                shopEmbed.add_field(name=str(weaponNum) + ". **⚠ #INVALID-ITEM# '" \
-                                        + requestedShop.weaponsStock.keys[weaponNum - 1].name + "'",
-                                    value="Do not attempt to buy. Could cause issues.", inline=True)
-                continue
-
-            currentItemCount = requestedShop.weaponsStock.items[currentItem].count
-            shopEmbed.add_field(name=str(weaponNum) + ". " \
-                                    + (currentItem.emoji.sendable + " " if currentItem.hasEmoji else "") \
-                                    + ((" `(" + str(currentItemCount) + ")` ") if currentItemCount > 1 else "") \
-                                    + "**" + currentItem.name + "**",
-                                    value=lib.stringTyping.commaSplitNum(currentItem.value) + " Credits\n" \
-                                        + currentItem.statsStringShort(), inline=True)
-
-    if item in ["all", "module"]:
-        for moduleNum in range(1, requestedShop.modulesStock.numKeys + 1):
-            if moduleNum == 1:
-                shopEmbed.add_field(name="‎", value="__**Modules**__", inline=False)
-
-            try:
-                currentItem = requestedShop.modulesStock[moduleNum - 1].item
-            except KeyError:
-                try:
-                    botState.logger.log("Main", "cmd_shop", "Requested module '" \
-                                                            + requestedShop.modulesStock.keys[moduleNum - 1].name \
-                                                            + "' (index " + str(moduleNum - 1) \
-                                                            + "), which was not found in the shop stock", category="shop",
-                                        eventType="UNKWN_KEY")
-                except IndexError:
-                    break
-                except AttributeError:
-                    keysStr = ""
-                    for item in requestedShop.modulesStock.items:
-                        keysStr += str(item) + ", "
-                    botState.logger.log("Main", "cmd_shop", "Unexpected type in modulesstock KEYS, index " \
-                                                            + str(moduleNum - 1) + ". Expected moduleItem, got " \
-                                                            + type(requestedShop.modulesStock.keys[moduleNum - 1]).__name__ \
-                                                            + ".\nInventory keys: " + keysStr[:-2], category="shop",
-                                        eventType="INVTY_KEY_TYPE")
-                    shopEmbed.add_field(name=str(moduleNum) + ". **⚠ #INVALID-ITEM# '" \
-                                            + requestedShop.modulesStock.keys[moduleNum - 1] + "'",
-                                        value="Do not attempt to buy. Could cause issues.", inline=True)
-                    continue
-                shopEmbed.add_field(name=str(moduleNum) + ". **⚠ #INVALID-ITEM# '" \
-                                        + requestedShop.modulesStock.keys[moduleNum - 1].name + "'",
-                                    value="Do not attempt to buy. Could cause issues.", inline=True)
-                continue
-
-            currentItemCount = requestedShop.modulesStock.items[currentItem].count
-            shopEmbed.add_field(name=str(moduleNum) + ". " \
-                                    + (currentItem.emoji.sendable + " " if currentItem.hasEmoji else "") \
-                                    + ((" `(" + str(currentItemCount) + ")` ") if currentItemCount > 1 else "") + "**" \
-                                    + currentItem.name + "**", value=lib.stringTyping.commaSplitNum(currentItem.value) \
-                                    + " Credits\n" + currentItem.statsStringShort(), inline=True)
-
-    if item in ["all", "turret"]:
-        for turretNum in range(1, requestedShop.turretsStock.numKeys + 1):
-            if turretNum == 1:
-                shopEmbed.add_field(name="‎", value="__**Turrets**__", inline=False)
-
-            try:
-                currentItem = requestedShop.turretsStock[turretNum - 1].item
-            except KeyError:
-                try:
-                    botState.logger.log("Main", "cmd_shop", "Requested turret '" \
-                                                            + requestedShop.turretsStock.keys[turretNum - 1].name \
-                                                            + "' (index " + str(turretNum - 1) \
-                                                            + "), which was not found in the shop stock", category="shop",
-                                        eventType="UNKWN_KEY")
-                except IndexError:
-                    break
-                except AttributeError:
-                    keysStr = ""
-                    for item in requestedShop.turretsStock.items:
-                        keysStr += str(item) + ", "
-                    botState.logger.log("Main", "cmd_shop", "Unexpected type in turretsstock KEYS, index " \
-                                                            + str(turretNum - 1) + ". Expected turretWeapon, got " \
-                                                            + type(requestedShop.turretsStock.keys[turretNum - 1]).__name__ \
-                                                            + ".\nInventory keys: " + keysStr[:-2], category="shop",
-                                        eventType="INVTY_KEY_TYPE")
-                    shopEmbed.add_field(name=str(turretNum) + ". **⚠ #INVALID-ITEM# '" \
-                                            + requestedShop.turretsStock.keys[turretNum - 1] + "'",
-                                        value="Do not attempt to buy. Could cause issues.", inline=True)
-                    continue
-                shopEmbed.add_field(name=str(turretNum) + ". **⚠ #INVALID-ITEM# '" \
-                                        + requestedShop.turretsStock.keys[turretNum - 1].name + "'",
-                                    value="Do not attempt to buy. Could cause issues.", inline=True)
-                continue
-
-            currentItemCount = requestedShop.turretsStock.items[currentItem].count
-            shopEmbed.add_field(name=str(turretNum) + ". " \
-                                + (currentItem.emoji.sendable + " " if currentItem.hasEmoji else "") \
-                                + ((" `(" + str(currentItemCount) + ")` ") if currentItemCount > 1 else "") + "**" \
-                                + currentItem.name + "**", value=lib.stringTyping.commaSplitNum(currentItem.value) \
-                                + " Credits\n" + currentItem.statsStringShort(), inline=True)
+    for itemType in ("ship", "weapon", "module", "turret"):
+        if item not in ("all", itemType):
+            continue
+        for fieldName, fieldValue, fieldInline in requestedShop.getListingFields(itemType):
+            shopEmbed.add_field(name=fieldName, value=fieldValue, inline=fieldInline)
 
     try:
         await sendChannel.send(embed=shopEmbed)
@@ -362,6 +202,9 @@ async def cmd_shop_buy(message : discord.Message, args : str, isDM : bool):
     requestedItem = shopItemStock[itemNum - 1].item
 
     if item == "ship":
+        # Shops may list shared prototype ships. Remove the listed ship from the stock, but give the user their own copy
+        listedShip = requestedItem
+        requestedItem = listedShip.copyIfPrototype()
         newShipValue = requestedItem.getValue()
         activeShip = requestedBUser.activeShip
 
@@ -383,13 +226,15 @@ async def cmd_shop_buy(message : discord.Message, args : str, isDM : bool):
             # TODO: move to a separate sellActiveShip function
             oldShipValue = activeShip.getValue(shipUpgradesOnly=transferItems)
             requestedBUser.credits += oldShipValue
+            botState.creditsLedger.record(requestedBUser.id, oldShipValue, creditsLedger.LedgerEvent.shopSale)
             shopItemStock.addItem(activeShip)
         else:
             oldShipValue = None
 
         requestedBUser.equipShipObj(requestedItem, noSaveActive=sellOldShip)
         requestedBUser.credits -= newShipValue
-        shopItemStock.removeItem(requestedItem)
+        botState.creditsLedger.record(requestedBUser.id, -newShipValue, creditsLedger.LedgerEvent.shopPurchase)
+        shopItemStock.removeItem(listedShip)
 
         outStr = ":moneybag: Congratulations on your new **" + requestedItem.name + "**!"
         if sellOldShip:
@@ -411,6 +256,7 @@ async def cmd_shop_buy(message : discord.Message, args : str, isDM : bool):
             return
 
         requestedBUser.credits -= requestedItem.value
+        botState.creditsLedger.record(requestedBUser.id, -requestedItem.value, creditsLedger.LedgerEvent.shopPurchase)
         requestedBUser.getInactivesByName(item).addItem(requestedItem)
         shopItemStock.removeItem(requestedItem)
 
@@ -505,6 +351,7 @@ async def cmd_shop_sell(message : discord.Message, args : str, isDM : bool):
             requestedBUser.unequipAll(requestedItem)
 
         requestedBUser.credits += requestedItem.getValue()
+        botState.creditsLedger.record(requestedBUser.id, requestedItem.getValue(), creditsLedger.LedgerEvent.shopSale)
         userItemInactives.removeItem(requestedItem)
         shopItemStock.addItem(requestedItem)
 
@@ -516,6 +363,7 @@ async def cmd_shop_sell(message : discord.Message, args : str, isDM : bool):
 
     elif item in ["weapon", "module", "turret", "tool"]:
         requestedBUser.credits += requestedItem.getValue()
+        botState.creditsLedger.record(requestedBUser.id, requestedItem.getValue(), creditsLedger.LedgerEvent.shopSale)
         userItemInactives.removeItem(requestedItem)
 
         if requestedItem is None:
@@ -576,6 +424,7 @@ async def cmd_pay(message : discord.Message, args : str, isDM : bool):
 
     sourceBBUser.credits -= amount
     targetBBUser.credits += amount
+    botState.creditsLedger.recordTransfer(sourceBBUser.id, targetBBUser.id, amount, creditsLedger.LedgerEvent.payment)
 
     await message.reply(mention_author=False, content=":moneybag: You paid " + lib.discordUtil.userOrMemberName(requestedUser, message.guild) \
                                 + " **" + str(amount) + "** credits!")
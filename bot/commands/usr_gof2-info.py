@@ -1,6 +1,8 @@
 import discord
 import os
+import re
 import asyncio
+from io import BytesIO
 
 from . import commandsDB as botCommands
 from ..cfg import bbData, cfg
@@ -61,21 +63,26 @@ async def cmd_make_route(message : discord.Message, args : str, isDM : bool):
 
     # attempt to look up the requested systems in the built in systems database
     systemsFound = {requestedStart: False, requestedEnd: False}
-    for syst in bbData.builtInSystemObjs.keys():
-        if bbData.builtInSystemObjs[syst].isCalled(requestedStart):
-            systemsFound[requestedStart] = True
-            startSyst = syst
-        if bbData.builtInSystemObjs[syst].isCalled(requestedEnd):
-            systemsFound[requestedEnd] = True
-            endSyst = syst
+    startObj = bbData.systemNameIndex.get(lib.stringTyping.normalizeName(requestedStart), None)
+    endObj = bbData.systemNameIndex.get(lib.stringTyping.normalizeName(requestedEnd), None)
+    if startObj is not None:
+        systemsFound[requestedStart] = True
+        startSyst = startObj.name
+    if endObj is not None:
+        systemsFound[requestedEnd] = True
+        endSyst = endObj.name
 
     # report any unrecognised systems
     for syst in [requestedStart, requestedEnd]:
         if not systemsFound[syst]:
+            suggestions = bbData.systemNameTrigrams.suggest(syst, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+            suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
             if len(syst) < 20:
-                await message.reply(mention_author=False, content=":x: The **" + syst + "** system is not on my star map! :map:")
+                await message.reply(mention_author=False, content=":x: The **" + syst \
+                                            + "** system is not on my star map! :map:" + suggestionsStr)
             else:
-                await message.reply(mention_author=False, content=":x: The **" + syst[0:15] + "**... system is not on my star map! :map:")
+                await message.reply(mention_author=False, content=":x: The **" + syst[0:15] \
+                                            + "**... system is not on my star map! :map:" + suggestionsStr)
             return
 
     # report any systems that were recognised, but do not have any neighbours
@@ -89,17 +96,19 @@ async def cmd_make_route(message : discord.Message, args : str, isDM : bool):
 
     # build and print the route, reporting any errors in the route generation process
     routeStr = ""
-    for currentSyst in lib.pathfinding.makeRoute(startSyst, endSyst):
+    route = lib.pathfinding.makeRoute(startSyst, endSyst)
+    for currentSyst in route:
         routeStr += currentSyst + ", "
-    if routeStr.startswith("#"):
-        await message.reply(mention_author=False, content=":x: ERR: Processing took too long! :stopwatch:")
-    elif routeStr.startswith("!"):
+    if routeStr.startswith("!"):
         await message.reply(mention_author=False, content=":x: ERR: No route found! :triangular_flag_on_post:")
     elif startSyst == endSyst:
         await message.reply(mention_author=False, content=":thinking: You're already there, pilot!")
     else:
+        routeMap = None
+        if bbData.routeMapRenderer is not None:
+            routeMap = discord.File(BytesIO(bbData.routeMapRenderer.renderRoute(route)), filename="route.png")
         await message.reply(mention_author=False, content="Here's the shortest route from **" + startSyst + "** to **" + endSyst + "**:\n> " \
-                                    + routeStr[:-2] + " :rocket:")
+                                    + routeStr[:-2] + " :rocket:", file=routeMap)
 
 botCommands.register("make-route", cmd_make_route, 0, allowDM=True, helpSection="gof2 info",
                         signatureStr="**make-route <startSystem>, <endSystem>**",
@@ -126,17 +135,18 @@ async def cmd_info_system(message : discord.Message, args : str, isDM : bool):
 
     # attempt to look up the specified system
     systArg = args.title()
-    systObj = None
-    for syst in bbData.builtInSystemObjs.keys():
-        if bbData.builtInSystemObjs[syst].isCalled(systArg):
-            systObj = bbData.builtInSystemObjs[syst]
+    systObj = bbData.systemNameIndex.get(lib.stringTyping.normalizeName(systArg), None)
 
     # report unrecognised systems
     if systObj is None:
+        suggestions = bbData.systemNameTrigrams.suggest(systArg, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(systArg) < 20:
-            await message.reply(mention_author=False, content=":x: The **" + systArg + "** system is not on my star map! :map:")
+            await message.reply(mention_author=False, content=":x: The **" + systArg \
+                                        + "** system is not on my star map! :map:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: The **" + systArg[0:15] + "**... system is not on my star map! :map:")
+            await message.reply(mention_author=False, content=":x: The **" + systArg[0:15] \
+                                        + "**... system is not on my star map! :map:" + suggestionsStr)
     else:
         # build the neighbours statistic into a string
         neighboursStr = ""
@@ -187,17 +197,18 @@ async def cmd_info_criminal(message : discord.Message, args : str, isDM : bool):
 
     # look up the criminal object
     criminalName = args.title()
-    criminalObj = None
-    for crim in bbData.builtInCriminalObjs.keys():
-        if bbData.builtInCriminalObjs[crim].isCalled(criminalName):
-            criminalObj = bbData.builtInCriminalObjs[crim]
+    criminalObj = bbData.criminalNameIndex.get(lib.stringTyping.normalizeName(criminalName), None)
 
     # report unrecognised criminal names
     if criminalObj is None:
+        suggestions = bbData.criminalNameTrigrams.suggest(criminalName, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(criminalName) < 20:
-            await message.reply(mention_author=False, content=":x: **" + criminalName + "** is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + criminalName \
+                                        + "** is not in my database! :detective:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: **" + criminalName[0:15] + "**... is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + criminalName[0:15] \
+                                        + "**... is not in my database! :detective:" + suggestionsStr)
 
     else:
         # build the stats embed
@@ -237,17 +248,20 @@ async def cmd_info_ship(message : discord.Message, args : str, isDM : bool):
     # look up the ship object
     itemName = args.title()
     itemObj = None
-    for ship in bbData.builtInShipData.values():
-        shipObj = shipItem.Ship.fromDict(ship)
-        if shipObj.isCalled(itemName):
-            itemObj = shipObj
+    shipKey = bbData.shipNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
+    if shipKey is not None:
+        itemObj = shipItem.Ship.fromDict(bbData.builtInShipData[shipKey])
 
     # report unrecognised ship names
     if itemObj is None:
+        suggestions = bbData.shipNameTrigrams.suggest(itemName, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(itemName) < 20:
-            await message.reply(mention_author=False, content=":x: **" + itemName + "** is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName \
+                                        + "** is not in my database! :detective:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] + "**... is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] \
+                                        + "**... is not in my database! :detective:" + suggestionsStr)
 
     else:
         # build the stats embed
@@ -320,17 +334,18 @@ async def cmd_info_weapon(message : discord.Message, args : str, isDM : bool):
 
     # look up the weapon object
     itemName = args.title()
-    itemObj = None
-    for weap in bbData.builtInWeaponObjs.keys():
-        if bbData.builtInWeaponObjs[weap].isCalled(itemName):
-            itemObj = bbData.builtInWeaponObjs[weap]
+    itemObj = bbData.weaponNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
 
     # report unrecognised weapon names
     if itemObj is None:
+        suggestions = bbData.weaponNameTrigrams.suggest(itemName, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(itemName) < 20:
-            await message.reply(mention_author=False, content=":x: **" + itemName + "** is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName \
+                                        + "** is not in my database! :detective:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] + "**... is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] \
+                                        + "**... is not in my database! :detective:" + suggestionsStr)
 
     else:
         # build the stats embed
@@ -377,17 +392,18 @@ async def cmd_info_module(message : discord.Message, args : str, isDM : bool):
 
     # look up the module object
     itemName = args.title()
-    itemObj = None
-    for module in bbData.builtInModuleObjs.keys():
-        if bbData.builtInModuleObjs[module].isCalled(itemName):
-            itemObj = bbData.builtInModuleObjs[module]
+    itemObj = bbData.moduleNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
 
     # report unrecognised module names
     if itemObj is None:
+        suggestions = bbData.moduleNameTrigrams.suggest(itemName, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(itemName) < 20:
-            await message.reply(mention_author=False, content=":x: **" + itemName + "** is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName \
+                                        + "** is not in my database! :detective:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] + "**... is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] \
+                                        + "**... is not in my database! :detective:" + suggestionsStr)
 
     else:
         # build the stats embed
@@ -435,17 +451,18 @@ async def cmd_info_turret(message : discord.Message, args : str, isDM : bool):
 
     # look up the turret object
     itemName = args.title()
-    itemObj = None
-    for turr in bbData.builtInTurretObjs.keys():
-        if bbData.builtInTurretObjs[turr].isCalled(itemName):
-            itemObj = bbData.builtInTurretObjs[turr]
+    itemObj = bbData.turretNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
 
     # report unrecognised turret names
     if itemObj is None:
+        suggestions = bbData.turretNameTrigrams.suggest(itemName, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(itemName) < 20:
-            await message.reply(mention_author=False, content=":x: **" + itemName + "** is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName \
+                                        + "** is not in my database! :detective:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] + "**... is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] \
+                                        + "**... is not in my database! :detective:" + suggestionsStr)
 
     else:
         # build the stats embed
@@ -618,6 +635,89 @@ botCommands.register("info", cmd_info, 0, allowDM=True, helpSection="gof2 info",
                                     + "to refer to your object in commands.")
 
 
+def formatStat(value : float) -> str:
+    """Format an item stat for display, without a decimal point if the stat is a whole number.
+
+    :param float value: The stat to format
+    :return: value, with thousands separators and rounded to 2 decimal places
+    :rtype: str
+    """
+    return "{:,}".format(int(value)) if float(value).is_integer() else "{:,.2f}".format(value)
+
+
+async def cmd_find(message : discord.Message, args : str, isDM : bool):
+    """Search for builtIn items of a type, filtered and sorted by expressions over their stats.
+    For example, 'ship cargo > 100 and value < 50000 sort armour + shield page 2'
+
+    :param discord.Message message: the discord message calling the command
+    :param str args: string containing an item type, an optional condition, optionally 'sort' followed by an expression
+                        to sort by, highest first, and optionally 'page' followed by a page number
+    :param bool isDM: Whether or not the command is being called from a DM channel
+    """
+    argsSplit = args.split(" ", 1)
+    itemType = argsSplit[0].rstrip("s")
+    if itemType not in bbData.statMatrices:
+        await message.reply(mention_author=False, content=":x: Please give an item type to search! " \
+                                    + "(ship/weapon/module/turret)")
+        return
+    matrix = bbData.statMatrices[itemType]
+    query = argsSplit[1] if len(argsSplit) > 1 else ""
+
+    # Read the page number and sort expression from the end of the query
+    page = 1
+    pageMatch = re.search(r"\bpage\s+(\S+)\s*$", query)
+    if pageMatch is not None:
+        if not lib.stringTyping.isInt(pageMatch.group(1)) or int(pageMatch.group(1)) < 1:
+            await message.reply(mention_author=False, content=":x: Invalid page number: " + pageMatch.group(1)[:15])
+            return
+        page = int(pageMatch.group(1))
+        query = query[:pageMatch.start()]
+    querySplit = re.split(r"\bsort\b", query, maxsplit=1)
+    condition = querySplit[0].strip() or None
+    sortBy = querySplit[1].strip() if len(querySplit) > 1 else "-value"
+
+    try:
+        results = matrix.query(condition=condition, sortBy=sortBy)
+        sortValues = matrix.evaluate(sortBy)
+        shownStats = ["value"] + [stat for stat in matrix.statsInExpression((condition or "") + " " + sortBy)
+                                    if stat != "value"]
+    except ValueError as e:
+        await message.reply(mention_author=False, content=":x: " + str(e) + "\nStats for " + itemType + "s are: " \
+                                                            + ", ".join(matrix.columns))
+        return
+
+    numPages = max(1, -(-len(results) // cfg.itemSearchResultsPerPage))
+    if page > numPages:
+        await message.reply(mention_author=False, content=":x: There " + ("is" if numPages == 1 else "are") + " only " \
+                                    + str(numPages) + " page" + ("" if numPages == 1 else "s") + " of results!")
+        return
+
+    resultsEmbed = lib.discordUtil.makeEmbed(titleTxt=itemType.title() + " Search",
+                                                desc=("Where `" + condition + "`, s" if condition else "S") + "orted by `" \
+                                                    + sortBy + "`",
+                                                footerTxt=str(len(results)) + " result" + ("" if len(results) == 1 else "s") \
+                                                    + ". Page " + str(page) + " of " + str(numPages))
+    firstResult = (page - 1) * cfg.itemSearchResultsPerPage
+    for row in results[firstResult:firstResult + cfg.itemSearchResultsPerPage]:
+        statsStr = " • ".join(stat + ": " + formatStat(matrix.columns[stat][row]) for stat in shownStats)
+        # Show the value of compound sort expressions, which are not a single stat
+        if sortBy.lstrip("-").strip() not in shownStats:
+            statsStr += " • sort: " + formatStat(sortValues[row])
+        resultsEmbed.add_field(name=matrix.items[row].name, value=statsStr, inline=False)
+    if not results:
+        resultsEmbed.add_field(name="No results", value="No " + itemType + "s match your search.", inline=False)
+
+    await message.reply(mention_author=False, embed=resultsEmbed)
+
+botCommands.register("find", cmd_find, 0, allowDM=True, helpSection="gof2 info",
+                        signatureStr="**find <item-type>** *[condition] [sort <expression>] [page <number>]*",
+                        shortHelp="Search for ships, weapons, modules or turrets by their stats.",
+                        longHelp="Search for ships, weapons, modules or turrets by their stats. The condition and sort " \
+                                    + "expression can use stat names, numbers, `+ - * /`, comparisons, `and`, `or` " \
+                                    + "and `not`. Results are sorted highest first, or cheapest first if no sort is given. " \
+                                    + "E.g: `find ship cargo > 100 and value < 50000 sort armour + shield`")
+
+
 async def cmd_showme_criminal(message : discord.Message, args : str, isDM : bool):
     """Return the URL of the image bountybot uses to represent the specified inbuilt criminal
 
@@ -635,16 +735,17 @@ async def cmd_showme_criminal(message : discord.Message, args : str, isDM : bool
         return
     # look up the criminal object
     criminalName = args.title()
-    criminalObj = None
-    for crim in bbData.builtInCriminalObjs.keys():
-        if bbData.builtInCriminalObjs[crim].isCalled(criminalName):
-            criminalObj = bbData.builtInCriminalObjs[crim]
+    criminalObj = bbData.criminalNameIndex.get(lib.stringTyping.normalizeName(criminalName), None)
     # report unrecognised criminal names
     if criminalObj is None:
+        suggestions = bbData.criminalNameTrigrams.suggest(criminalName, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(criminalName) < 20:
-            await message.reply(mention_author=False, content=":x: **" + criminalName + "** is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + criminalName \
+                                        + "** is not in my database! :detective:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: **" + criminalName[0:15] + "**... is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + criminalName[0:15] \
+                                        + "**... is not in my database! :detective:" + suggestionsStr)
     else:
         itemEmbed = lib.discordUtil.makeEmbed(col=discord.Colour.random(), img=criminalObj.icon,
                                                 titleTxt=criminalObj.name, footerTxt="Wanted criminal")
@@ -689,16 +790,19 @@ async def cmd_showme_ship(message : discord.Message, args : str, isDM : bool):
     # look up the ship object
     itemName = args.rstrip(" ").title()
     itemObj = None
-    for ship in bbData.builtInShipData.values():
-        shipObj = shipItem.Ship.fromDict(ship)
-        if shipObj.isCalled(itemName):
-            itemObj = shipObj
+    shipKey = bbData.shipNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
+    if shipKey is not None:
+        itemObj = shipItem.Ship.fromDict(bbData.builtInShipData[shipKey])
     # report unrecognised ship names
     if itemObj is None:
+        suggestions = bbData.shipNameTrigrams.suggest(itemName, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(itemName) < 20:
-            await message.reply(mention_author=False, content=":x: **" + itemName + "** is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName \
+                                        + "** is not in my database! :detective:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] + "**... is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] \
+                                        + "**... is not in my database! :detective:" + suggestionsStr)
         return
     if skin != "":
         shipData = bbData.builtInShipData[itemObj.name]
@@ -911,16 +1015,17 @@ async def cmd_showme_weapon(message : discord.Message, args : str, isDM : bool):
         return
     # look up the weapon object
     itemName = args.title()
-    itemObj = None
-    for weap in bbData.builtInWeaponObjs.keys():
-        if bbData.builtInWeaponObjs[weap].isCalled(itemName):
-            itemObj = bbData.builtInWeaponObjs[weap]
+    itemObj = bbData.weaponNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
     # report unrecognised weapon names
     if itemObj is None:
+        suggestions = bbData.weaponNameTrigrams.suggest(itemName, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(itemName) < 20:
-            await message.reply(mention_author=False, content=":x: **" + itemName + "** is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName \
+                                        + "** is not in my database! :detective:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] + "**... is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] \
+                                        + "**... is not in my database! :detective:" + suggestionsStr)
     else:
         if not itemObj.hasIcon:
             await message.reply(mention_author=False, content=":x: I don't have an icon for **" + itemObj.name.title() + "**!")
@@ -949,16 +1054,17 @@ async def cmd_showme_module(message : discord.Message, args : str, isDM : bool):
         return
     # look up the module object
     itemName = args.title()
-    itemObj = None
-    for module in bbData.builtInModuleObjs.keys():
-        if bbData.builtInModuleObjs[module].isCalled(itemName):
-            itemObj = bbData.builtInModuleObjs[module]
+    itemObj = bbData.moduleNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
     # report unrecognised module names
     if itemObj is None:
+        suggestions = bbData.moduleNameTrigrams.suggest(itemName, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(itemName) < 20:
-            await message.reply(mention_author=False, content=":x: **" + itemName + "** is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName \
+                                        + "** is not in my database! :detective:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] + "**... is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] \
+                                        + "**... is not in my database! :detective:" + suggestionsStr)
     else:
         if not itemObj.hasIcon:
             await message.reply(mention_author=False, content=":x: I don't have an icon for **" + itemObj.name.title() + "**!")
@@ -986,16 +1092,17 @@ async def cmd_showme_turret(message : discord.Message, args : str, isDM : bool):
         return
     # look up the turret object
     itemName = args.title()
-    itemObj = None
-    for turr in bbData.builtInTurretObjs.keys():
-        if bbData.builtInTurretObjs[turr].isCalled(itemName):
-            itemObj = bbData.builtInTurretObjs[turr]
+    itemObj = bbData.turretNameIndex.get(lib.stringTyping.normalizeName(itemName), None)
     # report unrecognised turret names
     if itemObj is None:
+        suggestions = bbData.turretNameTrigrams.suggest(itemName, cfg.fuzzySuggestionThreshold, cfg.maxFuzzySuggestions)
+        suggestionsStr = lib.fuzzySearch.didYouMean(suggestions)
         if len(itemName) < 20:
-            await message.reply(mention_author=False, content=":x: **" + itemName + "** is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName \
+                                        + "** is not in my database! :detective:" + suggestionsStr)
         else:
-            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] + "**... is not in my database! :detective:")
+            await message.reply(mention_author=False, content=":x: **" + itemName[0:15] \
+                                        + "**... is not in my database! :detective:" + suggestionsStr)
     else:
         if not itemObj.hasIcon:
             await message.reply(mention_author=False, content=":x: I don't have an icon for **" + itemObj.name.title() + "**!")
@@ -1,10 +1,11 @@
 import discord
+from typing import Dict, List, Tuple
 
 from . import commandsDB as botCommands
 from .. import lib, botState
 from ..cfg import cfg, bbData
 from ..users import basedUser
-from ..gameObjects.items import shipItem
+from ..gameObjects.items import shipItem, loadoutOptimiser, gameItem
 
 
 botCommands.addHelpSection(0, "loadout")
@@ -598,6 +599,153 @@ botCommands.register("unequip", cmd_unequip, 0, allowDM=True, helpSection="loado
                                 + "next to items in your `loadout`.")
 
 
+def parseOptimiseOptions(args : List[str]) -> Tuple[int, bool]:
+    """Read the optional budget and "apply" arguments given to the optimise command, in any order.
+
+    :param List[str] args: The arguments given after the objective
+    :return: The budget, or -1 if none was given, and whether or not to equip the chosen loadout
+    :rtype: Tuple[int, bool]
+    :raise ValueError: If an argument is invalid or repeated, or the budget is negative. The message can be shown to users.
+    """
+    budget = -1
+    applyLoadout = False
+    for arg in args:
+        if arg == "apply" and not applyLoadout:
+            applyLoadout = True
+        elif lib.stringTyping.isInt(arg) and budget == -1:
+            budget = int(arg)
+            if budget < 0:
+                raise ValueError("The budget cannot be negative!")
+        else:
+            raise ValueError("Invalid argument! Please only give an objective, optionally a budget, and optionally `apply`.")
+    return budget, applyLoadout
+
+
+def ownedItemPools(user : basedUser.BasedUser, ship : shipItem.Ship) -> Dict[str, List[gameItem.GameItem]]:
+    """Collect the items equipped on a user's ship and in their hangar, with one entry per copy.
+
+    :param BasedUser user: The user owning the items
+    :param Ship ship: The user's active ship
+    :return: The weapons, turrets and modules owned by the user, under the slot kinds from loadoutOptimiser.SLOT_KINDS
+    :rtype: Dict[str, List[gameItem.GameItem]]
+    """
+    pools = {"weapon": list(ship.weapons), "turret": list(ship.turrets), "module": list(ship.modules)}
+    for kind, inventory in (("weapon", user.inactiveWeapons), ("turret", user.inactiveTurrets),
+                            ("module", user.inactiveModules)):
+        for listing in inventory.items.values():
+            pools[kind] += [listing.item] * listing.count
+    return pools
+
+
+def loadoutStatsStr(ship : shipItem.Ship, loadout : loadoutOptimiser.Loadout, objective : str) -> str:
+    """List a ship's current stats next to the stats it would have with an optimised loadout, in bold if optimised.
+
+    :param Ship ship: The ship the loadout was optimised for
+    :param Loadout loadout: The optimised loadout
+    :param str objective: The objective the loadout was optimised for
+    :return: One line per stat in loadoutOptimiser.STATS
+    :rtype: str
+    """
+    currentStats = {"dps": ship.getDPS(), "shield": ship.getShield(), "armour": ship.getArmour(),
+                    "cargo": ship.getCargo(), "handling": ship.getHandling()}
+    statNames = {"dps": "DPS", "shield": "Shield", "armour": "Armour", "cargo": "Cargo", "handling": "Handling"}
+    statsStr = ""
+    for stat in loadoutOptimiser.STATS:
+        currentStr = str(round(currentStats[stat], 2)) if stat == "dps" else lib.stringTyping.commaSplitNum(currentStats[stat])
+        newStr = str(round(loadout.stats[stat], 2)) if stat == "dps" \
+                    else lib.stringTyping.commaSplitNum(loadout.stats[stat])
+        statsStr += ("**" + statNames[stat] + "**" if stat in loadoutOptimiser.objectiveStats[objective] \
+                        else statNames[stat]) + ": " + currentStr + " → " + newStr + "\n"
+    return statsStr
+
+
+def equipLoadout(user : basedUser.BasedUser, ship : shipItem.Ship, loadout : loadoutOptimiser.Loadout):
+    """Unequip everything from a user's active ship, and equip an optimised loadout from their hangar.
+
+    :param BasedUser user: The user owning the ship and the loadout's items
+    :param Ship ship: The user's active ship
+    :param Loadout loadout: The loadout to equip, chosen from the items owned by user
+    """
+    user.unequipAll(ship)
+    for weapon in loadout.weapons:
+        user.inactiveWeapons.removeItem(weapon)
+        ship.equipWeapon(weapon)
+    for module in loadout.modules:
+        user.inactiveModules.removeItem(module)
+        ship.equipModule(module)
+    for turret in loadout.turrets:
+        user.inactiveTurrets.removeItem(turret)
+        ship.equipTurret(turret)
+
+
+async def cmd_optimise(message : discord.Message, args : str, isDM : bool):
+    """Find the best loadout for the user's active ship from their equipped and inactive items, for the given objective.
+    Optionally, limit the total value of the chosen items, and equip the chosen items.
+
+    :param discord.Message message: the discord message calling the command
+    :param str args: string containing an objective (dps/health/cargo/handling), optionally a maximum total item value,
+                        and optionally "apply", separated by a single space
+    :param bool isDM: Whether or not the command is being called from a DM channel
+    """
+    argsSplit = args.split(" ")
+    objective = argsSplit[0]
+    if objective not in loadoutOptimiser.objectiveStats:
+        await message.reply(mention_author=False, content=":x: Please give an objective to optimise for: " \
+                                    + "/".join(loadoutOptimiser.objectiveStats) + ".")
+        return
+
+    try:
+        budget, applyLoadout = parseOptimiseOptions(argsSplit[1:])
+    except ValueError as e:
+        await message.reply(mention_author=False, content=":x: " + str(e))
+        return
+
+    requestedBBUser = botState.usersDB.getOrAddID(message.author.id)
+    activeShip = requestedBBUser.activeShip
+    if activeShip is None:
+        await message.reply(mention_author=False, content=":x: You do not have a ship equipped!")
+        return
+
+    pools = ownedItemPools(requestedBBUser, activeShip)
+    loadout = loadoutOptimiser.optimiseLoadout(activeShip, pools["weapon"], pools["turret"], pools["module"], objective,
+                                                budget=budget, maxNodes=cfg.loadoutOptimiserMaxNodes)
+    statsStr = loadoutStatsStr(activeShip, loadout, objective)
+
+    optimiseEmbed = lib.discordUtil.makeEmbed(titleTxt="Optimised Loadout: " + objective,
+                                                desc=activeShip.getNameAndNick() \
+                                                    + ("" if budget == -1 else "\nBudget: " \
+                                                        + lib.stringTyping.commaSplitNum(budget) + " Credits"),
+                                                col=bbData.factionColours[activeShip.manufacturer] if \
+                                                    activeShip.manufacturer in bbData.factionColours else \
+                                                    bbData.factionColours["neutral"],
+                                                thumb=activeShip.icon if activeShip.hasIcon else \
+                                                    message.author.avatar_url_as(size=64),
+                                                footerTxt="Total item value: " \
+                                                    + lib.stringTyping.commaSplitNum(loadout.value) \
+                                                    + " Credits" + ("" if loadout.optimal else \
+                                                        " | Search limit reached, a better loadout may exist"))
+    optimiseEmbed.add_field(name="Stats", value=statsStr, inline=False)
+    for title, items in (("Weapons", loadout.weapons), ("Modules", loadout.modules), ("Turrets", loadout.turrets)):
+        if items:
+            optimiseEmbed.add_field(name=title, value="\n".join((item.emoji.sendable + " " if item.hasEmoji else "") \
+                                                                    + item.name for item in items),
+                                    inline=True)
+
+    if applyLoadout:
+        equipLoadout(requestedBBUser, activeShip, loadout)
+        await message.reply(mention_author=False, content=":wrench: You equipped the optimised loadout.",
+                            embed=optimiseEmbed)
+    else:
+        await message.reply(mention_author=False, embed=optimiseEmbed)
+
+botCommands.register("optimise", cmd_optimise, 0, aliases=["optimize"], allowDM=True, helpSection="loadout",
+                    signatureStr="**optimise <dps|health|cargo|handling>** *[budget] [apply]*",
+                    shortHelp="Find the best loadout for your active ship from the items you own.",
+                    longHelp="Find the items you own which give your active ship the most DPS, health (shield plus " \
+                                + "armour), cargo or handling. Give a budget to limit the total value of the chosen items. " \
+                                + "Specify `apply` to equip the chosen items, moving everything else to your hangar.")
+
+
 async def cmd_nameship(message : discord.Message, args : str, isDM : bool):
     """Set the nickname of the active ship.
 
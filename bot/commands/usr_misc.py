@@ -1,8 +1,8 @@
 import discord
 from datetime import datetime, timedelta
 from aiohttp import client_exceptions
-import operator
 import traceback
+from typing import List, Tuple
 
 from . import commandsDB as botCommands
 from . import util_help
@@ -24,12 +24,14 @@ async def cmd_help(message: discord.Message, args: str, isDM: bool):
     """
     await util_help.util_autohelp(message, args, isDM, 0)
 
-botCommands.register("help", cmd_help, 0, allowDM=True, signatureStr="**help** *[page number, section or command]*",
+botCommands.register("help", cmd_help, 0, allowDM=True,
+                     signatureStr="**help** *[page number, section, command or search <words>]*",
                      shortHelp="Show usage information for available commands.\nGive a specific command for detailed info " \
                                 + "about it, or give a page number or give a section name for brief info.",
                      longHelp="Show usage information for available commands.\nGive a specific command for detailed info " \
                                 + "about it, or give a page number or give a section name for brief info about a set of " \
-                                + "commands. These are the currently valid section names:\n- Miscellaneous",
+                                + "commands. These are the currently valid section names:\n- Miscellaneous" \
+                                + "\nGive `search` followed by some words to find commands about them.",
                      useDoc=False)
 
 
@@ -228,6 +230,32 @@ botCommands.register("stats", cmd_stats, 0, aliases=["profile"], forceKeepArgsCa
                         shortHelp="Get various credits and bounty statistics about yourself, or another user.")
 
 
+def getLeaderboardUsers(guild : discord.Guild, stat : str, windowDays : int, globalBoard : bool) -> List[Tuple[int, int]]:
+    """Get the top 10 users for a leaderboard, from the credits ledger's day totals or the usersDB's leaderboard index.
+    Only users the bot can see are included on global leaderboards, and only the guild's members on local leaderboards.
+
+    :param discord.Guild guild: The guild the leaderboard was requested in
+    :param str stat: The name of the stat to rank users by, from userDB.leaderboardStats. Ignored if windowDays is given.
+    :param int windowDays: The number of days to rank users' credits earned over, or None to rank users by stat
+    :param bool globalBoard: Whether to rank users across all guilds, or only the members of guild
+    :return: A list of up to 10 (user ID, stat value) pairs, highest first
+    :rtype: List[Tuple[int, int]]
+    """
+    if globalBoard:
+        def includeUser(userID):
+            return botState.client.get_user(userID) is not None
+    else:
+        def includeUser(userID):
+            return guild.get_member(userID) is not None
+        # index the guild's members on its first local leaderboard. The index is then kept up to date by member events.
+        if not botState.usersDB.hasGuildLeaderboards(guild.id):
+            botState.usersDB.setGuildMembers(guild.id, (member.id for member in guild.members))
+
+    if windowDays is not None:
+        return botState.creditsLedger.topEarners(windowDays, 10, include=includeUser)
+    return botState.usersDB.getTopUsers(stat, 10, include=includeUser, guildID=None if globalBoard else guild.id)
+
+
 async def cmd_leaderboard(message : discord.Message, args : str, isDM : bool):
     """display leaderboards for different statistics
     if no arguments are given, display the local leaderboard for pilot value (value of loadout, hangar and balance, summed)
@@ -235,6 +263,7 @@ async def cmd_leaderboard(message : discord.Message, args : str, isDM : bool):
     if -c is given, display the leaderboard for current balance
     if -s is given, display the leaderboard for systems checked
     if -w is given, display the leaderboard for bounties won
+    if daily, weekly or monthly is given, display the leaderboard for credits earned over that time window
 
     :param discord.Message message: the discord message calling the command
     :param str args: string containing the arguments the user passed to the command
@@ -244,6 +273,8 @@ async def cmd_leaderboard(message : discord.Message, args : str, isDM : bool):
     globalBoard = False
     # stat to display
     stat = "value"
+    # number of days to sum credits earned over, for time-windowed leaderboards
+    windowDays = None
     # "global" or the local guild name
     boardScope = message.guild.name
     # user friendly string for the stat
@@ -258,6 +289,22 @@ async def cmd_leaderboard(message : discord.Message, args : str, isDM : bool):
     else:
         prefix = botState.guildsDB.getGuild(message.guild.id).commandPrefix
 
+    # time-windowed leaderboards are requested by name, e.g "weekly"
+    argsSplit = args.lower().split()
+    for window in cfg.leaderboardWindowDays:
+        if window in argsSplit:
+            if windowDays is not None:
+                await message.reply(mention_author=False, content=":x: Please only specify one time window! E.g: `" + prefix \
+                                            + "leaderboard weekly -g`")
+                return
+            windowDays = cfg.leaderboardWindowDays[window]
+            argsSplit.remove(window)
+            stat = "earned"
+            boardTitle = "Credits Earned (" + window.capitalize() + ")"
+            boardDesc = "*Net credits earned from bounties, shop trades, payments and duels, in the last " \
+                        + (str(windowDays) + " days" if windowDays != 1 else "day")
+    args = " ".join(argsSplit)
+
     # change leaderboard arguments based on the what is provided in args
     if args != "":
         args = args.lower()
@@ -274,6 +321,10 @@ async def cmd_leaderboard(message : discord.Message, args : str, isDM : bool):
                 await message.reply(mention_author=False, content=":x: Unknown argument: '**" + arg + "**'. Please refer to `" + prefix \
                                             + "help leaderboard`")
                 return
+        if windowDays is not None and any(arg in args for arg in "csw"):
+            await message.reply(mention_author=False, content=":x: Time windows can only be given for the credits earned " \
+                                        + "leaderboard! E.g: `" + prefix + "leaderboard weekly -g`")
+            return
         if "c" in args:
             stat = "credits"
             boardTitle = "Current Balance"
@@ -299,13 +350,7 @@ async def cmd_leaderboard(message : discord.Message, args : str, isDM : bool):
 
     boardDesc += ".*"
 
-    # get the requested stats and sort users by the stat
-    inputDict = {}
-    for user in botState.usersDB.getUsers():
-        if (globalBoard and botState.client.get_user(user.id) is not None) or \
-                (not globalBoard and message.guild.get_member(user.id) is not None):
-            inputDict[user.id] = user.getStatByName(stat)
-    sortedUsers = sorted(inputDict.items(), key=operator.itemgetter(1))[::-1]
+    sortedUsers = getLeaderboardUsers(message.guild, stat, windowDays, globalBoard)
 
     # build the leaderboard embed
     leaderboardEmbed = lib.discordUtil.makeEmbed(titleTxt=boardTitle, authorName=boardScope,
@@ -330,19 +375,35 @@ async def cmd_leaderboard(message : discord.Message, args : str, isDM : bool):
                                             + (boardUnit if sortedUsers[place][1] == 1 else boardUnits), inline=False)
             if first:
                 first = False
+    footerText = ""
     # If at least one external use is on the leaderboard, give a key
     if externalUser:
-        leaderboardEmbed.set_footer(
-            text="An `*` indicates a user that is from another server.")
+        footerText = "An `*` indicates a user that is from another server."
+    # Show the calling user's place if they didn't make the top 10
+    if windowDays is None and botState.usersDB.idExists(message.author.id) \
+            and message.author.id not in (userID for userID, _ in sortedUsers):
+        if globalBoard:
+            # Ranking only the users visible to the bot would mean checking every user, so rank among all stored users
+            footerText += ("\n" if footerText else "") + "You are in place " \
+                            + str(botState.usersDB.getRank(stat, message.author.id)) + " of all " \
+                            + str(len(botState.usersDB.users)) + " players, including players I can no longer see."
+        else:
+            place, numRanked = botState.usersDB.getGuildRank(stat, message.author.id, message.guild.id)
+            footerText += ("\n" if footerText else "") + "You are in place " + str(place) + " of " + str(numRanked) \
+                            + " players in this server."
+    if footerText:
+        leaderboardEmbed.set_footer(text=footerText)
     # send the embed
     await message.reply(mention_author=False, embed=leaderboardEmbed)
 
-botCommands.register("leaderboard", cmd_leaderboard, 0, allowDM=False, signatureStr="**leaderboard** *[-g|-c|-s|-w]*",
+botCommands.register("leaderboard", cmd_leaderboard, 0, allowDM=False,
+                        signatureStr="**leaderboard** *[daily|weekly|monthly] [-g|-c|-s|-w]*",
                         longHelp="Show the leaderboard for total player value. Give `-g` for the global leaderboard, " \
                             + "not just this server.\n> Give `-c` for the current credits balance leaderboard.\n" \
                             + "> Give `-s` for the 'systems checked' leaderboard.\n" \
                             + "> Give `-w` for the 'bounties won' leaderboard.\n" \
-                            + "E.g: `leaderboard -gs`")
+                            + "> Give `daily`, `weekly` or `monthly` for the credits earned over that time.\n" \
+                            + "E.g: `leaderboard -gs`, `leaderboard weekly -g`")
 
 
 async def cmd_notify(message : discord.Message, args : str, isDM : bool):
@@ -13,7 +13,7 @@ async def util_autohelp(message: discord.Message, args: str, isDM: bool, userAcc
     If a command is provided in args, the associated help string for just that command is printed.
 
     :param discord.Message message: the discord message calling the command
-    :param str args: empty, or a single command name
+    :param str args: empty, a single command name, a section name or number, or 'search' followed by words to search for
     :param bool isDM: Whether or not the command is being called from a DM channel
     """
     sendChannel = None
@@ -26,12 +26,28 @@ async def util_autohelp(message: discord.Message, args: str, isDM: bool, userAcc
     if sendChannel == message.channel:
         sendDM = False
 
+    # 'search' alone is left to fall through, as it is also a command alias
+    if args.startswith("search ") and args[len("search "):].strip():
+        query = args[len("search "):].strip()
+        results = botCommands.searchHelp(userAccessLevel, query, maxResults=cfg.maxHelpSearchResults)
+        if not results:
+            await message.reply(mention_author=False, content=":x: No commands found matching '" + query + "'! " \
+                                                                + "See `help help` for a list of help sections.")
+            return
+        resultsEmbed = lib.discordUtil.makeEmbed(titleTxt=cfg.userAccessLevels[userAccessLevel] + " Commands",
+                                                    desc="Commands matching '" + query + "'", col=discord.Colour.blue(),
+                                                    thumb=botState.client.user.avatar_url_as(size=64))
+        for registry in results:
+            resultsEmbed.add_field(name=registry.signatureStr, value=registry.shortHelp, inline=False)
+        await message.reply(mention_author=False, embed=resultsEmbed)
+        return
+
     if lib.stringTyping.isInt(args):
-        if int(args) < 1 or int(args) > len(botCommands.helpSectionEmbeds[userAccessLevel]):
+        if int(args) < 1 or int(args) > len(botCommands.helpSections[userAccessLevel]):
             await message.reply(mention_author=False, content=":x: Section number must be between 1 and " \
-                                        + str(len(botCommands.helpSectionEmbeds[userAccessLevel])) + "!")
+                                        + str(len(botCommands.helpSections[userAccessLevel])) + "!")
             return
-        args = list(botCommands.helpSectionEmbeds[userAccessLevel].keys())[int(args) - 1]
+        args = list(botCommands.helpSections[userAccessLevel].keys())[int(args) - 1]
     elif args == "misc":
         args = "miscellaneous"
 
@@ -56,11 +72,11 @@ async def util_autohelp(message: discord.Message, args: str, isDM: bool, userAcc
                                                     footerTxt="This menu will expire in " + helpMenuTimeoutStr + ".")
             sectionsStr = ""
             pages = {indexEmbed: {}}
-            for sectionNum in range(len(botCommands.helpSectionEmbeds[userAccessLevel])):
+            for sectionNum in range(len(botCommands.helpSections[userAccessLevel])):
                 sectionsStr += "\n" + str(sectionNum + 1) + ") " \
-                                + list(botCommands.helpSectionEmbeds[userAccessLevel].keys())[sectionNum].title()
+                                + list(botCommands.helpSections[userAccessLevel].keys())[sectionNum].title()
                 # sectionsStr += "\n" + cfg.defaultEmojis.menuOptions[sectionNum + 1].sendable + " : " +
-                #                 list(botCommands.helpSectionEmbeds[userAccessLevel].keys())[sectionNum].title()
+                #                 list(botCommands.helpSections[userAccessLevel].keys())[sectionNum].title()
                 # pages[indexEmbed][cfg.defaultEmojis.menuOptions[sectionNum + 1]] =
                 #                 ReactionMenu.NonSaveableReactionMenuOption(list(
                 #                     botCommands.helpSectionEmbeds[userAccessLevel].keys())[sectionNum].title(),
@@ -68,11 +84,12 @@ async def util_autohelp(message: discord.Message, args: str, isDM: bool, userAcc
                 #                     addArgs={"menuID": menuMsg.id, "pageNum": sectionNum})
             indexEmbed.add_field(name="Contents", value=sectionsStr)
             pageNum = 0
-            for helpSectionEmbedList in botCommands.helpSectionEmbeds[userAccessLevel].values():
-                for helpEmbed in helpSectionEmbedList:
+            totalEmbeds = botCommands.getTotalHelpEmbeds(userAccessLevel)
+            for sectionName in botCommands.helpSections[userAccessLevel]:
+                for helpEmbed in botCommands.getHelpSectionEmbeds(userAccessLevel, sectionName):
                     pageNum += 1
                     newEmbed = helpEmbed.copy()
-                    newEmbed.set_footer(text="Page " + str(pageNum) + " of " + str(botCommands.totalEmbeds[userAccessLevel]) \
+                    newEmbed.set_footer(text="Page " + str(pageNum) + " of " + str(totalEmbeds) \
                                             + " | This menu will expire in " + helpMenuTimeoutStr + ".")
                     pages[newEmbed] = {}
             helpMenu = pagedReactionMenu.PagedReactionMenu(
@@ -80,9 +97,10 @@ async def util_autohelp(message: discord.Message, args: str, isDM: bool, userAcc
             await helpMenu.updateMessage()
             botState.reactionMenusDB[menuMsg.id] = helpMenu
 
-        elif args in botCommands.helpSectionEmbeds[userAccessLevel]:
-            if len(botCommands.helpSectionEmbeds[userAccessLevel][args]) == 1:
-                await sendChannel.send(embed=botCommands.helpSectionEmbeds[userAccessLevel][args][0])
+        elif args in botCommands.helpSections[userAccessLevel]:
+            sectionEmbeds = botCommands.getHelpSectionEmbeds(userAccessLevel, args)
+            if len(sectionEmbeds) == 1:
+                await sendChannel.send(embed=sectionEmbeds[0])
             else:
                 owningUser = botState.usersDB.getOrAddID(message.author.id)
                 if owningUser.helpMenuOwned:
@@ -96,7 +114,7 @@ async def util_autohelp(message: discord.Message, args: str, isDM: bool, userAcc
                                             expiryFunction=expiryFunctions.expireHelpMenu, expiryFunctionArgs=menuMsg.id)
                 botState.taskScheduler.scheduleTask(helpTT)
                 pages = {}
-                for helpEmbed in botCommands.helpSectionEmbeds[userAccessLevel][args]:
+                for helpEmbed in sectionEmbeds:
                     newEmbed = helpEmbed.copy()
                     newEmbed.set_footer(text=helpEmbed.footer.text + " | This menu will expire in " \
                                         + helpMenuTimeoutStr + ".")
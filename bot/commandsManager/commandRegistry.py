@@ -24,6 +24,9 @@ class CommandRegistry:
     :vartype shortHelp: str
     :var longHelp: A longer help string describing in full parameters and command usage
     :vartype longHelp: str
+    :var lazyModule: If this registry is a stub standing in for a command module which has not yet been imported,
+                        the fully qualified name of that module. Otherwise, an empty string.
+    :vartype lazyModule: str
     """
 
     def __init__(self, ident: str, func: FunctionType, forceKeepArgsCasing: bool, forceKeepCommandCasing: bool,
@@ -54,6 +57,7 @@ class CommandRegistry:
         self.shortHelp = shortHelp
         self.longHelp = longHelp
         self.helpSection = helpSection
+        self.lazyModule = ""
 
 
     async def call(self, message: Message, args: str, isDM: bool):
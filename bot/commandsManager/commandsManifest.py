@@ -0,0 +1,169 @@
+from __future__ import annotations
+import ast
+import importlib
+from types import FunctionType
+from typing import List, Tuple, Dict, Any
+from ..lib.exceptions import UnmanifestableCommandModule
+
+# The name given to the HeirarchicalCommandsDB in commands modules, e.g `from . import commandsDB as botCommands`
+COMMANDS_DB_NAME = "botCommands"
+
+# The order of positional parameters accepted by HeirarchicalCommandsDB.register and addHelpSection
+REGISTER_PARAMS = ("command", "function", "accessLevel", "aliases", "forceKeepArgsCasing", "forceKeepCommandCasing",
+                    "allowDM", "noHelp", "signatureStr", "shortHelp", "longHelp", "useDoc", "helpSection")
+HELP_SECTION_PARAMS = ("accessLevel", "sectionName")
+
+# Top-level statements which may appear in a manifestable commands module, other than calls into botCommands
+IGNORED_STATEMENTS = (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Assign,
+                        ast.AnnAssign)
+
+
+def evalLiteral(node: ast.AST, modName: str) -> Any:
+    """Statically evaluate a literal argument given to a commands DB registration.
+    In addition to the literals supported by ast.literal_eval, this supports string concatenation with +,
+    since most help strings are split over multiple lines in this way.
+
+    :param ast.AST node: The expression node to evaluate
+    :param str modName: The name of the module being read, for error reporting
+    :return: The value of the literal expression
+    :raise UnmanifestableCommandModule: If the expression is not a literal
+    """
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        return evalLiteral(node.left, modName) + evalLiteral(node.right, modName)
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise UnmanifestableCommandModule(modName, "non-literal argument on line " + str(node.lineno))
+
+
+def commandsDBCall(node: ast.stmt, modName: str) -> ast.Call:
+    """Find the call into the commands DB made by a top-level statement of a commands module.
+
+    :param ast.stmt node: The top-level statement to inspect
+    :param str modName: The name of the module being read, for error reporting
+    :return: The botCommands method call made by node, or None if node can be ignored
+    :rtype: ast.Call
+    :raise UnmanifestableCommandModule: If node is anything other than an ignored statement or a botCommands call
+    """
+    if isinstance(node, IGNORED_STATEMENTS):
+        return None
+    if not isinstance(node, ast.Expr):
+        raise UnmanifestableCommandModule(modName, "conditional or complex statement on line " + str(node.lineno))
+    call = node.value
+    # Ignore docstrings and other constant expressions
+    if isinstance(call, ast.Constant):
+        return None
+    if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute)
+            and isinstance(call.func.value, ast.Name) and call.func.value.id == COMMANDS_DB_NAME):
+        raise UnmanifestableCommandModule(modName, "unrecognised module-level call on line " + str(node.lineno))
+    return call
+
+
+def callArgNodes(call: ast.Call, paramNames: Tuple[str]) -> Dict[str, ast.AST]:
+    """Name the expression given for each argument of a call, whether given positionally or by keyword.
+
+    :param ast.Call call: The call to read the arguments of
+    :param Tuple[str] paramNames: The names of the called function's positional parameters, in order
+    :return: The expression node given for each argument, by parameter name
+    :rtype: Dict[str, ast.AST]
+    """
+    argNodes = {paramNames[argNum]: arg for argNum, arg in enumerate(call.args)}
+    for kwarg in call.keywords:
+        argNodes[kwarg.arg] = kwarg.value
+    return argNodes
+
+
+class CommandsManifest:
+    """A lightweight description of the help sections and commands registered by a commands module,
+    read from the module's source without importing it.
+
+    :var modName: The fully qualified name of the described module
+    :vartype modName: str
+    :var helpSections: The help sections added by the module, as (accessLevel, sectionName) tuples, in the order added
+    :vartype helpSections: List[Tuple[int, str]]
+    :var registrations: HeirarchicalCommandsDB.register keyword arguments for each command registered by the module,
+                        in the order registered. In place of a function, the 'function' item gives the function's name.
+    :vartype registrations: List[Dict[str, Any]]
+    :var docstrings: The unaltered docstrings of each function registered by the module, by function name
+    :vartype docstrings: Dict[str, str]
+    """
+
+    def __init__(self, modName: str, helpSections: List[Tuple[int, str]], registrations: List[Dict[str, Any]],
+                    docstrings: Dict[str, str]):
+        """
+        :param str modName: The fully qualified name of the described module
+        :param List[Tuple[int, str]] helpSections: The help sections added by the module, as (accessLevel, sectionName)
+        :param List[Dict[str, Any]] registrations: HeirarchicalCommandsDB.register keyword arguments for each command
+        :param Dict[str, str] docstrings: The unaltered docstrings of each function registered by the module
+        """
+        self.modName = modName
+        self.helpSections = helpSections
+        self.registrations = registrations
+        self.docstrings = docstrings
+
+
+    def makeLazyFunction(self, funcName: str) -> FunctionType:
+        """Create a stand-in for one of the module's command functions. When called, the stand-in imports the module
+        (replacing all of the module's stub registrations with real ones) and passes the call on to the real function.
+
+        :param str funcName: The name of the command function in the module
+        :return: An async function with the same signature as a command function
+        :rtype: FunctionType
+        """
+        modName = self.modName
+
+        async def lazyCommand(message, args: str, isDM: bool):
+            module = importlib.import_module(modName)
+            await getattr(module, funcName)(message, args, isDM)
+
+        lazyCommand.__name__ = funcName
+        lazyCommand.__doc__ = self.docstrings.get(funcName, None)
+        return lazyCommand
+
+
+    @classmethod
+    def fromSource(cls, modName: str, filePath: str) -> CommandsManifest:
+        """Read the manifest for a commands module from its source file.
+        Only modules which call botCommands.register and botCommands.addHelpSection unconditionally at module level,
+        with literal arguments, can be described by a manifest.
+
+        :param str modName: The fully qualified name of the module to describe
+        :param str filePath: Path to the module's source file
+        :return: A new CommandsManifest describing the module
+        :rtype: CommandsManifest
+        :raise UnmanifestableCommandModule: If the module's registrations cannot be determined statically
+        """
+        with open(filePath, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=filePath)
+
+        functionDefs = {node.name: node for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+        helpSections = []
+        registrations = []
+        docstrings = {}
+
+        for node in tree.body:
+            call = commandsDBCall(node, modName)
+            if call is None:
+                continue
+
+            if call.func.attr == "addHelpSection":
+                kwargs = {argName: evalLiteral(argNode, modName)
+                            for argName, argNode in callArgNodes(call, HELP_SECTION_PARAMS).items()}
+                helpSections.append((kwargs["accessLevel"], kwargs["sectionName"]))
+
+            elif call.func.attr == "register":
+                argNodes = callArgNodes(call, REGISTER_PARAMS)
+                funcNode = argNodes.pop("function")
+                if not isinstance(funcNode, ast.Name) or funcNode.id not in functionDefs:
+                    raise UnmanifestableCommandModule(modName, "command function on line " + str(node.lineno) \
+                                                                + " is not defined in the module")
+                kwargs = {argName: evalLiteral(argNode, modName) for argName, argNode in argNodes.items()}
+                kwargs["function"] = funcNode.id
+                docstrings[funcNode.id] = ast.get_docstring(functionDefs[funcNode.id], clean=False)
+                registrations.append(kwargs)
+
+            else:
+                raise UnmanifestableCommandModule(modName, "unrecognised commands DB method '" + call.func.attr \
+                                                            + "' on line " + str(node.lineno))
+
+        return CommandsManifest(modName, helpSections, registrations, docstrings)
@@ -4,6 +4,8 @@ from discord import Message, Embed, Colour
 from typing import List
 from ..cfg import cfg
 from .commandRegistry import CommandRegistry
+from .commandsManifest import CommandsManifest
+from .helpSearchIndex import HelpSearchIndex
 
 
 class HeirarchicalCommandsDB:
@@ -19,8 +21,17 @@ class HeirarchicalCommandsDB:
     :vartype helpSections: List[Dict[str, List[CommandRegistry]]]
     :var helpSectionEmbeds: A list, where indices correspond to access levels, and elements are dictionaries mapping help
                             section names to a list of discord.Embeds describing each command in the section by their
-                            shortHelp strings
+                            shortHelp strings. Embeds are built on request by getHelpSectionEmbeds, and cached here until
+                            the section is next modified.
     :vartype helpSectionEmbeds: List[Dict[str, List[Embed]]]
+    :var helpEmbedThumbnail: URL of an image to add as a thumbnail to all help embeds, or None for no thumbnail
+    :vartype helpEmbedThumbnail: str
+    :var lazyHelpSections: Set of (accessLevel, sectionName) for help sections added from a CommandsManifest,
+                            which will be added again when the manifest's module is imported
+    :vartype lazyHelpSections: Set[Tuple[int, str]]
+    :var helpSearchIndexes: A list, where indices correspond to access levels, and elements are inverted indexes over the
+                            help information of all commands with help at that access level
+    :vartype helpSearchIndexes: List[HelpSearchIndex]
     """
 
     def __init__(self, numAccessLevels: int):
@@ -29,12 +40,10 @@ class HeirarchicalCommandsDB:
         self.numAccessLevels = numAccessLevels
         self.clear()
         self.helpSections = [{"miscellaneous": []} for _ in range(self.numAccessLevels)]
-        self.helpSectionEmbeds = [{"miscellaneous": [Embed(title=cfg.userAccessLevels[accessLevel] + " Commands",
-                                                            description=cfg.helpIntro + "\n__Miscellaneous__",
-                                                            colour=Colour.blue())]}
-                                                                    for accessLevel in range(self.numAccessLevels)]
-        self.helpSectionEmbeds[0]["miscellaneous"][0].set_footer(text="Page 1 of 1")
-        self.totalEmbeds = [1 for _ in range(numAccessLevels)]
+        self.helpSectionEmbeds = [{} for _ in range(self.numAccessLevels)]
+        self.helpEmbedThumbnail = None
+        self.lazyHelpSections = set()
+        self.helpSearchIndexes = [HelpSearchIndex() for _ in range(self.numAccessLevels)]
 
     def register(self, command: str, function: FunctionType, accessLevel: int, aliases: List[str] = [],
                  forceKeepArgsCasing: bool = False, forceKeepCommandCasing: bool = False, allowDM: bool = True,
@@ -75,10 +84,16 @@ class HeirarchicalCommandsDB:
             allIdents.append(alias if forceKeepCommandCasing else alias.lower())
 
         # Validate command identifiers for existence at the given accessLevel
+        # Stub registrations may only be replaced by the module which they are standing in for
+        replacedStub = None
         for currentIdent in allIdents:
             if currentIdent in self.commands[accessLevel]:
-                raise NameError("A command at access level " + str(accessLevel) \
-                                + " already exists with the name " + currentIdent)
+                if self.commands[accessLevel][currentIdent].lazyModule \
+                        and self.commands[accessLevel][currentIdent].lazyModule == function.__module__:
+                    replacedStub = self.commands[accessLevel][currentIdent]
+                else:
+                    raise NameError("A command at access level " + str(accessLevel) \
+                                    + " already exists with the name " + currentIdent)
 
         if not noHelp:
             helpSection = helpSection.lower()
@@ -125,24 +140,116 @@ class HeirarchicalCommandsDB:
             self.commands[accessLevel][currentIdent] = newRegistry
 
         if not noHelp:
-            # Add the command to help
-            self.helpSections[accessLevel][helpSection].append(newRegistry)
-            self.helpSectionEmbeds[accessLevel][helpSection][-1].add_field(
-                name=signatureStr, value=newRegistry.shortHelp, inline=False)
-
-            if len(self.helpSectionEmbeds[accessLevel][helpSection][-1]) > 6000 or \
-                    len(self.helpSectionEmbeds[accessLevel][helpSection][-1].fields) > cfg.maxCommandsPerHelpPage:
-
-                self.helpSectionEmbeds[accessLevel][helpSection][-1].remove_field(-1)
-                firstEmbed = Embed(title=cfg.userAccessLevels[accessLevel] + " Commands",
-                                    description=cfg.helpIntro + "\n__" + helpSection.title() + "__", colour=Colour.blue())
-                self.helpSectionEmbeds[accessLevel][helpSection].append(firstEmbed)
-                self.helpSectionEmbeds[accessLevel][helpSection][-1].add_field(
-                    name=signatureStr, value=newRegistry.shortHelp, inline=False)
-                for pageNum in range(len(self.helpSectionEmbeds[accessLevel][helpSection])):
-                    self.helpSectionEmbeds[accessLevel][helpSection][pageNum].set_footer(
-                        text="Page " + str(pageNum + 1) + " of " + str(len(self.helpSectionEmbeds[accessLevel][helpSection])))
-                self.totalEmbeds[accessLevel] += 1
+            # Add the command to help, in place of its stub if it has one
+            if replacedStub is not None and replacedStub in self.helpSections[accessLevel][helpSection]:
+                stubIndex = self.helpSections[accessLevel][helpSection].index(replacedStub)
+                self.helpSections[accessLevel][helpSection][stubIndex] = newRegistry
+            else:
+                self.helpSections[accessLevel][helpSection].append(newRegistry)
+            if replacedStub is not None:
+                self.helpSearchIndexes[accessLevel].remove(replacedStub)
+            self.helpSearchIndexes[accessLevel].add(newRegistry)
+            # Invalidate the section's help embeds, to be rebuilt on next request
+            self.helpSectionEmbeds[accessLevel].pop(helpSection, None)
+
+
+    def registerManifest(self, manifest: CommandsManifest):
+        """Register stubs for all commands and help sections described by a CommandsManifest, without importing the
+        described module. The module will be imported on the first call to any of its commands, at which point the
+        module's own registrations will replace the stubs.
+
+        :param CommandsManifest manifest: The manifest describing the commands to register
+        """
+        for accessLevel, sectionName in manifest.helpSections:
+            self.addHelpSection(accessLevel, sectionName)
+            self.lazyHelpSections.add((accessLevel, sectionName))
+
+        for registration in manifest.registrations:
+            kwargs = dict(registration)
+            kwargs["function"] = manifest.makeLazyFunction(registration["function"])
+            self.register(**kwargs)
+            # Mark the new registry as a stub for the manifest's module
+            cmdIdent = kwargs["command"] if kwargs.get("forceKeepCommandCasing", False) else kwargs["command"].lower()
+            self.commands[kwargs["accessLevel"]][cmdIdent].lazyModule = manifest.modName
+
+
+    def makeHelpEmbed(self, accessLevel: int, sectionName: str) -> Embed:
+        """Create an empty help embed for the given section, with no fields or footer.
+
+        :param int accessLevel: The access level which commands in the section require
+        :param str sectionName: The name of the help section
+        :return: A new help embed for the section
+        :rtype: Embed
+        """
+        newEmbed = Embed(title=cfg.userAccessLevels[accessLevel] + " Commands",
+                            description=cfg.helpIntro + "\n__" + sectionName.title() + "__", colour=Colour.blue())
+        if self.helpEmbedThumbnail is not None:
+            newEmbed.set_thumbnail(url=self.helpEmbedThumbnail)
+        return newEmbed
+
+
+    def getHelpSectionEmbeds(self, accessLevel: int, sectionName: str) -> List[Embed]:
+        """Get the help embeds listing the commands in the given section, by their shortHelp strings.
+        Embeds are built on first request, and cached until the section is next modified.
+
+        :param int accessLevel: The access level which commands in the section require
+        :param str sectionName: The name of the help section
+        :return: A list of embeds, each a page of the section's help listing
+        :rtype: List[Embed]
+        :raise KeyError: If no section exists with the given name at the given access level
+        """
+        if sectionName in self.helpSectionEmbeds[accessLevel]:
+            return self.helpSectionEmbeds[accessLevel][sectionName]
+
+        sectionEmbeds = [self.makeHelpEmbed(accessLevel, sectionName)]
+        for registry in self.helpSections[accessLevel][sectionName]:
+            sectionEmbeds[-1].add_field(name=registry.signatureStr, value=registry.shortHelp, inline=False)
+
+            if len(sectionEmbeds[-1]) > 6000 or len(sectionEmbeds[-1].fields) > cfg.maxCommandsPerHelpPage:
+                sectionEmbeds[-1].remove_field(-1)
+                sectionEmbeds.append(self.makeHelpEmbed(accessLevel, sectionName))
+                sectionEmbeds[-1].add_field(name=registry.signatureStr, value=registry.shortHelp, inline=False)
+
+        for pageNum in range(len(sectionEmbeds)):
+            sectionEmbeds[pageNum].set_footer(text="Page " + str(pageNum + 1) + " of " + str(len(sectionEmbeds)))
+
+        self.helpSectionEmbeds[accessLevel][sectionName] = sectionEmbeds
+        return sectionEmbeds
+
+
+    def getTotalHelpEmbeds(self, accessLevel: int) -> int:
+        """Get the total number of help embed pages across all sections at the given access level.
+        This will build the help embeds for any sections which have not yet been requested.
+
+        :param int accessLevel: The access level to count help embeds for
+        :return: The number of help embeds at the given access level
+        :rtype: int
+        """
+        return sum(len(self.getHelpSectionEmbeds(accessLevel, sectionName)) for sectionName in self.helpSections[accessLevel])
+
+
+    def searchHelp(self, accessLevel: int, query: str, maxResults: int = -1) -> List[CommandRegistry]:
+        """Search the help information of all commands at the given access level.
+
+        :param int accessLevel: The access level of the commands to search
+        :param str query: The words to search for
+        :param int maxResults: The maximum number of results to return, or -1 to return all matches (Default -1)
+        :return: The matching commands, best match first
+        :rtype: List[CommandRegistry]
+        """
+        return self.helpSearchIndexes[accessLevel].search(query, maxResults=maxResults)
+
+
+    def setHelpEmbedThumbnail(self, url: str):
+        """Set the image to display as the thumbnail of all help embeds, both cached and yet to be built.
+
+        :param str url: URL of the thumbnail image
+        """
+        self.helpEmbedThumbnail = url
+        for levelSection in self.helpSectionEmbeds:
+            for sectionEmbeds in levelSection.values():
+                for embed in sectionEmbeds:
+                    embed.set_thumbnail(url=url)
 
 
     async def call(self, command: str, message: Message, args: str, accessLevel: int, isDM: bool = False):
@@ -158,19 +265,32 @@ class HeirarchicalCommandsDB:
         :return: True if the command call was successful, False otherwise
         :rtype: bool
         """
+        registry = self.find(command, accessLevel)
+        # Return false if no command could be matched
+        if registry is None:
+            return False
+        await registry.call(message, args, isDM)
+        return True
+
+
+    def find(self, command: str, accessLevel: int) -> CommandRegistry:
+        """Find the registry for the command that would be called by the given name and access level.
+
+        :param str command: the text name of the command. Commands may be case sensitive, depending on
+                            their forceKeepCommandCasing option
+        :param int accessLevel: The access level of the caller. Commands at this level and below are searched.
+        :return: The matching command registry, or None if no command is found
+        :rtype: CommandRegistry
+        """
         commandLower = command.lower()
         # Search upper access levels first
         for requiredAccess in range(accessLevel, -1, -1):
             # Search casing matches (forceKeepCommandCasing) first
             if command in self.commands[requiredAccess]:
-                await self.commands[requiredAccess][command].call(message, args, isDM)
-                # Return true if a command was found
-                return True
+                return self.commands[requiredAccess][command]
             elif commandLower in self.commands[requiredAccess]:
-                await self.commands[requiredAccess][commandLower].call(message, args, isDM)
-                return True
-        # Return false if no command could be matched
-        return False
+                return self.commands[requiredAccess][commandLower]
+        return None
 
 
     def clear(self):
@@ -189,12 +309,10 @@ class HeirarchicalCommandsDB:
         """
         if accessLevel < 0 or accessLevel > self.numAccessLevels - 1:
             raise IndexError("accessLevel must be at least 0, and less than " + str(self.numAccessLevels))
-        if sectionName in self.helpSections:
+        if sectionName in self.helpSections[accessLevel]:
+            # Sections added from a manifest are added again when the manifest's module is imported
+            if (accessLevel, sectionName) in self.lazyHelpSections:
+                return
             raise ValueError("The given section name already exists in this DB '" + sectionName + "'")
 
         self.helpSections[accessLevel][sectionName] = []
-        self.helpSectionEmbeds[accessLevel][sectionName] = [Embed(title=cfg.userAccessLevels[accessLevel] + " Commands",
-                                                                    description=cfg.helpIntro + "\n__" \
-                                                                                + sectionName.title() + "__")]
-        self.helpSectionEmbeds[accessLevel][sectionName][0].set_footer(text="Page 1 of 1")
-        self.totalEmbeds[accessLevel] += 1
@@ -0,0 +1,97 @@
+import re
+from typing import Dict, List
+from .commandRegistry import CommandRegistry
+
+# Pattern matching a single searchable word
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# The score awarded to a command for a query term matching each of its help attributes.
+# Where a term appears in more than one attribute, only the highest scoring attribute is counted.
+IDENT_WEIGHT = 10
+ALIAS_WEIGHT = 8
+SIGNATURE_WEIGHT = 4
+SHORT_HELP_WEIGHT = 2
+LONG_HELP_WEIGHT = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Split a string into lower case searchable words. Hyphenated words are included both whole and split,
+    such that 'make-route' matches searches for 'make-route', 'make' and 'route'.
+
+    :param str text: The string to tokenize
+    :return: A list of the words in text
+    :rtype: List[str]
+    """
+    text = text.lower()
+    tokens = TOKEN_PATTERN.findall(text)
+    for word in text.split():
+        word = word.strip("*_`.,:;!?()[]<>'\"")
+        if "-" in word:
+            tokens.append(word)
+    return tokens
+
+
+class HelpSearchIndex:
+    """An inverted index over the help information of a set of commands, mapping words to the commands whose
+    names, aliases, signatures or help strings contain them.
+
+    :var postings: Dictionary mapping each indexed word to a dictionary of the commands containing that word,
+                    and the score awarded to the command for matching that word
+    :vartype postings: Dict[str, Dict[CommandRegistry, int]]
+    """
+
+    def __init__(self):
+        self.postings = {}
+
+
+    def add(self, registry: CommandRegistry):
+        """Index a command's help information.
+
+        :param CommandRegistry registry: The command to index
+        """
+        weightedTexts = ((registry.longHelp, LONG_HELP_WEIGHT), (registry.shortHelp, SHORT_HELP_WEIGHT),
+                            (registry.signatureStr, SIGNATURE_WEIGHT), (" ".join(registry.aliases), ALIAS_WEIGHT),
+                            (registry.ident, IDENT_WEIGHT))
+        for text, weight in weightedTexts:
+            if not text:
+                continue
+            for token in tokenize(text):
+                if token not in self.postings:
+                    self.postings[token] = {}
+                if self.postings[token].get(registry, 0) < weight:
+                    self.postings[token][registry] = weight
+
+
+    def remove(self, registry: CommandRegistry):
+        """Remove a command from the index. Does nothing if the command is not indexed.
+
+        :param CommandRegistry registry: The command to remove
+        """
+        for token in set(tokenize(" ".join((registry.ident, " ".join(registry.aliases), registry.signatureStr,
+                                            registry.shortHelp, registry.longHelp or "")))):
+            if token in self.postings:
+                self.postings[token].pop(registry, None)
+                if not self.postings[token]:
+                    del self.postings[token]
+
+
+    def search(self, query: str, maxResults: int = -1) -> List[CommandRegistry]:
+        """Find the commands best matching a search query.
+        Commands are ranked first by the number of query words they match, and then by total score.
+
+        :param str query: The words to search for
+        :param int maxResults: The maximum number of results to return, or -1 to return all matches (Default -1)
+        :return: The matching commands, best match first
+        :rtype: List[CommandRegistry]
+        """
+        scores: Dict[CommandRegistry, List[int]] = {}
+        for token in set(tokenize(query)):
+            for registry, weight in self.postings.get(token, {}).items():
+                if registry in scores:
+                    scores[registry][0] += 1
+                    scores[registry][1] += weight
+                else:
+                    scores[registry] = [1, weight]
+
+        results = sorted(scores, key=lambda registry: (-scores[registry][0], -scores[registry][1], registry.ident))
+        return results if maxResults == -1 else results[:maxResults]
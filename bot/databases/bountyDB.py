@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from ..gameObjects.bounties import bounty
-from typing import List
+from typing import List, Dict
 from ..baseClasses import serializable
 from ..cfg import cfg
+from ..lib.stringTyping import normalizeName
 
 
 class BountyDB(serializable.Serializable):
@@ -20,6 +21,13 @@ class BountyDB(serializable.Serializable):
     :var latestBounty: The most recent bounty to be added to this db.As of writing,
                         this is only used when scaling new bounty delays by the most recent length
     :vartype latestBounty: gameObjects.bounties.bounty.Bounty
+    :var criminalNames: Dictionary mapping the normalized names and aliases of all active bounties' criminals
+                        to their bounties. Aliases may be shared between criminals, so each name maps to a list
+                        of bounties, in the order they were added.
+    :vartype criminalNames: Dict[str, List[gameObjects.bounties.bounty.Bounty]]
+    :var systemBounties: Dictionary mapping system names to a dictionary of the active bounties routed through
+                            that system, and the system's position in each bounty's route
+    :vartype systemBounties: Dict[str, Dict[gameObjects.bounties.bounty.Bounty, int]]
     """
 
     def __init__(self, factions: str):
@@ -27,14 +35,17 @@ class BountyDB(serializable.Serializable):
         :param list factions: list of unique faction names useable in this db's bounties
         """
         # Dictionary of faction name : list of bounties
-        # TODO: add criminal.__hash__, and change bountyDB.bounties into dict of faction:{criminal:bounty}
         self.bounties = {}
         self.escapedBounties = {}
+        # Indexes over the bounties, kept up to date by addBounty and the remove methods
+        self.criminalNames = {}
+        self.systemBounties = {}
 
         # Useable faction names for this bountyDB
         self.factions = factions
         for fac in factions:
             self.bounties[fac] = []
+            self.escapedBounties[fac] = []
 
         self.latestBounty = None
 
@@ -50,6 +61,7 @@ class BountyDB(serializable.Serializable):
             raise KeyError("Attempted to add a faction that already exists: " + faction)
         # Initialise faction's database to empty
         self.bounties[faction] = []
+        self.escapedBounties[faction] = []
 
 
     def removeFaction(self, faction: str):
@@ -61,8 +73,12 @@ class BountyDB(serializable.Serializable):
         # Ensure the faction name exists
         if not self.factionExists(faction):
             raise KeyError("Unrecognised faction: " + faction)
+        # Remove the faction's bounties from the indexes
+        for currentBounty in self.bounties[faction]:
+            self.unindexBounty(currentBounty)
         # Remove the faction name from the DB
         self.bounties.pop(faction)
+        self.escapedBounties.pop(faction, None)
 
 
     def clearBounties(self, faction : str = None):
@@ -77,6 +93,8 @@ class BountyDB(serializable.Serializable):
             if not self.factionExists(faction):
                 raise KeyError("Unrecognised faction: " + faction)
             # Empty the faction's bounties
+            for currentBounty in self.bounties[faction]:
+                self.unindexBounty(currentBounty)
             self.bounties[faction] = []
         # If no faction is given
         else:
@@ -132,7 +150,6 @@ class BountyDB(serializable.Serializable):
 
     def getBounty(self, name : str, faction : str = None) -> bounty.Bounty:
         """Get the bounty object for a given criminal name or alias.
-        This process is much more efficient when given the faction that the criminal is wanted by.
 
         :param str name: A name or alias for the criminal whose bounty is to be fetched.
         :param str faction: The faction by which the criminal is wanted. Give None if this is not known,
@@ -141,28 +158,60 @@ class BountyDB(serializable.Serializable):
         :return: the bounty object tracking the named criminal
         :rtype: gameObjects.bounties.bounty.Bounty
 
-        :raise KeyError: If the requested criminal name does not exist in this DB
+        :raise KeyError: If the requested criminal name does not exist in this DB, or is not wanted by faction
         """
-        # If the criminal's faction is known
-        if faction is not None:
-            # Search the given faction's bounties
-            for currentBounty in self.bounties[faction]:
-                # Return the named criminal's bounty if the name is found
-                if currentBounty.criminal.isCalled(name):
-                    return currentBounty
-
-        # If the criminal's faction is not known, search all factions
-        else:
-            for fac in self.getFactions():
-                # Return the named criminal's bounty if the name is found
-                for currentBounty in self.bounties[fac]:
-                    if currentBounty.criminal.isCalled(name):
-                        return currentBounty
+        for currentBounty in self.criminalNames.get(normalizeName(name), []):
+            if faction is None or currentBounty.faction == faction:
+                return currentBounty
 
         # The criminal was not recognised, raise an error
         raise KeyError("Bounty not found: " + name)
 
 
+    def getSystemBounties(self, system : str) -> Dict[bounty.Bounty, int]:
+        """Get all active bounties whose routes pass through the given system.
+
+        :param str system: The name of the system to look up
+        :return: A dictionary mapping each bounty routed through system to the position of system in the bounty's route.
+                    ⚠ Do not mutate, and do not add or remove bounties while iterating over this dictionary
+        :rtype: Dict[gameObjects.bounties.bounty.Bounty, int]
+        """
+        return self.systemBounties.get(system, {})
+
+
+    def indexBounty(self, bounty : bounty.Bounty):
+        """Add an active bounty to the criminal name and system indexes.
+
+        :param bounty.Bounty bounty: The bounty to index
+        """
+        for name in {normalizeName(name) for name in [bounty.criminal.name] + bounty.criminal.aliases}:
+            if name not in self.criminalNames:
+                self.criminalNames[name] = []
+            self.criminalNames[name].append(bounty)
+        for routePos, system in enumerate(bounty.route):
+            if system not in self.systemBounties:
+                self.systemBounties[system] = {}
+            # Only the first occurrence of a system is recorded, matching route.index
+            self.systemBounties[system].setdefault(bounty, routePos)
+
+
+    def unindexBounty(self, bounty : bounty.Bounty):
+        """Remove an active bounty from the criminal name and system indexes.
+
+        :param bounty.Bounty bounty: The bounty to remove from the indexes
+        """
+        for name in {normalizeName(name) for name in [bounty.criminal.name] + bounty.criminal.aliases}:
+            if bounty in self.criminalNames.get(name, []):
+                self.criminalNames[name].remove(bounty)
+                if not self.criminalNames[name]:
+                    del self.criminalNames[name]
+        for system in bounty.route:
+            if system in self.systemBounties:
+                self.systemBounties[system].pop(bounty, None)
+                if not self.systemBounties[system]:
+                    del self.systemBounties[system]
+
+
     def canMakeBounty(self) -> bounty.Bounty:
         """Check whether this DB has space for more bounties
 
@@ -192,7 +241,6 @@ class BountyDB(serializable.Serializable):
 
     def bountyNameExists(self, name : str, faction : str = None) -> bool:
         """Check whether a criminal with the given name or alias exists in the DB
-        The process is much more efficient if the faction where the criminal should reside is known.
 
         :param str name: The name or alias to check for criminal existence against
         :param str faction: The faction whose bounties to check for the named criminal.
@@ -249,10 +297,11 @@ class BountyDB(serializable.Serializable):
 
         # ensure the given bounty does not already exist
         if self.bountyNameExists(bounty.criminal.name):
-            raise ValueError("Attempted to add a bounty whose name already exists: " + bounty.name)
+            raise ValueError("Attempted to add a bounty whose name already exists: " + bounty.criminal.name)
 
         # Add the bounty to the database
         self.bounties[bounty.faction].append(bounty)
+        self.indexBounty(bounty)
         self.latestBounty = bounty
 
 
@@ -264,8 +313,10 @@ class BountyDB(serializable.Serializable):
         :raise ValueError: if the requested bounty's name already exists in the database
         """
         # ensure the given bounty does not already exist
-        if self.bountyNameExists(bounty.criminal.name) or bounty.criminal.name in self.escapedBounties[bounty.faction]:
-            raise ValueError("Attempted to add a bounty whose name already exists: " + bounty.name)
+        if self.bountyNameExists(bounty.criminal.name) \
+                or any(escapedBounty.criminal.name == bounty.criminal.name
+                        for escapedBounty in self.escapedBounties[bounty.faction]):
+            raise ValueError("Attempted to add a bounty whose name already exists: " + bounty.criminal.name)
 
         # Add the bounty to the database
         self.escapedBounties[bounty.faction].append(bounty)
@@ -273,7 +324,6 @@ class BountyDB(serializable.Serializable):
 
     def removeBountyName(self, name : str, faction : str = None):
         """Find the bounty associated with the given criminal name or alias, and remove it from the database.
-        This process is much more efficient if the faction under which the bounty is wanted is given.
 
         :param str name: The name of the criminal to remove
         :param str faction: The faction whose bounties to check for the named criminal.
@@ -290,6 +340,7 @@ class BountyDB(serializable.Serializable):
         if bounty is self.latestBounty:
             self.latestBounty = None
         self.bounties[bounty.faction].remove(bounty)
+        self.unindexBounty(bounty)
 
 
     def hasBounties(self, faction : str = None) -> bool:
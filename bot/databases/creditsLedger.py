@@ -0,0 +1,231 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+import os
+import struct
+
+
+class LedgerEvent:
+    """The kinds of credit-affecting event recorded in a CreditsLedger.
+    """
+    bounty = 0
+    shopSale = 1
+    payment = 2
+    duel = 3
+    shopPurchase = 4
+
+
+# Every ledger record is packed into this fixed-width format:
+# UTC unix timestamp, user ID, change in credits, LedgerEvent
+recordFormat = struct.Struct("<IQqB")
+
+# The number of seconds in each rollup bucket
+secondsPerDay = 86400
+
+
+def dayNumber(when : datetime = None) -> int:
+    """Get the number of whole days elapsed since the unix epoch, at the given time.
+
+    :param datetime when: The UTC time to convert (Default datetime.utcnow())
+    :return: The index of the UTC day containing when
+    :rtype: int
+    """
+    if when is None:
+        when = datetime.utcnow()
+    return int((when - datetime(1970, 1, 1)).total_seconds() // secondsPerDay)
+
+
+class CreditsLedger:
+    """An append-only log of events which change users' credits balances, for leaderboards over recent time windows.
+
+    Each event is packed into a fixed-width record, and records are appended to the end of the ledger file when saved.
+    Alongside the log, the net credits change of each user is rolled up into one bucket per UTC day, so the total
+    for any window of days is the sum of at most retentionDays buckets per user, with no need to read the log.
+
+    Storage is bounded by compaction: records and buckets older than retentionDays are discarded when saving.
+
+    :var retentionDays: The number of days of history to keep, including the current day
+    :vartype retentionDays: int
+    :var dailyTotals: The net credits change of each user on each day, keyed by day number then user ID
+    :vartype dailyTotals: Dict[int, Dict[int, int]]
+    :var unsaved: Packed records added since the ledger was last saved
+    :vartype unsaved: bytearray
+    :var oldestDay: The day number of the oldest record in the ledger, saved or not, or -1 if there are no records
+    :vartype oldestDay: int
+    """
+
+    def __init__(self, retentionDays : int):
+        """
+        :param int retentionDays: The number of days of history to keep, including the current day
+        :raise ValueError: If retentionDays is not positive
+        """
+        if retentionDays < 1:
+            raise ValueError("The ledger must keep at least one day of history, not " + str(retentionDays))
+        self.retentionDays = retentionDays
+        self.dailyTotals = {}
+        self.unsaved = bytearray()
+        self.oldestDay = -1
+
+
+    def _addToTotals(self, timestamp : int, userID : int, amount : int):
+        """Add a record to the day rollups.
+
+        :param int timestamp: The UTC unix time of the event
+        :param int userID: The ID of the user whose balance changed
+        :param int amount: The change in the user's balance
+        """
+        day = timestamp // secondsPerDay
+        if day not in self.dailyTotals:
+            self.dailyTotals[day] = {}
+        dayTotals = self.dailyTotals[day]
+        dayTotals[userID] = dayTotals.get(userID, 0) + amount
+        if self.oldestDay == -1 or day < self.oldestDay:
+            self.oldestDay = day
+
+
+    def record(self, userID : int, amount : int, eventType : int, when : datetime = None):
+        """Record a change in a user's credits balance. Changes of zero credits are ignored.
+
+        :param int userID: The ID of the user whose balance changed
+        :param int amount: The change in the user's balance. Negative for credits lost.
+        :param int eventType: The LedgerEvent causing the change
+        :param datetime when: The UTC time of the change (Default datetime.utcnow())
+        """
+        if amount == 0:
+            return
+        if when is None:
+            when = datetime.utcnow()
+        timestamp = int((when - datetime(1970, 1, 1)).total_seconds())
+        self.unsaved += recordFormat.pack(timestamp, userID, amount, eventType)
+        self._addToTotals(timestamp, userID, amount)
+
+
+    def recordTransfer(self, sourceID : int, targetID : int, amount : int, eventType : int, when : datetime = None):
+        """Record a movement of credits from one user to another.
+
+        :param int sourceID: The ID of the user losing credits
+        :param int targetID: The ID of the user gaining credits
+        :param int amount: The number of credits moved
+        :param int eventType: The LedgerEvent causing the transfer
+        :param datetime when: The UTC time of the transfer (Default datetime.utcnow())
+        """
+        self.record(sourceID, -amount, eventType, when=when)
+        self.record(targetID, amount, eventType, when=when)
+
+
+    def windowTotals(self, numDays : int, today : int = None) -> Dict[int, int]:
+        """Sum the net credits change of every user over the most recent days.
+
+        :param int numDays: The number of days to sum over, including today
+        :param int today: The day number of the last day in the window (Default dayNumber())
+        :return: The net credits change of each user with at least one recorded event in the window, keyed by user ID
+        :rtype: Dict[int, int]
+        :raise ValueError: If numDays is not between 1 and retentionDays
+        """
+        if not 0 < numDays <= self.retentionDays:
+            raise ValueError("numDays must be between 1 and " + str(self.retentionDays) + ", not " + str(numDays))
+        if today is None:
+            today = dayNumber()
+        totals = {}
+        for day in range(today - numDays + 1, today + 1):
+            if day in self.dailyTotals:
+                for userID, amount in self.dailyTotals[day].items():
+                    totals[userID] = totals.get(userID, 0) + amount
+        return totals
+
+
+    def topEarners(self, numDays : int, numUsers : int, include : Callable[[int], bool] = None,
+                    today : int = None) -> List[Tuple[int, int]]:
+        """Get the users with the greatest net credits change over the most recent days, highest first.
+        Users with equal totals are ordered by ID.
+
+        :param int numDays: The number of days to sum over, including today
+        :param int numUsers: The maximum number of users to get
+        :param include: A function taking a user ID and deciding whether or not to include that user.
+                        Excluded users do not count towards numUsers. (Default include all users)
+        :param int today: The day number of the last day in the window (Default dayNumber())
+        :return: A list of up to numUsers (user ID, net credits change) pairs
+        :rtype: List[Tuple[int, int]]
+        :raise ValueError: If numDays is not between 1 and retentionDays
+        """
+        ranked = sorted(self.windowTotals(numDays, today=today).items(), key=lambda entry: (-entry[1], entry[0]))
+        if include is not None:
+            ranked = (entry for entry in ranked if include(entry[0]))
+        top = []
+        for entry in ranked:
+            if len(top) == numUsers:
+                break
+            top.append(entry)
+        return top
+
+
+    def save(self, filePath : str, today : int = None):
+        """Save the ledger to file, and discard any history older than retentionDays.
+        New records are appended to the end of the file, unless compaction is needed, in which case the file is
+        rewritten with only the records still in the retention window.
+
+        :param str filePath: The path to the ledger file
+        :param int today: The day number of the current day (Default dayNumber())
+        """
+        if today is None:
+            today = dayNumber()
+        cutoff = today - self.retentionDays + 1
+
+        if self.oldestDay != -1 and self.oldestDay < cutoff:
+            for day in [day for day in self.dailyTotals if day < cutoff]:
+                del self.dailyTotals[day]
+            if os.path.isfile(filePath):
+                with open(filePath, "rb") as f:
+                    records = f.read()
+            else:
+                records = b""
+            records += self.unsaved
+            kept = bytearray()
+            for offset in range(0, len(records), recordFormat.size):
+                if recordFormat.unpack_from(records, offset)[0] // secondsPerDay >= cutoff:
+                    kept += records[offset:offset + recordFormat.size]
+            with open(filePath, "wb") as f:
+                f.write(kept)
+            self.oldestDay = min(self.dailyTotals, default=-1)
+
+        elif self.unsaved:
+            with open(filePath, "ab") as f:
+                f.write(self.unsaved)
+
+        self.unsaved = bytearray()
+
+
+    @classmethod
+    def load(cls, filePath : str, retentionDays : int, today : int = None) -> CreditsLedger:
+        """Read a CreditsLedger from file, rebuilding the day rollups from its records.
+        Records older than retentionDays are skipped, and will be removed from the file on the next save.
+        A partially written record at the end of the file is removed.
+
+        :param str filePath: The path to the ledger file. If the file does not exist, an empty ledger is created.
+        :param int retentionDays: The number of days of history to keep, including the current day
+        :param int today: The day number of the current day (Default dayNumber())
+        :return: A new CreditsLedger containing the records in filePath
+        :rtype: CreditsLedger
+        """
+        newLedger = CreditsLedger(retentionDays)
+        if not os.path.isfile(filePath):
+            return newLedger
+        if today is None:
+            today = dayNumber()
+        cutoff = today - retentionDays + 1
+
+        with open(filePath, "rb") as f:
+            records = f.read()
+        validLength = len(records) - len(records) % recordFormat.size
+        if validLength != len(records):
+            # Cut off the partial record, so that new records are appended in line with the old ones
+            os.truncate(filePath, validLength)
+            records = records[:validLength]
+
+        for timestamp, userID, amount, _ in recordFormat.iter_unpack(records):
+            if timestamp // secondsPerDay >= cutoff:
+                newLedger._addToTotals(timestamp, userID, amount)
+            elif newLedger.oldestDay == -1 or timestamp // secondsPerDay < newLedger.oldestDay:
+                # Note the out of date record so that the file is compacted on the next save
+                newLedger.oldestDay = timestamp // secondsPerDay
+        return newLedger
@@ -1,13 +1,15 @@
 from __future__ import annotations
 from typing import List
 from discord import Guild
+from datetime import timedelta
 
 from ..users import basedGuild
+from ..gameObjects import guildShop
 from . import bountyDB
 from .. import botState
 from ..baseClasses import serializable
 from .. import lib
-from ..cfg import bbData
+from ..cfg import bbData, cfg
 
 
 class GuildDB(serializable.Serializable):
@@ -125,11 +127,17 @@ class GuildDB(serializable.Serializable):
 
 
     def refreshAllShopStocks(self):
-        """Generate new stock for all shops belonging to the stored guilds
+        """Generate new stock for all shops belonging to the stored guilds, in a single batch.
+        See guildShop.refreshShopStocks.
+        If cfg.guildRandomStreams is True, each shop draws from its guild's own random stream for the current
+        shop refresh period, so refreshes are reproducible and do not depend on the other guilds stored.
         """
-        for guild in self.guilds.values():
-            if not guild.shopDisabled:
-                guild.shop.refreshStock()
+        shopGuilds = [guild for guild in self.guilds.values() if not guild.shopDisabled]
+        seeds = None
+        if cfg.guildRandomStreams:
+            epoch = lib.randomStreams.refreshEpoch(timedelta(**cfg.timeouts.shopRefresh))
+            seeds = [lib.randomStreams.streamSeed(guild.id, "shop", epoch) for guild in shopGuilds]
+        guildShop.refreshShopStocks([guild.shop for guild in shopGuilds], seeds)
 
 
     def toDict(self, **kwargs) -> dict:
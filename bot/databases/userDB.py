@@ -3,9 +3,12 @@ from ..users.basedUser import BasedUser, defaultUserDict
 from .. import lib
 from .. import botState
 import traceback
-from typing import List
+from typing import Dict, List, Set, Tuple, Callable, Iterable
 from ..baseClasses import serializable
 
+# The names of the user stats for which UserDBs keep leaderboards
+leaderboardStats = ("credits", "value", "systemsChecked", "bountyWins")
+
 
 class UserDB(serializable.Serializable):
     """A database of BasedUser objects.
@@ -13,11 +16,26 @@ class UserDB(serializable.Serializable):
     :var users: Dictionary of users in the database, where values are the BasedUser objects and keys are the ids
                 of their respective BasedUser
     :vartype users: dict[int, BasedUser]
+    :var leaderboards: An index of users ordered by each stat in leaderboardStats, keyed by stat name. These are
+                        updated as users' stats change, so that leaderboards and ranks can be read without sorting.
+    :vartype leaderboards: dict[str, lib.rankedIndex.RankedIndex]
+    :var guildLeaderboards: Indexes like leaderboards, holding only the members of one guild, keyed by guild ID.
+                            Guilds are indexed by setGuildMembers, and kept up to date alongside leaderboards.
+    :vartype guildLeaderboards: dict[int, dict[str, lib.rankedIndex.RankedIndex]]
+    :var guildMembers: The IDs of the members of each indexed guild, keyed by guild ID
+    :vartype guildMembers: dict[int, set[int]]
+    :var memberGuilds: The IDs of the indexed guilds that each user is a member of, keyed by user ID. This includes
+                        users who are not in the database, so that they can be ranked in their guilds once added.
+    :vartype memberGuilds: dict[int, set[int]]
     """
 
     def __init__(self):
         # Store users as a dict of user.id: user
         self.users = {}
+        self.leaderboards = {stat: lib.rankedIndex.RankedIndex() for stat in leaderboardStats}
+        self.guildLeaderboards: Dict[int, Dict[str, lib.rankedIndex.RankedIndex]] = {}
+        self.guildMembers: Dict[int, Set[int]] = {}
+        self.memberGuilds: Dict[int, Set[int]] = {}
 
 
     def idExists(self, userID: int) -> bool:
@@ -90,7 +108,7 @@ class UserDB(serializable.Serializable):
             raise KeyError("Attempted to add a user that is already in this UserDB")
         # Create and return a new user
         newUser = BasedUser.fromDict(defaultUserDict, id=userID)
-        self.users[userID] = newUser
+        self.addUser(newUser)
         return newUser
 
 
@@ -105,6 +123,9 @@ class UserDB(serializable.Serializable):
             raise KeyError("Attempted to add a user that is already in this UserDB: " + str(userObj))
         # Store the passed BasedUser
         self.users[userObj.id] = userObj
+        # Add the user to the leaderboards, and keep them up to date
+        self._userStatsChanged(userObj, leaderboardStats)
+        userObj.statListener = self._userStatsChanged
 
 
     def getOrAddID(self, userID: int) -> BasedUser:
@@ -128,9 +149,154 @@ class UserDB(serializable.Serializable):
         userID = self.validateID(userID)
         if not self.idExists(userID):
             raise KeyError("user not found: " + str(userID))
+        self.users[userID].statListener = None
+        for leaderboard in self.leaderboards.values():
+            leaderboard.remove(userID)
+        # The user is still a member of their guilds, so keep memberGuilds in case they are added again
+        for guildID in self.memberGuilds.get(userID, ()):
+            for leaderboard in self.guildLeaderboards[guildID].values():
+                leaderboard.remove(userID)
         del self.users[userID]
 
 
+    def _userStatsChanged(self, user: BasedUser, stats: Tuple[str, ...]):
+        """Update the leaderboard positions of a user in the database, after some of their stats have changed.
+        This is called automatically by the user, see BasedUser.statListener.
+
+        :param BasedUser user: The user whose stats changed
+        :param Tuple[str, ...] stats: The names of the stats that changed
+        """
+        guildIDs = self.memberGuilds.get(user.id, ())
+        for stat in stats:
+            # Read value directly rather than through getStatByName, which may correct itemsValue mid-update
+            value = user.itemsValue + user.credits if stat == "value" else getattr(user, stat)
+            self.leaderboards[stat].set(user.id, value)
+            for guildID in guildIDs:
+                self.guildLeaderboards[guildID][stat].set(user.id, value)
+
+
+    def hasGuildLeaderboards(self, guildID: int) -> bool:
+        """Decide whether or not the members of a guild are indexed, see setGuildMembers.
+
+        :param int guildID: integer discord ID for the guild
+        :return: True if the guild's leaderboards are kept up to date, False otherwise
+        :rtype: bool
+        """
+        return guildID in self.guildLeaderboards
+
+
+    def setGuildMembers(self, guildID: int, memberIDs: Iterable[int]):
+        """Index the members of a guild, so that the guild's leaderboards and ranks can be read without filtering the
+        leaderboards of all users. This replaces any previous index of the guild. After this, keep the index up to date
+        with addGuildMember, removeGuildMember and removeGuild.
+
+        :param int guildID: integer discord ID for the guild
+        :param Iterable[int] memberIDs: integer discord IDs of all of the guild's members
+        """
+        if guildID in self.guildLeaderboards:
+            self.removeGuild(guildID)
+        self.guildLeaderboards[guildID] = {stat: lib.rankedIndex.RankedIndex() for stat in leaderboardStats}
+        self.guildMembers[guildID] = set()
+        for memberID in memberIDs:
+            self.addGuildMember(guildID, memberID)
+
+
+    def addGuildMember(self, guildID: int, userID: int):
+        """Add a user to the leaderboards of a guild they have joined. Guilds which are not indexed are ignored.
+
+        :param int guildID: integer discord ID for the guild
+        :param int userID: integer discord ID for the new member, who need not be in the database
+        """
+        if guildID not in self.guildLeaderboards or userID in self.guildMembers[guildID]:
+            return
+        self.guildMembers[guildID].add(userID)
+        if userID in self.memberGuilds:
+            self.memberGuilds[userID].add(guildID)
+        else:
+            self.memberGuilds[userID] = {guildID}
+        if userID in self.users:
+            self._userStatsChanged(self.users[userID], leaderboardStats)
+
+
+    def removeGuildMember(self, guildID: int, userID: int):
+        """Remove a user from the leaderboards of a guild they have left. Guilds which are not indexed are ignored.
+
+        :param int guildID: integer discord ID for the guild
+        :param int userID: integer discord ID for the former member
+        """
+        if guildID not in self.guildMembers or userID not in self.guildMembers[guildID]:
+            return
+        self.guildMembers[guildID].remove(userID)
+        self.memberGuilds[userID].remove(guildID)
+        if not self.memberGuilds[userID]:
+            del self.memberGuilds[userID]
+        if userID in self.users:
+            for leaderboard in self.guildLeaderboards[guildID].values():
+                leaderboard.remove(userID)
+
+
+    def removeGuild(self, guildID: int):
+        """Stop indexing the members of a guild, for example when the bot leaves the guild.
+
+        :param int guildID: integer discord ID for the guild
+        """
+        if guildID not in self.guildLeaderboards:
+            return
+        del self.guildLeaderboards[guildID]
+        for userID in self.guildMembers.pop(guildID):
+            self.memberGuilds[userID].remove(guildID)
+            if not self.memberGuilds[userID]:
+                del self.memberGuilds[userID]
+
+
+    def getTopUsers(self, stat: str, numUsers: int, include: Callable[[int], bool] = None,
+                    guildID: int = None) -> List[Tuple[int, int]]:
+        """Get the IDs of the users in the database with the highest values of the given stat, highest first.
+        Users with equal stats are ordered by ID.
+
+        :param str stat: The name of the stat to rank users by. Must be in leaderboardStats.
+        :param int numUsers: The maximum number of users to get
+        :param include: A function taking a user ID and deciding whether or not to include that user.
+                        Excluded users do not count towards numUsers. (Default include all users)
+        :param int guildID: integer discord ID for an indexed guild, to get only the guild's members from its own
+                            leaderboard. See setGuildMembers. (Default all users)
+        :return: A list of up to numUsers (user ID, stat value) pairs
+        :rtype: List[Tuple[int, int]]
+        :raise KeyError: If stat is not in leaderboardStats, or guildID is given and the guild is not indexed
+        """
+        leaderboards = self.leaderboards if guildID is None else self.guildLeaderboards[guildID]
+        return leaderboards[stat].topK(numUsers, include=include)
+
+
+    def getRank(self, stat: str, userID: int) -> int:
+        """Get the position of a user on the leaderboard for the given stat, across all users in the database.
+
+        :param str stat: The name of the stat to rank users by. Must be in leaderboardStats.
+        :param int userID: integer discord ID for the user to rank
+        :return: The user's place on the leaderboard, where the user with the highest stat is in place 1
+        :rtype: int
+        :raise KeyError: If stat is not in leaderboardStats, or no user is found with the requested ID
+        """
+        return self.leaderboards[stat].rank(self.validateID(userID)) + 1
+
+
+    def getGuildRank(self, stat: str, userID: int, guildID: int) -> Tuple[int, int]:
+        """Get the position of a user on the leaderboard for the given stat, among the members of an indexed guild.
+        Members who are not in the database are not ranked.
+
+        :param str stat: The name of the stat to rank users by. Must be in leaderboardStats.
+        :param int userID: integer discord ID for the user to rank
+        :param int guildID: integer discord ID for the guild to rank the user in. See setGuildMembers.
+        :return: The user's place in the guild, where the member with the highest stat is in place 1, and the number
+                    of members in the database, including the ranked user
+        :rtype: Tuple[int, int]
+        :raise KeyError: If stat is not in leaderboardStats, the guild is not indexed, or the requested user is not
+                            an indexed member of the guild
+        """
+        leaderboard = self.guildLeaderboards[guildID][stat]
+        return leaderboard.rank(self.validateID(userID)) + 1, len(leaderboard)
+
+
     def getUser(self, userID: int) -> BasedUser:
         """Fetch the BasedUser from the database with the given ID.
 
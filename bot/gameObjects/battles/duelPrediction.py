@@ -0,0 +1,171 @@
+from __future__ import annotations
+from ..items import shipItem
+from typing import Tuple, List
+import math
+import random
+
+# NumPy is optional, and used to simulate all fights at once
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The z-score for 95% confidence intervals
+CONFIDENCE_Z = 1.96
+# The quantiles bounding 95% of simulated times to kill
+TTK_INTERVAL_QUANTILES = (0.025, 0.975)
+
+
+def shipFightStats(ship : shipItem.Ship) -> Tuple[int, int]:
+    """Get the statistics of a ship used in duels.
+
+    :param shipItem ship: The ship to get the statistics of
+    :return: The ship's total health (armour plus shield) and DPS
+    :rtype: Tuple[int, int]
+    """
+    return ship.getArmour() + ship.getShield(), ship.getDPS()
+
+
+def winChanceInterval(wins : int, numFights : int) -> Tuple[float, float]:
+    """Estimate a 95% confidence interval for the chance of winning a fight, using the Wilson score interval.
+
+    :param int wins: The number of simulated fights won
+    :param int numFights: The total number of simulated fights
+    :return: The lower and upper bounds of the interval
+    :rtype: Tuple[float, float]
+    """
+    winRate = wins / numFights
+    zSquared = CONFIDENCE_Z ** 2
+    centre = (winRate + zSquared / (2 * numFights)) / (1 + zSquared / numFights)
+    halfWidth = CONFIDENCE_Z * math.sqrt(winRate * (1 - winRate) / numFights + zSquared / (4 * numFights ** 2)) \
+                / (1 + zSquared / numFights)
+    # The interval ends exactly at 0 or 1 when no or all fights are won, where float rounding could leave it short
+    return 0.0 if wins == 0 else max(0.0, centre - halfWidth), 1.0 if wins == numFights else min(1.0, centre + halfWidth)
+
+
+def _summariseTTKs(ttks : List[float]) -> dict:
+    """Summarise the times taken to kill a ship over many fights, ignoring fights in which the ship could not be killed.
+
+    :param List[float] ttks: The time taken to kill the ship in each fight, or math.inf if it was not killed
+    :return: A dictionary with the mean time to kill, and the bounds of the central 95% of times to kill.
+                All are None if the ship was never killed.
+    :rtype: dict
+    """
+    finiteTTKs = sorted(ttk for ttk in ttks if ttk != math.inf)
+    if not finiteTTKs:
+        return {"mean": None, "interval": (None, None)}
+    return {"mean": sum(finiteTTKs) / len(finiteTTKs),
+            "interval": tuple(finiteTTKs[int(quantile * (len(finiteTTKs) - 1))] for quantile in TTK_INTERVAL_QUANTILES)}
+
+
+def _simulateFightsNumpy(ship1Stats : Tuple[int, int], ship2Stats : Tuple[int, int], variancePercent : float,
+                            numFights : int, seed : int = None) -> Tuple[int, int, dict, dict]:
+    """Simulate many duels between two ships at once with NumPy, following the model used by duelRequest.fightShips.
+
+    :param Tuple[int, int] ship1Stats: The health and DPS of the first ship
+    :param Tuple[int, int] ship2Stats: The health and DPS of the second ship
+    :param float variancePercent: The amount of random variance to apply to ship statistics, as a float percentage
+    :param int numFights: The number of fights to simulate
+    :param int seed: A seed for the random number generator, to repeat a simulation. Give None for a new random
+                        simulation. (Default None)
+    :return: The number of fights won by each ship, and the summarised times to kill each ship
+    :rtype: Tuple[int, int, dict, dict]
+    """
+    rng = np.random.default_rng(seed)
+
+    def varied(stat):
+        return rng.integers(int(stat - stat * variancePercent), int(stat + stat * variancePercent),
+                            size=numFights, endpoint=True).astype(np.float64)
+
+    ship1HP, ship2HP = varied(ship1Stats[0]), varied(ship2Stats[0])
+    ship1DPS, ship2DPS = varied(ship1Stats[1]), varied(ship2Stats[1])
+    # A ship dealing no damage can never kill its opponent
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ship1TTK = np.where(ship2DPS > 0, ship1HP / ship2DPS, np.inf)
+        ship2TTK = np.where(ship1DPS > 0, ship2HP / ship1DPS, np.inf)
+
+    ship1Wins = int(np.count_nonzero(ship1TTK > ship2TTK))
+    ship2Wins = int(np.count_nonzero(ship2TTK > ship1TTK))
+    summaries = []
+    for ttks in (ship1TTK, ship2TTK):
+        finiteTTKs = ttks[np.isfinite(ttks)]
+        if finiteTTKs.size == 0:
+            summaries.append({"mean": None, "interval": (None, None)})
+        else:
+            summaries.append({"mean": float(finiteTTKs.mean()),
+                                "interval": tuple(float(bound) for bound in np.quantile(finiteTTKs, TTK_INTERVAL_QUANTILES))})
+    return ship1Wins, ship2Wins, summaries[0], summaries[1]
+
+
+def _simulateFightsPython(ship1Stats : Tuple[int, int], ship2Stats : Tuple[int, int], variancePercent : float,
+                            numFights : int, seed : int = None) -> Tuple[int, int, dict, dict]:
+    """Simulate many duels between two ships one at a time, following the model used by duelRequest.fightShips.
+    Used when NumPy is not installed.
+
+    :param Tuple[int, int] ship1Stats: The health and DPS of the first ship
+    :param Tuple[int, int] ship2Stats: The health and DPS of the second ship
+    :param float variancePercent: The amount of random variance to apply to ship statistics, as a float percentage
+    :param int numFights: The number of fights to simulate
+    :param int seed: A seed for the random number generator, to repeat a simulation. Give None for a new random
+                        simulation. (Default None)
+    :return: The number of fights won by each ship, and the summarised times to kill each ship
+    :rtype: Tuple[int, int, dict, dict]
+    """
+    rng = random.Random(seed)
+    bounds = [(int(stat - stat * variancePercent), int(stat + stat * variancePercent)) for stat in ship1Stats + ship2Stats]
+    ship1Wins = ship2Wins = 0
+    ship1TTKs = []
+    ship2TTKs = []
+    for _ in range(numFights):
+        ship1HP, ship1DPS, ship2HP, ship2DPS = (rng.randint(low, high) for low, high in bounds)
+        ship1TTK = ship1HP / ship2DPS if ship2DPS > 0 else math.inf
+        ship2TTK = ship2HP / ship1DPS if ship1DPS > 0 else math.inf
+        if ship1TTK > ship2TTK:
+            ship1Wins += 1
+        elif ship2TTK > ship1TTK:
+            ship2Wins += 1
+        ship1TTKs.append(ship1TTK)
+        ship2TTKs.append(ship2TTK)
+    return ship1Wins, ship2Wins, _summariseTTKs(ship1TTKs), _summariseTTKs(ship2TTKs)
+
+
+def predictDuel(ship1 : shipItem.Ship, ship2 : shipItem.Ship, variancePercent : float, numFights : int,
+                seed : int = None) -> dict:
+    """Estimate the outcome of a duel between two ships, by simulating many duels with the model used by
+    duelRequest.fightShips. Each ship's statistics are read only once. Fights are simulated all at once if NumPy
+    is installed, and one at a time otherwise.
+    As in fightShips, there is no variance if either ship has no DPS.
+
+    Times to kill (TTK) are as in fightShips: ship1's TTK is the time ship2 takes to destroy ship1.
+
+    :param shipItem ship1: One of the ships partaking in the duel
+    :param shipItem ship2: One of the ships partaking in the duel
+    :param float variancePercent: The amount of random variance to apply to ship statistics, as a float percentage
+                                    (e.g 0.5 for 50% random variance)
+    :param int numFights: The number of fights to simulate
+    :param int seed: A seed for the random number generator, to repeat a prediction. Give None for a new random
+                        prediction. (Default None)
+    :return: A dictionary containing each ship's chance of winning and the chance of a draw, a 95% confidence interval
+                for each ship's chance of winning, and the mean and central 95% of each ship's TTK over the fights in
+                which it was destroyed.
+    :rtype: dict
+    :raise ValueError: If numFights is not positive
+    """
+    if numFights < 1:
+        raise ValueError("Must simulate at least one fight, not " + str(numFights))
+    ship1Stats = shipFightStats(ship1)
+    ship2Stats = shipFightStats(ship2)
+    if ship1Stats[1] == 0 or ship2Stats[1] == 0:
+        variancePercent = 0
+
+    simulate = _simulateFightsNumpy if np is not None else _simulateFightsPython
+    ship1Wins, ship2Wins, ship1TTK, ship2TTK = simulate(ship1Stats, ship2Stats, variancePercent, numFights, seed)
+
+    return {"numFights": numFights,
+            "drawChance": (numFights - ship1Wins - ship2Wins) / numFights,
+            "ship1": {"winChance": ship1Wins / numFights,
+                        "winChanceInterval": winChanceInterval(ship1Wins, numFights),
+                        "TTK": ship1TTK},
+            "ship2": {"winChance": ship2Wins / numFights,
+                        "winChanceInterval": winChanceInterval(ship2Wins, numFights),
+                        "TTK": ship2TTK}}
@@ -5,6 +5,7 @@ from ...users import basedUser
 from ...scheduling import timedTask
 from ...users import basedGuild
 from ..items import shipItem
+from ...databases import creditsLedger
 import random
 
 
@@ -226,6 +227,8 @@ async def fightDuel(sourceUser : User, targetUser : User, duelReq : DuelRequest,
 
         winningBasedUser.credits += duelReq.stakes
         losingBasedUser.credits -= duelReq.stakes
+        botState.creditsLedger.recordTransfer(losingBasedUser.id, winningBasedUser.id, duelReq.stakes,
+                                                creditsLedger.LedgerEvent.duel)
         creditsMsg = "The stakes were **" \
                         + str(duelReq.stakes) + "** credit" \
                         + ("s" if duelReq.stakes != 1 else "") + ":"
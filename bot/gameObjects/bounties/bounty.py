@@ -7,7 +7,9 @@ if TYPE_CHECKING:
 from .bountyConfig import BountyConfig
 from ...cfg import bbData
 from . import criminal
+from ..items import shipItem
 from ...baseClasses import serializable
+import random
 
 
 class Bounty(serializable.Serializable):
@@ -30,10 +32,12 @@ class Bounty(serializable.Serializable):
     :vartype checked: dict[str, int]
     :var answer: The name of the system where the criminal is located
     :vartype answer: str
+    :var ship: The ship flown by the criminal in this bounty, or None if the criminal has no ship
+    :vartype ship: shipItem
     """
 
     def __init__(self, criminalObj : criminal = None, config : BountyConfig = None,
-                    owningDB : bountyDB.BountyDB = None, dbReload : bool = False):
+                    owningDB : bountyDB.BountyDB = None, dbReload : bool = False, rng : random.Random = random):
         """
         :param criminalObj: The criminal to be wanted. Give None to randomly generate a criminal. (Default None)
         :type criminalObj: criminal or None
@@ -44,6 +48,7 @@ class Bounty(serializable.Serializable):
         :param bool dbReload: Give True if this bounty is being created during bot bootup, False otherwise.
                                 This currently toggles whether the passed bounty is checked for existence or not.
                                 (Default False)
+        :param random.Random rng: The random number generator to generate missing details from (Default the random module)
         :raise ValueError: When dbReload is False but owningDB is not given
         """
         if not dbReload and owningDB is None:
@@ -56,7 +61,8 @@ class Bounty(serializable.Serializable):
                                                                                                 name=criminalObj.name)
 
         if not config.generated:
-            config.generate(owningDB, noCriminal=makeFresh, forceKeepChecked=dbReload, forceNoDBCheck=dbReload)
+            config.generate(owningDB, noCriminal=makeFresh, forceKeepChecked=dbReload, forceNoDBCheck=dbReload,
+                            rng=rng)
 
         if makeFresh:
             if config.builtIn:
@@ -69,10 +75,19 @@ class Bounty(serializable.Serializable):
                 # Don't just claim player ships! players could unequip ship items. Take a deep copy of the ship
                 if config.isPlayer:
                     self.criminal.copyShip(config.ship)
+                # NPC ships are generated for this bounty alone, so can be equipped directly
+                elif config.ship is not None:
+                    self.criminal.equipShip(config.ship)
 
         else:
             self.criminal = criminalObj
 
+        if self.criminal.isPlayer or (self.criminal.hasShip and not self.criminal.builtIn):
+            self.ship = self.criminal.ship if self.criminal.hasShip else None
+        else:
+            # builtIn criminals are shared between bounties, so their ships are held by the bounty instead
+            self.ship = config.ship
+
         self.faction = self.criminal.faction
         self.issueTime = config.issueTime
         self.endTime = config.endTime
@@ -149,9 +164,13 @@ class Bounty(serializable.Serializable):
         :return: A dictionary representation of this bounty.
         :rtype: dict
         """
-        return {"faction": self.faction, "route": self.route, "answer": self.answer, "checked": self.checked,
+        data = {"faction": self.faction, "route": self.route, "answer": self.answer, "checked": self.checked,
                 "reward": self.reward, "issueTime": self.issueTime, "endTime": self.endTime,
                 "criminal": self.criminal.toDict(**kwargs)}
+        # Criminals do not save their ships, so NPC ships are saved with the bounty
+        if self.ship is not None and not self.criminal.isPlayer:
+            data["ship"] = self.ship.toDict(**kwargs)
+        return data
 
 
     @classmethod
@@ -166,5 +185,6 @@ class Bounty(serializable.Serializable):
         owningDB = kwargs.get("owningDB", None)
         dbReload = kwargs.get("dbReload", False)
         criminalObj = criminal.Criminal.fromDict(bounty["criminal"])
-        newCfg = BountyConfig(**cls._makeDefaults(bounty), ignores=("criminal",))
+        configArgs = {argName: arg for argName, arg in bounty.items() if argName not in ("criminal", "ship")}
+        newCfg = BountyConfig(**configArgs, ship=shipItem.Ship.fromDict(bounty["ship"]) if "ship" in bounty else None)
         return Bounty(dbReload=dbReload, config=newCfg, criminalObj=criminalObj, owningDB=owningDB)
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 
 from ...cfg import bbData, cfg
 from ... import lib
+from ...lib import gameMaths
 
 
 class BountyConfig:
@@ -49,7 +50,8 @@ class BountyConfig:
     :var generated: whether or not this config is ready to be used. The config must verify and generate its attributes before
                     they can be used in a bounty.
     :vartype generated: bool
-    :var ship: The shipItem this criminal should equip
+    :var ship: The shipItem this criminal should equip. If this is not given for an NPC criminal, a ship is taken from
+                bbData.npcFleet during generate.
     :vartype ship: shipItem
     """
 
@@ -119,7 +121,7 @@ class BountyConfig:
 
 
     def generate(self, owningDB : bountyDB.BountyDB, noCriminal : bool = True, forceKeepChecked : bool = False,
-                    forceNoDBCheck : bool = False):
+                    forceNoDBCheck : bool = False, rng : random.Random = random):
         """Validate all given config data, and randomly generate missing data.
 
         :param BountyDB owningDB: Database containing all currently active bounties. When forceNoDBCheck is True,
@@ -131,6 +133,8 @@ class BountyConfig:
         :param bool forceNoDBCheck: If this is False, do not check if the bounty already exists.
                                         This should only be used as a performance and compatibility measure when
                                         loading in a bounty from file. (Default False)
+        :param random.Random rng: The random number generator to draw from, e.g a guild's seeded stream
+                                    from lib.randomStreams (Default the random module)
         :raise ValueError: When requesting an invalid faction, or when requesting an invalid reward amount
         :raise IndexError: When no space is available for a new bounty
         :raise KeyError: When the requested criminal name already exists in a bounty or when requesting an unknown system name
@@ -141,9 +145,9 @@ class BountyConfig:
                 self.builtIn = True
             else:
                 if self.faction == "":
-                    self.faction = random.choice(bbData.bountyFactions)
+                    self.faction = rng.choice(bbData.bountyFactions)
                     while doDBCheck and not owningDB.factionCanMakeBounty(self.faction):
-                        self.faction = random.choice(bbData.bountyFactions)
+                        self.faction = rng.choice(bbData.bountyFactions)
 
                 else:
                     if self.faction not in bbData.bountyFactions:
@@ -154,9 +158,9 @@ class BountyConfig:
 
                 if self.name == "":
                     self.builtIn = True
-                    self.name = random.choice(bbData.bountyNames[self.faction])
+                    self.name = rng.choice(bbData.bountyNames[self.faction])
                     while doDBCheck and owningDB.bountyNameExists(self.name):
-                        self.name = random.choice(bbData.bountyNames[self.faction])
+                        self.name = rng.choice(bbData.bountyNames[self.faction])
                 else:
                     if doDBCheck and owningDB.bountyNameExists(self.name):
                         raise KeyError("BountyConfig: attempted to create config for pre-existing bounty: " + self.name)
@@ -171,25 +175,20 @@ class BountyConfig:
 
         if self.route == []:
             if self.start == "":
-                self.start = random.choice(list(bbData.builtInSystemObjs.keys()))
-                while self.start == self.end or not bbData.builtInSystemObjs[self.start].hasJumpGate():
-                    self.start = random.choice(list(bbData.builtInSystemObjs.keys()))
+                self.start = bbData.galaxyGraph.randomJumpGateSystem(exclude=self.end, rng=rng)
             elif self.start not in bbData.builtInSystemObjs:
                 raise KeyError("BountyConfig: Invalid start system requested '" + self.start + "'")
             if self.end == "":
-                self.end = random.choice(list(bbData.builtInSystemObjs.keys()))
-                while self.start == self.end or not bbData.builtInSystemObjs[self.end].hasJumpGate():
-                    self.end = random.choice(list(bbData.builtInSystemObjs.keys()))
+                self.end = bbData.galaxyGraph.randomJumpGateSystem(exclude=self.start, rng=rng)
             elif self.end not in bbData.builtInSystemObjs:
                 raise KeyError("BountyConfig: Invalid end system requested '" + self.end + "'")
-            # self.route = makeRoute(self.start, self.end)
-            self.route = lib.pathfinding.bbAStar(self.start, self.end, bbData.builtInSystemObjs)
+            self.route = lib.pathfinding.makeRoute(self.start, self.end)
         else:
             for system in self.route:
                 if system not in bbData.builtInSystemObjs:
                     raise KeyError("BountyConfig: Invalid system in route '" + system + "'")
         if self.answer == "":
-            self.answer = random.choice(self.route)
+            self.answer = rng.choice(self.route)
         elif self.answer not in bbData.builtInSystemObjs:
             raise KeyError("Bounty constructor: Invalid answer requested '" + self.answer + "'")
 
@@ -202,6 +201,10 @@ class BountyConfig:
         if self.endTime == -1.0:
             self.endTime = (datetime.utcfromtimestamp(self.issueTime) + timedelta(days=len(self.route))).timestamp()
 
+        if self.ship is None and not self.isPlayer and bbData.npcFleet is not None:
+            # Seeded streams generate their own loadout, so that the ship is reproducible from the stream
+            self.ship = bbData.npcFleet.takeShip(gameMaths.pickRandomShopTL(rng), None if rng is random else rng)
+
         if not forceKeepChecked:
             self.checked = {}
         for station in self.route:
@@ -106,7 +106,7 @@ class Criminal(aliasable.Aliasable):
         """
         if self.hasShip:
             raise RuntimeError("CRIM_COPYSH_HASSH: Attempted to copyShip on a Criminal that already has an active ship")
-        self.ship = shipItem.Ship.fromDict(ship.toDict())
+        self.ship = ship.copy()
         self.hasShip = True
 
 
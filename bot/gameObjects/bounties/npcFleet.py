@@ -0,0 +1,237 @@
+from __future__ import annotations
+import random
+from array import array
+from typing import List
+
+from ...cfg import bbData
+from ...lib import gameMaths, randomStreams
+from ..items import shipItem
+
+# Marks an empty item slot in a packed loadout
+NO_ITEM = 0xFFFF
+
+
+def _streamUniforms(seed : int, firstCounter : int, count : int) -> List[float]:
+    """Draw consecutive values from a counter-based random stream, if one is given.
+
+    :param int seed: The seed of the stream to draw from, or None
+    :param int firstCounter: The position in the stream of the first value to draw
+    :param int count: The number of values to draw
+    :return: count uniform random values in [0, 1), or None if seed is None
+    :rtype: List[float]
+    """
+    if seed is None:
+        return None
+    return randomStreams.counterUniforms([seed] * count, list(range(firstCounter, firstCounter + count)))
+
+
+class NPCFleet:
+    """A pool of pre-generated ships with random loadouts for NPC criminals to fly, for each tech level.
+
+    Loadouts are generated in bulk with gameMaths' batch pickers, and stored packed into one array of unsigned shorts
+    per tech level. Each loadout is a fixed-width record for its tech level: the index of the ship in
+    bbData.shipKeysByTL, followed by the catalogue index of the item in every weapon, module and turret slot,
+    or NO_ITEM for empty slots. Ships are only built when they are taken from the pool, so handing out a ship takes
+    time proportional to its number of slots, however large the pool.
+
+    Ships are always of the pool's tech level. Items are picked with the same tech level probabilities as shop stock,
+    treating the pool's tech level as the shop tech level.
+
+    :var poolSize: The number of loadouts to generate for a tech level at once
+    :vartype poolSize: int
+    :var weaponCatalogue: Every builtIn weapon, ordered by tech level
+    :vartype weaponCatalogue: List[PrimaryWeapon]
+    :var moduleCatalogue: Every builtIn module, ordered by tech level
+    :vartype moduleCatalogue: List[ModuleItem]
+    :var turretCatalogue: Every builtIn turret, ordered by tech level
+    :vartype turretCatalogue: List[TurretWeapon]
+    :var catalogueOffsets: The index in each catalogue of the first item of each tech level, keyed by item type
+    :vartype catalogueOffsets: Dict[str, List[int]]
+    :var recordWidths: The number of shorts in each packed loadout, for each tech level
+    :vartype recordWidths: List[int]
+    :var pools: The packed loadouts not yet handed out, for each tech level
+    :vartype pools: List[array]
+    """
+
+    def __init__(self, poolSize : int):
+        """Catalogue the builtIn items and ships. bbData.shipKeysByTL, bbData.builtInShipPrototypes, and the
+        item lists sorted by tech level must already be populated.
+
+        :param int poolSize: The number of loadouts to generate for a tech level at once
+        :raise ValueError: If poolSize is not positive
+        """
+        if poolSize < 1:
+            raise ValueError("NPC fleets must generate at least one ship at a time, not " + str(poolSize))
+        self.poolSize = poolSize
+
+        self.catalogueOffsets = {}
+        for itemType, objsByTL in (("weapon", bbData.weaponObjsByTL), ("module", bbData.moduleObjsByTL),
+                                    ("turret", bbData.turretObjsByTL)):
+            catalogue = []
+            self.catalogueOffsets[itemType] = []
+            for tlItems in objsByTL:
+                self.catalogueOffsets[itemType].append(len(catalogue))
+                catalogue += tlItems
+            if len(catalogue) >= NO_ITEM:
+                raise ValueError("Too many builtIn " + itemType + "s to pack into an NPC fleet: " + str(len(catalogue)))
+            setattr(self, itemType + "Catalogue", catalogue)
+
+        # Each record has room for the ship with the most slots of its tech level
+        self.recordWidths = []
+        for tlShipKeys in bbData.shipKeysByTL:
+            mostSlots = 0
+            for shipKey in tlShipKeys:
+                prototype = bbData.builtInShipPrototypes[shipKey]
+                mostSlots = max(mostSlots, prototype.getMaxPrimaries() + prototype.getMaxModules() \
+                                            + prototype.getMaxTurrets())
+            self.recordWidths.append(1 + mostSlots)
+        self.pools = [array("H") for _ in bbData.shipKeysByTL]
+
+
+    def numShips(self, techLevel : int) -> int:
+        """Get the number of loadouts of the given tech level waiting to be handed out.
+
+        :param int techLevel: The tech level to count loadouts of
+        :return: The number of loadouts in the pool for techLevel
+        :rtype: int
+        """
+        return len(self.pools[techLevel - 1]) // self.recordWidths[techLevel - 1]
+
+
+    def _pickItems(self, itemType : str, techLevel : int, numSlots : int, seed : int = None,
+                    firstCounter : int = 0) -> List[int]:
+        """Pick a random item of the given type for each of a number of slots on ships of the given tech level.
+
+        :param str itemType: The type of item to pick, either "weapon", "module" or "turret"
+        :param int techLevel: The tech level of the ships being equipped
+        :param int numSlots: The total number of slots to pick items for
+        :param int seed: The seed of a counter-based stream to draw from, or None to draw new values (Default None)
+        :param int firstCounter: The position in seed's stream of the first value to draw. 2 * numSlots values are
+                                    drawn. Ignored if seed is None (Default 0)
+        :return: The catalogue index of the item picked for each slot, or NO_ITEM where no items of the picked tech
+                    level exist
+        :rtype: List[int]
+        """
+        objsByTL = getattr(bbData, itemType + "ObjsByTL")
+        tlUniforms = _streamUniforms(seed, firstCounter, numSlots)
+        itemTLs = gameMaths.pickRandomItemTLs([techLevel] * numSlots, tlUniforms)
+        indexUniforms = _streamUniforms(seed, firstCounter + numSlots, numSlots)
+        itemIndices = gameMaths.pickRandomIndices([len(objsByTL[itemTL - 1]) for itemTL in itemTLs], indexUniforms)
+        offsets = self.catalogueOffsets[itemType]
+        return [NO_ITEM if itemIndex == -1 else offsets[itemTL - 1] + itemIndex
+                for itemTL, itemIndex in zip(itemTLs, itemIndices)]
+
+
+    def _generateRecords(self, techLevel : int, numShips : int, seed : int = None) -> List[int]:
+        """Generate packed random loadouts for NPC ships of the given tech level, without adding them to the pool.
+        All random values are drawn together, using NumPy if it is installed.
+
+        :param int techLevel: The tech level of the ships to generate
+        :param int numShips: The number of loadouts to generate
+        :param int seed: The seed of a counter-based stream to draw all random values from, so that the same seed always
+                            generates the same loadouts. Give None to draw new values. (Default None)
+        :return: numShips packed loadouts, one after another, or an empty list if there are no ships of techLevel
+        :rtype: List[int]
+        """
+        tlShipKeys = bbData.shipKeysByTL[techLevel - 1]
+        if not tlShipKeys or numShips < 1:
+            return []
+        shipIndices = gameMaths.pickRandomIndices([len(tlShipKeys)] * numShips, _streamUniforms(seed, 0, numShips))
+        prototypes = [bbData.builtInShipPrototypes[tlShipKeys[shipIndex]] for shipIndex in shipIndices]
+
+        slotItems = {}
+        counter = numShips
+        for itemType, getMaxSlots in (("weapon", shipItem.Ship.getMaxPrimaries), ("module", shipItem.Ship.getMaxModules),
+                                        ("turret", shipItem.Ship.getMaxTurrets)):
+            numSlots = sum(getMaxSlots(prototype) for prototype in prototypes)
+            slotItems[itemType] = iter(self._pickItems(itemType, techLevel, numSlots, seed, counter))
+            counter += 2 * numSlots
+
+        recordWidth = self.recordWidths[techLevel - 1]
+        records = []
+        for shipIndex, prototype in zip(shipIndices, prototypes):
+            record = [shipIndex]
+            record += [next(slotItems["weapon"]) for _ in range(prototype.getMaxPrimaries())]
+            record += [next(slotItems["module"]) for _ in range(prototype.getMaxModules())]
+            record += [next(slotItems["turret"]) for _ in range(prototype.getMaxTurrets())]
+            record += [NO_ITEM] * (recordWidth - len(record))
+            records += record
+        return records
+
+
+    def generate(self, techLevel : int, numShips : int):
+        """Generate random loadouts for NPC ships of the given tech level, and add them to the pool.
+        All random values are drawn together, using NumPy if it is installed.
+
+        :param int techLevel: The tech level of the ships to generate
+        :param int numShips: The number of loadouts to generate
+        """
+        self.pools[techLevel - 1].extend(self._generateRecords(techLevel, numShips))
+
+
+    def refill(self):
+        """Top up the pool of every tech level to poolSize loadouts.
+        """
+        for techLevel in range(1, len(self.pools) + 1):
+            self.generate(techLevel, self.poolSize - self.numShips(techLevel))
+
+
+    def takeShip(self, techLevel : int, rng : random.Random = None) -> shipItem.Ship:
+        """Build a new ship from a loadout in the pool of the given tech level, and remove the loadout from the pool.
+        If the pool is empty, poolSize new loadouts are generated first.
+        If rng is given, the pool is left untouched, and a new loadout is generated from a seed drawn from rng instead,
+        so that the ship is reproducible from rng's state.
+        Modules which would exceed cfg.maxModuleTypeEquips are left out.
+
+        :param int techLevel: The tech level of the ship to take
+        :param random.Random rng: A seeded random number generator to generate the loadout from, e.g a guild's
+                                    random stream. Give None to take a loadout from the pool. (Default None)
+        :return: A new ship with a random loadout, or None if there are no ships of techLevel
+        :rtype: shipItem.Ship
+        :raise IndexError: If techLevel is not a valid tech level
+        """
+        if techLevel < 1:
+            raise IndexError("Invalid tech level: " + str(techLevel))
+        if rng is not None:
+            record = self._generateRecords(techLevel, 1, rng.getrandbits(64))
+            return self._buildShip(techLevel, record) if record else None
+
+        pool = self.pools[techLevel - 1]
+        if not pool:
+            self.generate(techLevel, self.poolSize)
+            if not pool:
+                return None
+
+        recordWidth = self.recordWidths[techLevel - 1]
+        record = pool[-recordWidth:]
+        del pool[-recordWidth:]
+        return self._buildShip(techLevel, record)
+
+
+    def _buildShip(self, techLevel : int, record : List[int]) -> shipItem.Ship:
+        """Build a new ship from a packed loadout.
+        Modules which would exceed cfg.maxModuleTypeEquips are left out.
+
+        :param int techLevel: The tech level of the loadout
+        :param List[int] record: The packed loadout to build
+        :return: A new ship with the loadout described by record
+        :rtype: shipItem.Ship
+        """
+        newShip = bbData.builtInShipPrototypes[bbData.shipKeysByTL[techLevel - 1][record[0]]].copy()
+        newShip.clearWeapons()
+        newShip.clearModules()
+        newShip.clearTurrets()
+        slot = 1
+        for _ in range(newShip.getMaxPrimaries()):
+            if record[slot] != NO_ITEM:
+                newShip.equipWeapon(self.weaponCatalogue[record[slot]])
+            slot += 1
+        for _ in range(newShip.getMaxModules()):
+            if record[slot] != NO_ITEM and newShip.canEquipModuleType(type(self.moduleCatalogue[record[slot]])):
+                newShip.equipModule(self.moduleCatalogue[record[slot]])
+            slot += 1
+        for _ in range(newShip.getMaxTurrets()):
+            if record[slot] != NO_ITEM:
+                newShip.equipTurret(self.turretCatalogue[record[slot]])
+            slot += 1
+        return newShip
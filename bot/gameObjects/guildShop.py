@@ -1,6 +1,6 @@
 # Typing imports
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Tuple
 if TYPE_CHECKING:
     from ..users import basedUser
 
@@ -12,9 +12,10 @@ from .items import moduleItemFactory, gameItem
 from .items.modules import moduleItem
 from .inventories.inventory import Inventory
 import random
-from ..botState import logger
-from ..lib import gameMaths
+from .. import botState
+from ..lib import gameMaths, randomStreams, stringTyping
 from ..baseClasses import serializable
+from ..databases import creditsLedger
 
 
 class GuildShop(serializable.Serializable):
@@ -40,6 +41,9 @@ class GuildShop(serializable.Serializable):
     :vartype modulesStock: inventory
     :var turretsStock: A inventory containing the shop's stock of turrets
     :vartype turretsStock: inventory
+    :var listingFieldsCache: The most recently rendered listing embed fields for each item type, alongside the
+                                stock inventory and inventory version they were rendered from. See getListingFields.
+    :vartype listingFieldsCache: Dict[str, Tuple[Inventory, int, List[Tuple[str, str, bool]]]]
     """
 
     def __init__(self, maxShips : int = cfg.shopRefreshShips, maxModules : int = cfg.shopRefreshModules,
@@ -72,6 +76,7 @@ class GuildShop(serializable.Serializable):
         self.weaponsStock = weaponsStock or Inventory()
         self.modulesStock = modulesStock or Inventory()
         self.turretsStock = turretsStock or Inventory()
+        self.listingFieldsCache = {}
 
         if not noRefresh and self.isEmpty():
             self.refreshStock()
@@ -85,13 +90,15 @@ class GuildShop(serializable.Serializable):
         return all(stock.isEmpty for stock in (self.shipsStock, self.weaponsStock, self.modulesStock, self.turretsStock))
 
 
-    def refreshStock(self, level : int = -1):
+    def refreshStock(self, level : int = -1, rng : random.Random = random):
         """Refresh the stock of the shop by picking random items according to the given tech level.
         All previous stock is deleted.
         If level = -1 is given, a new shop tech level is generated at random.
 
         :param int level: The new tech level of the shop. Give -1 to pick a level at random according to
                             gameMaths.pickRandomShopTL()
+        :param random.Random rng: The random number generator to draw from, e.g a guild's seeded stream
+                                    from lib.randomStreams (Default the random module)
         :raise ValueError: When given a tech level that is out of range
         """
         self.shipsStock.clear()
@@ -100,7 +107,7 @@ class GuildShop(serializable.Serializable):
         self.turretsStock.clear()
         # self.currentTechLevel = random.randint(cfg.minTechLevel, cfg.maxTechLevel)
         if level == -1:
-            self.currentTechLevel = gameMaths.pickRandomShopTL()
+            self.currentTechLevel = gameMaths.pickRandomShopTL(rng)
         else:
             if level not in range(cfg.minTechLevel, cfg.maxTechLevel + 1):
                 raise ValueError("Attempted to refresh a shop at tech level " + str(level) + ". must be within the range " \
@@ -108,25 +115,25 @@ class GuildShop(serializable.Serializable):
             self.currentTechLevel = level
 
         for i in range(self.maxShips):
-            tlShipKeys = bbData.shipKeysByTL[gameMaths.pickRandomItemTL(self.currentTechLevel) - 1]
+            tlShipKeys = bbData.shipKeysByTL[gameMaths.pickRandomItemTL(self.currentTechLevel, rng) - 1]
             if len(tlShipKeys) != 0:
-                self.shipsStock.addItem(Ship.fromDict(bbData.builtInShipData[random.choice(tlShipKeys)]))
+                self.shipsStock.addItem(bbData.builtInShipPrototypes[rng.choice(tlShipKeys)])
 
         for i in range(self.maxModules):
-            itemTL = gameMaths.pickRandomItemTL(self.currentTechLevel)
+            itemTL = gameMaths.pickRandomItemTL(self.currentTechLevel, rng)
             if len(bbData.moduleObjsByTL[itemTL - 1]) != 0:
-                self.modulesStock.addItem(random.choice(bbData.moduleObjsByTL[itemTL - 1]))
+                self.modulesStock.addItem(rng.choice(bbData.moduleObjsByTL[itemTL - 1]))
 
         for i in range(self.maxWeapons):
-            itemTL = gameMaths.pickRandomItemTL(self.currentTechLevel)
+            itemTL = gameMaths.pickRandomItemTL(self.currentTechLevel, rng)
             if len(bbData.weaponObjsByTL[itemTL - 1]) != 0:
-                self.weaponsStock.addItem(random.choice(bbData.weaponObjsByTL[itemTL - 1]))
+                self.weaponsStock.addItem(rng.choice(bbData.weaponObjsByTL[itemTL - 1]))
 
         # if random.randint(1, 100) <= cfg.turretSpawnProbability:
         for i in range(self.maxTurrets):
-            itemTL = gameMaths.pickRandomItemTL(self.currentTechLevel)
+            itemTL = gameMaths.pickRandomItemTL(self.currentTechLevel, rng)
             if len(bbData.turretObjsByTL[itemTL - 1]) != 0:
-                self.turretsStock.addItem(random.choice(bbData.turretObjsByTL[itemTL - 1]))
+                self.turretsStock.addItem(rng.choice(bbData.turretObjsByTL[itemTL - 1]))
 
 
     def getStockByName(self, item : str) -> Inventory:
@@ -153,6 +160,80 @@ class GuildShop(serializable.Serializable):
             raise NotImplementedError("Valid, but unrecognised item type: " + item)
 
 
+    def getListingFields(self, item : str) -> List[Tuple[str, str, bool]]:
+        """Get the embed fields listing the shop's current stock of the named type, as shown by the shop command.
+        Fields are rendered once and then cached, until the stock inventory is next changed.
+
+        :param str item: The name of the item type to list. Must be one of ship, weapon, module or turret
+        :return: A (name, value, inline) tuple for each embed field, starting with a heading field if any stock is listed.
+                    This list is shared with the cache, and must not be altered.
+        :rtype: List[Tuple[str, str, bool]]
+        :raise ValueError: When requesting an unknown item type
+        """
+        stock = self.getStockByName(item)
+        if item in self.listingFieldsCache:
+            cachedStock, cachedVersion, fields = self.listingFieldsCache[item]
+            if cachedStock is stock and cachedVersion == stock.version:
+                return fields
+
+        fields = self._renderListingFields(item, stock)
+        self.listingFieldsCache[item] = (stock, stock.version, fields)
+        return fields
+
+
+    def _renderListingFields(self, item : str, stock : Inventory) -> List[Tuple[str, str, bool]]:
+        """Render the embed fields listing the given stock. Use getListingFields instead, which caches the result.
+
+        :param str item: The name of the item type stored in stock
+        :param Inventory stock: The inventory to list
+        :return: A (name, value, inline) tuple for each embed field, starting with a heading field if any stock is listed
+        :rtype: List[Tuple[str, str, bool]]
+        """
+        fields = []
+        for itemNum in range(1, stock.numKeys + 1):
+            if itemNum == 1:
+                fields.append(("‎", "__**" + (item + "s").title() + "**__", False))
+
+            try:
+                currentItem = stock[itemNum - 1].item
+            except KeyError:
+                try:
+                    botState.logger.log("GuildShop", "renderListings", "Requested " + item + " '" \
+                                                            + stock.getKeys()[itemNum - 1].name + "' (index " \
+                                                            + str(itemNum - 1) + "), which was not found in the shop stock",
+                                        category="shop", eventType="UNKWN_KEY")
+                except IndexError:
+                    break
+                except AttributeError:
+                    keysStr = ", ".join(str(stockItem) for stockItem in stock.items)
+                    botState.logger.log("GuildShop", "renderListings", "Unexpected type in " + item + "s stock KEYS, index " \
+                                                            + str(itemNum - 1) + ". Expected " + item + ", got " \
+                                                            + type(stock.getKeys()[itemNum - 1]).__name__ \
+                                                            + ".\nInventory keys: " + keysStr, category="shop",
+                                        eventType="INVTY_KEY_TYPE")
+                    fields.append((str(itemNum) + ". **⚠ #INVALID-ITEM# '" + str(stock.getKeys()[itemNum - 1]) + "'",
+                                    "Do not attempt to buy. Could cause issues.", True))
+                    continue
+                fields.append((str(itemNum) + ". **⚠ #INVALID-ITEM# '" + stock.getKeys()[itemNum - 1].name + "'",
+                                "Do not attempt to buy. Could cause issues.", True))
+                continue
+
+            currentItemCount = stock.items[currentItem].count
+            # Ships may be nicknamed, and are valued including their equipped items
+            if item == "ship":
+                itemName = currentItem.getNameAndNick()
+                itemValue = currentItem.getValue()
+            else:
+                itemName = currentItem.name
+                itemValue = currentItem.value
+            fields.append((str(itemNum) + ". " + (currentItem.emoji.sendable + " " if currentItem.hasEmoji else "") \
+                                + ((" `(" + str(currentItemCount) + ")` ") if currentItemCount > 1 else "") \
+                                + "**" + itemName + "**",
+                            stringTyping.commaSplitNum(itemValue) + " Credits\n" + currentItem.statsStringShort(), True))
+
+        return fields
+
+
     def userCanAffordItemObj(self, user : basedUser.BasedUser, item : gameItem.GameItem) -> bool:
         """Decide whether a user has enough credits to buy an item
 
@@ -223,7 +304,8 @@ class GuildShop(serializable.Serializable):
         if self.userCanAffordItemObj(user, requestedShip):
             self.shipsStock.removeItem(requestedShip)
             user.credits -= requestedShip.getValue()
-            user.inactiveShips.addItem(requestedShip)
+            botState.creditsLedger.record(user.id, -requestedShip.getValue(), creditsLedger.LedgerEvent.shopPurchase)
+            user.inactiveShips.addItem(requestedShip.copyIfPrototype())
         else:
             raise RuntimeError("user " + str(user.id) + " attempted to buy ship " + requestedShip.name \
                                 + " but can't afford it: " + str(user.credits) + " < " + str(requestedShip.getValue()))
@@ -237,6 +319,7 @@ class GuildShop(serializable.Serializable):
         :param Ship weapon: The ship to buy from user
         """
         user.credits += ship.getValue()
+        botState.creditsLedger.record(user.id, ship.getValue(), creditsLedger.LedgerEvent.shopSale)
         self.shipsStock.addItem(ship)
         user.inactiveShips.removeItem(ship)
 
@@ -286,6 +369,7 @@ class GuildShop(serializable.Serializable):
         if self.userCanAffordItemObj(user, requestedWeapon):
             self.weaponsStock.removeItem(requestedWeapon)
             user.credits -= requestedWeapon.getValue()
+            botState.creditsLedger.record(user.id, -requestedWeapon.getValue(), creditsLedger.LedgerEvent.shopPurchase)
             user.inactiveShips.addItem(requestedWeapon)
         else:
             raise RuntimeError("user " + str(user.id) + " attempted to buy weapon " + requestedWeapon.name \
@@ -300,6 +384,7 @@ class GuildShop(serializable.Serializable):
         :param PrimaryWeapon weapon: The weapon to buy from user
         """
         user.credits += weapon.getValue()
+        botState.creditsLedger.record(user.id, weapon.getValue(), creditsLedger.LedgerEvent.shopSale)
         self.weaponsStock.addItem(weapon)
         user.inactiveWeapons.removeItem(weapon)
 
@@ -349,6 +434,7 @@ class GuildShop(serializable.Serializable):
         if self.userCanAffordItemObj(user, requestedModule):
             self.modulesStock.removeItem(requestedModule)
             user.credits -= requestedModule.getValue()
+            botState.creditsLedger.record(user.id, -requestedModule.getValue(), creditsLedger.LedgerEvent.shopPurchase)
             user.inactiveShips.addItem(requestedModule)
         else:
             raise RuntimeError("user " + str(user.id) + " attempted to buy module " + requestedModule.name \
@@ -363,6 +449,7 @@ class GuildShop(serializable.Serializable):
         :param moduleItem module: The module to buy from user
         """
         user.credits += module.getValue()
+        botState.creditsLedger.record(user.id, module.getValue(), creditsLedger.LedgerEvent.shopSale)
         self.modulesStock.addItem(module)
         user.inactiveModules.removeItem(module)
 
@@ -412,6 +499,7 @@ class GuildShop(serializable.Serializable):
         if self.userCanAffordItemObj(user, requestedTurret):
             self.turretsStock.removeItem(requestedTurret)
             user.credits -= requestedTurret.getValue()
+            botState.creditsLedger.record(user.id, -requestedTurret.getValue(), creditsLedger.LedgerEvent.shopPurchase)
             user.inactiveShips.addItem(requestedTurret)
         else:
             raise RuntimeError("user " + str(user.id) + " attempted to buy turret " + requestedTurret.name \
@@ -426,6 +514,7 @@ class GuildShop(serializable.Serializable):
         :param TurretWeapon turret: The turret to buy from user
         """
         user.credits += turret.getValue()
+        botState.creditsLedger.record(user.id, turret.getValue(), creditsLedger.LedgerEvent.shopSale)
         self.turretsStock.addItem(turret)
         user.inactiveTurrets.removeItem(turret)
 
@@ -450,37 +539,10 @@ class GuildShop(serializable.Serializable):
         :return: A dictionary containing all information needed to reconstruct this shop object
         :rtype: dict
         """
-        shipsStockDict = []
-        for ship in self.shipsStock.keys:
-            if ship in self.shipsStock.items:
-                shipsStockDict.append(self.shipsStock.items[ship].toDict(**kwargs))
-            else:
-                logger.log("bbShp", "toDict", "Failed to save invalid ship key '" + str(ship) \
-                                                + "' - not found in items dict", category="shop", eventType="UNKWN_KEY")
-
-        weaponsStockDict = []
-        for weapon in self.weaponsStock.keys:
-            if weapon in self.weaponsStock.items:
-                weaponsStockDict.append(self.weaponsStock.items[weapon].toDict(**kwargs))
-            else:
-                logger.log("bbShp", "toDict", "Failed to save invalid weapon key '" + str(weapon) \
-                                                + "' - not found in items dict", category="shop", eventType="UNKWN_KEY")
-
-        modulesStockDict = []
-        for module in self.modulesStock.keys:
-            if module in self.modulesStock.items:
-                modulesStockDict.append(self.modulesStock.items[module].toDict(**kwargs))
-            else:
-                logger.log("bbShp", "toDict", "Failed to save invalid module key '" + str(module) \
-                                                + "' - not found in items dict", category="shop", eventType="UNKWN_KEY")
-
-        turretsStockDict = []
-        for turret in self.turretsStock.keys:
-            if turret in self.turretsStock.items:
-                turretsStockDict.append(self.turretsStock.items[turret].toDict(**kwargs))
-            else:
-                logger.log("bbShp", "toDict", "Failed to save invalid turret key '" + str(turret) \
-                                                + "' - not found in items dict", category="shop", eventType="UNKWN_KEY")
+        shipsStockDict = [listing.toDict(**kwargs) for listing in self.shipsStock.items.values()]
+        weaponsStockDict = [listing.toDict(**kwargs) for listing in self.weaponsStock.items.values()]
+        modulesStockDict = [listing.toDict(**kwargs) for listing in self.modulesStock.items.values()]
+        turretsStockDict = [listing.toDict(**kwargs) for listing in self.turretsStock.items.values()]
 
         return {"maxShips": self.maxShips, "maxWeapons": self.maxWeapons, "maxModules": self.maxModules,
                 "currentTechLevel": self.currentTechLevel, "shipsStock": shipsStockDict, "weaponsStock": weaponsStockDict,
@@ -515,3 +577,56 @@ class GuildShop(serializable.Serializable):
 
         return GuildShop(**cls._makeDefaults(shopDict, shipsStock=shipsStock, weaponsStock=weaponsStock,
                                                 modulesStock=modulesStock, turretsStock=turretsStock))
+
+
+def refreshShopStocks(shops : List[GuildShop], seeds : List[int] = None):
+    """Refresh the stock of many shops at once, as if calling refreshStock on each with a random tech level.
+    Rather than picking tech levels and items for one slot at a time, all random values for every shop are drawn
+    together with gameMaths' batch pickers, which use NumPy when it is installed.
+
+    If seeds are given, each shop's random values are drawn from its own stream with randomStreams.counterUniforms.
+    Each shop's new stock then depends only on its seed, and not on the other shops refreshed with it.
+
+    :param List[GuildShop] shops: The shops to refresh
+    :param List[int] seeds: The seed of the random stream to draw each shop's stock from, e.g from
+                            randomStreams.streamSeed. Give None to draw from the global random number generator.
+                            (Default None)
+    """
+    def streamUniforms(slotCounters : List[Tuple[int, int]]) -> List[float]:
+        # Draw the uniform value at each (shop index, counter) position of the shops' streams
+        if seeds is None:
+            return None
+        return randomStreams.counterUniforms([seeds[shopIndex] for shopIndex, _ in slotCounters],
+                                                [counter for _, counter in slotCounters])
+
+    # Each shop's stream starts with its tech level, followed by an item tech level and an item index for every slot
+    shopTLs = gameMaths.pickRandomShopTLs(len(shops), streamUniforms([(shopIndex, 0) for shopIndex in range(len(shops))]))
+    for shop, shopTL in zip(shops, shopTLs):
+        for stock in (shop.shipsStock, shop.weaponsStock, shop.modulesStock, shop.turretsStock):
+            stock.clear()
+        shop.currentTechLevel = shopTL
+
+    for stockNum, (stockAttr, maxAttr, itemsByTL) in enumerate((("shipsStock", "maxShips", bbData.shipKeysByTL),
+                                                                ("modulesStock", "maxModules", bbData.moduleObjsByTL),
+                                                                ("weaponsStock", "maxWeapons", bbData.weaponObjsByTL),
+                                                                ("turretsStock", "maxTurrets", bbData.turretObjsByTL))):
+        # Pick an item tech level and an item of that tech level for every slot of every shop
+        slotShopTLs = [shopTL for shop, shopTL in zip(shops, shopTLs) for _ in range(getattr(shop, maxAttr))]
+        slotCounters = [(shopIndex, 1 + 2 * (4 * slot + stockNum)) for shopIndex, shop in enumerate(shops)
+                        for slot in range(getattr(shop, maxAttr))]
+        itemTLs = gameMaths.pickRandomItemTLs(slotShopTLs, streamUniforms(slotCounters))
+        itemIndices = gameMaths.pickRandomIndices([len(itemsByTL[itemTL - 1]) for itemTL in itemTLs],
+                                                    streamUniforms([(shopIndex, counter + 1)
+                                                                    for shopIndex, counter in slotCounters]))
+
+        slotNum = 0
+        for shop in shops:
+            stock = getattr(shop, stockAttr)
+            for _ in range(getattr(shop, maxAttr)):
+                if itemIndices[slotNum] != -1:
+                    newItem = itemsByTL[itemTLs[slotNum] - 1][itemIndices[slotNum]]
+                    # Ships are stored by key. Shops list the shared prototype, which is copied when bought
+                    if stockAttr == "shipsStock":
+                        newItem = bbData.builtInShipPrototypes[newItem]
+                    stock.addItem(newItem)
+                slotNum += 1
@@ -7,24 +7,38 @@ class Inventory(serializable.Serializable):
     """A database of InventoryListings.
     Aside from the use of InventoryListing for the purpose of item quantities, this class is type unaware.
 
-    :var items: The actual item listings
+    Listings are kept in a dictionary, which preserves the order in which items were first added. Adding, removing,
+    counting and checking for items all take constant time. Reading items by position, as in getPage, uses a list of
+    the item types which is rebuilt from the dictionary only when an item type has been removed since it was last read.
+
+    :var items: The actual item listings, in the order in which they were added
     :vartype items: dict[object, InventoryListing]
-    :var keys: The item types stored
-    :vartype keys: ist[object]
+    :var orderedKeys: The item types stored, in the same order as items, or None if it needs to be rebuilt
+    :vartype orderedKeys: list[object]
     :var totalItems: The total number of items stored; the sum of all item quantities
     :vartype totalItems: int
-    :var numKeys: The number of item types stored; the length of self.keys
+    :var numKeys: The number of item types stored; the length of self.items
     :vartype numKeys: int
+    :var version: A counter incremented on every change to the inventory's contents, such that anything derived from
+                    the contents can be recognised as out of date
+    :vartype version: int
+    :var changeListener: An optional function called with an item and a quantity whenever that quantity of the item is
+                            added to the inventory, or with a negative quantity when removed. None for no listener.
+    :vartype changeListener: Callable[[object, int], None]
     """
     def __init__(self):
-        # The actual item listings
+        # The actual item listings, in the order in which they were added
         self.items = {}
-        # The item types stored
-        self.keys = []
+        # The item types stored, for reading by position. None when it needs to be rebuilt from self.items
+        self.orderedKeys = []
         # The total number of items stored; the sum of all item quantities
         self.totalItems = 0
-        # The number of item types stored; the length of self.keys
+        # The number of item types stored; the length of self.items
         self.numKeys = 0
+        # Incremented on every change to the inventory's contents
+        self.version = 0
+        # Called with (item, quantity) on every addition, and with (item, -quantity) on every removal
+        self.changeListener = None
 
 
     def addItem(self, item : object, quantity : int = 1):
@@ -39,6 +53,7 @@ class Inventory(serializable.Serializable):
         if quantity < 0:
             raise ValueError("Quantity must be at least 1")
 
+        self.version += 1
         # increment totalItems tracker
         self.totalItems += quantity
         # increment count for existing bbItemListing
@@ -48,9 +63,13 @@ class Inventory(serializable.Serializable):
         else:
             self.items[item] = inventoryListing.InventoryListing(item, quantity)
             # Update keys and numKeys trackers
-            self.keys.append(item)
+            if self.orderedKeys is not None:
+                self.orderedKeys.append(item)
             self.numKeys += 1
 
+        if self.changeListener is not None:
+            self.changeListener(item, quantity)
+
 
     def _addListing(self, newListing : inventoryListing.InventoryListing):
         """Add an inventory listing to the inventory, including item and acount.
@@ -59,6 +78,7 @@ class Inventory(serializable.Serializable):
 
         :param InventoryListing newListing: The inventory listing to add to the inventory
         """
+        self.version += 1
         # update total items count
         self.totalItems += newListing.count
         # if item is already stored, increment its listing count
@@ -67,10 +87,14 @@ class Inventory(serializable.Serializable):
         # otherwise, store a reference to the given listing
         else:
             self.items[newListing.item] = newListing
-            self.keys.append(newListing.item)
+            if self.orderedKeys is not None:
+                self.orderedKeys.append(newListing.item)
             # update keys counter
             self.numKeys += 1
 
+        if self.changeListener is not None:
+            self.changeListener(newListing.item, newListing.count)
+
 
     def removeItem(self, item : object, quantity : int = 1):
         """Remove one or more of an item from the inventory.
@@ -84,19 +108,19 @@ class Inventory(serializable.Serializable):
         """
         # Ensure enough of item is stored to remove quantity of it
         if item in self.items and self.items[item].count >= quantity:
+            self.version += 1
             # Update item's count and inventory's totalItems tracker
             self.items[item].count -= quantity
             self.totalItems -= quantity
             # remove the bbItemListing if it is now empty
             if self.items[item].count == 0:
-                # update the keys and numKeys trackers
-                for i in range(len(self.keys)):
-                    if self.keys[i] is item:
-                        self.keys.pop(i)
-                        break
-                # self.keys.remove(item)
+                # update the keys and numKeys trackers. orderedKeys is rebuilt when next read by position
+                self.orderedKeys = None
                 self.numKeys -= 1
                 del self.items[item]
+
+            if self.changeListener is not None:
+                self.changeListener(item, -quantity)
         else:
             raise ValueError("Attempted to remove " + str(quantity) + " " + str(item) + "(s) when " \
                                 + (str(self.items[item].count) if item in self.items else "0") + " are in inventory")
@@ -113,6 +137,19 @@ class Inventory(serializable.Serializable):
         return int(self.numKeys / itemsPerPage) + (0 if self.numKeys % itemsPerPage == 0 else 1)
 
 
+    def getKeys(self) -> list:
+        """Get the item types stored, in the order in which they were added, for reading by position.
+        Takes constant time unless an item type has been removed since the last call, in which case the list is rebuilt.
+        The returned list must not be modified.
+
+        :return: The item types stored
+        :rtype: list[object]
+        """
+        if self.orderedKeys is None:
+            self.orderedKeys = list(self.items)
+        return self.orderedKeys
+
+
     def getPage(self, pageNum : int, itemsPerPage : int) -> list:
         """Get a list of the bbItemListings on the requested page.
         pageNum is 1 index-based; the first page is 1.
@@ -129,8 +166,8 @@ class Inventory(serializable.Serializable):
             raise IndexError("pageNum out of range. min=1 max=" + str(self.numPages(itemsPerPage)))
 
         page = []
-        # Splice self.keys around the first and last indices in the requested page
-        for item in self.keys[(pageNum - 1) * itemsPerPage: min(pageNum * itemsPerPage, self.numKeys)]:
+        # Splice the keys list around the first and last indices in the requested page
+        for item in self.getKeys()[(pageNum - 1) * itemsPerPage: min(pageNum * itemsPerPage, self.numKeys)]:
             # Add the bbItemListings for each of the page's keys to the results list
             page.append(self.items[item])
 
@@ -144,7 +181,7 @@ class Inventory(serializable.Serializable):
         :return: True if at least one of item is in this inventory, False otherwise
         :rtype: bool
         """
-        return item in self.keys
+        return item in self.items
 
 
     def numStored(self, item) -> int:
@@ -154,7 +191,7 @@ class Inventory(serializable.Serializable):
         :return: Integer count of number of items in this inventory. 0 if it is not stored in this inventory.
         :rtype: int
         """
-        return self.items[item].count if self.stores(item) else 0
+        return self.items[item].count if item in self.items else 0
 
 
     def isEmpty(self) -> bool:
@@ -169,15 +206,21 @@ class Inventory(serializable.Serializable):
     def clear(self):
         """Remove all items from the inventory.
         """
+        removedListings = self.items.values()
         self.items = {}
-        self.keys = []
+        self.orderedKeys = []
         self.totalItems = 0
         self.numKeys = 0
+        self.version += 1
+        # Notify only once the items are gone, so that the listener sees the inventory as it is after the removal
+        if self.changeListener is not None:
+            for listing in removedListings:
+                self.changeListener(listing.item, -listing.count)
 
 
     def __getitem__(self, key : int) -> inventoryListing.InventoryListing:
         """Override [subscript] operator for reading values.
-        Currently returns the InventoryListing for the item at position key in self.keys.
+        Currently returns the InventoryListing for the item at position key in the order that items were added.
 
         :param int key: The index of the key to dereference
         :return: The InventoryListing for the item at the requested index
@@ -187,14 +230,15 @@ class Inventory(serializable.Serializable):
         :raise IndexError: When given an index that isn't an int, or the given index is out of range
         :raise ValueError: When the inventory is empty
         """
-        if bool(self.keys):
-            if key in range(len(self.keys)):
-                if self.keys[key] in self.items:
-                    return self.items[self.keys[key]]
-                raise KeyError("Failed get of key number " + str(key) + " - " + str(self.keys[key]) \
+        keys = self.getKeys()
+        if bool(keys):
+            if key in range(len(keys)):
+                if keys[key] in self.items:
+                    return self.items[keys[key]]
+                raise KeyError("Failed get of key number " + str(key) + " - " + str(keys[key]) \
                                 + ". Key does not exist in inventory.")
             raise IndexError("Key of incorrect type or out of range: " + str(key) + ". Valid range: 0 - " \
-                                + str(len(self.keys) - 1))
+                                + str(len(keys) - 1))
         raise ValueError("Attempted to fetch key " + str(key) + ", but keys list is empty")
 
 
@@ -214,7 +258,7 @@ class Inventory(serializable.Serializable):
 
         :param object item: The object to test for membership
         """
-        return item in self.keys
+        return item in self.items
 
 
     def toDict(self, **kwargs) -> dict:
@@ -0,0 +1,403 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple, Any
+from ...cfg import cfg
+from . import shipItem
+import heapq
+import math
+
+# The ship stats affected by equipped items
+STATS = ("dps", "shield", "armour", "cargo", "handling")
+# The stats which each objective maximises the sum of
+objectiveStats = {"dps": ("dps",), "health": ("shield", "armour"), "cargo": ("cargo",), "handling": ("handling",)}
+# The equipment slot kinds of a ship
+SLOT_KINDS = ("weapon", "turret", "module")
+
+
+class _Candidate:
+    """One or more interchangeable items which may be equipped.
+
+    :var kind: The kind of slot the items are equipped into, from SLOT_KINDS
+    :vartype kind: str
+    :var items: The item objects, one per copy available
+    :vartype items: List[Any]
+    :var adds: The flat amount each copy adds to each stat in STATS
+    :vartype adds: Tuple[float, ...]
+    :var mults: The multiplier each copy applies to each stat in STATS
+    :vartype mults: Tuple[float, ...]
+    :var value: The value of each copy
+    :vartype value: int
+    :var typeName: The name of the item's class, for module type equip limits
+    :vartype typeName: str
+    """
+    __slots__ = ("kind", "items", "adds", "mults", "value", "typeName")
+
+    def __init__(self, kind : str, item : Any):
+        """
+        :param str kind: The kind of slot the item is equipped into, from SLOT_KINDS
+        :param item: The first copy of the item
+        """
+        self.kind = kind
+        self.items = [item]
+        if kind == "module":
+            self.adds = tuple(getattr(item, stat) for stat in STATS)
+            self.mults = tuple(getattr(item, stat + "Multiplier") for stat in STATS)
+        else:
+            self.adds = (item.dps,) + (0,) * (len(STATS) - 1)
+            self.mults = (1,) * len(STATS)
+        self.value = item.getValue()
+        self.typeName = type(item).__name__
+
+
+class Loadout:
+    """A set of items to equip onto a ship, as chosen by optimiseLoadout.
+
+    :var weapons: The primary weapons to equip
+    :vartype weapons: List[PrimaryWeapon]
+    :var turrets: The turrets to equip
+    :vartype turrets: List[TurretWeapon]
+    :var modules: The modules to equip
+    :vartype modules: List[ModuleItem]
+    :var stats: The ship's resulting value of each stat in STATS, as calculated by the ship's stat getters
+    :vartype stats: Dict[str, float]
+    :var score: The loadout's score for the objective it was chosen for
+    :vartype score: float
+    :var value: The total value of the items in the loadout
+    :vartype value: int
+    :var optimal: Whether the whole search finished, proving that no better loadout exists
+    :vartype optimal: bool
+    """
+
+    def __init__(self, weapons : List[Any], turrets : List[Any], modules : List[Any], stats : Dict[str, float],
+                    score : float, value : int, optimal : bool):
+        """
+        :param List[PrimaryWeapon] weapons: The primary weapons to equip
+        :param List[TurretWeapon] turrets: The turrets to equip
+        :param List[ModuleItem] modules: The modules to equip
+        :param Dict[str, float] stats: The ship's resulting value of each stat in STATS
+        :param float score: The loadout's score for the objective it was chosen for
+        :param int value: The total value of the items in the loadout
+        :param bool optimal: Whether the whole search finished, proving that no better loadout exists
+        """
+        self.weapons = weapons
+        self.turrets = turrets
+        self.modules = modules
+        self.stats = stats
+        self.score = score
+        self.value = value
+        self.optimal = optimal
+
+
+def _baseStats(ship : shipItem.Ship) -> Tuple[List[float], List[float]]:
+    """Get the flat total and multiplier of each stat in STATS given by a ship and its upgrades, with no items equipped.
+    This follows the stat getters in shipItem.Ship.
+
+    :param shipItem.Ship ship: The ship to get the base stats of
+    :return: The flat total of each stat, and the multiplier applied to each stat
+    :rtype: Tuple[List[float], List[float]]
+    """
+    # Ships have no base DPS or shield of their own
+    adds = [0, 0, ship.armour, ship.cargo, ship.handling]
+    mults = [1] * len(STATS)
+    for upgrade in ship.upgradesApplied:
+        for statIndex, stat in enumerate(STATS):
+            adds[statIndex] += getattr(upgrade, stat)
+            mults[statIndex] *= getattr(upgrade, stat + "Multiplier")
+    return adds, mults
+
+
+def _statTotals(baseAdds : List[float], baseMults : List[float], adds : List[float], mults : List[float]) -> List[float]:
+    """Calculate the value of each stat in STATS, as the ship's stat getters would.
+
+    :param List[float] baseAdds: The flat total of each stat given by the ship and its upgrades
+    :param List[float] baseMults: The multiplier of each stat given by the ship's upgrades
+    :param List[float] adds: The flat total of each stat given by equipped items
+    :param List[float] mults: The multiplier of each stat given by equipped items
+    :return: The value of each stat. DPS is not rounded, and the other stats are truncated to ints.
+    :rtype: List[float]
+    """
+    totals = [(baseAdds[i] + adds[i]) * baseMults[i] * mults[i] for i in range(len(STATS))]
+    return [totals[0]] + [int(total) for total in totals[1:]]
+
+
+def _bestMultiplierSuffixes(candidates : List[_Candidate], kind : str, numSlots : int,
+                                statIndex : int) -> List[List[float]]:
+    """For each position in candidates, find the best multipliers of a stat available from the candidates of a slot
+    kind at or after that position, best first, limited to the number of slots of that kind.
+
+    :param List[_Candidate] candidates: The candidates being searched
+    :param str kind: The slot kind to consider candidates of
+    :param int numSlots: The number of slots of kind on the ship
+    :param int statIndex: The index in STATS of the stat to consider
+    :return: A list of the best multipliers greater than 1, for each position in candidates and one past the end
+    :rtype: List[List[float]]
+    """
+    suffixes = [[] for _ in range(len(candidates) + 1)]
+    for position in range(len(candidates) - 1, -1, -1):
+        candidate = candidates[position]
+        best = suffixes[position + 1]
+        if candidate.kind == kind and candidate.mults[statIndex] > 1:
+            best = sorted(best + [candidate.mults[statIndex]] * min(len(candidate.items), numSlots), reverse=True)[:numSlots]
+        suffixes[position] = best
+    return suffixes
+
+
+def _removeDominated(candidates : List[_Candidate], slots : Dict[str, int], scoredStats : List[int],
+                        budgeted : bool) -> List[_Candidate]:
+    """Remove candidates that can never be needed in an optimal loadout.
+    A candidate is dominated by another of the same kind if the other is at least as good for every scored stat,
+    and no more expensive if there is a budget. If there are enough copies of dominating candidates to fill every slot
+    of the kind, then any loadout using the dominated candidate can swap it for an unused dominating copy.
+    Only dominating candidates of the same type, or without a module type equip limit, are counted, so that swapping
+    never breaks a type limit.
+
+    :param List[_Candidate] candidates: The candidates to filter
+    :param Dict[str, int] slots: The number of slots of each kind on the ship
+    :param List[int] scoredStats: The indices in STATS of the stats being maximised
+    :param bool budgeted: Whether the total value of the loadout is limited
+    :return: The candidates which are not dominated
+    :rtype: List[_Candidate]
+    """
+    kept = []
+    for position, candidate in enumerate(candidates):
+        dominatingCopies = 0
+        for otherPosition, other in enumerate(candidates):
+            if other is candidate or other.kind != candidate.kind \
+                    or any(other.adds[i] < candidate.adds[i] or other.mults[i] < candidate.mults[i] for i in scoredStats) \
+                    or (budgeted and other.value > candidate.value) \
+                    or (other.typeName != candidate.typeName and cfg.maxModuleTypeEquips.get(other.typeName, -1) != -1):
+                continue
+            # Of mutually dominating candidates, only drop the later one, so that one always remains
+            if all(other.adds[i] == candidate.adds[i] and other.mults[i] == candidate.mults[i] for i in scoredStats) \
+                    and (not budgeted or other.value == candidate.value) and otherPosition > position:
+                continue
+            dominatingCopies += len(other.items)
+        if dominatingCopies < slots[candidate.kind]:
+            kept.append(candidate)
+    return kept
+
+
+def _groupCandidates(pools : Dict[str, List[Any]], scoredStats : List[int]) -> List[_Candidate]:
+    """Group identical items into candidates, so that the search decides how many copies to take rather than which.
+    Candidates which cannot improve the objective are left out, and the rest are sorted most promising first.
+
+    :param Dict[str, List[Any]] pools: The items available to equip into each slot kind, with one entry per copy
+    :param List[int] scoredStats: The indices in STATS of the stats being maximised
+    :return: The candidates to search, most promising first
+    :rtype: List[_Candidate]
+    """
+    groups = {}
+    for kind in SLOT_KINDS:
+        for item in pools[kind]:
+            candidate = _Candidate(kind, item)
+            key = (kind, candidate.typeName, item.name, candidate.adds, candidate.mults, candidate.value)
+            if key in groups:
+                groups[key].items.append(item)
+            else:
+                groups[key] = candidate
+    # Items which cannot improve the objective are never worth a slot
+    candidates = [candidate for candidate in groups.values()
+                    if any(candidate.adds[i] > 0 or candidate.mults[i] > 1 for i in scoredStats)]
+    # Try the most promising items first, so that good loadouts are found early and prune more of the search
+    candidates.sort(key=lambda candidate: (-max(candidate.mults[i] for i in scoredStats),
+                                            -sum(candidate.adds[i] for i in scoredStats), candidate.value))
+    return candidates
+
+
+def _topGains(gains : List[Tuple[float, int]], numSlots : int) -> float:
+    """Find the greatest total gain from filling a number of slots.
+
+    :param List[Tuple[float, int]] gains: The gain from one copy of each candidate, and the number of copies available
+    :param int numSlots: The number of slots to fill
+    :return: The sum of the numSlots greatest gains available
+    :rtype: float
+    """
+    return sum(heapq.nlargest(numSlots, (gain for gain, copies in gains for _ in range(min(copies, numSlots)))))
+
+
+class _LoadoutSearch:
+    """A depth first branch and bound search over the number of copies of each candidate to equip.
+
+    :var candidates: The candidates being searched, in the order they are decided
+    :vartype candidates: List[_Candidate]
+    :var best: The best score found, its total value, and the number of each candidate taken
+    :vartype best: List
+    :var nodesLeft: The number of partial loadouts left to consider, or a negative number for no limit
+    :vartype nodesLeft: int
+    :var cutShort: Whether the search was cut short by running out of nodes
+    :vartype cutShort: bool
+    """
+
+    def __init__(self, candidates : List[_Candidate], baseAdds : List[float], baseMults : List[float],
+                    slots : Dict[str, int], scoredStats : List[int], budget : int, maxNodes : int):
+        """
+        :param List[_Candidate] candidates: The candidates to search, in the order they are decided
+        :param List[float] baseAdds: The flat total of each stat given by the ship and its upgrades
+        :param List[float] baseMults: The multiplier of each stat given by the ship's upgrades
+        :param Dict[str, int] slots: The number of slots of each kind on the ship
+        :param List[int] scoredStats: The indices in STATS of the stats being maximised
+        :param int budget: The maximum total value of the chosen items, or -1 for no limit
+        :param int maxNodes: The maximum number of partial loadouts to consider, or -1 for no limit
+        """
+        self.candidates = candidates
+        self.baseAdds = baseAdds
+        self.baseMults = baseMults
+        self.scoredStats = scoredStats
+        self.budget = budget
+        # Only modules have multipliers. Those which multiply a scored stat are bounded separately from the rest.
+        self.multiplying = [any(candidate.mults[i] > 1 for i in scoredStats) for candidate in candidates]
+        self.bestMults = {i: _bestMultiplierSuffixes(candidates, "module", slots["module"], i) for i in scoredStats}
+        self.best = [self.score([0] * len(STATS), [1] * len(STATS)), 0, [0] * len(candidates)]
+        self.taken = [0] * len(candidates)
+        self.typeCounts = {}
+        self.nodesLeft = maxNodes
+        self.cutShort = False
+
+
+    def score(self, adds : List[float], mults : List[float]) -> float:
+        """Score a loadout for the objective.
+
+        :param List[float] adds: The flat total of each stat given by the loadout's items
+        :param List[float] mults: The multiplier of each stat given by the loadout's items
+        :return: The sum of the ship's resulting scored stats
+        :rtype: float
+        """
+        totals = _statTotals(self.baseAdds, self.baseMults, adds, mults)
+        return sum(totals[i] for i in self.scoredStats)
+
+
+    def bound(self, position : int, free : Dict[str, int], adds : List[float], mults : List[float]) -> float:
+        """Find an upper bound on the score of any loadout completing a partial loadout.
+        If j of the free module slots hold multiplying modules, then each stat is multiplied by at most its j best
+        remaining multipliers, making the objective linear in the flat stats still to be added. The j multiplying
+        modules and the other free slots are then filled with the items adding the most to that linear sum.
+
+        :param int position: The index of the first candidate not yet decided
+        :param Dict[str, int] free: The number of free slots of each kind
+        :param List[float] adds: The flat total of each stat given by the items taken so far
+        :param List[float] mults: The multiplier of each stat given by the items taken so far
+        :return: The greatest score that any completion of the partial loadout could have
+        :rtype: float
+        """
+        remaining = list(zip(self.candidates[position:], self.multiplying[position:]))
+        maxMultiplying = min(free["module"], sum(len(candidate.items) for candidate, isMultiplying in remaining
+                                                    if isMultiplying))
+        best = None
+        for numMultiplying in range(maxMultiplying + 1):
+            weights = {i: self.baseMults[i] * mults[i] * math.prod(self.bestMults[i][position][:numMultiplying])
+                        for i in self.scoredStats}
+            total = sum((self.baseAdds[i] + adds[i]) * weights[i] for i in self.scoredStats)
+            gains = {"weapon": [], "turret": [], "module": [], "multiplying": []}
+            for candidate, isMultiplying in remaining:
+                gain = sum(candidate.adds[i] * weights[i] for i in self.scoredStats)
+                if gain > 0:
+                    gains["multiplying" if isMultiplying else candidate.kind].append((gain, len(candidate.items)))
+            total += _topGains(gains["weapon"], free["weapon"]) + _topGains(gains["turret"], free["turret"]) \
+                        + _topGains(gains["module"], free["module"] - numMultiplying) \
+                        + _topGains(gains["multiplying"], numMultiplying)
+            if best is None or total > best:
+                best = total
+        return best
+
+
+    def maxTake(self, candidate : _Candidate, free : Dict[str, int], spent : int) -> int:
+        """Find the most copies of a candidate that can be added to a partial loadout.
+
+        :param _Candidate candidate: The candidate to take copies of
+        :param Dict[str, int] free: The number of free slots of each kind
+        :param int spent: The total value of the items taken so far
+        :return: The most copies that fit in the free slots, the module type equip limit and the budget
+        :rtype: int
+        """
+        maxTake = min(len(candidate.items), free[candidate.kind])
+        if candidate.kind == "module":
+            typeLimit = cfg.maxModuleTypeEquips.get(candidate.typeName, -1)
+            if typeLimit != -1:
+                maxTake = min(maxTake, typeLimit - self.typeCounts.get(candidate.typeName, 0))
+        if self.budget != -1 and candidate.value > 0:
+            maxTake = min(maxTake, (self.budget - spent) // candidate.value)
+        return max(maxTake, 0)
+
+
+    def search(self, position : int, free : Dict[str, int], spent : int, adds : List[float], mults : List[float]):
+        """Search every completion of a partial loadout which might beat the best loadout found so far.
+
+        :param int position: The index of the first candidate not yet decided
+        :param Dict[str, int] free: The number of free slots of each kind
+        :param int spent: The total value of the items taken so far
+        :param List[float] adds: The flat total of each stat given by the items taken so far
+        :param List[float] mults: The multiplier of each stat given by the items taken so far
+        """
+        if self.nodesLeft == 0:
+            self.cutShort = True
+            return
+        self.nodesLeft -= 1
+        currentScore = self.score(adds, mults)
+        if currentScore > self.best[0] or (currentScore == self.best[0] and spent < self.best[1]):
+            self.best = [currentScore, spent, list(self.taken)]
+        if position == len(self.candidates) or self.bound(position, free, adds, mults) <= self.best[0]:
+            return
+
+        candidate = self.candidates[position]
+        for take in range(self.maxTake(candidate, free, spent), 0, -1):
+            newFree = dict(free)
+            newFree[candidate.kind] -= take
+            self.typeCounts[candidate.typeName] = self.typeCounts.get(candidate.typeName, 0) + take
+            self.taken[position] = take
+            self.search(position + 1, newFree, spent + candidate.value * take,
+                        [adds[i] + candidate.adds[i] * take for i in range(len(STATS))],
+                        [mults[i] * candidate.mults[i] ** take for i in range(len(STATS))])
+            self.taken[position] = 0
+            self.typeCounts[candidate.typeName] -= take
+        self.search(position + 1, free, spent, adds, mults)
+
+
+    def loadout(self) -> Loadout:
+        """Make the best loadout found into a Loadout.
+
+        :return: The best loadout found
+        :rtype: Loadout
+        """
+        chosen = {kind: [] for kind in SLOT_KINDS}
+        adds = [0] * len(STATS)
+        mults = [1] * len(STATS)
+        for candidate, take in zip(self.candidates, self.best[2]):
+            chosen[candidate.kind] += candidate.items[:take]
+            for i in range(len(STATS)):
+                adds[i] += candidate.adds[i] * take
+                mults[i] *= candidate.mults[i] ** take
+        totals = _statTotals(self.baseAdds, self.baseMults, adds, mults)
+        return Loadout(chosen["weapon"], chosen["turret"], chosen["module"], dict(zip(STATS, totals)), self.best[0],
+                        self.best[1], not self.cutShort)
+
+
+def optimiseLoadout(ship : shipItem.Ship, weapons : List[Any], turrets : List[Any], modules : List[Any],
+                    objective : str, budget : int = -1, maxNodes : int = -1) -> Loadout:
+    """Find the loadout maximising the given objective, from a pool of available items.
+    Slot counts and module type equip limits are respected, and the total value of the chosen items can be limited.
+
+    The search is a depth first branch and bound over groups of identical items, deciding how many copies of each
+    group to equip. Each partial loadout is bounded by assuming every remaining free slot is filled with the best
+    remaining item for each stat separately, ignoring the budget and module type limits. Any partial loadout whose
+    bound cannot beat the best loadout found so far is not searched further.
+
+    :param shipItem.Ship ship: The ship to equip. Its currently equipped items are ignored - to consider them, include
+                                them in the pools.
+    :param List[PrimaryWeapon] weapons: The primary weapons available to equip, with one entry per copy
+    :param List[TurretWeapon] turrets: The turrets available to equip, with one entry per copy
+    :param List[ModuleItem] modules: The modules available to equip, with one entry per copy
+    :param str objective: The name of the objective to maximise, from objectiveStats
+    :param int budget: The maximum total value of the chosen items, or -1 for no limit (Default -1)
+    :param int maxNodes: The maximum number of partial loadouts to consider, or -1 for no limit (Default -1)
+    :return: The best loadout found. Its optimal attribute is False if the search was cut short by maxNodes.
+    :rtype: Loadout
+    :raise KeyError: If objective is not in objectiveStats
+    """
+    scoredStats = [STATS.index(stat) for stat in objectiveStats[objective]]
+    baseAdds, baseMults = _baseStats(ship)
+    slots = {"weapon": ship.getMaxPrimaries(), "turret": ship.getMaxTurrets(), "module": ship.getMaxModules()}
+    candidates = _groupCandidates({"weapon": weapons, "turret": turrets, "module": modules}, scoredStats)
+    candidates = _removeDominated(candidates, slots, scoredStats, budget != -1)
+
+    search = _LoadoutSearch(candidates, baseAdds, baseMults, slots, scoredStats, budget, maxNodes)
+    search.search(0, slots, 0, [0] * len(STATS), [1] * len(STATS))
+    return search.loadout()
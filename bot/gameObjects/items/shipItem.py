@@ -1,9 +1,12 @@
 # Typing imports
 from __future__ import annotations
-from typing import List, Union, TYPE_CHECKING
+from typing import List, Union, Callable, TYPE_CHECKING
 if TYPE_CHECKING:
     from .modules import moduleItem
 
+import copy
+import functools
+
 from .gameItem import GameItem, spawnableItem
 from . import moduleItemFactory
 from .weapons.primaryWeapon import PrimaryWeapon
@@ -14,6 +17,24 @@ from ... import lib
 from ...lib.emojis import BasedEmoji
 
 
+def cachedStat(statGetter : Callable[[Ship, bool], int]) -> Callable[[Ship, bool], int]:
+    """Decorator memoising a Ship stat getter in the ship's statsCache, separately for each value of shipUpgradesOnly.
+    The cache is emptied by Ship.invalidateStats, which must be called whenever the ship's items or upgrades change.
+    The original, uncached getter remains available as the decorated getter's __wrapped__ attribute.
+
+    :param statGetter: A Ship method calculating a stat, accepting only the shipUpgradesOnly argument
+    :return: statGetter, memoised
+    """
+    @functools.wraps(statGetter)
+    def getCachedStat(self : Ship, shipUpgradesOnly : bool = False) -> int:
+        key = (statGetter.__name__, shipUpgradesOnly)
+        if key not in self.statsCache:
+            self.statsCache[key] = statGetter(self, shipUpgradesOnly=shipUpgradesOnly)
+        return self.statsCache[key]
+
+    return getCachedStat
+
+
 @spawnableItem
 class Ship(GameItem):
     """An equippable and customisable ship for use by players and NPCs.
@@ -55,6 +76,16 @@ class Ship(GameItem):
     :vartype upgradesApplied: list[shipUpgrade]
     :var skin: The name of the skin applied to this ship
     :vartype skin: str
+    :var isPrototype: Whether this ship is one of the shared, unmodifiable ships in bbData.builtInShipPrototypes.
+                        Prototypes may be listed in any number of shops at once, and must be copied before being given
+                        to a user. See copyIfPrototype.
+    :vartype isPrototype: bool
+    :var statsCache: The results of the ship's stat getters since its items or upgrades last changed,
+                        keyed by getter name and shipUpgradesOnly. See cachedStat.
+    :vartype statsCache: Dict[Tuple[str, bool], int]
+    :var valueListener: An optional function called with this ship and the change in its value, whenever its items or
+                        upgrades change. None for no listener. While a listener is set, the ship's value is always cached.
+    :vartype valueListener: Callable[[Ship, int], None]
     """
 
     def __init__(self, name : str, maxPrimaries : int, maxTurrets : int,
@@ -125,21 +156,66 @@ class Ship(GameItem):
         self.maxTurrets = maxTurrets
         self.maxModules = maxModules
 
-        self.weapons = weapons
-        self.modules = modules
-        self.turrets = turrets
+        # Copy the item lists, so that ships never share the default lists and change each other's stats
+        self.weapons = list(weapons)
+        self.modules = list(modules)
+        self.turrets = list(turrets)
 
         self.nickname = ""
         self.hasNickname = False
         if nickname != "":
             self.changeNickname(nickname)
 
-        self.upgradesApplied = upgradesApplied
+        self.upgradesApplied = list(upgradesApplied)
 
         self.shopSpawnRate = shopSpawnRate
 
         self.skin = skin
         self.isSkinned = skin != ""
+        self.isPrototype = False
+        self.statsCache = {}
+        self.valueListener = None
+
+
+    def invalidateStats(self):
+        """Forget all cached stats, such that they are recalculated when next requested.
+        Call this whenever the ship's equipped items or applied upgrades change.
+        If the ship has a valueListener, its new value is calculated immediately and the change reported to the listener.
+        """
+        oldValue = self.statsCache.get(("getValue", False))
+        self.statsCache = {}
+        if self.valueListener is not None and oldValue is not None:
+            valueChange = self.getValue() - oldValue
+            if valueChange != 0:
+                self.valueListener(self, valueChange)
+
+
+    def copy(self) -> Ship:
+        """Create a new, independently modifiable ship identical to this one.
+        Equipped items and upgrades are not copied, the new ship refers to the same item objects in new lists.
+
+        :return: A new ship with the same attributes, equipped items and upgrades as this one
+        :rtype: Ship
+        """
+        newShip = copy.copy(self)
+        newShip.aliases = self.aliases.copy()
+        newShip.weapons = self.weapons.copy()
+        newShip.modules = self.modules.copy()
+        newShip.turrets = self.turrets.copy()
+        newShip.upgradesApplied = self.upgradesApplied.copy()
+        newShip.isPrototype = False
+        newShip.statsCache = self.statsCache.copy()
+        newShip.valueListener = None
+        return newShip
+
+
+    def copyIfPrototype(self) -> Ship:
+        """Get a version of this ship which is safe to modify or give to a user.
+
+        :return: A copy of this ship if it is a prototype, otherwise this ship
+        :rtype: Ship
+        """
+        return self.copy() if self.isPrototype else self
 
 
     def getNumWeaponsEquipped(self) -> int:
@@ -232,6 +308,7 @@ class Ship(GameItem):
         if not self.canEquipMoreWeapons():
             raise OverflowError("Attempted to equip a weapon but all weapon slots are full")
         self.weapons.append(weapon)
+        self.invalidateStats()
 
 
     def unequipWeaponObj(self, weapon : PrimaryWeapon):
@@ -240,6 +317,7 @@ class Ship(GameItem):
         :param PrimaryWeapon weapon: The weapon object to unequip
         """
         self.weapons.remove(weapon)
+        self.invalidateStats()
 
 
     def unequipWeaponIndex(self, index : int):
@@ -248,6 +326,7 @@ class Ship(GameItem):
         :param int index: The index of the weapon to unequip from the ship
         """
         self.weapons.pop(index)
+        self.invalidateStats()
 
 
     def getWeaponAtIndex(self, index : int) -> PrimaryWeapon:
@@ -291,6 +370,7 @@ class Ship(GameItem):
             raise ValueError("Attempted to equip a module of a type that is already at its maximum capacity: " + str(module))
 
         self.modules.append(module)
+        self.invalidateStats()
 
 
     def unequipModuleObj(self, module : moduleItem.ModuleItem):
@@ -299,6 +379,7 @@ class Ship(GameItem):
         :param moduleItem module: The module to unequip
         """
         self.modules.remove(module)
+        self.invalidateStats()
 
 
     def unequipModuleIndex(self, index : int):
@@ -307,6 +388,7 @@ class Ship(GameItem):
         :param int index: The index of the module to unequip
         """
         self.modules.pop(index)
+        self.invalidateStats()
 
 
     def getModuleAtIndex(self, index : int) -> moduleItem.ModuleItem:
@@ -328,6 +410,7 @@ class Ship(GameItem):
         if not self.canEquipMoreTurrets():
             raise OverflowError("Attempted to equip a turret but all turret slots are full")
         self.turrets.append(turret)
+        self.invalidateStats()
 
 
     def unequipTurretObj(self, turret : TurretWeapon):
@@ -336,6 +419,7 @@ class Ship(GameItem):
         :param TurretWeapon turret: The turret object to unequip
         """
         self.turrets.remove(turret)
+        self.invalidateStats()
 
 
     def unequipTurretIndex(self, index : int):
@@ -344,6 +428,7 @@ class Ship(GameItem):
         :param int index: The index of the turret to unequip from the ship
         """
         self.turrets.pop(index)
+        self.invalidateStats()
 
 
     def getTurretAtIndex(self, index : int) -> TurretWeapon:
@@ -356,6 +441,7 @@ class Ship(GameItem):
         return self.turrets[index]
 
 
+    @cachedStat
     def getDPS(self, shipUpgradesOnly : bool = False) -> int:
         """Get the total DPS provided by the equipped items and upgrades.
         If shipUpgradesOnly is given as True, then only applied shipUpgrades will be included in the calculation.
@@ -384,6 +470,7 @@ class Ship(GameItem):
         return total * multiplier
 
 
+    @cachedStat
     def getShield(self, shipUpgradesOnly : bool = False) -> int:
         """Get the total Shield provided by the equipped items and upgrades.
         If shipUpgradesOnly is given as True, then only applied shipUpgrades will be included in the calculation.
@@ -408,6 +495,7 @@ class Ship(GameItem):
         return int(total * multiplier)
 
 
+    @cachedStat
     def getArmour(self, shipUpgradesOnly : bool = False) -> int:
         """Get the total Armour provided by the equipped items and upgrades.
         If shipUpgradesOnly is given as True, then only applied shipUpgrades will be included in the calculation.
@@ -432,6 +520,7 @@ class Ship(GameItem):
         return int(total * multiplier)
 
 
+    @cachedStat
     def getCargo(self, shipUpgradesOnly : bool = False) -> int:
         """Get the total Cargo provided by the equipped items and upgrades.
         If shipUpgradesOnly is given as True, then only applied shipUpgrades will be included in the calculation.
@@ -456,6 +545,7 @@ class Ship(GameItem):
         return int(total * multiplier)
 
 
+    @cachedStat
     def getHandling(self, shipUpgradesOnly : bool = False) -> int:
         """Get the total Handling provided by the equipped items and upgrades.
         If shipUpgradesOnly is given as True, then only applied shipUpgrades will be included in the calculation.
@@ -480,6 +570,7 @@ class Ship(GameItem):
         return int(total * multiplier)
 
 
+    @cachedStat
     def getMaxSecondaries(self, shipUpgradesOnly : bool = False) -> int:
         """Get the total maxSecondaries provided by the equipped items and upgrades.
         If shipUpgradesOnly is given as True, then only applied shipUpgrades will be included in the calculation.
@@ -501,6 +592,7 @@ class Ship(GameItem):
         return int(total * multiplier)
 
 
+    @cachedStat
     def getMaxPrimaries(self, shipUpgradesOnly : bool = False) -> int:
         """Get the total MaxPrimaries provided by the equipped items and upgrades.
         If shipUpgradesOnly is given as True, then only applied shipUpgrades will be included in the calculation.
@@ -522,6 +614,7 @@ class Ship(GameItem):
         return int(total * multiplier)
 
 
+    @cachedStat
     def getMaxTurrets(self, shipUpgradesOnly : bool = False) -> int:
         """Get the total MaxTurrets provided by the equipped items and upgrades.
         If shipUpgradesOnly is given as True, then only applied shipUpgrades will be included in the calculation.
@@ -543,6 +636,7 @@ class Ship(GameItem):
         return int(total * multiplier)
 
 
+    @cachedStat
     def getMaxModules(self, shipUpgradesOnly : bool = False) -> int:
         """Get the total MaxModules provided by the equipped items and upgrades.
         If shipUpgradesOnly is given as True, then only applied shipUpgrades will be included in the calculation.
@@ -563,6 +657,7 @@ class Ship(GameItem):
         return int(total * multiplier)
 
 
+    @cachedStat
     def getValue(self, shipUpgradesOnly : bool = False) -> int:
         """Get the total Value provided by the equipped items and upgrades.
         If shipUpgradesOnly is given as True, then only applied shipUpgrades will be included in the calculation.
@@ -596,6 +691,7 @@ class Ship(GameItem):
         :param shipUpgrade upgrade: the upgrade to apply
         """
         self.upgradesApplied.append(upgrade)
+        self.invalidateStats()
 
 
     def changeNickname(self, nickname : str):
@@ -664,6 +760,8 @@ class Ship(GameItem):
         while self.hasTurretsEquipped() and other.canEquipMoreTurrets():
             other.equipTurret(self.turrets.pop(0))
 
+        self.invalidateStats()
+
 
     def getActivesByName(self, item : str) -> Union[PrimaryWeapon, moduleItem.ModuleItem,
                                                     TurretWeapon]:
@@ -691,18 +789,21 @@ class Ship(GameItem):
         """Delete all weapons equipped on the ship, without saving them.
         """
         self.weapons = []
+        self.invalidateStats()
 
 
     def clearModules(self):
         """Delete all modules equipped on the ship, without saving them.
         """
         self.modules = []
+        self.invalidateStats()
 
 
     def clearTurrets(self):
         """Delete all turrets equipped on the ship, without saving them.
         """
         self.turrets = []
+        self.invalidateStats()
 
 
     def applySkin(self, skin : shipSkin.ShipSkin):
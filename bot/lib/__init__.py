@@ -1,2 +1,3 @@
 # Make all lib modules available on package import
-from . import discordUtil, emojis, exceptions, jsonHandler, pathfinding, stringTyping, timeUtil # noqa: F401
+from . import discordUtil, emojis, exceptions, fuzzySearch, galaxyGraph, jsonHandler, pathfinding, randomStreams, \
+    rankedIndex, routeMap, statMatrix, stringTyping, timeUtil, weightedSampler  # noqa: F401
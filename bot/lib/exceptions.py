@@ -54,3 +54,13 @@ class InvalidGameObjectFolder(Exception):
         super().__init__("Invalid game object configuration folder (" + reason + "): " + filePath)
         self.filePath = filePath
         self.reason = reason
+
+
+class UnmanifestableCommandModule(Exception):
+    """Raised when attempting to read a lazy-loading manifest from a commands module whose command registrations
+    cannot be determined without importing the module.
+    """
+    def __init__(self, modName, reason):
+        super().__init__("Cannot build a commands manifest for module '" + modName + "': " + reason)
+        self.modName = modName
+        self.reason = reason
@@ -0,0 +1,135 @@
+from __future__ import annotations
+from typing import Dict, List, Set, Iterable
+from .stringTyping import normalizeName
+
+
+def trigrams(name: str) -> Set[str]:
+    """Get the set of all three-character substrings of a normalized, padded name.
+    Names are padded such that the first and last characters of the name contribute their own trigrams,
+    giving more weight to matching word starts and endings.
+
+    :param str name: The name to split into trigrams
+    :return: A set containing all trigrams of name
+    :rtype: Set[str]
+    """
+    padded = "  " + normalizeName(name) + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(first: Set[str], second: Set[str]) -> float:
+    """Calculate the Sørensen–Dice coefficient of two sets of trigrams.
+
+    :param Set[str] first: The trigrams of the first name
+    :param Set[str] second: The trigrams of the second name
+    :return: A similarity score between 0 (no trigrams in common) and 1 (identical trigrams)
+    :rtype: float
+    """
+    if not first and not second:
+        return 1.0
+    return 2 * len(first & second) / (len(first) + len(second))
+
+
+def rankBySimilarity(query: str, names: Iterable[str], minSimilarity: float, maxResults: int) -> List[str]:
+    """Rank a small collection of names by their similarity to query, without building an index.
+    Useful for collections that change frequently, such as the currently active bounties.
+
+    :param str query: The name to compare against
+    :param Iterable[str] names: The names to rank
+    :param float minSimilarity: The lowest similarity score a name may have to be included in the results
+    :param int maxResults: The maximum number of names to return
+    :return: Up to maxResults names from names, most similar first
+    :rtype: List[str]
+    """
+    queryTrigrams = trigrams(query)
+    scores = {}
+    for name in names:
+        score = similarity(queryTrigrams, trigrams(name))
+        if score >= minSimilarity and score > scores.get(name, 0):
+            scores[name] = score
+    return sorted(scores, key=lambda name: (-scores[name], name))[:maxResults]
+
+
+def didYouMean(suggestions: List[str]) -> str:
+    """Format a list of name suggestions into a sentence to append to a not-found message.
+
+    :param List[str] suggestions: The suggested names
+    :return: An empty string if suggestions is empty, otherwise a new line asking whether the user meant any of suggestions
+    :rtype: str
+    """
+    if not suggestions:
+        return ""
+    return "\nDid you mean " + " or ".join("**" + name + "**" for name in suggestions) + "?"
+
+
+class TrigramIndex:
+    """An inverted index from trigrams to the names containing them, for finding the names most similar to a misspelling.
+    Each indexed name or alias refers to a display name, which is returned in suggestions. Multiple aliases may share
+    the same display name, in which case the display name is suggested at most once.
+
+    :var postings: Dictionary mapping trigrams to the set of normalized names containing that trigram
+    :vartype postings: Dict[str, Set[str]]
+    :var nameTrigrams: Dictionary mapping each normalized name to its set of trigrams
+    :vartype nameTrigrams: Dict[str, Set[str]]
+    :var displayNames: Dictionary mapping each normalized name to the display name it refers to
+    :vartype displayNames: Dict[str, str]
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.nameTrigrams = {}
+        self.displayNames = {}
+
+
+    def add(self, name: str, displayName: str):
+        """Index a name or alias.
+
+        :param str name: The name or alias to index
+        :param str displayName: The name to suggest when name is a close match
+        """
+        name = normalizeName(name)
+        self.displayNames[name] = displayName
+        if name in self.nameTrigrams:
+            return
+        self.nameTrigrams[name] = trigrams(name)
+        for trigram in self.nameTrigrams[name]:
+            if trigram not in self.postings:
+                self.postings[trigram] = set()
+            self.postings[trigram].add(name)
+
+
+    def suggest(self, query: str, minSimilarity: float, maxResults: int) -> List[str]:
+        """Find the display names whose names or aliases are most similar to query.
+        Only names sharing at least one trigram with query are scored.
+
+        :param str query: The misspelled name to find suggestions for
+        :param float minSimilarity: The lowest similarity score a name may have to be suggested
+        :param int maxResults: The maximum number of display names to return
+        :return: Up to maxResults display names, most similar first
+        :rtype: List[str]
+        """
+        queryTrigrams = trigrams(query)
+        candidates = set()
+        for trigram in queryTrigrams:
+            candidates |= self.postings.get(trigram, set())
+
+        scores: Dict[str, float] = {}
+        for name in candidates:
+            score = similarity(queryTrigrams, self.nameTrigrams[name])
+            displayName = self.displayNames[name]
+            if score >= minSimilarity and score > scores.get(displayName, 0):
+                scores[displayName] = score
+        return sorted(scores, key=lambda displayName: (-scores[displayName], displayName))[:maxResults]
+
+
+    @classmethod
+    def fromNames(cls, names: Dict[str, str]) -> TrigramIndex:
+        """Build a TrigramIndex from a dictionary of names and aliases to display names.
+
+        :param Dict[str, str] names: Dictionary mapping names and aliases to the display names they refer to
+        :return: A new TrigramIndex containing all of names
+        :rtype: TrigramIndex
+        """
+        newIndex = cls()
+        for name, displayName in names.items():
+            newIndex.add(name, displayName)
+        return newIndex
@@ -0,0 +1,176 @@
+from __future__ import annotations
+from ..gameObjects.bounties import solarSystem
+from array import array
+from typing import Dict, List, Iterable
+import hashlib
+import math
+import random
+
+
+class GalaxyGraph:
+    """A compact, read-only representation of the jump gate network between a set of solarSystems.
+    Each system is given an integer ID, its index in names. Neighbours are stored in compressed sparse row form:
+    the IDs of system i's neighbours are adjTargets[adjStart[i]:adjStart[i + 1]].
+    Per-system attributes are stored in flat arrays indexed by system ID.
+
+    :var names: The name of each system, indexed by system ID
+    :vartype names: List[str]
+    :var ids: Dictionary mapping system names to system IDs
+    :vartype ids: Dict[str, int]
+    :var systems: The solarSystem object for each system, indexed by system ID
+    :vartype systems: List[solarSystem.SolarSystem]
+    :var adjStart: The index in adjTargets of the first neighbour of each system, followed by len(adjTargets)
+    :vartype adjStart: array
+    :var adjTargets: The IDs of every system's neighbours, grouped by system
+    :vartype adjTargets: array
+    :var xCoords: The first coordinate of each system
+    :vartype xCoords: array
+    :var yCoords: The second coordinate of each system
+    :vartype yCoords: array
+    :var security: The bbData.securityLevels index of each system
+    :vartype security: array
+    :var jumpGateIDs: The IDs of all systems with at least one neighbour
+    :vartype jumpGateIDs: List[int]
+    :var longestJump: The greatest straight-line distance covered by any single jump
+    :vartype longestJump: float
+    """
+
+    def __init__(self, systems : List[solarSystem.SolarSystem], adjStart : array, adjTargets : array):
+        """
+        :param List[solarSystem.SolarSystem] systems: The system for each system ID
+        :param array adjStart: The index in adjTargets of the first neighbour of each system, followed by len(adjTargets)
+        :param array adjTargets: The IDs of every system's neighbours, grouped by system
+        """
+        self.systems = systems
+        self.names = [syst.name for syst in systems]
+        self.ids = {name: systemID for systemID, name in enumerate(self.names)}
+        self.adjStart = adjStart
+        self.adjTargets = adjTargets
+        self.xCoords = array("d", (syst.coordinates[0] for syst in systems))
+        self.yCoords = array("d", (syst.coordinates[1] for syst in systems))
+        self.security = array("i", (syst.security for syst in systems))
+        self.jumpGateIDs = [systemID for systemID in range(len(systems)) if adjStart[systemID + 1] > adjStart[systemID]]
+        self.longestJump = max((self.distance(systemID, neighbourID) for systemID in range(len(systems))
+                                for neighbourID in self.neighbourIDs(systemID)), default=0)
+
+
+    def __len__(self) -> int:
+        """Get the number of systems in the graph.
+
+        :return: The number of systems in the graph
+        :rtype: int
+        """
+        return len(self.names)
+
+
+    def neighbourIDs(self, systemID : int) -> array:
+        """Get the IDs of the systems reachable by a single jump from the given system.
+
+        :param int systemID: The ID of the system whose neighbours to get
+        :return: The IDs of systemID's neighbours
+        :rtype: array
+        """
+        return self.adjTargets[self.adjStart[systemID]:self.adjStart[systemID + 1]]
+
+
+    def hasJumpGate(self, systemID : int) -> bool:
+        """Decide whether or not the given system has any neighbours.
+
+        :param int systemID: The ID of the system to check
+        :return: True if systemID has at least one neighbour, False otherwise
+        :rtype: bool
+        """
+        return self.adjStart[systemID + 1] > self.adjStart[systemID]
+
+
+    def distance(self, firstID : int, secondID : int) -> float:
+        """Calculate the straight-line distance between two systems.
+
+        :param int firstID: The ID of the first system
+        :param int secondID: The ID of the second system
+        :return: The straight-line distance between the two systems' coordinates
+        :rtype: float
+        """
+        return math.hypot(self.xCoords[secondID] - self.xCoords[firstID], self.yCoords[secondID] - self.yCoords[firstID])
+
+
+    def routeDistance(self, routeIDs : Iterable[int]) -> float:
+        """Calculate the total straight-line distance travelled along a route.
+
+        :param Iterable[int] routeIDs: The IDs of the systems along the route, in order
+        :return: The sum of the distances between each consecutive pair of systems in the route
+        :rtype: float
+        """
+        routeIDs = list(routeIDs)
+        return sum(self.distance(routeIDs[i], routeIDs[i + 1]) for i in range(len(routeIDs) - 1))
+
+
+    def randomJumpGateSystem(self, exclude : str = "", rng : random.Random = random) -> str:
+        """Pick a system with a jump gate, uniformly at random.
+
+        :param str exclude: The name of a system which must not be picked (Default "")
+        :param random.Random rng: The random number generator to draw from (Default the random module)
+        :return: The name of a random system with a jump gate, which is not exclude
+        :rtype: str
+        :raise ValueError: If there is no system with a jump gate, other than exclude
+        """
+        excludeID = self.ids.get(exclude, -1)
+        if len(self.jumpGateIDs) - (excludeID in self.jumpGateIDs) < 1:
+            raise ValueError("No systems with jump gates available")
+        systemID = rng.choice(self.jumpGateIDs)
+        while systemID == excludeID:
+            systemID = rng.choice(self.jumpGateIDs)
+        return self.names[systemID]
+
+
+    def routeToNames(self, routeIDs : Iterable[int]) -> List[str]:
+        """Convert a list of system IDs to a list of system names.
+
+        :param Iterable[int] routeIDs: The IDs of the systems to convert
+        :return: The names of the systems, in the same order as routeIDs
+        :rtype: List[str]
+        """
+        return [self.names[systemID] for systemID in routeIDs]
+
+
+    def routeToSystems(self, routeIDs : Iterable[int]) -> List[solarSystem.SolarSystem]:
+        """Convert a list of system IDs to a list of solarSystem objects.
+
+        :param Iterable[int] routeIDs: The IDs of the systems to convert
+        :return: The solarSystem objects for the systems, in the same order as routeIDs
+        :rtype: List[solarSystem.SolarSystem]
+        """
+        return [self.systems[systemID] for systemID in routeIDs]
+
+
+    def layoutHash(self) -> str:
+        """Hash the names and connections of all systems in the graph, such that data derived from the graph's layout
+        can be recognised as out of date when the layout changes.
+
+        :return: A hex digest uniquely identifying the layout of this graph
+        :rtype: str
+        """
+        layoutHash = hashlib.sha256("\n".join(self.names).encode())
+        layoutHash.update(self.adjStart.tobytes())
+        layoutHash.update(self.adjTargets.tobytes())
+        return layoutHash.hexdigest()
+
+
+    @classmethod
+    def fromSystems(cls, graph : Dict[str, solarSystem.SolarSystem]) -> GalaxyGraph:
+        """Compile a GalaxyGraph from a dictionary of solarSystems.
+        Systems are numbered in name order, so that the same systems always compile to the same graph.
+        Neighbour names which do not appear in graph are ignored.
+
+        :param dict[str, solarSystem] graph: A dictionary mapping system names to solarSystem objects
+        :return: A new GalaxyGraph of the systems in graph
+        :rtype: GalaxyGraph
+        """
+        systems = [graph[name] for name in sorted(graph)]
+        ids = {syst.name: systemID for systemID, syst in enumerate(systems)}
+        adjStart = array("i", [0])
+        adjTargets = array("i")
+        for syst in systems:
+            adjTargets.extend(sorted({ids[neighbour] for neighbour in syst.neighbours if neighbour in ids}))
+            adjStart.append(len(adjTargets))
+        return GalaxyGraph(systems, adjStart, adjTargets)
@@ -1,8 +1,17 @@
 from ..cfg import cfg
+from .weightedSampler import WeightedSampler, AliasSampler
 import math
 import random
 from typing import List, Union
 
+# NumPy is optional, and used to draw random values for many shops at once
+try:
+    import numpy as np
+    numpyRNG = np.random.default_rng()
+except ImportError:
+    np = None
+    numpyRNG = None
+
 
 def makeMatrix(xDim : int, yDim : int) -> List[List[int]]:
     """Create an (xDim, yDim) matrix of zeros.
@@ -15,22 +24,6 @@ def makeMatrix(xDim : int, yDim : int) -> List[List[int]]:
     return [[0] * xDim for _ in range(yDim)]
 
 
-# cfg.itemSpawnRateResDP in terms of decimal digits, used 
-itemSpawnRateResDigits = math.pow(10, cfg.itemSpawnRateResDP)
-
-# Valid ranges of item tech levels
-numTechLevels = cfg.maxTechLevel - cfg.minTechLevel + 1
-techLevelRange = range(cfg.minTechLevel, cfg.maxTechLevel + 1)
-
-# The probability of a shop spawning with a given tech level. Tech level = index + 1
-cumulativeShopTLChance = [0] * numTechLevels
-
-# CUMULATIVE probabilities of items of a given tech level spawning in a shop of a given tech level
-# Outer dimension is shop tech level
-# Inner dimension is item tech level
-itemTLSpawnChanceForShopTL = makeMatrix(numTechLevels, numTechLevels)
-cumulativeItemTLSpawnChanceForShopTL = makeMatrix(numTechLevels, numTechLevels)
-
 # Parameters for itemTLSpawnChanceForShopTL values, using quadratic function: https://www.desmos.com/calculator/n2xfxf8taj
 # Original u function by Novahkiin22: https://www.desmos.com/calculator/tnldodey5u
 # Original function by Novahkiin22: https://www.desmos.com/calculator/nrshikfmxc
@@ -45,7 +38,8 @@ def truncItemSpawnResolution(num : float) -> float:
     :return: num, truncated to cfg.itemSpawnRateResDP decimal places
     :rtype: float
     """
-    return math.trunc(num * itemSpawnRateResDigits) / itemSpawnRateResDigits
+    resolutionDigits = math.pow(10, cfg.itemSpawnRateResDP)
+    return math.trunc(num * resolutionDigits) / resolutionDigits
 
 
 def normalizeArray(nums: List[Union[int, float]]) -> List[Union[int, float]]:
@@ -75,17 +69,48 @@ def makeCumulative(nums : List[Union[int, float]]) -> List[Union[int, float]]:
     return nums
 
 
-def pickRandomShopTL() -> int:
+def tlWeightsFromCumulative(cumulativeChances : List[float]) -> List[int]:
+    """Find the weight with which each tech level is picked from a table of cumulative chances.
+    A random chance is drawn from cfg.itemSpawnRateResDP decimal places in (0, 1], and the first tech level whose
+    cumulative chance is at least the drawn chance is picked - or the last tech level if there is no such tech level.
+    The weights count the possible drawn chances resulting in each tech level, so they reproduce the table exactly.
+
+    :param List[float] cumulativeChances: The cumulative chance for each tech level
+    :return: The number of possible drawn chances which result in each tech level
+    :rtype: List[int]
+    """
+    resolutionDigits = int(math.pow(10, cfg.itemSpawnRateResDP))
+
+    def numChancesAtMost(chance : float) -> int:
+        # Count the drawn chances n / resolutionDigits <= chance, correcting for float rounding in the estimate
+        count = min(max(int(chance * resolutionDigits), 0), resolutionDigits)
+        while count < resolutionDigits and (count + 1) / resolutionDigits <= chance:
+            count += 1
+        while count > 0 and count / resolutionDigits > chance:
+            count -= 1
+        return count
+
+    # The table need not be increasing. The first tech level reaching a chance is the first whose running maximum does
+    weights = []
+    prevCount = 0
+    runningMax = -math.inf
+    for chance in cumulativeChances:
+        runningMax = max(runningMax, chance)
+        count = numChancesAtMost(runningMax)
+        weights.append(count - prevCount)
+        prevCount = count
+    weights[-1] += resolutionDigits - prevCount
+    return weights
+
+
+def pickRandomShopTL(rng : random.Random = random) -> int:
     """Pick a random shop techlevel, with probabilities calculated previously in gameMaths.
 
+    :param random.Random rng: The random number generator to draw from (Default the random module)
     :return: An integer between 1 and 10 representing a shop tech level
     :rtype: int
     """
-    tlChance = random.randint(1, itemSpawnRateResDigits) / itemSpawnRateResDigits
-    try:
-        return next(i + 1 for i, v in enumerate(cumulativeShopTLChance) if v >= tlChance)
-    except StopIteration:
-        return cfg.maxTechLevel
+    return getTechLevelTables().shopTLSampler.sample(rng)
 
 
 def tl_u(x : int, t : int) -> float:
@@ -99,18 +124,112 @@ def tl_u(x : int, t : int) -> float:
     return max(0, truncItemSpawnResolution(1 - math.pow((x - t) / 1.4, 2)))
 
 
-def pickRandomItemTL(shopTL : int) -> int:
+def pickRandomItemTL(shopTL : int, rng : random.Random = random) -> int:
     """Pick a random item techlevel, with probabilities calculated previously in gameMaths.
 
     :param int shopTL: int representing the tech level of the shop owning the item
+    :param random.Random rng: The random number generator to draw from (Default the random module)
     :return: An integer between 1 and 10 representing a item tech level
     :rtype: int
     """
-    tlChance = random.randint(1, itemSpawnRateResDigits) / itemSpawnRateResDigits
-    try:
-        return next(i + 1 for i, v in enumerate(cumulativeItemTLSpawnChanceForShopTL[shopTL - 1]) if v >= tlChance)
-    except StopIteration:
-        return cfg.maxTechLevel
+    tables = getTechLevelTables()
+    return tables.itemTLSamplers[shopTL - tables.minTechLevel].sample(rng)
+
+
+def pickAliasedIndices(acceptChances : List[float], aliases : List[int], uniforms : List[float] = None) -> List[int]:
+    """Sample one index from each row of a stack of AliasSampler tables at once, using NumPy.
+    Each sample uses a single uniform value: its integer part, once scaled by the number of columns, picks the column,
+    and its fractional part picks between the column's value and its alias.
+
+    :param List[float] acceptChances: A NumPy array of shape (n, number of tech levels),
+                                        with one row of AliasSampler.acceptChances per pick
+    :param List[int] aliases: A NumPy array of shape (n, number of tech levels),
+                                with one row of AliasSampler.aliases per pick
+    :param List[float] uniforms: n uniform random values in [0, 1) to sample with. Give None to draw new values.
+                                    (Default None)
+    :return: A NumPy array of shape (n,), containing the index picked from each row
+    :rtype: List[int]
+    """
+    numPicks, numColumns = acceptChances.shape
+    scaled = (numpyRNG.random(numPicks) if uniforms is None else np.asarray(uniforms, dtype=float)) * numColumns
+    columns = scaled.astype(int)
+    rows = np.arange(numPicks)
+    return np.where(scaled - columns < acceptChances[rows, columns], columns, aliases[rows, columns])
+
+
+def _pickAliasedIndex(sampler : AliasSampler, uniform : float) -> int:
+    """Sample one index from an AliasSampler's tables with a single uniform value, exactly as pickAliasedIndices does.
+
+    :param AliasSampler sampler: The sampler whose tables to sample from
+    :param float uniform: A uniform random value in [0, 1)
+    :return: The index in sampler.values of the picked value
+    :rtype: int
+    """
+    scaled = uniform * len(sampler.acceptChances)
+    column = int(scaled)
+    return column if scaled - column < sampler.acceptChances[column] else sampler.aliases[column]
+
+
+def pickRandomShopTLs(numShops : int, uniforms : List[float] = None) -> List[int]:
+    """Pick many random shop techlevels at once, with the same probabilities as pickRandomShopTL.
+    Uses NumPy if it is installed.
+
+    :param int numShops: The number of tech levels to pick
+    :param List[float] uniforms: numShops uniform random values in [0, 1) to pick with, e.g from
+                                    randomStreams.counterUniforms. Give None to draw new values. (Default None)
+    :return: A list of numShops integers between 1 and 10 representing shop tech levels
+    :rtype: List[int]
+    """
+    tables = getTechLevelTables()
+    if np is None:
+        if uniforms is None:
+            return tables.shopTLSampler.sampleMany(numShops)
+        return [_pickAliasedIndex(tables.shopTLSampler, uniform) + tables.minTechLevel for uniform in uniforms]
+    shape = (numShops, tables.numTechLevels)
+    return (pickAliasedIndices(np.broadcast_to(tables.shopTLAcceptChances, shape),
+                                np.broadcast_to(tables.shopTLAliases, shape), uniforms)
+            + tables.minTechLevel).tolist()
+
+
+def pickRandomItemTLs(shopTLs : List[int], uniforms : List[float] = None) -> List[int]:
+    """Pick a random item techlevel for each of the given shop techlevels at once,
+    with the same probabilities as pickRandomItemTL. Uses NumPy if it is installed.
+
+    :param List[int] shopTLs: The tech levels of the shops owning each item
+    :param List[float] uniforms: A uniform random value in [0, 1) to pick each item tech level with, e.g from
+                                    randomStreams.counterUniforms. Give None to draw new values. (Default None)
+    :return: A list of integers between 1 and 10 representing item tech levels, one for each of shopTLs
+    :rtype: List[int]
+    """
+    tables = getTechLevelTables()
+    if np is None:
+        if uniforms is None:
+            return [pickRandomItemTL(shopTL) for shopTL in shopTLs]
+        return [_pickAliasedIndex(tables.itemTLSamplers[shopTL - tables.minTechLevel], uniform) + tables.minTechLevel
+                for shopTL, uniform in zip(shopTLs, uniforms)]
+    shopTLIndices = np.asarray(shopTLs, dtype=int) - tables.minTechLevel
+    return (pickAliasedIndices(tables.itemTLAcceptChances[shopTLIndices], tables.itemTLAliases[shopTLIndices], uniforms)
+            + tables.minTechLevel).tolist()
+
+
+def pickRandomIndices(lengths : List[int], uniforms : List[float] = None) -> List[int]:
+    """Pick a uniformly random index into each of a number of sequences of the given lengths at once.
+    Uses NumPy if it is installed.
+
+    :param List[int] lengths: The length of each sequence to pick an index for
+    :param List[float] uniforms: A uniform random value in [0, 1) to pick each index with, e.g from
+                                    randomStreams.counterUniforms. Give None to draw new values. (Default None)
+    :return: A random index for each of lengths, or -1 for sequences of length 0
+    :rtype: List[int]
+    """
+    if np is None:
+        if uniforms is None:
+            return [random.randrange(length) if length else -1 for length in lengths]
+        return [int(uniform * length) if length else -1 for length, uniform in zip(lengths, uniforms)]
+    lengths = np.asarray(lengths, dtype=int)
+    indices = ((numpyRNG.random(len(lengths)) if uniforms is None else np.asarray(uniforms, dtype=float))
+                * lengths).astype(int)
+    return np.where(lengths > 0, indices, -1).tolist()
 
 
 def shipSkinValueForTL(averageTL : int) -> int:
@@ -123,30 +242,126 @@ def shipSkinValueForTL(averageTL : int) -> int:
     return averageTL * 10000
 
 
-# Calculate spawn chance for each shop TL
-for shopTL in techLevelRange:
-    cumulativeShopTLChance[shopTL - 1] = truncItemSpawnResolution(1 - math.exp((shopTL - 10.5) / 5))
-
-cumulativeShopTLChance = normalizeArray(cumulativeShopTLChance)
-# Sum probabilities to give cumulative scale
-cumulativeShopTLChance = makeCumulative(cumulativeShopTLChance)
+class TechLevelTables:
+    """The probability tables used for picking random shop and item tech levels, calculated for one configuration
+    of cfg.minTechLevel, cfg.maxTechLevel and cfg.itemSpawnRateResDP.
+    Use getTechLevelTables to get the tables for the current configuration, rather than creating new ones.
+
+    :var minTechLevel: The lowest tech level in the tables
+    :vartype minTechLevel: int
+    :var maxTechLevel: The highest tech level in the tables
+    :vartype maxTechLevel: int
+    :var resolutionDP: The number of decimal places probabilities are truncated to
+    :vartype resolutionDP: int
+    :var numTechLevels: The number of tech levels in the tables
+    :vartype numTechLevels: int
+    :var techLevelRange: All tech levels in the tables, in increasing order
+    :vartype techLevelRange: range
+    :var cumulativeShopTLChance: CUMULATIVE probabilities of a shop spawning with a given tech level.
+                                    Tech level = index + minTechLevel
+    :vartype cumulativeShopTLChance: List[float]
+    :var itemTLSpawnChanceForShopTL: Probabilities of items of a given tech level spawning in a shop of a given tech level.
+                                        Outer dimension is shop tech level, inner dimension is item tech level
+    :vartype itemTLSpawnChanceForShopTL: List[List[float]]
+    :var cumulativeItemTLSpawnChanceForShopTL: CUMULATIVE itemTLSpawnChanceForShopTL
+    :vartype cumulativeItemTLSpawnChanceForShopTL: List[List[float]]
+    :var shopTLSampler: Sampler picking shop tech levels according to cumulativeShopTLChance
+    :vartype shopTLSampler: WeightedSampler
+    :var itemTLSamplers: Samplers picking item tech levels according to cumulativeItemTLSpawnChanceForShopTL,
+                            indexed by shop tech level - minTechLevel
+    :vartype itemTLSamplers: List[WeightedSampler]
+    """
 
-# Loop through shop TLs
-for shopTL in techLevelRange:
-    # Calculate spawn chance for each item TL in this shop TL
-    tlSpawnRates = normalizeArray([tl_u(itemTL, shopTL) for itemTL in techLevelRange])
+    def __init__(self, minTechLevel : int, maxTechLevel : int, resolutionDP : int):
+        """
+        :param int minTechLevel: The lowest tech level in the tables
+        :param int maxTechLevel: The highest tech level in the tables
+        :param int resolutionDP: The number of decimal places probabilities are truncated to.
+                                    Must match cfg.itemSpawnRateResDP, which is used by the table building functions.
+        """
+        self.minTechLevel = minTechLevel
+        self.maxTechLevel = maxTechLevel
+        self.resolutionDP = resolutionDP
+        self.numTechLevels = maxTechLevel - minTechLevel + 1
+        self.techLevelRange = range(minTechLevel, maxTechLevel + 1)
+
+        # Calculate spawn chance for each shop TL
+        shopTLChance = [truncItemSpawnResolution(1 - math.exp((shopTL - 10.5) / 5)) for shopTL in self.techLevelRange]
+        # Sum probabilities to give cumulative scale
+        self.cumulativeShopTLChance = makeCumulative(normalizeArray(shopTLChance))
+
+        # Calculate spawn chance for each item TL in each shop TL
+        self.itemTLSpawnChanceForShopTL = [normalizeArray([tl_u(itemTL, shopTL) for itemTL in self.techLevelRange])
+                                            for shopTL in self.techLevelRange]
+        # Sum probabilities to give cumulative scale
+        self.cumulativeItemTLSpawnChanceForShopTL = [makeCumulative(tlSpawnRates)
+                                                        for tlSpawnRates in self.itemTLSpawnChanceForShopTL]
+
+        # Build samplers for picking shop and item tech levels according to the above tables
+        self.shopTLSampler: WeightedSampler = AliasSampler(list(self.techLevelRange),
+                                                            tlWeightsFromCumulative(self.cumulativeShopTLChance))
+        self.itemTLSamplers: List[WeightedSampler] = [AliasSampler(list(self.techLevelRange),
+                                                                    tlWeightsFromCumulative(tlChances))
+                                                        for tlChances in self.cumulativeItemTLSpawnChanceForShopTL]
+
+        # The samplers' tables as NumPy arrays, for picking many tech levels at once
+        if np is not None:
+            self.shopTLAcceptChances = np.asarray(self.shopTLSampler.acceptChances)
+            self.shopTLAliases = np.asarray(self.shopTLSampler.aliases)
+            self.itemTLAcceptChances = np.asarray([sampler.acceptChances for sampler in self.itemTLSamplers])
+            self.itemTLAliases = np.asarray([sampler.aliases for sampler in self.itemTLSamplers])
+
+
+    def matchesConfig(self) -> bool:
+        """Decide whether these tables were calculated for the current cfg values.
+
+        :return: True if the tables' tech level range and resolution match those in cfg, False otherwise
+        :rtype: bool
+        """
+        return (self.minTechLevel, self.maxTechLevel, self.resolutionDP) \
+                == (cfg.minTechLevel, cfg.maxTechLevel, cfg.itemSpawnRateResDP)
+
+
+    def describe(self) -> str:
+        """Summarise the tables as percentage chances, one line per shop tech level.
+
+        :return: The chance of each shop tech level being picked, followed by the chance of each item tech level
+                    being picked in each shop tech level
+        :rtype: str
+        """
+        shopTLChances = self.shopTLSampler.probabilities()
+        lines = ["shop TL: " + " ".join(str(shopTL) + "=" + str(truncItemSpawnResolution(chance * 100)) + "%"
+                                        for shopTL, chance in zip(self.techLevelRange, shopTLChances) if chance != 0)]
+        for shopTL, itemTLChances in zip(self.techLevelRange, self.itemTLSpawnChanceForShopTL):
+            lines.append("\t• shop TL" + str(shopTL) + ": itemTL "
+                            + " ".join(str(itemTL) + "=" + str(truncItemSpawnResolution(chance * 100)) + "%"
+                                        for itemTL, chance in zip(self.techLevelRange, itemTLChances) if chance != 0))
+        return "\n".join(lines)
+
+
+# The tables for the current cfg values. Calculated on first use, see getTechLevelTables
+_techLevelTables: TechLevelTables = None
+
+
+def getTechLevelTables() -> TechLevelTables:
+    """Get the tech level probability tables for the current cfg values.
+    The tables are calculated on first use, and recalculated whenever the relevant cfg values have changed.
+
+    :return: The tech level probability tables for the current cfg values
+    :rtype: TechLevelTables
+    """
+    global _techLevelTables
+    if _techLevelTables is None or not _techLevelTables.matchesConfig():
+        _techLevelTables = TechLevelTables(cfg.minTechLevel, cfg.maxTechLevel, cfg.itemSpawnRateResDP)
+    return _techLevelTables
 
-    # Save non-cumulative probabilities
-    itemTLSpawnChanceForShopTL[shopTL - 1] = [i for i in tlSpawnRates]
 
-    # Sum probabilities to give cumulative scale
-    cumulativeItemTLSpawnChanceForShopTL[shopTL - 1] = makeCumulative(tlSpawnRates)
+def resetTechLevelTables() -> TechLevelTables:
+    """Recalculate the tech level probability tables immediately, e.g after changing the functions used to build them.
 
-for shopTL in range(len(itemTLSpawnChanceForShopTL)):
-    print("\t• shop TL" + str(shopTL + 1) + ": itemTL", end="")
-    for itemTL in range(len((itemTLSpawnChanceForShopTL[shopTL]))):
-        if itemTLSpawnChanceForShopTL[shopTL][itemTL] != 0:
-            print(" " + str(itemTL + 1) + "=" \
-                        + str(truncItemSpawnResolution(itemTLSpawnChanceForShopTL[shopTL][itemTL] * 100)),
-                    end="% ")
-    print()
+    :return: The newly calculated tables
+    :rtype: TechLevelTables
+    """
+    global _techLevelTables
+    _techLevelTables = None
+    return getTechLevelTables()
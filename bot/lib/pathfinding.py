@@ -2,42 +2,17 @@
 # TODO: Add failed route lookups to logger
 from __future__ import annotations
 from ..gameObjects.bounties import solarSystem
+from ..baseClasses import serializable
 import math
+import os
+import heapq
+from array import array
+from collections import deque
 from ..cfg import bbData
+from . import jsonHandler, galaxyGraph
 from typing import Dict, List
 
 
-class AStarNode(solarSystem.SolarSystem):
-    """A node for use in a* pathfinding.
-    TODO: Does this really need to extend solarSystem?
-
-    :var syst: this node's associated solarSystem object.
-    :vartype syst: solarSystem
-    :var parent: The previous AStarNode in the generated path
-    :vartype parent: AStarNode
-    :var g: The total distance travelled to get to this node
-    :vartype g: float
-    :var h: The estimated distance from this node to the nearest goal
-    :vartype h: float
-    :var f: The node's estimated "value" when picking the next node in the route, equal to g + h
-    :vartype f: float
-    """
-
-    def __init__(self, syst : solarSystem.SolarSystem, parent : AStarNode, g : float = 0, h : float = 0):
-        """
-        :param solarSystem syst: this node's associated solarSystem object.
-        :param AStarNode parent: The previous AStarNode in the generated path
-        :param float g: The total distance travelled to get to this node (Default 0)
-        :param float h: The estimated distance from this node to the nearest goal (Default 0)
-        :param float f: The node's estimated "value" when picking the next node in the route, equal to g + h (Default g + h)
-        """
-        self.syst = syst
-        self.parent = parent
-        self.g = g
-        self.h = h
-        self.f = g + h
-
-
 def heuristic(start : solarSystem.SolarSystem, end : solarSystem.SolarSystem) -> float:
     """Estimate the distance between two solarSystems, using straight line (pythagorean) distance.
 
@@ -49,69 +24,220 @@ def heuristic(start : solarSystem.SolarSystem, end : solarSystem.SolarSystem) ->
                     + (end.coordinates[0] - start.coordinates[0]) ** 2)
 
 
-def bbAStar(start : solarSystem.SolarSystem, end : solarSystem.SolarSystem,
-        graph : Dict[str, solarSystem.SolarSystem]) -> List[str]:
+def longestJump(graph : Dict[str, solarSystem.SolarSystem]) -> float:
+    """Find the greatest straight-line distance covered by any single jump in a graph.
+    Since every jump costs the same, dividing the straight-line distance between two systems by this gives
+    a lower bound on the number of jumps needed to travel between them.
+
+    :param dict[str, solarSystem] graph: A dictionary mapping system names to solarSystem objects
+    :return: The straight-line length of the longest jump in graph, or 0 if graph has no jumps
+    :rtype: float
+    """
+    return max((heuristic(syst, graph[neighbour]) for syst in graph.values()
+                for neighbour in syst.neighbours if neighbour in graph), default=0)
+
+
+def bbAStar(start : str, end : str, graph : Dict[str, solarSystem.SolarSystem],
+        maxJumpDistance : float = None) -> List[str]:
     """Find the shortest path from the given start solarSystem to the end solarSystem, using the given graph for edges.
     If no route can be found, the string "! " + start + " -> " + end is returned.
-    If the max route length (50) is reached, "#" is returned.
 
-    :param solarSystem start: The starting system for route generation
-    :param solarSystem end: The goal system where route generation terminates
+    Every jump has a cost of 1. The estimated number of jumps remaining from a system is its straight-line distance
+    to end divided by maxJumpDistance, which never overestimates, so the route found is always a shortest route.
+
+    :param str start: The name of the starting system for route generation
+    :param str end: The name of the goal system where route generation terminates
     :param dict[str, solarSystem] graph: A dictionary mapping system names to solarSystem objects
+    :param float maxJumpDistance: The longestJump of graph. Give None to calculate it. (Default None)
     :return: A list containing string system names representing the shortest route from start (the first element) to end
             (the last element)
     :rtype: list
     """
-
     if start == end:
         return [start]
-    open = [AStarNode(graph[start], None, h=heuristic(graph[start], graph[end]))]
-    closed = []
-    count = 0
-
-    while open:
-        q = open.pop(0)
-
-        count += 1
-        if count == 50:
-            return "#"
-        for succName in q.syst.getNeighbours():
-            if succName == end:
-                closed.append(AStarNode(graph[succName], q))
-                route = []
-                node = closed[-1]
-                while node:
-                    route.append(node.syst.name)
-                    node = node.parent
-                return route[::-1]
-
-            succ = AStarNode(graph[succName], q)
-            succ.g = q.g + 1
-            succ.h = heuristic(succ.syst, graph[end])
-            succ.f = succ.g + succ.h
-
-            betterFound = False
-            for existingNode in open + closed:
-                if existingNode.syst.coordinates == succ.syst.coordinates and existingNode.f <= succ.f:
-                    betterFound = True
-            if betterFound:
+    if maxJumpDistance is None:
+        maxJumpDistance = longestJump(graph)
+    endSyst = graph[end]
+
+    def estimate(systName : str) -> float:
+        return heuristic(graph[systName], endSyst) / maxJumpDistance if maxJumpDistance else 0
+
+    # Heap of (estimated total jumps, jumps so far, tie breaker, system name)
+    # The tie breaker ensures that system names are never compared, keeping pops in insertion order
+    openHeap = [(estimate(start), 0, 0, start)]
+    pushCount = 1
+    bestJumps = {start: 0}
+    parents = {start: None}
+    closed = set()
+
+    while openHeap:
+        _, jumps, _, current = heapq.heappop(openHeap)
+        if current in closed:
+            continue
+        if current == end:
+            route = []
+            while current is not None:
+                route.append(current)
+                current = parents[current]
+            return route[::-1]
+        closed.add(current)
+
+        for succName in graph[current].neighbours:
+            if succName not in graph or succName in closed:
                 continue
+            succJumps = jumps + 1
+            if succJumps < bestJumps.get(succName, math.inf):
+                bestJumps[succName] = succJumps
+                parents[succName] = current
+                heapq.heappush(openHeap, (succJumps + estimate(succName), succJumps, pushCount, succName))
+                pushCount += 1
 
-            insertPos = len(open)
-            for i in range(len(open)):
-                if open[i].f > succ.f:
-                    if i != 0:
-                        insertPos = i - 1
-                    break
-            open.insert(insertPos, succ)
+    return "! " + start + " -> " + end
 
-        closed.append(q)
 
-    return "! " + start + " -> " + end
+class RouteTable(serializable.Serializable):
+    """A precomputed table of the shortest routes between every pair of systems in a GalaxyGraph.
+    Rather than storing every route, the table stores the ID of the first system to jump to from each system towards
+    each other system. Routes are reconstructed by following these next hops, in time linear to the route length.
+
+    :var graphHash: The GalaxyGraph.layoutHash of the graph that this table was built for
+    :vartype graphHash: str
+    :var names: The name of each system, indexed by system ID
+    :vartype names: List[str]
+    :var ids: Dictionary mapping system names to system IDs
+    :vartype ids: Dict[str, int]
+    :var nextHops: For each start system ID, an array giving the ID of the neighbouring system on the shortest route
+                    towards each end system ID, or -1 where the end system is unreachable
+    :vartype nextHops: List[array]
+    """
+
+    def __init__(self, graphHash : str, names : List[str], nextHops : List[array]):
+        """
+        :param str graphHash: The GalaxyGraph.layoutHash of the graph that this table was built for
+        :param List[str] names: The name of each system, indexed by system ID
+        :param List[array] nextHops: For each start system ID, an array giving the ID of the next hop towards each
+                                        end system ID, or -1 where the end system is unreachable
+        """
+        self.graphHash = graphHash
+        self.names = names
+        self.ids = {name: systemID for systemID, name in enumerate(names)}
+        self.nextHops = nextHops
+
+
+    def makeRouteIDs(self, startID : int, endID : int) -> List[int]:
+        """Find the shortest route between two systems, by system ID.
+
+        :param int startID: The ID of the starting system
+        :param int endID: The ID of the target system
+        :return: list of system IDs where the first element is startID, the last element is endID,
+                    and all intermediary systems are adjacent. The list is empty if no route exists.
+        :rtype: list[int]
+        """
+        if self.nextHops[startID][endID] == -1:
+            return []
+        route = [startID]
+        while route[-1] != endID:
+            route.append(self.nextHops[route[-1]][endID])
+        return route
+
+
+    def makeRoute(self, start : str, end : str) -> List[str]:
+        """Find the shortest route between two systems.
+        If no route exists, the string "! " + start + " -> " + end is returned, as with bbAStar.
+
+        :param str start: string name of the starting system
+        :param str end: string name of the target system
+        :return: list of string system names where the first element is start, the last element is end,
+                    and all intermediary systems are adjacent
+        :rtype: list[str]
+        :raise KeyError: If start or end is not a system in this table
+        """
+        route = self.makeRouteIDs(self.ids[start], self.ids[end])
+        if not route:
+            return "! " + start + " -> " + end
+        return [self.names[systemID] for systemID in route]
+
+
+    def toDict(self, **kwargs) -> dict:
+        """Serialize this RouteTable into dictionary format, for caching to disk.
+
+        :return: A dictionary containing all information needed to recreate this table
+        :rtype: dict
+        """
+        return {"graphHash": self.graphHash, "names": self.names, "nextHops": [row.tolist() for row in self.nextHops]}
+
+
+    @classmethod
+    def fromDict(cls, tableDict : dict, **kwargs) -> RouteTable:
+        """Recreate a RouteTable from its dictionary-serialized representation - the opposite of RouteTable.toDict
+
+        :param dict tableDict: A dictionary containing all information needed to recreate the table
+        :return: A new RouteTable as described in tableDict
+        :rtype: RouteTable
+        """
+        return RouteTable(tableDict["graphHash"], tableDict["names"],
+                            [array("i", row) for row in tableDict["nextHops"]])
+
+
+    @classmethod
+    def fromGalaxyGraph(cls, galaxy : galaxyGraph.GalaxyGraph) -> RouteTable:
+        """Build a RouteTable by breadth-first search from every system in a GalaxyGraph.
+        Jumps are unweighted, so the first time a system is reached is along a shortest route.
+
+        :param GalaxyGraph galaxy: The graph to find routes through
+        :return: A new RouteTable containing shortest routes between all connected pairs of systems in galaxy
+        :rtype: RouteTable
+        """
+        numSystems = len(galaxy)
+        adjStart = galaxy.adjStart
+        adjTargets = galaxy.adjTargets
+        nextHops = []
+        for startID in range(numSystems):
+            # The first jump taken from startID on the way to each reached system
+            firstHops = array("i", [-1]) * numSystems
+            firstHops[startID] = startID
+            frontier = deque()
+            for neighbourID in adjTargets[adjStart[startID]:adjStart[startID + 1]]:
+                firstHops[neighbourID] = neighbourID
+                frontier.append(neighbourID)
+            while frontier:
+                currentID = frontier.popleft()
+                for neighbourID in adjTargets[adjStart[currentID]:adjStart[currentID + 1]]:
+                    if firstHops[neighbourID] == -1:
+                        firstHops[neighbourID] = firstHops[currentID]
+                        frontier.append(neighbourID)
+            nextHops.append(firstHops)
+        return RouteTable(galaxy.layoutHash(), list(galaxy.names), nextHops)
+
+
+def loadRouteTable(galaxy : galaxyGraph.GalaxyGraph, cachePath : str) -> RouteTable:
+    """Load the RouteTable for the given graph from the cache file at cachePath.
+    If the cache file does not exist, cannot be read, or was built for a different graph,
+    a new RouteTable is built and saved to cachePath.
+
+    :param GalaxyGraph galaxy: The graph to find routes through
+    :param str cachePath: Path to the JSON file to cache the RouteTable in
+    :return: A RouteTable containing shortest routes between all connected pairs of systems in galaxy
+    :rtype: RouteTable
+    """
+    graphHash = galaxy.layoutHash()
+    if os.path.isfile(cachePath):
+        try:
+            tableData = jsonHandler.readJSON(cachePath)
+        except (OSError, ValueError):
+            pass
+        else:
+            if tableData.get("graphHash", None) == graphHash:
+                return RouteTable.fromDict(tableData)
+
+    newTable = RouteTable.fromGalaxyGraph(galaxy)
+    jsonHandler.saveDB(cachePath, newTable)
+    return newTable
 
 
 def makeRoute(start : str, end : str) -> List[str]:
     """Find the shortest route between two systems.
+    Routes are looked up in bbData.routeTable where available, falling back to bbAStar before it has been loaded.
 
     :param str start: string name of the starting system. Must exist in bbData.builtInSystemObjs
     :param str end: string name of the target system. Must exist in bbData.builtInSystemObjs
@@ -119,4 +245,6 @@ def makeRoute(start : str, end : str) -> List[str]:
                 and all intermediary systems are adjacent
     :rtype: list[str]
     """
+    if bbData.routeTable is not None:
+        return bbData.routeTable.makeRoute(start, end)
     return bbAStar(start, end, bbData.builtInSystemObjs)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+from typing import List
+import hashlib
+import random
+
+# NumPy is optional, and used to draw uniform values for many streams at once
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Constants of the SplitMix64 generator, used by counterUniforms
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+_MIX_MULTIPLIERS = (0xBF58476D1CE4E5B9, 0x94D049BB133111EB)
+_MASK_64 = (1 << 64) - 1
+
+
+def streamSeed(ownerID : int, purpose : str, epoch : int) -> int:
+    """Derive a random seed from the owner of a random stream, what the stream is used for, and when it is used.
+    The seed is a pure function of its inputs, and so is the same in every process and every run of the bot.
+
+    :param int ownerID: The ID of the guild or user owning the stream
+    :param str purpose: A name for what the stream generates, e.g "shop" or "bounty", to keep streams independent
+    :param int epoch: The refresh period the stream is used in
+    :return: A 64-bit seed unique to the given inputs
+    :rtype: int
+    """
+    return int.from_bytes(hashlib.sha256((purpose + ":" + str(ownerID) + ":" + str(epoch)).encode()).digest()[:8], "big")
+
+
+def makeStream(ownerID : int, purpose : str, epoch : int) -> random.Random:
+    """Create a new random number generator, seeded from the owner of the stream, its purpose and its epoch.
+    Two streams made with the same arguments produce identical sequences.
+
+    :param int ownerID: The ID of the guild or user owning the stream
+    :param str purpose: A name for what the stream generates, e.g "shop" or "bounty", to keep streams independent
+    :param int epoch: The refresh period the stream is used in
+    :return: A new random.Random seeded with streamSeed(ownerID, purpose, epoch)
+    :rtype: random.Random
+    """
+    return random.Random(streamSeed(ownerID, purpose, epoch))
+
+
+def refreshEpoch(period : timedelta, when : datetime = None) -> int:
+    """Get the number of whole refresh periods elapsed since the unix epoch, at the given time.
+    The result is rounded to the nearest period, so that scheduled refreshes firing slightly early or late
+    still agree on their epoch.
+
+    :param timedelta period: The time between refreshes
+    :param datetime when: The UTC time of the refresh (Default datetime.utcnow())
+    :return: The index of the refresh period at when
+    :rtype: int
+    :raise ValueError: If period is not positive
+    """
+    if period.total_seconds() <= 0:
+        raise ValueError("Refresh periods must be positive, not " + str(period))
+    if when is None:
+        when = datetime.utcnow()
+    return round((when - datetime(1970, 1, 1)).total_seconds() / period.total_seconds())
+
+
+def counterUniforms(seeds : List[int], counters : List[int]) -> List[float]:
+    """Draw a uniform random float in [0, 1) for each pair of seed and counter, at once.
+    Each float is the counter-th output of the SplitMix64 generator seeded with seed, so it is a pure function of its
+    seed and counter: many streams can be drawn from together, in any order, without the values of any one stream
+    depending on the others. Uses NumPy if it is installed, giving identical results to the pure Python version.
+
+    :param List[int] seeds: The 64-bit seed of the stream to draw each value from, e.g from streamSeed
+    :param List[int] counters: The position in its stream of each value to draw. Must be the same length as seeds
+    :return: A float in [0, 1) for each pair of seed and counter
+    :rtype: List[float]
+    """
+    if np is None:
+        uniforms = []
+        for seed, counter in zip(seeds, counters):
+            z = (seed + (counter + 1) * _GOLDEN_GAMMA) & _MASK_64
+            z = ((z ^ (z >> 30)) * _MIX_MULTIPLIERS[0]) & _MASK_64
+            z = ((z ^ (z >> 27)) * _MIX_MULTIPLIERS[1]) & _MASK_64
+            uniforms.append(((z ^ (z >> 31)) >> 11) * 2.0 ** -53)
+        return uniforms
+
+    # uint64 arithmetic wraps around, matching the masking above
+    z = np.asarray(seeds, dtype=np.uint64) + (np.asarray(counters, dtype=np.uint64) + np.uint64(1)) \
+        * np.uint64(_GOLDEN_GAMMA)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX_MULTIPLIERS[0])
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX_MULTIPLIERS[1])
+    return (((z ^ (z >> np.uint64(31))) >> np.uint64(11)).astype(np.float64) * 2.0 ** -53).tolist()
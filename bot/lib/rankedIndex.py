@@ -0,0 +1,234 @@
+from __future__ import annotations
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+import random
+
+# The maximum height of a RankedIndex's skip list. 32 levels comfortably index billions of entries.
+MAX_LEVELS = 32
+
+
+class _SkipNode:
+    """A single entry in a RankedIndex's skip list.
+
+    :var sortKey: The (-score, key) pair by which entries are ordered
+    :vartype sortKey: tuple
+    :var next: The next node along each of this node's levels, or None at the end of the level
+    :vartype next: List[_SkipNode]
+    :var width: The number of entries skipped over by following each of this node's levels, including the next node
+    :vartype width: List[int]
+    """
+    __slots__ = ("sortKey", "next", "width")
+
+    def __init__(self, sortKey : tuple, levels : int):
+        """
+        :param tuple sortKey: The (-score, key) pair by which the entry is ordered
+        :param int levels: The number of levels the node appears in
+        """
+        self.sortKey = sortKey
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+class RankedIndex:
+    """A collection of keys with numerical scores, kept in order of score from highest to lowest.
+    Keys with equal scores are ordered by key, lowest first, so every key has a well defined rank.
+
+    Entries are stored in an indexable skip list: every node records how many entries each of its links skips over,
+    so adding, updating and removing keys, and finding the rank of a key, all take O(log n) expected time.
+    Reading the top k entries takes O(log n + k) time.
+
+    :var scores: The current score of every key in the index
+    :vartype scores: Dict[Any, float]
+    :var head: A node before the first entry of the skip list, appearing in every level
+    :vartype head: _SkipNode
+    :var rng: The random number generator deciding the heights of new nodes
+    :vartype rng: random.Random
+    """
+
+    def __init__(self, seed : int = 0):
+        """
+        :param int seed: A seed for the random heights of skip list nodes. This affects only performance. (Default 0)
+        """
+        self.scores = {}
+        self.head = _SkipNode(None, MAX_LEVELS)
+        self.rng = random.Random(seed)
+
+
+    def __len__(self) -> int:
+        """Get the number of keys in the index.
+
+        :return: The number of keys in the index
+        :rtype: int
+        """
+        return len(self.scores)
+
+
+    def __contains__(self, key : Any) -> bool:
+        """Decide whether or not the given key is in the index.
+
+        :param key: The key to look up
+        :return: True if key has a score in the index, False otherwise
+        :rtype: bool
+        """
+        return key in self.scores
+
+
+    def _randomLevels(self) -> int:
+        """Pick the number of levels for a new node, where each extra level is half as likely as the last.
+
+        :return: A number of levels between 1 and MAX_LEVELS
+        :rtype: int
+        """
+        levels = 1
+        while levels < MAX_LEVELS and self.rng.random() < 0.5:
+            levels += 1
+        return levels
+
+
+    def _insert(self, sortKey : tuple):
+        """Add a node to the skip list, in order.
+
+        :param tuple sortKey: The (-score, key) pair to add
+        """
+        # The last node before sortKey in each level, and the position of that node
+        chain = [None] * MAX_LEVELS
+        positions = [0] * MAX_LEVELS
+        node = self.head
+        position = 0
+        for level in range(MAX_LEVELS - 1, -1, -1):
+            while node.next[level] is not None and node.next[level].sortKey < sortKey:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            positions[level] = position
+
+        newNode = _SkipNode(sortKey, self._randomLevels())
+        # The new node is inserted at position + 1
+        for level in range(len(newNode.next)):
+            prev = chain[level]
+            stepsToNew = position + 1 - positions[level]
+            newNode.next[level] = prev.next[level]
+            newNode.width[level] = prev.width[level] - stepsToNew + 1
+            prev.next[level] = newNode
+            prev.width[level] = stepsToNew
+        # Links passing over the new node now skip one more entry
+        for level in range(len(newNode.next), MAX_LEVELS):
+            chain[level].width[level] += 1
+
+
+    def _remove(self, sortKey : tuple):
+        """Remove a node from the skip list.
+
+        :param tuple sortKey: The (-score, key) pair to remove, which must be in the skip list
+        """
+        chain = [None] * MAX_LEVELS
+        node = self.head
+        for level in range(MAX_LEVELS - 1, -1, -1):
+            while node.next[level] is not None and node.next[level].sortKey < sortKey:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+
+
+    def set(self, key : Any, score : float):
+        """Add a key to the index, or change the score of a key already in the index.
+
+        :param key: The key to set the score of. Must be hashable, and comparable with all other keys in the index.
+        :param float score: The new score for key
+        """
+        if key in self.scores:
+            if self.scores[key] == score:
+                return
+            self._remove((-self.scores[key], key))
+        self.scores[key] = score
+        self._insert((-score, key))
+
+
+    def remove(self, key : Any):
+        """Remove a key from the index.
+
+        :param key: The key to remove
+        :raise KeyError: If key is not in the index
+        """
+        self._remove((-self.scores[key], key))
+        del self.scores[key]
+
+
+    def rank(self, key : Any) -> int:
+        """Get the position of a key in the index, where the key with the highest score is at position 0.
+
+        :param key: The key to look up
+        :return: The number of keys ordered before key
+        :rtype: int
+        :raise KeyError: If key is not in the index
+        """
+        sortKey = (-self.scores[key], key)
+        node = self.head
+        position = 0
+        for level in range(MAX_LEVELS - 1, -1, -1):
+            while node.next[level] is not None and node.next[level].sortKey < sortKey:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+
+    def rankAmong(self, key : Any, keys : Iterable[Any]) -> Tuple[int, int]:
+        """Get the position of a key among a subset of the keys in the index, for example the members of one guild.
+        This takes time linear in the size of the subset, rather than in the size of the index.
+        Keys in the subset which are not in the index are ignored.
+
+        :param key: The key to look up
+        :param Iterable keys: The subset of keys to rank key among. key is counted whether or not it is in keys.
+        :return: The number of keys in the subset ordered before key, and the number of keys in the subset and the index,
+                    including key
+        :rtype: Tuple[int, int]
+        :raise KeyError: If key is not in the index
+        """
+        sortKey = (-self.scores[key], key)
+        position = 0
+        numRanked = 1
+        for otherKey in set(keys):
+            if otherKey != key and otherKey in self.scores:
+                numRanked += 1
+                if (-self.scores[otherKey], otherKey) < sortKey:
+                    position += 1
+        return position, numRanked
+
+
+    def iterTop(self) -> Iterator[Tuple[Any, float]]:
+        """Iterate over all entries in the index, from highest score to lowest.
+        The index must not be changed during iteration.
+
+        :return: An iterator over (key, score) pairs
+        :rtype: Iterator[Tuple[Any, float]]
+        """
+        node = self.head.next[0]
+        while node is not None:
+            yield node.sortKey[1], -node.sortKey[0]
+            node = node.next[0]
+
+
+    def topK(self, k : int, include : Callable[[Any], bool] = None) -> List[Tuple[Any, float]]:
+        """Get the k entries with the highest scores. If include is given, only keys for which include returns True
+        are counted, and so the index is read only as far as the k'th included key.
+
+        :param int k: The maximum number of entries to get
+        :param include: A function deciding whether or not to include a given key (Default include all keys)
+        :return: A list of up to k (key, score) pairs, from highest score to lowest
+        :rtype: List[Tuple[Any, float]]
+        """
+        top = []
+        if k <= 0:
+            return top
+        for key, score in self.iterTop():
+            if include is None or include(key):
+                top.append((key, score))
+                if len(top) == k:
+                    break
+        return top
@@ -0,0 +1,161 @@
+from __future__ import annotations
+from PIL import Image, ImageDraw
+from collections import OrderedDict
+from io import BytesIO
+from typing import List, Tuple, Dict, Any
+from .galaxyGraph import GalaxyGraph
+
+# Colours used when drawing maps, as RGBA tuples
+BACKGROUND_COLOUR = (12, 14, 28, 255)
+JUMP_COLOUR = (70, 78, 110, 255)
+ROUTE_COLOUR = (255, 196, 0, 255)
+LABEL_COLOUR = (200, 205, 220, 255)
+# System colours, indexed by bbData.securityLevels index
+SECURITY_COLOURS = [(80, 200, 120, 255), (90, 160, 255, 255), (255, 150, 60, 255), (230, 60, 60, 255)]
+
+# Radius of system markers, and of the start and end markers of routes, in pixels
+SYSTEM_RADIUS = 4
+ROUTE_END_RADIUS = 7
+# Width of jump lines, and of route lines, in pixels
+JUMP_WIDTH = 1
+ROUTE_WIDTH = 4
+
+
+class RouteMapRenderer:
+    """Draws maps of the galaxy with a route highlighted.
+    The galaxy itself - jumps, systems and labels - is drawn once into a base layer on creation.
+    Each route is then drawn over a copy of the base layer, and the resulting PNG is kept in a least recently used
+    cache keyed by the systems in the route, so popular routes are only ever drawn once.
+
+    :var galaxy: The graph being drawn
+    :vartype galaxy: GalaxyGraph
+    :var scale: The number of pixels per galaxy coordinate unit
+    :vartype scale: float
+    :var margin: The number of pixels of empty space around the edges of the galaxy
+    :vartype margin: int
+    :var minX: The smallest first coordinate of any system
+    :vartype minX: float
+    :var minY: The smallest second coordinate of any system
+    :vartype minY: float
+    :var baseLayer: The image of the galaxy with no route drawn
+    :vartype baseLayer: Image.Image
+    :var maxCacheSize: The maximum number of rendered routes to keep in the cache
+    :vartype maxCacheSize: int
+    :var cache: The PNG bytes of the most recently rendered routes, keyed by the tuple of system names in the route,
+                least recently used first
+    :vartype cache: OrderedDict
+    :var hits: The number of renders served from the cache
+    :vartype hits: int
+    :var misses: The number of renders that had to be drawn
+    :vartype misses: int
+    """
+
+    def __init__(self, galaxy : GalaxyGraph, scale : float, margin : int, maxCacheSize : int):
+        """
+        :param GalaxyGraph galaxy: The graph to draw
+        :param float scale: The number of pixels per galaxy coordinate unit
+        :param int margin: The number of pixels of empty space around the edges of the galaxy
+        :param int maxCacheSize: The maximum number of rendered routes to keep in the cache
+        """
+        self.galaxy = galaxy
+        self.scale = scale
+        self.margin = margin
+        self.minX = min(galaxy.xCoords, default=0)
+        self.minY = min(galaxy.yCoords, default=0)
+        self.maxCacheSize = maxCacheSize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.baseLayer = self.drawBaseLayer()
+
+
+    def toPixel(self, systemID : int) -> Tuple[float, float]:
+        """Get the position of a system in the map image.
+
+        :param int systemID: The ID of the system to locate
+        :return: The (x, y) pixel coordinates of the system
+        :rtype: Tuple[float, float]
+        """
+        return (self.margin + (self.galaxy.xCoords[systemID] - self.minX) * self.scale,
+                self.margin + (self.galaxy.yCoords[systemID] - self.minY) * self.scale)
+
+
+    def drawBaseLayer(self) -> Image.Image:
+        """Draw all systems, jumps and system names into a new image.
+
+        :return: A new image of the galaxy
+        :rtype: Image.Image
+        """
+        width = int(self.margin * 2 + (max(self.galaxy.xCoords, default=0) - self.minX) * self.scale)
+        height = int(self.margin * 2 + (max(self.galaxy.yCoords, default=0) - self.minY) * self.scale)
+        image = Image.new("RGBA", (max(width, 1), max(height, 1)), BACKGROUND_COLOUR)
+        draw = ImageDraw.Draw(image)
+
+        for systemID in range(len(self.galaxy)):
+            for neighbourID in self.galaxy.neighbourIDs(systemID):
+                # Draw each two-way jump only once
+                if neighbourID > systemID or systemID not in self.galaxy.neighbourIDs(neighbourID):
+                    draw.line((self.toPixel(systemID), self.toPixel(neighbourID)), fill=JUMP_COLOUR, width=JUMP_WIDTH)
+
+        for systemID in range(len(self.galaxy)):
+            x, y = self.toPixel(systemID)
+            colour = SECURITY_COLOURS[self.galaxy.security[systemID] % len(SECURITY_COLOURS)]
+            draw.ellipse((x - SYSTEM_RADIUS, y - SYSTEM_RADIUS, x + SYSTEM_RADIUS, y + SYSTEM_RADIUS), fill=colour)
+            draw.text((x + SYSTEM_RADIUS + 2, y - SYSTEM_RADIUS - 2), self.galaxy.names[systemID], fill=LABEL_COLOUR)
+
+        return image
+
+
+    def drawRoute(self, route : List[str]) -> bytes:
+        """Draw a route over a copy of the base layer.
+
+        :param List[str] route: The names of the systems in the route, in order
+        :return: The PNG-encoded image of the route
+        :rtype: bytes
+        """
+        image = self.baseLayer.copy()
+        draw = ImageDraw.Draw(image)
+        points = [self.toPixel(self.galaxy.ids[system]) for system in route]
+        if len(points) > 1:
+            draw.line(points, fill=ROUTE_COLOUR, width=ROUTE_WIDTH, joint="curve")
+        for x, y in (points[0], points[-1]):
+            draw.ellipse((x - ROUTE_END_RADIUS, y - ROUTE_END_RADIUS, x + ROUTE_END_RADIUS, y + ROUTE_END_RADIUS),
+                            outline=ROUTE_COLOUR, width=2)
+
+        imageBytes = BytesIO()
+        image.save(imageBytes, format="PNG")
+        return imageBytes.getvalue()
+
+
+    def renderRoute(self, route : List[str]) -> bytes:
+        """Get a PNG image of the galaxy map with the given route highlighted, from the cache if possible.
+
+        :param List[str] route: The names of the systems in the route, in order
+        :return: The PNG-encoded image of the route
+        :rtype: bytes
+        :raise KeyError: If route contains a system not in the galaxy
+        :raise ValueError: If route is empty
+        """
+        if not route:
+            raise ValueError("Cannot render an empty route")
+        key = tuple(route)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        self.misses += 1
+        imageBytes = self.drawRoute(route)
+        self.cache[key] = imageBytes
+        if len(self.cache) > self.maxCacheSize:
+            self.cache.popitem(last=False)
+        return imageBytes
+
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarise the performance of the cache.
+
+        :return: A dictionary of cache hits, misses, and the number of cached routes
+        :rtype: Dict[str, Any]
+        """
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self.cache)}
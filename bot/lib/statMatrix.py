@@ -0,0 +1,294 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Sequence
+import ast
+import math
+import operator
+
+# NumPy is optional, and used to evaluate expressions over all rows at once
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Operators allowed in stat expressions
+_BINARY_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul}
+_COMPARISONS = {ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+                ast.Eq: operator.eq, ast.NotEq: operator.ne}
+
+# The greatest nesting depth and number of parsed nodes allowed in a stat expression, well within the recursion limit
+MAX_EXPRESSION_DEPTH = 50
+MAX_EXPRESSION_NODES = 500
+# The longest piece of an expression to quote back in error messages
+MAX_QUOTED_LENGTH = 50
+
+
+def _quote(text : str) -> str:
+    """Quote a piece of an expression for an error message, shortened to MAX_QUOTED_LENGTH characters.
+
+    :param str text: The text to quote
+    :return: text in quotes, with its end replaced by an ellipsis if it is too long
+    :rtype: str
+    """
+    if len(text) > MAX_QUOTED_LENGTH:
+        text = text[:MAX_QUOTED_LENGTH - 3] + "..."
+    return "'" + text + "'"
+
+
+def parseExpression(expression : str) -> ast.AST:
+    """Parse a stat expression, rejecting expressions too large or too deeply nested to evaluate safely.
+
+    :param str expression: The expression to parse
+    :return: The body of the parsed expression
+    :rtype: ast.AST
+    :raise ValueError: If expression is not valid Python syntax, or is nested deeper than MAX_EXPRESSION_DEPTH or
+                        contains more than MAX_EXPRESSION_NODES nodes
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except (SyntaxError, RecursionError, MemoryError):
+        raise ValueError("Invalid expression: " + _quote(expression))
+
+    # Measure the tree without recursion, since it may be too deep to recurse over
+    numNodes = 0
+    unvisited = [(tree.body, 1)]
+    while unvisited:
+        node, depth = unvisited.pop()
+        numNodes += 1
+        if depth > MAX_EXPRESSION_DEPTH or numNodes > MAX_EXPRESSION_NODES:
+            raise ValueError("Expression is too long or complex: " + _quote(expression))
+        unvisited += [(child, depth + 1) for child in ast.iter_child_nodes(node)]
+    return tree.body
+
+
+def _divide(numerator, denominator):
+    """Divide two numbers or NumPy arrays, giving infinity or nan rather than an error when dividing by zero.
+
+    :param numerator: The number to divide
+    :param denominator: The number to divide by
+    :return: numerator / denominator
+    """
+    if np is not None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.divide(numerator, denominator)
+    if denominator == 0:
+        # As in NumPy, the sign of the infinity depends on the signs of both the numerator and the zero
+        if numerator == 0 or math.isnan(numerator):
+            return math.nan
+        return math.copysign(math.inf, numerator) * math.copysign(1, denominator)
+    return numerator / denominator
+
+
+class StatMatrix:
+    """A table of numerical statistics of a fixed set of objects, stored by column.
+    Rows can be filtered and sorted by arithmetic expressions over the columns, such as "cargo > 100 and value < 50000"
+    or "armour + shield". With NumPy installed, columns are arrays and each expression is evaluated over all rows at once.
+
+    :var items: The object in each row
+    :vartype items: List[Any]
+    :var columns: The value of each statistic for each row, keyed by statistic name. These are NumPy float arrays if
+                    NumPy is installed, and lists of floats otherwise.
+    :vartype columns: Dict[str, Sequence[float]]
+    """
+
+    def __init__(self, items : Sequence[Any], columns : Dict[str, Sequence[float]]):
+        """
+        :param Sequence[Any] items: The object in each row
+        :param Dict[str, Sequence[float]] columns: The value of each statistic for each row, keyed by statistic name
+        :raise ValueError: If any column is not the same length as items
+        """
+        self.items = list(items)
+        self.columns = {}
+        for stat, column in columns.items():
+            if len(column) != len(self.items):
+                raise ValueError("Column '" + stat + "' has " + str(len(column)) + " rows, expected " + str(len(self.items)))
+            self.columns[stat] = np.asarray(column, dtype=np.float64) if np is not None else [float(x) for x in column]
+
+
+    def __len__(self) -> int:
+        """Get the number of rows in the matrix.
+
+        :return: The number of rows in the matrix
+        :rtype: int
+        """
+        return len(self.items)
+
+
+    def _evaluateNode(self, node : ast.AST, columns : Dict[str, Any]):
+        """Recursively evaluate a parsed stat expression.
+
+        :param ast.AST node: The parsed expression to evaluate
+        :param columns: The columns to read stats from - either self.columns, or a single row when NumPy is not installed
+        :return: The value of the expression
+        :raise ValueError: If the expression contains an unknown stat, or anything other than numbers, stat names,
+                            arithmetic, comparisons, and/or/not, and brackets
+        """
+        evaluator = _NODE_EVALUATORS.get(type(node), None)
+        result = None if evaluator is None else evaluator(self, node, columns)
+        if result is None:
+            raise ValueError("Unsupported expression: " + _quote(ast.unparse(node)))
+        return result
+
+
+    def _evaluateConstant(self, node : ast.Constant, columns : Dict[str, Any]):
+        """Evaluate a number in a stat expression.
+
+        :return: The number, or None if the constant is not a number
+        """
+        return node.value if type(node.value) in (int, float) else None
+
+
+    def _evaluateName(self, node : ast.Name, columns : Dict[str, Any]):
+        """Evaluate a stat name in a stat expression.
+
+        :return: The stat's column, or its value in the current row
+        :raise ValueError: If the stat is unknown
+        """
+        if node.id not in columns:
+            raise ValueError("Unknown stat " + _quote(node.id))
+        return columns[node.id]
+
+
+    def _evaluateBinOp(self, node : ast.BinOp, columns : Dict[str, Any]):
+        """Evaluate an arithmetic operation in a stat expression.
+
+        :return: The result of the operation, or None if the operator is not supported
+        """
+        if not isinstance(node.op, ast.Div) and type(node.op) not in _BINARY_OPERATORS:
+            return None
+        left = self._evaluateNode(node.left, columns)
+        right = self._evaluateNode(node.right, columns)
+        if isinstance(node.op, ast.Div):
+            return _divide(left, right)
+        return _BINARY_OPERATORS[type(node.op)](left, right)
+
+
+    def _evaluateUnaryOp(self, node : ast.UnaryOp, columns : Dict[str, Any]):
+        """Evaluate a negation or 'not' in a stat expression.
+
+        :return: The result of the operation, or None if the operator is not supported
+        """
+        if isinstance(node.op, ast.USub):
+            return -self._evaluateNode(node.operand, columns)
+        if isinstance(node.op, ast.Not):
+            operand = self._evaluateNode(node.operand, columns)
+            return np.logical_not(operand) if np is not None else not operand
+        return None
+
+
+    def _evaluateCompare(self, node : ast.Compare, columns : Dict[str, Any]):
+        """Evaluate a comparison, or a chain of comparisons, in a stat expression.
+
+        :return: Whether all of the comparisons are true, or None if any comparison operator is not supported
+        """
+        if any(type(op) not in _COMPARISONS for op in node.ops):
+            return None
+        result = True
+        left = self._evaluateNode(node.left, columns)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = self._evaluateNode(comparator, columns)
+            result = operator.and_(result, _COMPARISONS[type(op)](left, right))
+            left = right
+        return result
+
+
+    def _evaluateBoolOp(self, node : ast.BoolOp, columns : Dict[str, Any]):
+        """Evaluate an 'and' or 'or' in a stat expression.
+
+        :return: The combined values
+        """
+        values = [self._evaluateNode(value, columns) for value in node.values]
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+        result = values[0]
+        for value in values[1:]:
+            result = combine(result, value)
+        return result
+
+
+    def evaluate(self, expression : str) -> Sequence[float]:
+        """Evaluate an expression for every row in the matrix.
+        Expressions may contain numbers, stat names, + - * /, comparisons, and, or, not, and brackets.
+        Division by zero gives infinity, or nan for 0 / 0.
+
+        :param str expression: The expression to evaluate
+        :return: The value of the expression for each row, as a NumPy array if NumPy is installed, or a list otherwise
+        :rtype: Sequence[float]
+        :raise ValueError: If expression is not a valid stat expression
+        """
+        body = parseExpression(expression)
+        try:
+            if np is not None:
+                # inf and nan propagate as in Python, without warnings
+                with np.errstate(all="ignore"):
+                    result = self._evaluateNode(body, self.columns)
+                # Expressions of only constants evaluate to a single value
+                return np.broadcast_to(result, (len(self.items),))
+            return [self._evaluateNode(body, {stat: column[row] for stat, column in self.columns.items()})
+                    for row in range(len(self.items))]
+        except (TypeError, OverflowError):
+            # e.g "and" between two numbers, or a number too large for a float
+            raise ValueError("Invalid expression: " + _quote(expression))
+
+
+    def statsInExpression(self, expression : str) -> List[str]:
+        """Find the names of the stats used in an expression, in the order they first appear.
+
+        :param str expression: The expression to search
+        :return: The names of the columns used in expression
+        :rtype: List[str]
+        :raise ValueError: If expression is not valid Python syntax, or is too long or complex
+        """
+        stats = []
+        # ast.walk visits nodes breadth first, so sort the names into the order they appear in
+        names = sorted((node for node in ast.walk(parseExpression(expression)) if isinstance(node, ast.Name)),
+                        key=lambda node: (node.lineno, node.col_offset))
+        for node in names:
+            if node.id in self.columns and node.id not in stats:
+                stats.append(node.id)
+        return stats
+
+
+    def query(self, condition : str = None, sortBy : str = None) -> List[int]:
+        """Find the rows satisfying a condition, sorted by an expression from highest to lowest.
+        Rows with equal sort values, or a sort value of nan, keep their order in the matrix, with nan last.
+
+        :param str condition: An expression which is true for rows to include (Default include all rows)
+        :param str sortBy: An expression to sort rows by, highest first (Default keep the order of the matrix)
+        :return: The indices of the included rows, in sorted order
+        :rtype: List[int]
+        :raise ValueError: If condition or sortBy is not a valid stat expression
+        """
+        if condition is None:
+            rows = list(range(len(self.items)))
+        elif np is not None:
+            rows = np.flatnonzero(self.evaluate(condition)).tolist()
+        else:
+            rows = [row for row, included in enumerate(self.evaluate(condition)) if included]
+
+        if sortBy is not None:
+            sortValues = self.evaluate(sortBy)
+            if np is not None:
+                sortValues = np.asarray(sortValues, dtype=np.float64)[rows]
+                # Negate to sort highest first. Stable sorting keeps ties in matrix order, and nan sorts last.
+                rows = np.asarray(rows, dtype=np.int64)[np.argsort(-sortValues, kind="stable")].tolist()
+            else:
+                rows.sort(key=lambda row: (math.isnan(sortValues[row]), -sortValues[row]))
+        return rows
+
+
+    @classmethod
+    def fromItems(cls, items : Sequence[Any], statGetters : Dict[str, Callable[[Any], float]]) -> StatMatrix:
+        """Build a StatMatrix by reading statistics from a sequence of objects.
+
+        :param Sequence[Any] items: The object for each row
+        :param statGetters: A function reading each statistic from an object, keyed by statistic name
+        :return: A new StatMatrix of the stats of items
+        :rtype: StatMatrix
+        """
+        return StatMatrix(items, {stat: [getter(item) for item in items] for stat, getter in statGetters.items()})
+
+
+# The StatMatrix method evaluating each type of node allowed in stat expressions
+_NODE_EVALUATORS = {ast.Constant: StatMatrix._evaluateConstant, ast.Name: StatMatrix._evaluateName,
+                    ast.BinOp: StatMatrix._evaluateBinOp, ast.UnaryOp: StatMatrix._evaluateUnaryOp,
+                    ast.Compare: StatMatrix._evaluateCompare, ast.BoolOp: StatMatrix._evaluateBoolOp}
@@ -74,6 +74,16 @@ def shipSkinNameToToolName(skinName : str) -> str:
     return f"Ship Skin: {skinName}"
 
 
+def normalizeName(name : str) -> str:
+    """Normalize an object name or alias for case and whitespace insensitive lookup.
+
+    :param str name: The name to normalize
+    :return: name in lower case, with leading and trailing whitespace removed and inner whitespace collapsed to single spaces
+    :rtype: str
+    """
+    return " ".join(name.lower().split())
+
+
 def formatAdditive(stat : Union[float, int]) -> str:
     """Format a module effect attribute into a string, including a sign symbol.
 
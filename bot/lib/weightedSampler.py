@@ -0,0 +1,147 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Any, Sequence
+import random
+
+
+class WeightedSampler(ABC):
+    """An abstract class for picking random values from a fixed set, where each value has a given relative weight.
+    The probability of picking each value is its weight divided by the sum of all weights.
+    Samplers are built once and then sampled many times, so implementations trade build time for fast sampling.
+
+    All sampling methods accept the random number generator to draw from, defaulting to the global random module.
+
+    :var values: The values which may be picked
+    :vartype values: List[Any]
+    :var weights: The relative weight of each value
+    :vartype weights: List[float]
+    """
+
+    def __init__(self, values : Sequence[Any], weights : Sequence[float]):
+        """
+        :param Sequence[Any] values: The values which may be picked
+        :param Sequence[float] weights: The relative weight of each value. Must be non-negative, with a positive sum.
+        :raise ValueError: If values and weights are of different lengths, or weights are invalid
+        """
+        if len(values) != len(weights):
+            raise ValueError("Received " + str(len(values)) + " values but " + str(len(weights)) + " weights")
+        if any(weight < 0 for weight in weights) or sum(weights) <= 0:
+            raise ValueError("Weights must be non-negative with a positive sum")
+        self.values = list(values)
+        self.weights = list(weights)
+
+
+    def probabilities(self) -> List[float]:
+        """Get the probability of picking each value.
+
+        :return: The probability of picking each value in self.values, in the same order
+        :rtype: List[float]
+        """
+        totalWeight = sum(self.weights)
+        return [weight / totalWeight for weight in self.weights]
+
+
+    @abstractmethod
+    def sample(self, rng : random.Random = random) -> Any:
+        """Pick a random value.
+
+        :param random.Random rng: The random number generator to draw from (Default the random module)
+        :return: One of self.values
+        """
+        raise NotImplementedError()
+
+
+    def sampleMany(self, count : int, rng : random.Random = random) -> List[Any]:
+        """Pick many random values, independently.
+
+        :param int count: The number of values to pick
+        :param random.Random rng: The random number generator to draw from (Default the random module)
+        :return: A list of count values from self.values
+        :rtype: List[Any]
+        """
+        return [self.sample(rng) for _ in range(count)]
+
+
+class BisectSampler(WeightedSampler):
+    """A WeightedSampler picking values by binary search over cumulative weights, in O(log n) time per sample.
+
+    :var cumulativeWeights: The running total of self.weights
+    :vartype cumulativeWeights: List[float]
+    """
+
+    def __init__(self, values : Sequence[Any], weights : Sequence[float]):
+        """
+        :param Sequence[Any] values: The values which may be picked
+        :param Sequence[float] weights: The relative weight of each value. Must be non-negative, with a positive sum.
+        :raise ValueError: If values and weights are of different lengths, or weights are invalid
+        """
+        super().__init__(values, weights)
+        self.cumulativeWeights = list(accumulate(self.weights))
+
+
+    def sample(self, rng : random.Random = random) -> Any:
+        """Pick a random value.
+
+        :param random.Random rng: The random number generator to draw from (Default the random module)
+        :return: One of self.values
+        """
+        # bisect_right skips over values with a weight of zero. The min guards against float rounding at the top end.
+        return self.values[min(bisect_right(self.cumulativeWeights, rng.random() * self.cumulativeWeights[-1]),
+                                len(self.values) - 1)]
+
+
+class AliasSampler(WeightedSampler):
+    """A WeightedSampler picking values by Walker's alias method, in O(1) time per sample.
+    Each value is given a column of equal height, split between the value itself and at most one 'alias' value.
+    Sampling picks a column uniformly, and then one of the column's two values according to the split.
+
+    :var acceptChances: The proportion of each value's column belonging to the value itself
+    :vartype acceptChances: List[float]
+    :var aliases: The index of the value occupying the remainder of each value's column
+    :vartype aliases: List[int]
+    """
+
+    def __init__(self, values : Sequence[Any], weights : Sequence[float]):
+        """
+        :param Sequence[Any] values: The values which may be picked
+        :param Sequence[float] weights: The relative weight of each value. Must be non-negative, with a positive sum.
+        :raise ValueError: If values and weights are of different lengths, or weights are invalid
+        """
+        super().__init__(values, weights)
+        numValues = len(self.values)
+        totalWeight = sum(self.weights)
+        # Scale weights such that the average column height is 1
+        scaledWeights = [weight * numValues / totalWeight for weight in self.weights]
+        self.acceptChances = [1.0] * numValues
+        self.aliases = list(range(numValues))
+
+        # Vose's method: repeatedly top up an under-full column with the excess of an over-full one
+        underFull = [i for i, weight in enumerate(scaledWeights) if weight < 1]
+        overFull = [i for i, weight in enumerate(scaledWeights) if weight >= 1]
+        while underFull and overFull:
+            small = underFull.pop()
+            large = overFull.pop()
+            self.acceptChances[small] = scaledWeights[small]
+            self.aliases[small] = large
+            scaledWeights[large] -= 1 - scaledWeights[small]
+            if scaledWeights[large] < 1:
+                underFull.append(large)
+            else:
+                overFull.append(large)
+        # Any remaining columns are full, up to float rounding error
+        for i in underFull + overFull:
+            self.acceptChances[i] = 1.0
+
+
+    def sample(self, rng : random.Random = random) -> Any:
+        """Pick a random value.
+
+        :param random.Random rng: The random number generator to draw from (Default the random module)
+        :return: One of self.values
+        """
+        column = rng.randrange(len(self.values))
+        if rng.random() < self.acceptChances[column]:
+            return self.values[column]
+        return self.values[self.aliases[column]]
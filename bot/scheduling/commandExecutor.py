@@ -0,0 +1,218 @@
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Awaitable, Hashable
+
+
+class PriorityClassQueue:
+    """A queue of pending commands of a single priority class, served round-robin across guilds.
+
+    :var name: The name of the priority class
+    :vartype name: str
+    :var maxWorkers: The maximum number of commands of this class that may run at once
+    :vartype maxWorkers: int
+    :var guildQueues: Dictionary mapping guild IDs to a deque of (coroutine, future, enqueue time) for that guild's
+                        pending commands. Commands called from DMs are queued under None.
+    :vartype guildQueues: Dict[Hashable, deque]
+    :var guildOrder: The IDs of all guilds with pending commands, in the order they will next be served
+    :vartype guildOrder: deque
+    :var pending: Counts the commands waiting in this queue, waking a worker for each one
+    :vartype pending: asyncio.Semaphore
+    :var running: The number of commands of this class currently running
+    :vartype running: int
+    :var numStarted: The total number of commands of this class that have been started
+    :vartype numStarted: int
+    :var totalWait: The total time in seconds that started commands of this class spent waiting in the queue
+    :vartype totalWait: float
+    :var maxWait: The longest time in seconds that a started command of this class spent waiting in the queue
+    :vartype maxWait: float
+    """
+
+    def __init__(self, name: str, maxWorkers: int):
+        """
+        :param str name: The name of the priority class
+        :param int maxWorkers: The maximum number of commands of this class that may run at once
+        """
+        if maxWorkers < 1:
+            raise ValueError("Priority class '" + name + "' must have at least one worker")
+        self.name = name
+        self.maxWorkers = maxWorkers
+        self.guildQueues = {}
+        self.guildOrder = deque()
+        self.pending = asyncio.Semaphore(0)
+        self.running = 0
+        self.numStarted = 0
+        self.totalWait = 0.0
+        self.maxWait = 0.0
+
+
+    def put(self, guildID: Hashable, coro: Awaitable, future: asyncio.Future):
+        """Queue a command to be run by this class's workers.
+
+        :param Hashable guildID: The ID of the guild the command was called from, or None if called from DMs
+        :param Awaitable coro: The command coroutine to run
+        :param asyncio.Future future: The future to pass the command's result to
+        """
+        if guildID not in self.guildQueues:
+            self.guildQueues[guildID] = deque()
+            self.guildOrder.append(guildID)
+        self.guildQueues[guildID].append((coro, future, datetime.utcnow()))
+        self.pending.release()
+
+
+    def pop(self):
+        """Take the next command from the guild whose turn it is, and move that guild to the back of the queue.
+
+        :return: The (coroutine, future, enqueue time) of the next command
+        :rtype: tuple
+        """
+        guildID = self.guildOrder.popleft()
+        job = self.guildQueues[guildID].popleft()
+        if self.guildQueues[guildID]:
+            self.guildOrder.append(guildID)
+        else:
+            del self.guildQueues[guildID]
+        return job
+
+
+    def depth(self) -> int:
+        """Get the number of commands waiting in this queue.
+
+        :return: The number of commands waiting to be started
+        :rtype: int
+        """
+        return sum(len(guildQueue) for guildQueue in self.guildQueues.values())
+
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarise the current state of this queue.
+
+        :return: A dictionary of queue depth, guilds waiting, running and maximum workers, commands started,
+                    and average and maximum wait time in seconds
+        :rtype: Dict[str, Any]
+        """
+        return {"depth": self.depth(), "guilds": len(self.guildOrder), "running": self.running,
+                "maxWorkers": self.maxWorkers, "started": self.numStarted,
+                "avgWait": self.totalWait / self.numStarted if self.numStarted else 0.0, "maxWait": self.maxWait}
+
+
+class CommandExecutor:
+    """Runs commands through priority classes, each with a bounded number of workers.
+    Within each class, guilds take turns to have a command started, so that a guild calling many commands
+    cannot delay the commands of other guilds by more than one command per turn.
+
+    :var classQueues: Dictionary mapping priority class names to their queues
+    :vartype classQueues: Dict[str, PriorityClassQueue]
+    :var defaultClass: The name of the priority class to use for commands with no class assigned
+    :vartype defaultClass: str
+    :var commandClasses: Dictionary mapping command identifiers to the names of their priority classes
+    :vartype commandClasses: Dict[str, str]
+    :var workers: The asyncio tasks running each worker
+    :vartype workers: List[asyncio.Task]
+    """
+
+    def __init__(self, classWorkers: Dict[str, int], commandClasses: Dict[str, Any], defaultClass: str):
+        """
+        :param Dict[str, int] classWorkers: Dictionary mapping priority class names to their maximum number of workers
+        :param Dict[str, Any] commandClasses: Dictionary mapping priority class names to iterables of the identifiers
+                                                of commands in that class
+        :param str defaultClass: The name of the priority class to use for commands with no class assigned
+        :raise KeyError: If a command is assigned to, or defaultClass is, an unknown priority class
+        """
+        if defaultClass not in classWorkers:
+            raise KeyError("Unknown default priority class: " + defaultClass)
+        self.classQueues = {className: PriorityClassQueue(className, maxWorkers)
+                            for className, maxWorkers in classWorkers.items()}
+        self.defaultClass = defaultClass
+        self.commandClasses = {}
+        for className, commandIdents in commandClasses.items():
+            if className not in self.classQueues:
+                raise KeyError("Unknown priority class: " + className)
+            for ident in commandIdents:
+                self.commandClasses[ident] = className
+        self.workers = []
+
+
+    def start(self):
+        """Start the workers for all priority classes. This must be called from within a running event loop.
+        """
+        if self.workers:
+            raise RuntimeError("CommandExecutor already started")
+        for classQueue in self.classQueues.values():
+            for _ in range(classQueue.maxWorkers):
+                self.workers.append(asyncio.ensure_future(self._workerLoop(classQueue)))
+
+
+    def stop(self):
+        """Cancel all workers. Commands still waiting in queues will not be run.
+        """
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+
+
+    def priorityClassOf(self, commandIdent: str) -> str:
+        """Get the name of the priority class that the given command will be run in.
+
+        :param str commandIdent: The identifier of the command
+        :return: The name of the command's priority class
+        :rtype: str
+        """
+        return self.commandClasses.get(commandIdent, self.defaultClass)
+
+
+    async def submit(self, commandIdent: str, guildID: Hashable, coro: Awaitable) -> Any:
+        """Queue a command coroutine in its priority class, and wait for it to be run.
+
+        :param str commandIdent: The identifier of the command being called, determining its priority class
+        :param Hashable guildID: The ID of the guild the command was called from, or None if called from DMs
+        :param Awaitable coro: The coroutine to run
+        :return: The result of coro
+        :raise Exception: Any exception raised by coro
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.classQueues[self.priorityClassOf(commandIdent)].put(guildID, coro, future)
+        return await future
+
+
+    async def _workerLoop(self, classQueue: PriorityClassQueue):
+        """Repeatedly take and run commands from a priority class queue, forever.
+
+        :param PriorityClassQueue classQueue: The queue to serve
+        """
+        while True:
+            await classQueue.pending.acquire()
+            coro, future, enqueueTime = classQueue.pop()
+            waited = (datetime.utcnow() - enqueueTime).total_seconds()
+            classQueue.numStarted += 1
+            classQueue.totalWait += waited
+            classQueue.maxWait = max(classQueue.maxWait, waited)
+
+            # The caller may have been cancelled while waiting
+            if future.cancelled():
+                coro.close()
+                continue
+
+            classQueue.running += 1
+            try:
+                result = await coro
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                classQueue.running -= 1
+
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Summarise the current state of all priority class queues.
+
+        :return: A dictionary mapping priority class names to their PriorityClassQueue.stats
+        :rtype: Dict[str, Dict[str, Any]]
+        """
+        return {className: classQueue.stats() for className, classQueue in self.classQueues.items()}
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from discord import Embed, channel, Client, Forbidden, Guild, Member, Message, HTTPException, NotFound
 from typing import List, Dict, Union
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from .. import botState, lib
 from ..gameObjects import guildShop
@@ -468,7 +468,14 @@ class BasedGuild(serializable.Serializable):
             raise ValueError("Attempted to spawn a bounty into a guild where bounties are disabled")
         # ensure a new bounty can be created
         if self.bountiesDB.canMakeBounty():
-            newBounty = bounty.Bounty(owningDB=self.bountiesDB)
+            if cfg.guildRandomStreams:
+                # Bounty issue times are rounded down to the minute, so use the same resolution for the stream epoch
+                epoch = lib.randomStreams.refreshEpoch(timedelta(minutes=1),
+                                                        datetime.utcnow().replace(second=0, microsecond=0))
+                newBounty = bounty.Bounty(owningDB=self.bountiesDB,
+                                            rng=lib.randomStreams.makeStream(self.id, "bounty", epoch))
+            else:
+                newBounty = bounty.Bounty(owningDB=self.bountiesDB)
             # activate and announce the bounty
             self.bountiesDB.addBounty(newBounty)
             await self.announceNewBounty(newBounty)
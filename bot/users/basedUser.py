@@ -35,6 +35,10 @@ defaultUserDict = {"credits": 0, "bountyCooldownEnd": 0, "lifetimeBountyCreditsW
 # but provides a reference for game design.
 defaultUserValue = 28970
 
+# Attributes whose changes are reported to BasedUser.statListener, and the names of the leaderboard stats they affect
+trackedStatAttributes = {"credits": ("credits", "value"), "itemsValue": ("value",), "systemsChecked": ("systemsChecked",),
+                            "bountyWins": ("bountyWins",)}
+
 
 class BasedUser(serializable.Serializable):
     """A user of the bot. There is currently no guarantee that user still shares any guilds with the bot,
@@ -97,6 +101,12 @@ class BasedUser(serializable.Serializable):
     :vartype homeGuildID: int
     :var guildTransferCooldownEnd: A timestamp after which this user is allowed to transfer their homeGuildID.
     :vartype guildTransferCooldownEnd: datetime.datetime
+    :var itemsValue: The total value of the user's active ship and all of their inactive items, kept up to date as items
+                        are added, removed and modified. Credits are not included. See getStatByName("value").
+    :vartype itemsValue: int
+    :var statListener: A function called with this user and a tuple of stat names whenever one of the attributes in
+                        trackedStatAttributes is assigned to, e.g by a UserDB keeping leaderboards. None by default.
+    :vartype statListener: Callable[[BasedUser, Tuple[str, ...]], None]
     """
 
     def __init__(self, userID: int, credits : int = 0, lifetimeBountyCreditsWon : int = 0,
@@ -184,6 +194,7 @@ class BasedUser(serializable.Serializable):
         if guildTransferCooldownEnd is None:
             guildTransferCooldownEnd = datetime.utcnow()
 
+        self.statListener = None
         self.id = userID
         self.credits = credits
         self.lifetimeBountyCreditsWon = lifetimeBountyCreditsWon
@@ -199,6 +210,14 @@ class BasedUser(serializable.Serializable):
         self.inactiveTurrets = inactiveTurrets
         self.inactiveTools = inactiveTools
 
+        # Track changes to the value of the user's items
+        for userInventory in (inactiveShips, inactiveModules, inactiveWeapons, inactiveTurrets, inactiveTools):
+            userInventory.changeListener = self._inventoryChanged
+        self._watchShip(activeShip)
+        for ship in inactiveShips.items:
+            self._watchShip(ship)
+        self.itemsValue = self.calculateItemsValue()
+
         self.lastSeenGuildId = lastSeenGuildId
         self.hasLastSeenGuildId = lastSeenGuildId != -1
 
@@ -249,6 +268,19 @@ class BasedUser(serializable.Serializable):
         self.guildTransferCooldownEnd = guildTransferCooldownEnd
 
 
+    def __setattr__(self, name : str, value):
+        """Set an attribute of this user, informing statListener when a stat shown on leaderboards changes.
+        Stats such as credits are modified all over the bot, so assignments are watched here rather than at each
+        modification.
+
+        :param str name: The name of the attribute to set
+        :param value: The new value for the attribute
+        """
+        super().__setattr__(name, value)
+        if name in trackedStatAttributes and self.statListener is not None:
+            self.statListener(self, trackedStatAttributes[name])
+
+
     def resetUser(self):
         """Reset the user's attributes back to their default values.
         """
@@ -257,7 +289,7 @@ class BasedUser(serializable.Serializable):
         self.bountyCooldownEnd = -1
         self.systemsChecked = 0
         self.bountyWins = 0
-        self.activeShip = shipItem.Ship.fromDict(defaultShipLoadoutDict)
+        self.setActiveShip(shipItem.Ship.fromDict(defaultShipLoadoutDict))
         self.inactiveModules.clear()
         self.inactiveShips.clear()
         self.inactiveWeapons.clear()
@@ -416,7 +448,7 @@ class BasedUser(serializable.Serializable):
             self.inactiveShips.addItem(self.activeShip)
         if ship in self.inactiveShips:
             self.inactiveShips.removeItem(ship)
-        self.activeShip = ship
+        self.setActiveShip(ship)
 
 
     def equipShipIndex(self, index : int):
@@ -429,10 +461,84 @@ class BasedUser(serializable.Serializable):
             raise IndexError("Index out of range")
         if self.activeShip is not None:
             self.inactiveShips.addItem(self.activeShip)
-        self.activeShip = self.inactiveShips[index]
+        self.setActiveShip(self.inactiveShips[index].item)
         self.inactiveShips.removeItem(self.activeShip)
 
 
+    def setActiveShip(self, ship : shipItem.Ship):
+        """Replace the user's active ship, without moving either ship into or out of the hangar.
+        Use equipShipObj or equipShipIndex to equip a ship from the hangar.
+
+        :param shipItem ship: The new active ship
+        """
+        oldShip = self.activeShip
+        self.activeShip = ship
+        if oldShip is not None:
+            self.itemsValue -= oldShip.getValue()
+            self._unwatchShipIfUnowned(oldShip)
+        if ship is not None:
+            self._watchShip(ship)
+            self.itemsValue += ship.getValue()
+
+
+    def _watchShip(self, ship : shipItem.Ship):
+        """Start tracking changes to the value of the given ship, which must be owned by this user.
+
+        :param shipItem ship: The ship to track
+        """
+        if ship is not None:
+            # Ships only report value changes when their value is cached
+            ship.getValue()
+            ship.valueListener = self._shipValueChanged
+
+
+    def _unwatchShipIfUnowned(self, ship : shipItem.Ship):
+        """Stop tracking changes to the value of the given ship, if it is no longer owned by this user.
+
+        :param shipItem ship: The ship to stop tracking
+        """
+        if ship.valueListener == self._shipValueChanged and not self.ownsShip(ship):
+            ship.valueListener = None
+
+
+    def _inventoryChanged(self, item : object, quantity : int):
+        """Update the user's total items value when items are added to or removed from one of their inventories.
+
+        :param object item: The item added or removed
+        :param int quantity: The number of item added, or negative the number of item removed
+        """
+        self.itemsValue += item.getValue() * quantity
+        if isinstance(item, shipItem.Ship):
+            if quantity > 0:
+                self._watchShip(item)
+            else:
+                self._unwatchShipIfUnowned(item)
+
+
+    def _shipValueChanged(self, ship : shipItem.Ship, valueChange : int):
+        """Update the user's total items value when the value of one of their ships changes.
+
+        :param shipItem ship: The ship whose value changed
+        :param int valueChange: The change in the value of one of ship
+        """
+        self.itemsValue += valueChange * (self.inactiveShips.numStored(ship) + (1 if self.activeShip is ship else 0))
+
+
+    def calculateItemsValue(self) -> int:
+        """Calculate the total value of the user's active ship and all of their inactive items, from scratch.
+        This is slow, and only needed to verify itemsValue, which should be used instead.
+
+        :return: The total value of the user's active ship and inactive items
+        :rtype: int
+        """
+        total = self.activeShip.getValue() if self.activeShip is not None else 0
+        for userInventory in (self.inactiveModules, self.inactiveTurrets, self.inactiveWeapons, self.inactiveShips,
+                                self.inactiveTools):
+            for item, listing in userInventory.items.items():
+                total += listing.count * item.getValue()
+        return total
+
+
     def toDict(self, **kwargs) -> dict:
         """Serialize this BasedUser to a dictionary representation for saving to file.
 
@@ -499,23 +605,15 @@ class BasedUser(serializable.Serializable):
         elif stat == "bountyWins":
             return self.bountyWins
         elif stat == "value":
-            modulesValue = 0
-            for module in self.inactiveModules.keys:
-                modulesValue += self.inactiveModules.items[module].count * module.getValue()
-            turretsValue = 0
-            for turret in self.inactiveTurrets.keys:
-                turretsValue += self.inactiveTurrets.items[turret].count * turret.getValue()
-            weaponsValue = 0
-            for weapon in self.inactiveWeapons.keys:
-                weaponsValue += self.inactiveWeapons.items[weapon].count * weapon.getValue()
-            shipsValue = 0
-            for ship in self.inactiveShips.keys:
-                shipsValue += self.inactiveShips.items[ship].count * ship.getValue()
-            toolsValue = 0
-            for tool in self.inactiveTools.keys:
-                toolsValue += self.inactiveTools.items[tool].count * tool.getValue()
-
-            return modulesValue + turretsValue + weaponsValue + shipsValue + self.activeShip.getValue() + self.credits
+            if cfg.verifyUserValues:
+                calculatedValue = self.calculateItemsValue()
+                if calculatedValue != self.itemsValue:
+                    botState.logger.log("bbUsr", "getStat", "Running items value of user #" + str(self.id) + " was " \
+                                                            + str(self.itemsValue) + ", but calculated " \
+                                                            + str(calculatedValue) + ". Value corrected.",
+                                        category="usersDB", eventType="VALUE_DRIFT")
+                    self.itemsValue = calculatedValue
+            return self.itemsValue + self.credits
         else:
             raise ValueError("Unknown stat name: " + str(stat))
 
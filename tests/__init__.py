@@ -0,0 +1,2 @@
+# bot.cfg must be imported before bot.lib, as it is in main.py
+from bot.cfg import cfg  # noqa: F401
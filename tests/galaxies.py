@@ -0,0 +1,87 @@
+"""Galaxies for tests and benchmarks to find routes through.
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Dict, List
+import json
+import os
+import random
+
+from bot.cfg import cfg
+from bot.gameObjects.bounties import solarSystem
+
+
+def makeRandomGalaxy(numSystems : int, jumpRange : float, rng : random.Random) -> Dict[str, solarSystem.SolarSystem]:
+    """Scatter systems uniformly over a unit square, and connect every pair of systems within jumpRange of each other.
+    Sparse galaxies are likely to be split into several unconnected clusters.
+
+    :param int numSystems: The number of systems to generate
+    :param float jumpRange: The greatest straight-line distance between two connected systems
+    :param random.Random rng: The random number generator to place systems with
+    :return: A dictionary mapping system names to solarSystem objects
+    :rtype: Dict[str, solarSystem.SolarSystem]
+    """
+    names = ["System " + str(systemNum) for systemNum in range(numSystems)]
+    coordinates = [(rng.random(), rng.random()) for _ in range(numSystems)]
+    neighbours = {name: [] for name in names}
+    for first in range(numSystems):
+        for second in range(first + 1, numSystems):
+            if (coordinates[first][0] - coordinates[second][0]) ** 2 \
+                    + (coordinates[first][1] - coordinates[second][1]) ** 2 <= jumpRange ** 2:
+                neighbours[names[first]].append(names[second])
+                neighbours[names[second]].append(names[first])
+    return {name: solarSystem.SolarSystem(name, "neutral", neighbours[name], 0, coords)
+            for name, coords in zip(names, coordinates)}
+
+
+def loadBuiltInGalaxy() -> Dict[str, solarSystem.SolarSystem]:
+    """Load the builtIn solar systems from the META.json files of the .bbSystem folders in
+    cfg.paths.SolarSystemMETAFolder. This avoids gameConfigurator, which needs the bot's config to be initialised.
+
+    :return: A dictionary mapping system names to solarSystem objects, or None if the folder does not exist
+    :rtype: Dict[str, solarSystem.SolarSystem]
+    """
+    systemsDir = os.path.normpath(cfg.paths["SolarSystemMETAFolder"])
+    if not os.path.isdir(systemsDir):
+        return None
+    graph = {}
+    for subdir, dirs, _ in os.walk(systemsDir):
+        for dirname in dirs:
+            if dirname.lower().endswith(".bbsystem"):
+                with open(os.path.join(subdir, dirname, "META.json"), "r") as f:
+                    syst = solarSystem.SolarSystem.fromDict(json.loads(f.read()))
+                graph[syst.name] = syst
+    return graph
+
+
+def bfsJumps(start : str, graph : Dict[str, solarSystem.SolarSystem]) -> Dict[str, int]:
+    """Count the fewest jumps needed to reach every system reachable from start, by breadth-first search.
+
+    :param str start: The name of the system to search from
+    :param dict[str, solarSystem] graph: A dictionary mapping system names to solarSystem objects
+    :return: A dictionary mapping the names of all systems reachable from start to the number of jumps needed
+    :rtype: Dict[str, int]
+    """
+    jumps = {start: 0}
+    frontier = deque([start])
+    while frontier:
+        current = frontier.popleft()
+        for neighbour in graph[current].neighbours:
+            if neighbour in graph and neighbour not in jumps:
+                jumps[neighbour] = jumps[current] + 1
+                frontier.append(neighbour)
+    return jumps
+
+
+def isValidRoute(route : List[str], start : str, end : str, graph : Dict[str, solarSystem.SolarSystem]) -> bool:
+    """Decide whether a route runs from start to end, only jumping between neighbouring systems.
+
+    :param List[str] route: The names of the systems along the route, in order
+    :param str start: The name of the system the route should start at
+    :param str end: The name of the system the route should end at
+    :param dict[str, solarSystem] graph: A dictionary mapping system names to solarSystem objects
+    :return: True if route is a valid route from start to end, False otherwise
+    :rtype: bool
+    """
+    return route[0] == start and route[-1] == end \
+        and all(route[i + 1] in graph[route[i]].neighbours for i in range(len(route) - 1))
@@ -0,0 +1,96 @@
+"""The list-backed Inventory used before inventories were backed by their ordered listings dict, kept as a reference
+for tests and benchmarks to compare the current Inventory against.
+"""
+from bot.gameObjects.inventories import inventoryListing
+
+
+class ListInventory:
+    """An inventory keeping its item types in a list alongside its listings dict, as Inventory once did.
+    Membership checks scan the list, and removing an item type removes it from the list.
+
+    :var items: The actual item listings
+    :vartype items: dict[object, InventoryListing]
+    :var keys: The item types stored, in the order in which they were added
+    :vartype keys: list[object]
+    :var totalItems: The total number of items stored; the sum of all item quantities
+    :vartype totalItems: int
+    :var numKeys: The number of item types stored; the length of self.keys
+    :vartype numKeys: int
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.keys = []
+        self.totalItems = 0
+        self.numKeys = 0
+
+
+    def addItem(self, item : object, quantity : int = 1):
+        if quantity < 0:
+            raise ValueError("Quantity must be at least 1")
+        self.totalItems += quantity
+        if item in self.items:
+            self.items[item].count += quantity
+        else:
+            self.items[item] = inventoryListing.InventoryListing(item, quantity)
+            self.keys.append(item)
+            self.numKeys += 1
+
+
+    def removeItem(self, item : object, quantity : int = 1):
+        if item in self.items and self.items[item].count >= quantity:
+            self.items[item].count -= quantity
+            self.totalItems -= quantity
+            if self.items[item].count == 0:
+                for i in range(len(self.keys)):
+                    if self.keys[i] is item:
+                        self.keys.pop(i)
+                        break
+                self.numKeys -= 1
+                del self.items[item]
+        else:
+            raise ValueError("Attempted to remove " + str(quantity) + " " + str(item) + "(s) when " \
+                                + (str(self.items[item].count) if item in self.items else "0") + " are in inventory")
+
+
+    def numPages(self, itemsPerPage : int) -> int:
+        return int(self.numKeys / itemsPerPage) + (0 if self.numKeys % itemsPerPage == 0 else 1)
+
+
+    def getPage(self, pageNum : int, itemsPerPage : int) -> list:
+        if pageNum < 1 or pageNum > self.numPages(itemsPerPage):
+            raise IndexError("pageNum out of range. min=1 max=" + str(self.numPages(itemsPerPage)))
+        return [self.items[item] for item in self.keys[(pageNum - 1) * itemsPerPage: min(pageNum * itemsPerPage,
+                                                                                            self.numKeys)]]
+
+
+    def stores(self, item) -> bool:
+        return item in self.keys
+
+
+    def numStored(self, item) -> int:
+        return self.items[item].count if self.stores(item) else 0
+
+
+    def isEmpty(self) -> bool:
+        return self.totalItems == 0
+
+
+    def clear(self):
+        self.items = {}
+        self.keys = []
+        self.totalItems = 0
+        self.numKeys = 0
+
+
+    def __getitem__(self, key : int) -> inventoryListing.InventoryListing:
+        if bool(self.keys):
+            if key in range(len(self.keys)):
+                return self.items[self.keys[key]]
+            raise IndexError("Key of incorrect type or out of range: " + str(key) + ". Valid range: 0 - " \
+                                + str(len(self.keys) - 1))
+        raise ValueError("Attempted to fetch key " + str(key) + ", but keys list is empty")
+
+
+    def __contains__(self, item) -> bool:
+        return item in self.keys
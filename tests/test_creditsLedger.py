@@ -0,0 +1,152 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from bot.databases import creditsLedger
+from bot.databases.creditsLedger import CreditsLedger, LedgerEvent, recordFormat
+
+# The number of days of history kept by the ledgers under test
+RETENTION_DAYS = 7
+# The day number of the first day on which events are recorded
+FIRST_DAY = 19000
+
+
+def dayStart(day):
+    """Get the UTC time at the start of the given day number.
+    """
+    return datetime(1970, 1, 1) + timedelta(days=day)
+
+
+class TestCreditsLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tempDir, "ledger.bin")
+
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+
+    def readFileRecords(self):
+        with open(self.filePath, "rb") as f:
+            return list(recordFormat.iter_unpack(f.read()))
+
+
+    def test_recordEncoding(self):
+        ledger = CreditsLedger(RETENTION_DAYS)
+        when = dayStart(FIRST_DAY) + timedelta(hours=5, seconds=7)
+        timestamp = FIRST_DAY * creditsLedger.secondsPerDay + 5 * 3600 + 7
+        # Discord IDs use all 64 bits, and credits may be lost as well as gained
+        ledger.record(2 ** 64 - 1, -123456789, LedgerEvent.shopPurchase, when=when)
+        ledger.record(42, 0, LedgerEvent.bounty, when=when)
+        ledger.recordTransfer(1, 2, 500, LedgerEvent.payment, when=when)
+        self.assertEqual(len(ledger.unsaved), 3 * recordFormat.size)
+        self.assertEqual(list(recordFormat.iter_unpack(ledger.unsaved)),
+                            [(timestamp, 2 ** 64 - 1, -123456789, LedgerEvent.shopPurchase),
+                                (timestamp, 1, -500, LedgerEvent.payment), (timestamp, 2, 500, LedgerEvent.payment)])
+        self.assertEqual(creditsLedger.dayNumber(when), FIRST_DAY)
+
+
+    def test_saveLoadRoundTrip(self):
+        rng = random.Random(45)
+        ledger = CreditsLedger(RETENTION_DAYS)
+        events = []
+        for saveNum in range(3):
+            for _ in range(50):
+                event = (rng.randrange(10), rng.randint(-1000, 1000), rng.choice((LedgerEvent.bounty, LedgerEvent.duel)),
+                            dayStart(FIRST_DAY + saveNum) + timedelta(seconds=rng.randrange(creditsLedger.secondsPerDay)))
+                ledger.record(*event[:3], when=event[3])
+                if event[1] != 0:
+                    events.append(event)
+            ledger.save(self.filePath, today=FIRST_DAY + saveNum)
+            self.assertEqual(len(ledger.unsaved), 0)
+            # Saves within the retention window only append
+            self.assertEqual(len(self.readFileRecords()), len(events))
+
+        loaded = CreditsLedger.load(self.filePath, RETENTION_DAYS, today=FIRST_DAY + 2)
+        self.assertEqual(loaded.dailyTotals, ledger.dailyTotals)
+        self.assertEqual(loaded.oldestDay, FIRST_DAY)
+        self.assertEqual([record[1:] for record in self.readFileRecords()],
+                            [(userID, amount, eventType) for userID, amount, eventType, _ in events])
+        for numDays in range(1, RETENTION_DAYS + 1):
+            self.assertEqual(loaded.windowTotals(numDays, today=FIRST_DAY + 2),
+                                ledger.windowTotals(numDays, today=FIRST_DAY + 2))
+
+
+    def test_compaction(self):
+        ledger = CreditsLedger(RETENTION_DAYS)
+        for day in range(FIRST_DAY, FIRST_DAY + 10):
+            ledger.record(day - FIRST_DAY, 10, LedgerEvent.bounty, when=dayStart(day))
+            ledger.save(self.filePath, today=day)
+            cutoff = day - RETENTION_DAYS + 1
+            self.assertTrue(all(bucketDay >= cutoff for bucketDay in ledger.dailyTotals))
+            self.assertEqual(ledger.oldestDay, max(cutoff, FIRST_DAY))
+            fileDays = [timestamp // creditsLedger.secondsPerDay for timestamp, _, _, _ in self.readFileRecords()]
+            self.assertEqual(fileDays, list(range(max(cutoff, FIRST_DAY), day + 1)))
+
+
+    def test_loadSkipsOutOfDateRecords(self):
+        ledger = CreditsLedger(RETENTION_DAYS)
+        for day in range(FIRST_DAY, FIRST_DAY + 3):
+            ledger.record(1, 10, LedgerEvent.bounty, when=dayStart(day))
+        ledger.save(self.filePath, today=FIRST_DAY + 2)
+
+        today = FIRST_DAY + RETENTION_DAYS
+        loaded = CreditsLedger.load(self.filePath, RETENTION_DAYS, today=today)
+        self.assertEqual(sorted(loaded.dailyTotals), [FIRST_DAY + 1, FIRST_DAY + 2])
+        # The out of date record is noted, so that the next save compacts the file
+        self.assertEqual(loaded.oldestDay, FIRST_DAY)
+        loaded.save(self.filePath, today=today)
+        self.assertEqual(len(self.readFileRecords()), 2)
+        self.assertEqual(loaded.oldestDay, FIRST_DAY + 1)
+
+
+    def test_partialRecordTruncated(self):
+        ledger = CreditsLedger(RETENTION_DAYS)
+        ledger.record(1, 10, LedgerEvent.bounty, when=dayStart(FIRST_DAY))
+        ledger.record(2, 20, LedgerEvent.bounty, when=dayStart(FIRST_DAY))
+        ledger.save(self.filePath, today=FIRST_DAY)
+        # Simulate a crash part way through appending a record
+        with open(self.filePath, "ab") as f:
+            f.write(recordFormat.pack(0, 3, 30, LedgerEvent.bounty)[:recordFormat.size // 2])
+
+        loaded = CreditsLedger.load(self.filePath, RETENTION_DAYS, today=FIRST_DAY)
+        self.assertEqual(os.path.getsize(self.filePath), 2 * recordFormat.size)
+        self.assertEqual(loaded.windowTotals(1, today=FIRST_DAY), {1: 10, 2: 20})
+        # New records are appended in line with the old ones
+        loaded.record(3, 30, LedgerEvent.bounty, when=dayStart(FIRST_DAY))
+        loaded.save(self.filePath, today=FIRST_DAY)
+        self.assertEqual([record[1:3] for record in self.readFileRecords()], [(1, 10), (2, 20), (3, 30)])
+
+
+    def test_loadMissingFile(self):
+        loaded = CreditsLedger.load(self.filePath, RETENTION_DAYS, today=FIRST_DAY)
+        self.assertEqual(loaded.dailyTotals, {})
+        self.assertEqual(loaded.oldestDay, -1)
+
+
+    def test_windowTotalsAndTopEarners(self):
+        rng = random.Random(4545)
+        ledger = CreditsLedger(RETENTION_DAYS)
+        events = []
+        for _ in range(500):
+            event = (rng.randrange(20), rng.randint(-500, 1000), FIRST_DAY + rng.randrange(RETENTION_DAYS))
+            ledger.record(event[0], event[1], LedgerEvent.bounty, when=dayStart(event[2]))
+            events.append(event)
+        today = FIRST_DAY + RETENTION_DAYS - 1
+        for numDays in range(1, RETENTION_DAYS + 1):
+            expected = {}
+            for userID, amount, day in events:
+                if day > today - numDays and amount != 0:
+                    expected[userID] = expected.get(userID, 0) + amount
+            self.assertEqual(ledger.windowTotals(numDays, today=today), expected)
+            ranked = sorted(expected.items(), key=lambda entry: (-entry[1], entry[0]))
+            self.assertEqual(ledger.topEarners(numDays, 5, today=today), ranked[:5])
+            self.assertEqual(ledger.topEarners(numDays, 5, include=lambda userID: userID % 2 == 0, today=today),
+                                [entry for entry in ranked if entry[0] % 2 == 0][:5])
+        with self.assertRaises(ValueError):
+            ledger.windowTotals(RETENTION_DAYS + 1)
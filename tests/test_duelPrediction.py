@@ -0,0 +1,113 @@
+import itertools
+import math
+import unittest
+
+from bot.gameObjects.battles import duelPrediction
+
+# The number of fights to simulate in each prediction
+NUM_FIGHTS = 20000
+# The variance applied to ship statistics in every simulation
+VARIANCE_PERCENT = 0.5
+# Pairs of ship (health, DPS) statistics to simulate fights between.
+# Statistics are small, so that every possible fight can be enumerated to find the exact win chances.
+MATCHUPS = (((20, 10), (20, 10)), ((30, 8), (20, 12)), ((14, 6), (40, 4)), ((25, 0), (18, 6)))
+
+
+def exactWinChances(ship1Stats, ship2Stats, variancePercent):
+    """Calculate the exact chance of each ship winning a fight, by enumerating every combination of varied statistics.
+    Statistics are varied uniformly over integers, as in duelRequest.fightShips.
+    """
+    statRanges = [range(int(stat - stat * variancePercent), int(stat + stat * variancePercent) + 1)
+                    for stat in ship1Stats + ship2Stats]
+    ship1Wins = ship2Wins = numFights = 0
+    for ship1HP, ship1DPS, ship2HP, ship2DPS in itertools.product(*statRanges):
+        ship1TTK = ship1HP / ship2DPS if ship2DPS > 0 else math.inf
+        ship2TTK = ship2HP / ship1DPS if ship1DPS > 0 else math.inf
+        numFights += 1
+        if ship1TTK > ship2TTK:
+            ship1Wins += 1
+        elif ship2TTK > ship1TTK:
+            ship2Wins += 1
+    return ship1Wins / numFights, ship2Wins / numFights
+
+
+class TestWinChanceInterval(unittest.TestCase):
+
+    def test_knownValues(self):
+        # Wilson score intervals at 95% confidence, from published tables
+        for wins, numFights, expected in ((5, 10, (0.2366, 0.7634)), (0, 10, (0.0, 0.2775)), (10, 10, (0.7225, 1.0)),
+                                            (50, 100, (0.4038, 0.5962)), (81, 263, (0.2553, 0.3662))):
+            with self.subTest(wins=wins, numFights=numFights):
+                for bound, expectedBound in zip(duelPrediction.winChanceInterval(wins, numFights), expected):
+                    self.assertAlmostEqual(bound, expectedBound, places=4)
+
+
+    def test_containsWinRate(self):
+        for numFights in (1, 7, 100, 10000):
+            for wins in range(0, numFights + 1, max(1, numFights // 10)):
+                low, high = duelPrediction.winChanceInterval(wins, numFights)
+                self.assertLessEqual(0, low)
+                self.assertLessEqual(low, wins / numFights)
+                self.assertLessEqual(wins / numFights, high)
+                self.assertLessEqual(high, 1)
+
+
+class TestSimulateFights(unittest.TestCase):
+    """Check that the NumPy and pure Python simulators both estimate the exact win chances, and agree with each other.
+    """
+
+    def assertIntervalsContain(self, ship1Wins, ship2Wins, expected):
+        for wins, winChance in zip((ship1Wins, ship2Wins), expected):
+            low, high = duelPrediction.winChanceInterval(wins, NUM_FIGHTS)
+            # Widen the 95% interval a little, so that the seeded tests are not on the edge of failing
+            slack = (high - low) / 2
+            self.assertLessEqual(low - slack, winChance)
+            self.assertLessEqual(winChance, high + slack)
+
+
+    def test_pythonSimulator(self):
+        for seed, (ship1Stats, ship2Stats) in enumerate(MATCHUPS):
+            with self.subTest(ship1Stats=ship1Stats, ship2Stats=ship2Stats):
+                ship1Wins, ship2Wins, _, _ = duelPrediction._simulateFightsPython(ship1Stats, ship2Stats,
+                                                                                    VARIANCE_PERCENT, NUM_FIGHTS, seed)
+                self.assertIntervalsContain(ship1Wins, ship2Wins,
+                                            exactWinChances(ship1Stats, ship2Stats, VARIANCE_PERCENT))
+
+
+    @unittest.skipIf(duelPrediction.np is None, "NumPy is not installed")
+    def test_numpySimulator(self):
+        for seed, (ship1Stats, ship2Stats) in enumerate(MATCHUPS):
+            with self.subTest(ship1Stats=ship1Stats, ship2Stats=ship2Stats):
+                ship1Wins, ship2Wins, _, _ = duelPrediction._simulateFightsNumpy(ship1Stats, ship2Stats,
+                                                                                    VARIANCE_PERCENT, NUM_FIGHTS, seed)
+                self.assertIntervalsContain(ship1Wins, ship2Wins,
+                                            exactWinChances(ship1Stats, ship2Stats, VARIANCE_PERCENT))
+
+
+    @unittest.skipIf(duelPrediction.np is None, "NumPy is not installed")
+    def test_simulatorsAgree(self):
+        for seed, (ship1Stats, ship2Stats) in enumerate(MATCHUPS):
+            with self.subTest(ship1Stats=ship1Stats, ship2Stats=ship2Stats):
+                pythonResult = duelPrediction._simulateFightsPython(ship1Stats, ship2Stats, VARIANCE_PERCENT,
+                                                                    NUM_FIGHTS, seed)
+                numpyResult = duelPrediction._simulateFightsNumpy(ship1Stats, ship2Stats, VARIANCE_PERCENT,
+                                                                    NUM_FIGHTS, seed)
+                # Each simulator's win rate lies within the other's confidence interval
+                for wins, otherWins in zip(pythonResult[:2], numpyResult[:2]):
+                    self.assertIntervalsContain(wins, 0, (otherWins / NUM_FIGHTS, 0))
+                    self.assertIntervalsContain(otherWins, 0, (wins / NUM_FIGHTS, 0))
+                for pythonTTK, numpyTTK in zip(pythonResult[2:], numpyResult[2:]):
+                    if pythonTTK["mean"] is None:
+                        self.assertIsNone(numpyTTK["mean"])
+                    else:
+                        self.assertAlmostEqual(pythonTTK["mean"], numpyTTK["mean"], delta=0.05 * pythonTTK["mean"])
+
+
+    def test_seedRepeatsSimulation(self):
+        ship1Stats, ship2Stats = MATCHUPS[1]
+        simulators = [duelPrediction._simulateFightsPython]
+        if duelPrediction.np is not None:
+            simulators.append(duelPrediction._simulateFightsNumpy)
+        for simulate in simulators:
+            self.assertEqual(simulate(ship1Stats, ship2Stats, VARIANCE_PERCENT, 1000, 46),
+                                simulate(ship1Stats, ship2Stats, VARIANCE_PERCENT, 1000, 46))
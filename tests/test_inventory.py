@@ -0,0 +1,110 @@
+from __future__ import annotations
+import random
+import unittest
+
+from bot.baseClasses import serializable
+from bot.gameObjects.inventories import inventory
+from tests.listInventory import ListInventory
+
+# The number of random inventory operations to make in each test run
+NUM_STEPS = 20000
+# The number of distinct items to add and remove
+NUM_ITEMS = 300
+# The number of listings per page when comparing pages
+ITEMS_PER_PAGE = 7
+
+
+class Item(serializable.Serializable):
+    """An item compared by identity, as game items are in inventories.
+    """
+    def __init__(self, itemNum):
+        self.itemNum = itemNum
+
+
+    def __repr__(self):
+        return "Item " + str(self.itemNum)
+
+
+    def toDict(self, **kwargs) -> dict:
+        return {"itemNum": self.itemNum}
+
+
+    @classmethod
+    def fromDict(cls, data : dict, **kwargs) -> Item:
+        return Item(data["itemNum"])
+
+
+class TestInventory(unittest.TestCase):
+    """Make the same random additions and removals to an Inventory and to the list-backed inventory it replaced,
+    checking that both always hold the same listings in the same order.
+    """
+
+    def assertInventoriesMatch(self, expected, actual):
+        self.assertEqual(expected.numKeys, actual.numKeys)
+        self.assertEqual(expected.totalItems, actual.totalItems)
+        self.assertEqual(expected.isEmpty(), actual.isEmpty())
+        self.assertEqual(expected.numPages(ITEMS_PER_PAGE), actual.numPages(ITEMS_PER_PAGE))
+        for pageNum in range(1, expected.numPages(ITEMS_PER_PAGE) + 1):
+            self.assertEqual([(listing.item, listing.count) for listing in expected.getPage(pageNum, ITEMS_PER_PAGE)],
+                                [(listing.item, listing.count) for listing in actual.getPage(pageNum, ITEMS_PER_PAGE)])
+        for keyNum in range(expected.numKeys):
+            self.assertIs(expected[keyNum].item, actual[keyNum].item)
+
+
+    def test_matchesListInventory(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                items = [Item(itemNum) for itemNum in range(NUM_ITEMS)]
+                expected = ListInventory()
+                actual = inventory.Inventory()
+                for step in range(NUM_STEPS):
+                    item = rng.choice(items)
+                    operation = rng.random()
+                    if operation < 0.5:
+                        quantity = rng.randint(1, 3)
+                        expected.addItem(item, quantity)
+                        actual.addItem(item, quantity)
+                    elif operation < 0.8:
+                        if expected.stores(item):
+                            quantity = rng.randint(1, expected.numStored(item))
+                            expected.removeItem(item, quantity)
+                            actual.removeItem(item, quantity)
+                        else:
+                            self.assertRaises(ValueError, actual.removeItem, item)
+                    elif operation < 0.999:
+                        self.assertEqual(expected.stores(item), actual.stores(item))
+                        self.assertEqual(item in expected, item in actual)
+                        self.assertEqual(expected.numStored(item), actual.numStored(item))
+                        if expected.numKeys:
+                            keyNum = rng.randrange(expected.numKeys)
+                            self.assertIs(expected[keyNum].item, actual[keyNum].item)
+                    else:
+                        expected.clear()
+                        actual.clear()
+                    if step % 500 == 0:
+                        self.assertInventoriesMatch(expected, actual)
+                self.assertInventoriesMatch(expected, actual)
+
+
+    def test_changeListenerSeesChangedInventory(self):
+        rng = random.Random(43)
+        items = [Item(itemNum) for itemNum in range(20)]
+        inv = inventory.Inventory()
+        listenedCounts = {item: 0 for item in items}
+
+        def changeListener(item, quantity):
+            listenedCounts[item] += quantity
+            # The listener is called after the change, so the inventory already holds the new quantity
+            self.assertEqual(inv.numStored(item), listenedCounts[item])
+
+        inv.changeListener = changeListener
+        for step in range(2000):
+            item = rng.choice(items)
+            if rng.random() < 0.6:
+                inv.addItem(item, rng.randint(1, 3))
+            elif inv.stores(item):
+                inv.removeItem(item, rng.randint(1, inv.numStored(item)))
+            if step % 100 == 99:
+                inv.clear()
+                self.assertEqual(set(listenedCounts.values()), {0})
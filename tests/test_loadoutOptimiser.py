@@ -0,0 +1,151 @@
+import itertools
+import random
+import unittest
+from unittest import mock
+
+from bot.cfg import cfg
+from bot.gameObjects.items import loadoutOptimiser, shipItem
+from bot.gameObjects.items.modules import armourModule, compressorModule, primaryWeaponModModule, shieldModule, \
+    thrusterModule, moduleItem
+from bot.gameObjects.items.weapons import primaryWeapon, turretWeapon
+
+# The number of random ships and item pools to optimise for each objective
+NUM_CASES = 40
+# The Ship getter for each stat in loadoutOptimiser.STATS
+STAT_GETTERS = {"dps": "getDPS", "shield": "getShield", "armour": "getArmour", "cargo": "getCargo",
+                "handling": "getHandling"}
+# Module type equip limits to test with. maxModuleTypeEquips is keyed by class name, as in Ship.canEquipModuleType.
+TYPE_LIMITS = {"ArmourModule": 1, "ShieldModule": 2, "ThrusterModule": 1, "CompressorModule": -1,
+                "PrimaryWeaponModModule": 2}
+
+
+def makeModule(rng, moduleNum):
+    """Create a random module of a type in TYPE_LIMITS, or a module with no type limit.
+    """
+    name = "Module " + str(moduleNum)
+    value = rng.randint(0, 5000)
+    return rng.choice((
+        lambda: armourModule.ArmourModule(name, [], armour=rng.randint(10, 300), value=value),
+        lambda: shieldModule.ShieldModule(name, [], shield=rng.randint(10, 300), value=value),
+        lambda: thrusterModule.ThrusterModule(name, [], handlingMultiplier=rng.choice((1.1, 1.25, 1.5)), value=value),
+        lambda: compressorModule.CompressorModule(name, [], cargoMultiplier=rng.choice((1.1, 1.2)), value=value),
+        lambda: primaryWeaponModModule.PrimaryWeaponModModule(name, [], dpsMultiplier=rng.choice((1.1, 1.3)),
+                                                                value=value),
+        # Modules without a type limit may add to and multiply several stats
+        lambda: moduleItem.ModuleItem(name, [], armour=rng.randint(0, 100), shieldMultiplier=rng.choice((1, 1.2)),
+                                        dps=rng.randint(0, 50), cargo=rng.randint(0, 30),
+                                        handlingMultiplier=rng.choice((1, 1.1)), value=value)))()
+
+
+def makePools(rng):
+    """Create random pools of weapons, turrets and modules to choose from, including repeated copies of some items.
+    """
+    weapons = [primaryWeapon.PrimaryWeapon("Weapon " + str(i), [], dps=rng.randint(10, 200), value=rng.randint(0, 5000))
+                for i in range(rng.randint(0, 3))]
+    turrets = [turretWeapon.TurretWeapon("Turret " + str(i), [], dps=rng.randint(10, 200), value=rng.randint(0, 5000))
+                for i in range(rng.randint(0, 2))]
+    modules = [makeModule(rng, i) for i in range(rng.randint(2, 5))]
+    # Copies of the same item are held as repeated references, as in inventories
+    return [pool + [rng.choice(pool) for _ in range(rng.randint(0, 2))] if pool else pool
+            for pool in (weapons, turrets, modules)]
+
+
+def makeShip(rng, **kwargs):
+    return shipItem.Ship("Ship", rng.randint(0, 2), rng.randint(0, 2), rng.randint(1, 3), armour=rng.randint(0, 500),
+                            cargo=rng.randint(0, 100), handling=rng.randint(0, 100), **kwargs)
+
+
+def score(ship, objective):
+    return sum(getattr(ship, STAT_GETTERS[stat])() for stat in loadoutOptimiser.objectiveStats[objective])
+
+
+def selections(pool, numSlots):
+    """Every selection of at most numSlots items from pool.
+    """
+    for numChosen in range(min(numSlots, len(pool)) + 1):
+        yield from itertools.combinations(pool, numChosen)
+
+
+def bruteForceScore(ship, weapons, turrets, modules, objective, budget):
+    """Find the best score of any loadout, by equipping every possible selection of items onto a copy of ship.
+    """
+    best = None
+    for chosenWeapons in selections(weapons, ship.maxPrimaries):
+        for chosenTurrets in selections(turrets, ship.maxTurrets):
+            for chosenModules in selections(modules, ship.maxModules):
+                if budget != -1 and sum(item.getValue() for item in chosenWeapons + chosenTurrets + chosenModules) > budget:
+                    continue
+                typeCounts = {}
+                for module in chosenModules:
+                    typeCounts[type(module).__name__] = typeCounts.get(type(module).__name__, 0) + 1
+                if any(TYPE_LIMITS.get(typeName, -1) != -1 and count > TYPE_LIMITS[typeName]
+                        for typeName, count in typeCounts.items()):
+                    continue
+                equipped = shipItem.Ship("Equipped", ship.maxPrimaries, ship.maxTurrets, ship.maxModules,
+                                            armour=ship.armour, cargo=ship.cargo, handling=ship.handling,
+                                            weapons=chosenWeapons, turrets=chosenTurrets, modules=chosenModules)
+                equippedScore = score(equipped, objective)
+                if best is None or equippedScore > best:
+                    best = equippedScore
+    return best
+
+
+class TestOptimiseLoadout(unittest.TestCase):
+    """Check that optimiseLoadout finds a loadout as good as the best found by trying every possible loadout.
+    """
+
+    def setUp(self):
+        patcher = mock.patch.dict(cfg.maxModuleTypeEquips, TYPE_LIMITS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    def assertLoadoutValid(self, ship, loadout, weapons, turrets, modules, budget):
+        self.assertLessEqual(len(loadout.weapons), ship.maxPrimaries)
+        self.assertLessEqual(len(loadout.turrets), ship.maxTurrets)
+        self.assertLessEqual(len(loadout.modules), ship.maxModules)
+        for chosen, pool in ((loadout.weapons, weapons), (loadout.turrets, turrets), (loadout.modules, modules)):
+            for item in set(chosen):
+                self.assertLessEqual(chosen.count(item), pool.count(item))
+        value = sum(item.getValue() for item in loadout.weapons + loadout.turrets + loadout.modules)
+        self.assertEqual(loadout.value, value)
+        if budget != -1:
+            self.assertLessEqual(value, budget)
+        # Equipping the loadout one item at a time checks the module type limits
+        equipped = shipItem.Ship("Equipped", ship.maxPrimaries, ship.maxTurrets, ship.maxModules, armour=ship.armour,
+                                    cargo=ship.cargo, handling=ship.handling)
+        for weapon in loadout.weapons:
+            equipped.equipWeapon(weapon)
+        for turret in loadout.turrets:
+            equipped.equipTurret(turret)
+        for module in loadout.modules:
+            equipped.equipModule(module)
+        for stat, getterName in STAT_GETTERS.items():
+            self.assertAlmostEqual(loadout.stats[stat], getattr(equipped, getterName)())
+        return equipped
+
+
+    def test_matchesBruteForce(self):
+        rng = random.Random(48)
+        for objective in loadoutOptimiser.objectiveStats:
+            for caseNum in range(NUM_CASES):
+                ship = makeShip(rng)
+                weapons, turrets, modules = makePools(rng)
+                totalValue = sum(item.getValue() for item in weapons + turrets + modules)
+                budget = rng.choice((-1, 0, rng.randint(0, totalValue), rng.randint(0, totalValue // 3)))
+                with self.subTest(objective=objective, caseNum=caseNum, budget=budget):
+                    loadout = loadoutOptimiser.optimiseLoadout(ship, weapons, turrets, modules, objective, budget=budget)
+                    equipped = self.assertLoadoutValid(ship, loadout, weapons, turrets, modules, budget)
+                    self.assertTrue(loadout.optimal)
+                    self.assertAlmostEqual(loadout.score, score(equipped, objective))
+                    self.assertAlmostEqual(loadout.score, bruteForceScore(ship, weapons, turrets, modules, objective,
+                                                                            budget))
+
+
+    def test_maxNodesCutsSearchShort(self):
+        rng = random.Random(4848)
+        ship = makeShip(rng)
+        weapons, turrets, modules = makePools(rng)
+        loadout = loadoutOptimiser.optimiseLoadout(ship, weapons, turrets, modules, "health", maxNodes=1)
+        self.assertFalse(loadout.optimal)
+        self.assertLoadoutValid(ship, loadout, weapons, turrets, modules, -1)
@@ -0,0 +1,82 @@
+import random
+import unittest
+
+from bot.cfg import bbData, cfg
+from bot.gameObjects.bounties import npcFleet
+from bot.gameObjects.items import shipItem
+from bot.gameObjects.items.modules import armourModule
+from bot.gameObjects.items.weapons import primaryWeapon, turretWeapon
+
+# The bbData attributes replaced with a small synthetic catalogue for the duration of each test
+CATALOGUE_ATTRS = ("shipKeysByTL", "builtInShipPrototypes", "weaponObjsByTL", "moduleObjsByTL", "turretObjsByTL")
+# The number of loadouts to generate for each tech level at once
+POOL_SIZE = 20
+
+
+def describeShip(ship):
+    """Summarise a ship's loadout as a comparable tuple of item names.
+    """
+    return (ship.name, [weapon.name for weapon in ship.weapons], [module.name for module in ship.modules],
+            [turret.name for turret in ship.turrets])
+
+
+class TestNPCFleet(unittest.TestCase):
+    """Take ships from an NPC fleet of a small random catalogue, checking that ships taken with a seeded random number
+    generator are reproducible, and leave the pools untouched.
+    """
+
+    def setUp(self):
+        self.oldCatalogue = {attr: getattr(bbData, attr) for attr in CATALOGUE_ATTRS}
+        rng = random.Random(1)
+        techLevels = range(cfg.minTechLevel, cfg.maxTechLevel + 1)
+        bbData.shipKeysByTL = [["Ship " + str(techLevel) + "-" + str(i) for i in range(2)] for techLevel in techLevels]
+        bbData.builtInShipPrototypes = {shipKey: shipItem.Ship(shipKey, rng.randint(1, 4), rng.randint(0, 3),
+                                                                rng.randint(1, 5), techLevel=techLevel)
+                                        for techLevel, tlShipKeys in zip(techLevels, bbData.shipKeysByTL)
+                                        for shipKey in tlShipKeys}
+        bbData.weaponObjsByTL = [[primaryWeapon.PrimaryWeapon("Weapon " + str(techLevel) + "-" + str(i), [],
+                                                                dps=rng.randint(10, 500), techLevel=techLevel)
+                                    for i in range(3)] for techLevel in techLevels]
+        # One tech level with no items, to cover empty slots
+        bbData.moduleObjsByTL = [[armourModule.ArmourModule("Armour " + str(techLevel) + "-" + str(i), [],
+                                                            armour=rng.randint(10, 300), techLevel=techLevel)
+                                    for i in range(0 if techLevel == cfg.minTechLevel else 2)] for techLevel in techLevels]
+        bbData.turretObjsByTL = [[turretWeapon.TurretWeapon("Turret " + str(techLevel) + "-" + str(i), [],
+                                                            dps=rng.randint(10, 500), techLevel=techLevel)
+                                    for i in range(2)] for techLevel in techLevels]
+        self.fleet = npcFleet.NPCFleet(POOL_SIZE)
+        self.fleet.refill()
+
+
+    def tearDown(self):
+        for attr, value in self.oldCatalogue.items():
+            setattr(bbData, attr, value)
+
+
+    def test_seededShipsReproducible(self):
+        for techLevel in range(cfg.minTechLevel, cfg.maxTechLevel + 1):
+            for seed in range(10):
+                first = self.fleet.takeShip(techLevel, random.Random(seed))
+                second = self.fleet.takeShip(techLevel, random.Random(seed))
+                self.assertEqual(describeShip(first), describeShip(second))
+                self.assertIn(first.name, bbData.shipKeysByTL[techLevel - 1])
+                self.assertIsNot(first, second)
+
+
+    def test_seededShipsLeavePoolUntouched(self):
+        pools = [pool.tobytes() for pool in self.fleet.pools]
+        for techLevel in range(cfg.minTechLevel, cfg.maxTechLevel + 1):
+            self.fleet.takeShip(techLevel, random.Random(techLevel))
+        self.assertEqual(pools, [pool.tobytes() for pool in self.fleet.pools])
+
+
+    def test_seededShipsVary(self):
+        loadouts = {str(describeShip(self.fleet.takeShip(cfg.maxTechLevel, random.Random(seed)))) for seed in range(50)}
+        self.assertGreater(len(loadouts), 1)
+
+
+    def test_unseededShipsTakenFromPool(self):
+        for techLevel in range(cfg.minTechLevel, cfg.maxTechLevel + 1):
+            ship = self.fleet.takeShip(techLevel)
+            self.assertIn(ship.name, bbData.shipKeysByTL[techLevel - 1])
+            self.assertEqual(self.fleet.numShips(techLevel), POOL_SIZE - 1)
@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from bot.lib import galaxyGraph, pathfinding
+from . import galaxies
+
+
+class TestBBAStar(unittest.TestCase):
+    """Check that bbAStar always finds a shortest route, by comparing the number of jumps in its routes with
+    breadth-first search.
+    """
+
+    def assertShortestRoutes(self, graph, starts):
+        maxJumpDistance = pathfinding.longestJump(graph)
+        for start in starts:
+            jumps = galaxies.bfsJumps(start, graph)
+            for end in graph:
+                route = pathfinding.bbAStar(start, end, graph, maxJumpDistance)
+                if end in jumps:
+                    self.assertIsInstance(route, list, start + " -> " + end)
+                    self.assertTrue(galaxies.isValidRoute(route, start, end, graph), route)
+                    self.assertEqual(len(route) - 1, jumps[end], start + " -> " + end)
+                else:
+                    self.assertEqual(route, "! " + start + " -> " + end)
+
+
+    def test_builtInGalaxy(self):
+        graph = galaxies.loadBuiltInGalaxy()
+        if not graph:
+            self.skipTest("builtIn solar systems are not available")
+        self.assertShortestRoutes(graph, graph)
+
+
+    def test_randomGalaxies(self):
+        rng = random.Random(2033)
+        for numSystems, jumpRange in ((2, 1.5), (30, 0.2), (60, 0.15), (120, 0.12), (200, 0.08)):
+            with self.subTest(numSystems=numSystems, jumpRange=jumpRange):
+                graph = galaxies.makeRandomGalaxy(numSystems, jumpRange, rng)
+                self.assertShortestRoutes(graph, rng.sample(list(graph), min(numSystems, 20)))
+
+
+    def test_computedLongestJump(self):
+        graph = galaxies.makeRandomGalaxy(80, 0.15, random.Random(33))
+        maxJumpDistance = pathfinding.longestJump(graph)
+        for start, end in zip(list(graph)[::2], list(graph)[1::2]):
+            self.assertEqual(pathfinding.bbAStar(start, end, graph),
+                                pathfinding.bbAStar(start, end, graph, maxJumpDistance))
+
+
+    def test_routeTableAgrees(self):
+        graph = galaxies.makeRandomGalaxy(100, 0.12, random.Random(34))
+        routeTable = pathfinding.RouteTable.fromGalaxyGraph(galaxyGraph.GalaxyGraph.fromSystems(graph))
+        for start in list(graph)[:20]:
+            for end in graph:
+                aStarRoute = pathfinding.bbAStar(start, end, graph)
+                tableRoute = routeTable.makeRoute(start, end)
+                if isinstance(aStarRoute, str):
+                    self.assertEqual(tableRoute, aStarRoute)
+                else:
+                    self.assertTrue(galaxies.isValidRoute(tableRoute, start, end, graph), tableRoute)
+                    self.assertEqual(len(tableRoute), len(aStarRoute))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import random
+import unittest
+
+from bot.lib.rankedIndex import RankedIndex
+
+# The number of random index operations to make in each test run
+NUM_STEPS = 5000
+# The number of distinct keys to add and remove
+NUM_KEYS = 200
+
+
+class SortedListIndex:
+    """A reference RankedIndex, which sorts every key by score on every read.
+    """
+    def __init__(self):
+        self.scores = {}
+
+
+    def ordered(self):
+        return sorted(self.scores.items(), key=lambda entry: (-entry[1], entry[0]))
+
+
+    def rank(self, key):
+        return [entryKey for entryKey, _ in self.ordered()].index(key)
+
+
+    def rankAmong(self, key, keys):
+        group = set(keys) | {key}
+        ordered = [entryKey for entryKey, _ in self.ordered() if entryKey in group]
+        return ordered.index(key), len(ordered)
+
+
+    def topK(self, k, include=None):
+        return [entry for entry in self.ordered() if include is None or include(entry[0])][:max(k, 0)]
+
+
+class TestRankedIndex(unittest.TestCase):
+    """Make the same random changes to a RankedIndex and to a sorted list, checking that both always rank keys the same.
+    """
+
+    def assertIndexesMatch(self, expected, actual):
+        self.assertEqual(len(actual), len(expected.scores))
+        self.assertEqual(list(actual.iterTop()), expected.ordered())
+        for key in expected.scores:
+            self.assertEqual(actual.rank(key), expected.rank(key))
+
+
+    def assertReadsMatch(self, rng, expected, actual, key, operation):
+        if operation < 0.8:
+            self.assertEqual(key in actual, key in expected.scores)
+            if key in expected.scores:
+                self.assertEqual(actual.rank(key), expected.rank(key))
+            else:
+                self.assertRaises(KeyError, actual.rank, key)
+        elif operation < 0.9:
+            k = rng.randint(-1, 15)
+            modulus = rng.randint(1, 5)
+            include = rng.choice((None, lambda key: key % modulus == 0))
+            self.assertEqual(actual.topK(k, include=include), expected.topK(k, include=include))
+        elif key in expected.scores:
+            # Groups may include keys which are not in the index, and may leave out the ranked key
+            group = rng.sample(range(NUM_KEYS), rng.randint(0, 30))
+            self.assertEqual(actual.rankAmong(key, group), expected.rankAmong(key, group))
+
+
+    def test_matchesSortedList(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                expected = SortedListIndex()
+                actual = RankedIndex(seed=seed)
+                for step in range(NUM_STEPS):
+                    key = rng.randrange(NUM_KEYS)
+                    operation = rng.random()
+                    if operation < 0.5:
+                        # Few distinct scores, so that many keys are ordered by key
+                        score = rng.choice((rng.randint(0, 5), rng.randint(-10 ** 6, 10 ** 6), rng.uniform(-10, 10)))
+                        expected.scores[key] = score
+                        actual.set(key, score)
+                    elif operation < 0.65:
+                        if key in expected.scores:
+                            del expected.scores[key]
+                            actual.remove(key)
+                        else:
+                            self.assertRaises(KeyError, actual.remove, key)
+                    else:
+                        self.assertReadsMatch(rng, expected, actual, key, operation)
+                    if step % 500 == 0:
+                        self.assertIndexesMatch(expected, actual)
+                self.assertIndexesMatch(expected, actual)
+
+
+    def test_emptyIndex(self):
+        index = RankedIndex()
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.topK(5), [])
+        self.assertEqual(list(index.iterTop()), [])
+        self.assertRaises(KeyError, index.rank, 1)
+        self.assertRaises(KeyError, index.remove, 1)
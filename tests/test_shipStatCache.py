@@ -0,0 +1,131 @@
+import random
+import unittest
+
+from bot.gameObjects import shipUpgrade
+from bot.gameObjects.items import shipItem
+from bot.gameObjects.items.modules import armourModule, compressorModule, primaryWeaponModModule, shieldModule, \
+    thrusterModule
+from bot.gameObjects.items.weapons import primaryWeapon, turretWeapon
+
+# The names of all Ship getters memoised with cachedStat
+CACHED_GETTERS = ("getDPS", "getShield", "getArmour", "getCargo", "getHandling", "getMaxSecondaries",
+                    "getMaxPrimaries", "getMaxTurrets", "getMaxModules", "getValue")
+# The number of random loadout changes to make in each test run
+NUM_STEPS = 400
+
+
+def makeItems(rng):
+    """Create a random selection of weapons, modules, turrets and upgrades to equip.
+    """
+    weapons = [primaryWeapon.PrimaryWeapon("Weapon " + str(i), [], dps=rng.randint(10, 500), value=rng.randint(0, 9000))
+                for i in range(6)]
+    turrets = [turretWeapon.TurretWeapon("Turret " + str(i), [], dps=rng.randint(10, 500), value=rng.randint(0, 9000))
+                for i in range(4)]
+    modules = [armourModule.ArmourModule("Armour " + str(i), [], armour=rng.randint(10, 300), value=rng.randint(0, 9000))
+                for i in range(3)] \
+            + [shieldModule.ShieldModule("Shield " + str(i), [], shield=rng.randint(10, 300), value=rng.randint(0, 9000))
+                for i in range(3)] \
+            + [thrusterModule.ThrusterModule("Thruster " + str(i), [], handlingMultiplier=rng.uniform(1, 1.5),
+                                                value=rng.randint(0, 9000)) for i in range(2)] \
+            + [compressorModule.CompressorModule("Compressor " + str(i), [], cargoMultiplier=rng.uniform(1, 1.5),
+                                                    value=rng.randint(0, 9000)) for i in range(2)] \
+            + [primaryWeaponModModule.PrimaryWeaponModModule("Weapon mod " + str(i), [], dpsMultiplier=rng.uniform(1, 1.5),
+                                                                value=rng.randint(0, 9000)) for i in range(2)]
+    upgrades = [shipUpgrade.ShipUpgrade("Upgrade " + str(i), rng.uniform(0.5, 2), armour=rng.randint(0, 50),
+                                        cargo=rng.randint(0, 20), handling=rng.randint(0, 10),
+                                        maxPrimaries=rng.randint(0, 1), maxModules=rng.randint(0, 1),
+                                        maxTurrets=rng.randint(0, 1), maxModulesMultiplier=rng.choice((1, 1.5)))
+                for i in range(4)]
+    return weapons, turrets, modules, upgrades
+
+
+def makeShip(rng, name):
+    return shipItem.Ship(name, rng.randint(1, 4), rng.randint(0, 3), rng.randint(2, 6), armour=rng.randint(100, 1000),
+                            cargo=rng.randint(10, 200), handling=rng.randint(50, 200), value=rng.randint(10000, 90000))
+
+
+def getStat(getter, ship, shipUpgradesOnly):
+    """Call a stat getter, returning the type of any exception raised instead of a value.
+    ShipUpgrades have no dps or shield attributes, so getDPS and getShield raise AttributeError on upgraded ships.
+    The cached getter should raise the same exception as the uncached getter.
+    """
+    try:
+        return getter(ship, shipUpgradesOnly=shipUpgradesOnly)
+    except AttributeError as e:
+        return type(e)
+
+
+class TestShipStatCache(unittest.TestCase):
+    """Make random changes to the loadouts of a fleet of ships, checking after every change that each cached stat getter
+    agrees with the uncached getter.
+    """
+
+    def assertCachesValid(self, ships, step):
+        for shipNum, ship in enumerate(ships):
+            for getterName in CACHED_GETTERS:
+                for shipUpgradesOnly in (False, True):
+                    self.assertEqual(getStat(getattr(shipItem.Ship, getterName), ship, shipUpgradesOnly),
+                                        getStat(getattr(shipItem.Ship, getterName).__wrapped__, ship, shipUpgradesOnly),
+                                        "step " + str(step) + ", ship " + str(shipNum) + ", " + getterName
+                                        + ("(shipUpgradesOnly=True)" if shipUpgradesOnly else ""))
+
+
+    def randomChange(self, rng, ships, weapons, turrets, modules, upgrades):
+        """Make one random change to the loadout of a random ship.
+        """
+        ship = rng.choice(ships)
+        change = rng.randrange(10)
+        if change == 0 and ship.canEquipMoreWeapons():
+            ship.equipWeapon(rng.choice(weapons))
+        elif change == 1 and ship.canEquipMoreTurrets():
+            ship.equipTurret(rng.choice(turrets))
+        elif change == 2:
+            module = rng.choice(modules)
+            if ship.canEquipMoreModules() and ship.canEquipModuleType(type(module)):
+                ship.equipModule(module)
+        elif change == 3:
+            for items, unequipIndex, unequipObj in ((ship.weapons, ship.unequipWeaponIndex, ship.unequipWeaponObj),
+                                                    (ship.modules, ship.unequipModuleIndex, ship.unequipModuleObj),
+                                                    (ship.turrets, ship.unequipTurretIndex, ship.unequipTurretObj)):
+                if items:
+                    if rng.random() < 0.5:
+                        unequipIndex(rng.randrange(len(items)))
+                    else:
+                        unequipObj(rng.choice(items))
+        elif change == 4:
+            ship.applyUpgrade(rng.choice(upgrades))
+        elif change == 5 and len(ships) < 12:
+            ships.append(ship.copy())
+        elif change == 6:
+            # Transferring items to the same ship never terminates
+            ship.transferItemsTo(rng.choice([otherShip for otherShip in ships if otherShip is not ship]))
+        elif change == 7:
+            rng.choice((ship.clearWeapons, ship.clearModules, ship.clearTurrets))()
+
+
+    def test_randomLoadoutChanges(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                weapons, turrets, modules, upgrades = makeItems(rng)
+                ships = [makeShip(rng, "Ship " + str(i)) for i in range(4)]
+                self.assertCachesValid(ships, 0)
+                for step in range(1, NUM_STEPS + 1):
+                    self.randomChange(rng, ships, weapons, turrets, modules, upgrades)
+                    self.assertCachesValid(ships, step)
+
+
+    def test_copyHasOwnCache(self):
+        rng = random.Random(42)
+        weapons, _, _, _ = makeItems(rng)
+        ship = makeShip(rng, "Original")
+        ship.getDPS()
+        shipCopy = ship.copy()
+        shipCopy.equipWeapon(weapons[0])
+        self.assertEqual(ship.getDPS(), shipItem.Ship.getDPS.__wrapped__(ship))
+        self.assertEqual(shipCopy.getDPS(), shipItem.Ship.getDPS.__wrapped__(shipCopy))
+        self.assertNotEqual(ship.getDPS(), shipCopy.getDPS())
+
+
+if __name__ == "__main__":
+    unittest.main()
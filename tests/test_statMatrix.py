@@ -0,0 +1,119 @@
+import math
+import random
+import unittest
+from unittest import mock
+
+from bot.lib import statMatrix
+
+# The names of the stats in the matrices under test
+STATS = ("armour", "cargo", "value", "dps")
+# The number of rows in the matrices under test
+NUM_ROWS = 40
+# The number of random expressions to compare the evaluators with
+NUM_EXPRESSIONS = 300
+
+
+def randomColumns(rng):
+    """Make random stat columns, including zeros to divide by and repeated values to sort.
+    """
+    return {stat: [rng.choice((0, rng.randint(1, 5), rng.randint(0, 10000), rng.uniform(-100, 100)))
+                    for _ in range(NUM_ROWS)] for stat in STATS}
+
+
+def randomArithmetic(rng, depth):
+    """Generate a random arithmetic stat expression.
+    """
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(STATS + (str(rng.randint(0, 100)), str(round(rng.uniform(0, 10), 2))))
+    if rng.random() < 0.15:
+        return "-" + randomArithmetic(rng, depth - 1)
+    return "(" + randomArithmetic(rng, depth - 1) + " " + rng.choice("+-*/") + " " + randomArithmetic(rng, depth - 1) + ")"
+
+
+def randomCondition(rng, depth):
+    """Generate a random boolean stat expression.
+    """
+    if depth == 0 or rng.random() < 0.4:
+        comparisons = [randomArithmetic(rng, 2)]
+        for _ in range(rng.randint(1, 2)):
+            comparisons += [rng.choice(("<", "<=", ">", ">=", "==", "!=")), randomArithmetic(rng, 2)]
+        return " ".join(comparisons)
+    if rng.random() < 0.2:
+        return "not (" + randomCondition(rng, depth - 1) + ")"
+    return "(" + randomCondition(rng, depth - 1) + ") " + rng.choice(("and", "or")) + " (" \
+            + randomCondition(rng, depth - 1) + ")"
+
+
+def sameValue(first, second):
+    return (math.isnan(first) and math.isnan(second)) or first == second \
+            or math.isclose(first, second, rel_tol=1e-9, abs_tol=1e-9)
+
+
+class TestStatMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(47)
+        self.columns = randomColumns(self.rng)
+        self.matrix = statMatrix.StatMatrix(range(NUM_ROWS), self.columns)
+        with mock.patch.object(statMatrix, "np", None):
+            self.pythonMatrix = statMatrix.StatMatrix(range(NUM_ROWS), self.columns)
+
+
+    def evaluatePython(self, expression):
+        with mock.patch.object(statMatrix, "np", None):
+            return self.pythonMatrix.evaluate(expression)
+
+
+    def queryPython(self, condition, sortBy):
+        with mock.patch.object(statMatrix, "np", None):
+            return self.pythonMatrix.query(condition=condition, sortBy=sortBy)
+
+
+    @unittest.skipIf(statMatrix.np is None, "NumPy is not installed")
+    def test_evaluatorsAgree(self):
+        for _ in range(NUM_EXPRESSIONS):
+            expression = randomArithmetic(self.rng, 4) if self.rng.random() < 0.5 else randomCondition(self.rng, 3)
+            with self.subTest(expression=expression):
+                numpyValues = [float(value) for value in self.matrix.evaluate(expression)]
+                pythonValues = [float(value) for value in self.evaluatePython(expression)]
+                self.assertEqual(len(numpyValues), NUM_ROWS)
+                for numpyValue, pythonValue in zip(numpyValues, pythonValues):
+                    self.assertTrue(sameValue(numpyValue, pythonValue), str(numpyValue) + " != " + str(pythonValue))
+
+
+    @unittest.skipIf(statMatrix.np is None, "NumPy is not installed")
+    def test_queriesAgree(self):
+        for _ in range(NUM_EXPRESSIONS // 3):
+            condition = randomCondition(self.rng, 2) if self.rng.random() < 0.8 else None
+            # Sort by single stats, so that float rounding cannot reorder rows with nearly equal sort values
+            sortBy = self.rng.choice(STATS + tuple("-" + stat for stat in STATS) + (None,))
+            with self.subTest(condition=condition, sortBy=sortBy):
+                self.assertEqual(self.matrix.query(condition=condition, sortBy=sortBy),
+                                    self.queryPython(condition, sortBy))
+
+
+    def test_queryMatchesReference(self):
+        rows = self.queryPython("cargo > 3 and not (value < 100)", "armour")
+        expected = [row for row in range(NUM_ROWS) if self.columns["cargo"][row] > 3 and self.columns["value"][row] >= 100]
+        expected.sort(key=lambda row: -self.columns["armour"][row])
+        self.assertEqual(rows, expected)
+        self.assertEqual(self.matrix.query("cargo > 3 and not (value < 100)", "armour"), expected)
+
+
+    def test_invalidExpressions(self):
+        longName = "x" * 3000
+        for expression in ("1 +", "cargo ** 2", "cargo in value", "None", "__import__('os')", "cargo.real", longName,
+                            "-" * 1500 + "1", "not " * 2000 + "1", "(" * 500 + "1" + ")" * 500,
+                            " + ".join(["cargo"] * 1000), "cargo * 1" + "0" * 400):
+            for evaluate in (self.matrix.evaluate, self.evaluatePython):
+                with self.subTest(expression=expression[:20], evaluate=evaluate):
+                    with self.assertRaises(ValueError) as context:
+                        evaluate(expression)
+                    # Error messages are shown to users, and must fit in a discord message
+                    self.assertLessEqual(len(str(context.exception)), 200)
+        with self.assertRaises(ValueError):
+            self.matrix.statsInExpression("-" * 1500 + "1")
+
+
+    def test_statsInExpression(self):
+        self.assertEqual(self.matrix.statsInExpression("value > 3 and cargo / value < armour"), ["value", "cargo", "armour"])
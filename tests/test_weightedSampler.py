@@ -0,0 +1,167 @@
+import math
+import random
+import unittest
+
+from bot.cfg import cfg
+from bot.lib import gameMaths, randomStreams, weightedSampler
+
+# The number of values to sample when comparing sampled frequencies with probabilities
+NUM_SAMPLES = 100000
+# The number of standard errors that a sampled frequency may be away from its probability
+MAX_STANDARD_ERRORS = 5
+
+
+def cumulativeTableProbabilities(cumulativeChances):
+    """Calculate the probability of picking each tech level from a cumulative chance table, in the way that
+    pickRandomShopTL and pickRandomItemTL did before they used samplers: draw a chance from
+    cfg.itemSpawnRateResDP decimal places in (0, 1], and pick the first tech level whose cumulative chance is
+    at least the chance drawn, or cfg.maxTechLevel if there is none.
+    Every possible chance is drawn once, so the probabilities are exact.
+    """
+    resolutionDigits = int(math.pow(10, cfg.itemSpawnRateResDP))
+    counts = [0] * (cfg.maxTechLevel - cfg.minTechLevel + 1)
+    for chanceNum in range(1, resolutionDigits + 1):
+        tlChance = chanceNum / resolutionDigits
+        techLevel = next((i + 1 for i, v in enumerate(cumulativeChances) if v >= tlChance), cfg.maxTechLevel)
+        counts[techLevel - cfg.minTechLevel] += 1
+    return [count / resolutionDigits for count in counts]
+
+
+def assertFrequenciesMatch(testCase, picks, values, probabilities):
+    """Assert that the frequency of each value in picks is within MAX_STANDARD_ERRORS standard errors of its probability.
+    """
+    for value, probability in zip(values, probabilities):
+        frequency = picks.count(value) / len(picks)
+        standardError = math.sqrt(probability * (1 - probability) / len(picks))
+        testCase.assertLessEqual(abs(frequency - probability), MAX_STANDARD_ERRORS * standardError + 1 / len(picks),
+                                    "value " + str(value))
+
+
+class SamplerTests:
+    """Tests shared by every WeightedSampler implementation, each sampling the same seeded random weights.
+    Subclasses set samplerType to the WeightedSampler subclass to test.
+    """
+    samplerType = None
+
+    def test_probabilities(self):
+        sampler = self.samplerType("abcd", [1, 0, 3, 4])
+        self.assertEqual(sampler.probabilities(), [0.125, 0, 0.375, 0.5])
+
+
+    def test_invalidWeights(self):
+        for values, weights in (("ab", [1]), ("ab", [1, -1]), ("ab", [0, 0])):
+            with self.subTest(weights=weights):
+                with self.assertRaises(ValueError):
+                    self.samplerType(values, weights)
+
+
+    def test_randomWeights(self):
+        rng = random.Random(37)
+        for numValues in (1, 2, 5, 10, 50):
+            with self.subTest(numValues=numValues):
+                weights = [rng.choice((0, rng.random(), rng.randint(1, 100))) for _ in range(numValues - 1)] + [1]
+                sampler = self.samplerType(range(numValues), weights)
+                picks = sampler.sampleMany(NUM_SAMPLES, rng)
+                assertFrequenciesMatch(self, picks, range(numValues), sampler.probabilities())
+                for value, weight in enumerate(weights):
+                    if weight == 0:
+                        self.assertNotIn(value, picks)
+
+
+    def test_techLevelWeights(self):
+        tables = gameMaths.resetTechLevelTables()
+        expected = cumulativeTableProbabilities(tables.cumulativeShopTLChance)
+        sampler = self.samplerType(tables.techLevelRange, expected)
+        assertFrequenciesMatch(self, sampler.sampleMany(NUM_SAMPLES, random.Random(2037)), tables.techLevelRange, expected)
+
+
+class TestBisectSampler(SamplerTests, unittest.TestCase):
+    samplerType = weightedSampler.BisectSampler
+
+
+class TestAliasSampler(SamplerTests, unittest.TestCase):
+    samplerType = weightedSampler.AliasSampler
+
+
+class TestTechLevelSamplers(unittest.TestCase):
+    """Check that picking tech levels with samplers gives the same distributions as the cumulative tables did.
+    """
+
+    def setUp(self):
+        self.tables = gameMaths.resetTechLevelTables()
+        self.rng = random.Random(2037)
+
+
+    def assertFrequenciesMatch(self, picks, probabilities):
+        assertFrequenciesMatch(self, picks, self.tables.techLevelRange, probabilities)
+
+
+    def test_shopTLProbabilities(self):
+        for sampled, expected in zip(self.tables.shopTLSampler.probabilities(),
+                                        cumulativeTableProbabilities(self.tables.cumulativeShopTLChance)):
+            self.assertAlmostEqual(sampled, expected, places=12)
+
+
+    def test_itemTLProbabilities(self):
+        for shopTL, cumulativeChances in zip(self.tables.techLevelRange, self.tables.cumulativeItemTLSpawnChanceForShopTL):
+            for sampled, expected in zip(self.tables.itemTLSamplers[shopTL - cfg.minTechLevel].probabilities(),
+                                            cumulativeTableProbabilities(cumulativeChances)):
+                self.assertAlmostEqual(sampled, expected, places=12, msg="shop TL " + str(shopTL))
+
+
+    def test_pickRandomShopTL(self):
+        self.assertFrequenciesMatch([gameMaths.pickRandomShopTL(self.rng) for _ in range(NUM_SAMPLES)],
+                                    cumulativeTableProbabilities(self.tables.cumulativeShopTLChance))
+
+
+    def test_pickRandomItemTL(self):
+        for shopTL, cumulativeChances in zip(self.tables.techLevelRange, self.tables.cumulativeItemTLSpawnChanceForShopTL):
+            with self.subTest(shopTL=shopTL):
+                self.assertFrequenciesMatch([gameMaths.pickRandomItemTL(shopTL, self.rng) for _ in range(NUM_SAMPLES)],
+                                            cumulativeTableProbabilities(cumulativeChances))
+
+
+    def test_pickRandomShopTLs(self):
+        self.assertFrequenciesMatch(gameMaths.pickRandomShopTLs(NUM_SAMPLES),
+                                    cumulativeTableProbabilities(self.tables.cumulativeShopTLChance))
+
+
+    def test_pickRandomItemTLs(self):
+        for shopTL, cumulativeChances in zip(self.tables.techLevelRange, self.tables.cumulativeItemTLSpawnChanceForShopTL):
+            with self.subTest(shopTL=shopTL):
+                self.assertFrequenciesMatch(gameMaths.pickRandomItemTLs([shopTL] * NUM_SAMPLES),
+                                            cumulativeTableProbabilities(cumulativeChances))
+
+
+    def test_raisedMinTechLevel(self):
+        oldMinTechLevel = cfg.minTechLevel
+        cfg.minTechLevel += 2
+        try:
+            tables = gameMaths.getTechLevelTables()
+            self.assertEqual(tables.minTechLevel, cfg.minTechLevel)
+            for shopTL in tables.techLevelRange:
+                with self.subTest(shopTL=shopTL):
+                    picks = [gameMaths.pickRandomItemTL(shopTL, self.rng) for _ in range(NUM_SAMPLES // 10)]
+                    assertFrequenciesMatch(self, picks, tables.techLevelRange,
+                                            tables.itemTLSamplers[shopTL - tables.minTechLevel].probabilities())
+                    self.assertEqual(gameMaths.pickRandomItemTLs([shopTL] * 10, [0.999] * 10),
+                                        [gameMaths._pickAliasedIndex(tables.itemTLSamplers[shopTL - tables.minTechLevel],
+                                                                        0.999) + tables.minTechLevel] * 10)
+        finally:
+            cfg.minTechLevel = oldMinTechLevel
+            gameMaths.resetTechLevelTables()
+
+
+    def test_pickWithStreams(self):
+        seeds = [self.rng.getrandbits(64) for _ in range(NUM_SAMPLES)]
+        uniforms = randomStreams.counterUniforms(seeds, [0] * NUM_SAMPLES)
+        self.assertFrequenciesMatch(gameMaths.pickRandomShopTLs(NUM_SAMPLES, uniforms),
+                                    cumulativeTableProbabilities(self.tables.cumulativeShopTLChance))
+        shopTL = cfg.maxTechLevel // 2
+        self.assertFrequenciesMatch(gameMaths.pickRandomItemTLs([shopTL] * NUM_SAMPLES, uniforms),
+                                    cumulativeTableProbabilities(
+                                        self.tables.cumulativeItemTLSpawnChanceForShopTL[shopTL - cfg.minTechLevel]))
+
+
+if __name__ == "__main__":
+    unittest.main()